@@ -39,7 +39,7 @@ def test(session: Session) -> None:
 	session.install('git+https://github.com/shrine-maiden-heavy-industries/torii-hdl.git')
 	# TODO(aki): Removed once we can rely on the Torii USB version in PyPi
 	session.install('git+https://github.com/shrine-maiden-heavy-industries/torii-usb.git')
-	session.install('--pre', '-e', '.[usb,uart]')
+	session.install('--pre', '-e', '.[usb,uart,export]')
 
 	if ENABLE_COVERAGE:
 		session.log('Coverage support enabled')
@@ -250,3 +250,19 @@ def dist(session: Session) -> None:
 	session.install('build')
 
 	session.run('python', '-m', 'build', '-o', str(DIST_DIR))
+
+@nox.session(reuse_venv = True)
+def benchmark(session: Session) -> None:
+	OUTPUT_DIR = BUILD_DIR / 'benchmarks'
+	OUTPUT_DIR.mkdir(parents = True, exist_ok = True)
+
+	# TODO(aki): Removed once we can rely on the Torii version in PyPi
+	session.install('git+https://github.com/shrine-maiden-heavy-industries/torii-hdl.git')
+	# TODO(aki): Removed once we can rely on the Torii USB version in PyPi
+	session.install('git+https://github.com/shrine-maiden-heavy-industries/torii-usb.git')
+	session.install('--pre', '-e', '.[usb,uart]')
+
+	# Any extra arguments, such as `--baseline`, are passed through to the benchmarks
+	session.run(
+		'python', '-m', 'tests.benchmarks.host', '--json', str(OUTPUT_DIR / 'host.json'), *session.posargs
+	)
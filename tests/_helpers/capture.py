@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from collections.abc    import Callable, Iterable
+from typing             import Any
+
+from torii.hdl.ast      import Signal
+from torii.hdl.dsl      import Module
+from torii.hdl.ir       import Elaboratable
+
+from torii_ila._bits    import bits
+from torii_ila.backhaul import AsyncILABackhaulInterface, ILABackhaulInterface
+from torii_ila.layout   import ILALayout, ILASignal
+
+LAYOUT = ILALayout(
+	[ ILASignal('a', 1, 0), ILASignal('b', 3, 1), ILASignal('c', 8, 4), ILASignal('d', 16, 12) ],
+	sample_depth = 4, sample_rate = 80e6, prologue_samples = 1
+)
+
+# A capture off of the UART ILA gateware tests
+SAMPLES = b'\xf1\x2e\x00\x00\xe2\x4e\x00\x00\xd5\x8e\x00\x00\xc6\x0e\x01\x00'
+
+def encode_rcobs(data: bytes) -> bytes:
+	out = bytearray()
+	run = 0
+	for byte in data:
+		if byte == 0:
+			out.append(run + 1)
+			run = 0
+		else:
+			out.append(byte)
+			run += 1
+			if run == 254:
+				out.append(0xff)
+				run = 0
+	out.append(run + 1)
+	return bytes(out)
+
+class MemoryBackhaul(ILABackhaulInterface):
+	''' A backhaul for a capture that is already in hand, as raw sample values '''
+
+	def __init__(self, layout: ILALayout, raw: Iterable[int]) -> None:
+		super().__init__(layout)
+
+		self._raw = [ bits.from_int(value, layout.sample_width) for value in raw ]
+
+	def _ingest_samples(self) -> list[bits]:
+		return self._raw
+
+class MemoryAsyncBackhaul(AsyncILABackhaulInterface):
+	''' The asyncio flavor of :py:class:`MemoryBackhaul` '''
+
+	def __init__(self, layout: ILALayout, raw: Iterable[int]) -> None:
+		super().__init__(layout)
+
+		self._raw = [ bits.from_int(value, layout.sample_width) for value in raw ]
+
+	async def _ingest_samples(self) -> list[bits]:
+		return self._raw
+
+class CountingDut(Elaboratable):
+	''' An ILA probing signals that count up every cycle, triggered once ``trigger_after`` cycles in '''
+
+	def __init__(
+		self, ila_type: Callable[..., Any], widths: Iterable[int], sample_depth: int, trigger_after: int = 16,
+		**ila_args: Any
+	) -> None:
+		self.signals = [ Signal(width, name = f'count_{idx}') for idx, width in enumerate(widths) ]
+
+		self.ila = ila_type(
+			signals         = self.signals,
+			sample_depth    = sample_depth,
+			sampling_domain = 'sync',
+			**ila_args,
+		)
+
+		self._trigger_after = trigger_after
+
+	def elaborate(self, platform) -> Module:
+		m = Module()
+
+		m.submodules.ila = self.ila
+
+		cycle = Signal(range(self._trigger_after + 1))
+
+		with m.If(cycle != self._trigger_after):
+			m.d.sync += [ cycle.eq(cycle + 1), ]
+
+		m.d.comb += [ self.ila.trigger.eq(cycle == self._trigger_after - 1), ]
+		m.d.sync += [ sig.eq(sig + 1) for sig in self.signals ]
+
+		return m
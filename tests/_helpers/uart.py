@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import time
+from collections         import deque
+
+from collections.abc     import Iterable
+from typing              import Self
+
+from torii.hdl.ast       import Signal
+from torii.hdl.ir        import Elaboratable, Fragment
+from torii.sim           import Passive, Simulator
+
+from torii_ila.uart      import UARTIntegratedLogicAnalyzer
+
+from .capture            import CountingDut
+
+def counting_dut(widths: Iterable[int], sample_depth: int, divisor: int = 8) -> CountingDut:
+	''' A :py:class:`CountingDut <tests._helpers.capture.CountingDut>` behind a UART ILA '''
+
+	return CountingDut(
+		UARTIntegratedLogicAnalyzer, widths, sample_depth,
+		divisor = divisor, tx = Signal(), rx = Signal(reset = 1),
+	)
+
+class SimSerial:
+	'''
+	Stands in for :py:class:`serial.Serial` on the other end of the UART of a simulated UART ILA.
+
+	The simulation only runs while something is being read, until there is enough to hand back, so the
+	host side of the backhaul drives it just like it would real hardware.
+
+	Attributes
+	----------
+	cycles : int
+		The number of clock cycles simulated so far.
+
+	sim_time : float
+		The wall-clock seconds spent simulating so far.
+	'''
+
+	def __init__(
+		self, dut: Elaboratable, ila: UARTIntegratedLogicAnalyzer, *, frequency: float = 48e6,
+		max_cycles: int = 10_000_000
+	) -> None:
+		self.timeout  = None
+		self.cycles   = 0
+		self.sim_time = 0.0
+
+		self._ila        = ila
+		self._divisor    = ila.divisor
+		self._max_cycles = max_cycles
+		self._rx_data    = bytearray()
+		self._tx_data    = deque[int]()
+
+		self._sim = Simulator(Fragment.get(dut, None))
+		self._sim.add_clock(1 / frequency, domain = 'sync')
+		self._sim.add_sync_process(self._count, domain = 'sync')
+		self._sim.add_sync_process(self._receive, domain = 'sync')
+		self._sim.add_sync_process(self._transmit, domain = 'sync')
+
+	def _count(self):
+		yield Passive()
+		while True:
+			yield
+			self.cycles += 1
+
+	def _receive(self):
+		''' Pull bytes off of the ILA UART TX line '''
+
+		yield Passive()
+		while True:
+			while (yield self._ila.tx):
+				yield
+			# Sample each bit in the middle
+			for _ in range(self._divisor // 2):
+				yield
+			byte = 0
+			for idx in range(8):
+				for _ in range(self._divisor):
+					yield
+				byte |= (yield self._ila.tx) << idx
+			for _ in range(self._divisor):
+				yield
+			self._rx_data.append(byte)
+
+	def _transmit(self):
+		''' Push bytes written by the host onto the ILA UART RX line '''
+
+		yield Passive()
+		while True:
+			if not self._tx_data:
+				yield
+				continue
+
+			byte = self._tx_data.popleft()
+			for bit in (0, *((byte >> idx) & 1 for idx in range(8)), 1):
+				yield self._ila.rx.eq(bit)
+				for _ in range(self._divisor):
+					yield
+
+	@property
+	def in_waiting(self) -> int:
+		return len(self._rx_data)
+
+	def read(self, size: int = 1) -> bytes:
+		start    = time.perf_counter()
+		deadline = self.cycles + self._max_cycles
+
+		# Like a serial port without a timeout, block until there's something to hand back
+		while not self._rx_data and self.cycles < deadline:
+			self._sim.advance()
+
+		self.sim_time += time.perf_counter() - start
+
+		data = bytes(self._rx_data[:size])
+		del self._rx_data[:size]
+		return data
+
+	def write(self, data: bytes) -> None:
+		self._tx_data.extend(data)
+
+	def flush(self) -> None:
+		pass
+
+	def reset_input_buffer(self) -> None:
+		self._rx_data.clear()
+
+	def close(self) -> None:
+		pass
+
+	def __enter__(self) -> Self:
+		return self
+
+	def __exit__(self, *_) -> None:
+		self.close()
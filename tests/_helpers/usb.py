@@ -0,0 +1,455 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Rachel Mant <git@dragonmux.network>
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import time
+from array               import array
+from typing              import Any, Generator, Iterable
+
+from torii.hdl.ir        import Elaboratable, Fragment
+from torii.hdl.rec       import Record, Direction
+from torii.sim           import Passive, Simulator
+from torii.test          import ToriiTestCase
+
+from usb_construct.types import USBPacketID, USBStandardRequests
+
+import usb.core
+
+from torii_ila.usb       import USBIntegratedLogicAnalyzer
+
+from .capture            import CountingDut
+
+UTMI_BUS = Record([
+	# Send interface
+	('tx_data', 8, Direction.FANOUT),
+	('tx_valid', 1, Direction.FANOUT),
+	('tx_ready', 1, Direction.FANIN),
+	# Receive interface
+	('rx_data', 8, Direction.FANIN),
+	('rx_valid', 1, Direction.FANIN),
+	('rx_active', 1, Direction.FANIN),
+
+	# Control signals
+	('line_state', 2),
+	('vbus_valid', 1),
+	('session_valid', 1),
+	('session_end', 1),
+	('rx_error', 1),
+	('host_disconnect', 1),
+	('id_digital', 1),
+	('xcvr_select', 2),
+	('term_select', 1),
+	('op_mode', 2),
+	('suspend', 1),
+	('id_pullup', 1),
+	('dm_pulldown', 1),
+	('dp_pulldown', 1),
+	('chrg_vbus', 1),
+	('dischrg_vbus', 1),
+	('use_external_vbus_indicator', 1),
+])
+
+class Platform():
+	device = 'TEST'
+
+	def request(self, name: str, number: int = 0):
+		assert name == 'usb'
+		assert number == 0
+		return UTMI_BUS
+
+def counting_dut(widths: Iterable[int], sample_depth: int, **ila_args: Any) -> CountingDut:
+	''' A :py:class:`CountingDut <tests._helpers.capture.CountingDut>` behind a USB ILA on the test bus '''
+
+	return CountingDut(USBIntegratedLogicAnalyzer, widths, sample_depth, bus = ('usb', 0), **ila_args)
+
+class USBHost:
+	'''
+	Drives the UTMI bus of a USB device like a host would.
+
+	This is mixed into :py:class:`USBHostTestCase` for the gateware tests, where the assertions come from
+	the test case, and is used by :py:class:`SimUSBDevice` to drive a simulated device on behalf of the
+	real backhaul code.
+	'''
+
+	# How many cycles the device has to start answering a token
+	response_timeout: int = 50
+
+	_last_frame: int = 0
+	_last_data_send: USBPacketID | None = None
+	_last_data_recv: dict[int, USBPacketID]
+
+	def usb_reset_state(self) -> None:
+		self._last_frame      = 0
+		self._last_data_send  = None
+		self._last_data_recv  = dict()
+
+	# These are shadowed by the ones from the test case when there is one
+	def assertEqual(self, first, second, msg = None) -> None:
+		if first != second:
+			raise AssertionError(msg or f'{first!r} != {second!r}')
+
+	wait_until_high = staticmethod(ToriiTestCase.wait_until_high)
+
+	@staticmethod
+	def crc5(data: int, bit_len: int) -> int:
+		crc = 0x1f
+
+		for bit_idx in range(bit_len):
+			bit = (data >> bit_idx) & 1
+			crc <<= 1
+
+			if bit != (crc >> 5):
+				crc ^= 0x25
+			crc &= 0x1f
+
+		crc ^= 0x1f
+		return int(f'{crc:05b}'[::-1], base = 2)
+
+	@staticmethod
+	def crc16(data: int, bit_len: int, crc_in: int = 0) -> int:
+		crc = int(f'{crc_in ^ 0xffff:016b}'[::-1], base = 2)
+
+		for bit_idx in range(bit_len):
+			bit = (data >> bit_idx) & 1
+			crc <<= 1
+
+			if bit != (crc >> 16):
+				crc ^= 0x18005
+			crc &= 0xffff
+
+		crc ^= 0xffff
+		return int(f'{crc:016b}'[::-1], base = 2)
+
+	@staticmethod
+	def crc16_buff(data: Iterable[int]) -> int:
+		crc = 0
+		for byte in data:
+			crc = USBHost.crc16(byte, 8, crc)
+		return crc
+
+	def usb_send_control_token(self, pid: USBPacketID, token_data: int):
+		frame = token_data | (self.crc5(token_data, 11) << 11)
+		yield UTMI_BUS.rx_active.eq(1)
+		yield
+		yield UTMI_BUS.rx_valid.eq(1)
+		yield UTMI_BUS.rx_data.eq(pid.byte())
+		yield
+		yield UTMI_BUS.rx_data.eq(frame & 0xff)
+		yield
+		yield UTMI_BUS.rx_data.eq(frame >> 8)
+		yield
+		yield UTMI_BUS.rx_valid.eq(0)
+		yield UTMI_BUS.rx_active.eq(0)
+		yield
+
+	def usb_collect_response(self):
+		''' Collect a whole packet from the device, returning its bytes '''
+
+		yield UTMI_BUS.tx_ready.eq(1)
+		yield
+		yield from self.wait_until_high(UTMI_BUS.tx_valid, timeout = self.response_timeout)
+		data = list[int]()
+		while (yield UTMI_BUS.tx_valid):
+			data.append((yield UTMI_BUS.tx_data))
+			yield
+		yield UTMI_BUS.tx_ready.eq(0)
+		return data
+
+	def usb_consume_response(self, data: Iterable[int]):
+		self.assertEqual((yield from self.usb_collect_response()), list(data))
+
+	def usb_sof(self):
+		yield from self.usb_send_control_token(USBPacketID.SOF, self._last_frame)
+		self._last_frame += 1
+		self._last_frame &= 0x7ff
+
+	def usb_solicit(self, addr: int, ep: int, pid: USBPacketID):
+		yield from self.usb_send_control_token(pid, addr | (ep << 7))
+
+	def usb_in(self, addr: int, ep: int):
+		yield from self.usb_solicit(addr, ep, USBPacketID.IN)
+
+	def usb_out(self, addr: int, ep: int):
+		yield from self.usb_solicit(addr, ep, USBPacketID.OUT)
+
+	def usb_setup(self, addr: int):
+		self._last_data_send = None
+		yield from self.usb_solicit(addr, 0, USBPacketID.SETUP)
+
+	def usb_recv_ep_packet(self, addr: int, ep: int):
+		''' Ask an IN endpoint for a packet, returning its payload, or ``None`` if the device NAKed '''
+
+		yield from self.usb_in(addr, ep)
+		pid, *data = yield from self.usb_collect_response()
+		if pid == USBPacketID.NAK.byte():
+			return None
+
+		payload, crc = data[:-2], data[-2:]
+		self.assertEqual(self.crc16_buff(payload).to_bytes(2, byteorder = 'little'), bytes(crc))
+		yield from self.usb_send_ack()
+		return payload
+
+	def usb_send_ack(self):
+		yield UTMI_BUS.rx_active.eq(1)
+		yield
+		yield UTMI_BUS.rx_valid.eq(1)
+		yield UTMI_BUS.rx_data.eq(USBPacketID.ACK.byte())
+		yield
+		yield UTMI_BUS.rx_valid.eq(0)
+		yield UTMI_BUS.rx_active.eq(0)
+		yield
+
+	def usb_recv_ack(self):
+		yield from self.usb_consume_response((USBPacketID.ACK.byte(),))
+
+	def usb_recv_stall(self):
+		yield from self.usb_consume_response((USBPacketID.STALL.byte(),))
+
+	def usb_send_data(self, data: Iterable[int]):
+		if self._last_data_send is None or self._last_data_send == USBPacketID.DATA1:
+			self._last_data_send = USBPacketID.DATA0
+		else:
+			self._last_data_send = USBPacketID.DATA1
+
+		yield UTMI_BUS.rx_active.eq(1)
+		yield
+		yield UTMI_BUS.rx_valid.eq(1)
+		yield UTMI_BUS.rx_data.eq(self._last_data_send.byte())
+		yield
+		crc = 0
+		for byte in data:
+			crc = self.crc16(byte, 8, crc)
+			yield UTMI_BUS.rx_data.eq(byte)
+			yield
+		yield UTMI_BUS.rx_data.eq(crc & 0xff)
+		yield
+		yield UTMI_BUS.rx_data.eq(crc >> 8)
+		yield
+		yield UTMI_BUS.rx_valid.eq(0)
+		yield UTMI_BUS.rx_active.eq(0)
+		yield
+
+	def usb_recv_zlp(self):
+		yield from self.usb_consume_response((USBPacketID.DATA1.byte(), 0x00, 0x00))
+
+	def usb_send_zlp(self):
+		yield from self.usb_send_data(())
+
+	def usb_send_setup_packet(self, addr: int, data: Iterable[int]):
+		yield from self.usb_setup(addr)
+		yield from self.usb_send_data(data)
+		yield from self.usb_recv_ack()
+
+	def usb_set_addr(self, addr: int):
+		yield from self.usb_send_setup_packet(0, (
+			0x00, USBStandardRequests.SET_ADDRESS,
+			*addr.to_bytes(2, byteorder = 'little'), 0x00, 0x00, 0x00, 0x00
+		))
+		yield from self.usb_in(0, 0)
+		yield from self.usb_recv_zlp()
+		yield from self.usb_send_ack()
+
+	def usb_set_config(self, addr: int, config: int):
+		yield from self.usb_send_setup_packet(addr, (
+			0x00, USBStandardRequests.SET_CONFIGURATION,
+			*config.to_bytes(2, byteorder = 'little'), 0x00, 0x00, 0x00, 0x00
+		))
+		yield from self.usb_in(addr, 0)
+		yield from self.usb_recv_zlp()
+		yield from self.usb_send_ack()
+
+	def usb_set_interface(self, addr: int, interface: int, alt: int):
+		yield from self.usb_send_setup_packet(addr, (
+			0x01, USBStandardRequests.SET_INTERFACE,
+			*alt.to_bytes(2, byteorder = 'little'),
+			*interface.to_bytes(2, byteorder = 'little'),
+			0x00, 0x00
+		))
+		yield from self.usb_in(addr, 0)
+		yield from self.usb_recv_zlp()
+		yield from self.usb_send_ack()
+
+	def usb_recv_ep_data(self, addr: int, ep: int, data: Iterable[int]):
+		# Each endpoint has its own data toggle
+		if self._last_data_recv.get(ep) in (None, USBPacketID.DATA1):
+			self._last_data_recv[ep] = USBPacketID.DATA0
+		else:
+			self._last_data_recv[ep] = USBPacketID.DATA1
+
+		crc = self.crc16_buff(data)
+		yield from self.usb_in(addr, ep)
+		yield from self.usb_consume_response((
+			self._last_data_recv[ep].byte(), *data, *crc.to_bytes(2, byteorder = 'little')
+		))
+		yield from self.usb_send_ack()
+
+	def usb_vendor_out(self, addr: int, request: int, value: int, index: int = 0):
+		yield from self.usb_send_setup_packet(addr, (
+			0x40, request, *value.to_bytes(2, byteorder = 'little'), *index.to_bytes(2, byteorder = 'little'),
+			0x00, 0x00
+		))
+		yield from self.usb_in(addr, 0)
+		yield from self.usb_recv_zlp()
+		yield from self.usb_send_ack()
+
+	def usb_vendor_in(self, addr: int, request: int, data: Iterable[int], index: int = 0):
+		yield from self.usb_send_setup_packet(addr, (
+			0xc0, request, 0x00, 0x00, *index.to_bytes(2, byteorder = 'little'),
+			*len(data).to_bytes(2, byteorder = 'little')
+		))
+		yield from self.usb_in(addr, 0)
+		yield from self.usb_consume_response((
+			USBPacketID.DATA1.byte(), *data, *self.crc16_buff(data).to_bytes(2, byteorder = 'little')
+		))
+		yield from self.usb_send_ack()
+		yield from self.usb_out(addr, 0)
+		yield from self.usb_send_zlp()
+		yield from self.usb_recv_ack()
+
+	def usb_control_in(self, addr: int, setup: Iterable[int], length: int):
+		''' Run an IN control transfer, returning the data stage '''
+
+		yield from self.usb_send_setup_packet(addr, setup)
+		data = list[int]()
+		while len(data) < length:
+			packet = yield from self.usb_recv_ep_packet(addr, 0)
+			if packet is None:
+				continue
+			data.extend(packet)
+			if len(packet) < 64:
+				break
+		yield from self.usb_out(addr, 0)
+		yield from self.usb_send_zlp()
+		yield from self.usb_recv_ack()
+		return data
+
+	def usb_control_out(self, addr: int, setup: Iterable[int]):
+		''' Run an OUT control transfer without a data stage '''
+
+		yield from self.usb_send_setup_packet(addr, setup)
+		while (yield from self.usb_recv_ep_packet(addr, 0)) is None:
+			pass
+
+class USBHostTestCase(ToriiTestCase, USBHost):
+	''' Drives the UTMI bus of a USB device under test like a host would '''
+
+	platform = Platform()
+
+	def setUp(self) -> None:
+		super().setUp()
+		self.usb_reset_state()
+
+class SimUSBDevice(USBHost):
+	'''
+	Stands in for the :py:class:`usb.core.Device` of a simulated USB ILA.
+
+	Like :py:class:`SimSerial <tests._helpers.uart.SimSerial>` the simulation only runs while a transfer is in
+	flight, each transfer being played out on the UTMI bus by the :py:class:`USBHost` helpers, so the host side
+	of the backhaul drives it just like it would real hardware.
+
+	Attributes
+	----------
+	cycles : int
+		The number of clock cycles simulated so far.
+
+	sim_time : float
+		The wall-clock seconds spent simulating so far.
+	'''
+
+	def __init__(
+		self, dut: Elaboratable, *, address: int = 0x1a, frequency: float = 60e6, max_packet_size: int = 512,
+		max_cycles: int = 10_000_000
+	) -> None:
+		self.usb_reset_state()
+		self.cycles   = 0
+		self.sim_time = 0.0
+
+		self._address         = address
+		self._frequency       = frequency
+		self._max_packet_size = max_packet_size
+		self._max_cycles      = max_cycles
+		self._transfer        = None
+		self._result          = None
+
+		self._sim = Simulator(Fragment.get(dut, Platform()))
+		self._sim.add_clock(1 / frequency, domain = 'usb')
+		self._sim.add_clock(1 / frequency, domain = 'sync')
+		self._sim.add_sync_process(self._count, domain = 'usb')
+		self._sim.add_sync_process(self._host, domain = 'usb')
+
+	def _count(self):
+		yield Passive()
+		while True:
+			yield
+			self.cycles += 1
+
+	def _host(self):
+		''' Bring the device up, then play out each transfer as it comes in '''
+
+		yield Passive()
+		yield UTMI_BUS.vbus_valid.eq(1)
+		yield UTMI_BUS.line_state.eq(0b01)
+		yield
+		yield from self.usb_sof()
+		yield from self.usb_set_addr(self._address)
+		yield from self.usb_set_config(self._address, 1)
+
+		while True:
+			if self._transfer is None:
+				yield
+				continue
+
+			self._result   = yield from self._transfer
+			self._transfer = None
+
+	def _run(self, transfer: Generator):
+		start    = time.perf_counter()
+		deadline = self.cycles + self._max_cycles
+
+		self._transfer = transfer
+		while self._transfer is not None:
+			if self.cycles >= deadline:
+				raise RuntimeError(f'Simulated USB transfer did not complete within {self._max_cycles} cycles')
+			self._sim.advance()
+
+		self.sim_time += time.perf_counter() - start
+		return self._result
+
+	def ctrl_transfer(
+		self, bmRequestType: int, bRequest: int, wValue: int = 0, wIndex: int = 0,
+		data_or_wLength: int | None = None, timeout: int | None = None
+	) -> array | int:
+		setup = (
+			bmRequestType, bRequest, *wValue.to_bytes(2, byteorder = 'little'),
+			*wIndex.to_bytes(2, byteorder = 'little'),
+		)
+
+		if bmRequestType & 0x80:
+			return array('B', self._run(self.usb_control_in(
+				self._address, (*setup, *data_or_wLength.to_bytes(2, byteorder = 'little')), data_or_wLength
+			)))
+
+		if data_or_wLength:
+			raise NotImplementedError('OUT control transfers with a data stage are not simulated')
+
+		self._run(self.usb_control_out(self._address, (*setup, 0x00, 0x00)))
+		return 0
+
+	def read(self, endpoint: int, size: int, timeout: int | None = None) -> array:
+		''' A bulk read, which ends on a short packet, ``timeout`` being in milliseconds of simulated time '''
+
+		deadline = None if not timeout else self.cycles + int(timeout * 1e-3 * self._frequency)
+
+		data = bytearray()
+		while len(data) < size:
+			packet = self._run(self.usb_recv_ep_packet(self._address, endpoint & 0x7f))
+			if packet is None:
+				if deadline is not None and self.cycles >= deadline:
+					raise usb.core.USBTimeoutError('Operation timed out')
+				continue
+
+			data.extend(packet)
+			if len(packet) < self._max_packet_size:
+				break
+
+		return array('B', data)
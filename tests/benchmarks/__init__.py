@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import json
+import platform
+import time
+from collections.abc import Callable, Iterable
+from pathlib         import Path
+from tempfile        import TemporaryDirectory
+from typing          import Any
+
+from torii_ila.backhaul import ILABackhaulInterface
+
+Result = dict[str, Any]
+
+def best_of(func: Callable[[], Any], repeat: int = 5) -> float:
+	''' Run ``func`` a few times and return the quickest run in seconds, which is the one with the least noise '''
+
+	best = float('inf')
+
+	for _ in range(repeat):
+		start = time.perf_counter()
+		func()
+		best = min(best, time.perf_counter() - start)
+
+	return best
+
+def bench_backhaul(backhaul: ILABackhaulInterface, peer: Any) -> Result:
+	'''
+	Pull a capture through ``backhaul`` from a simulated ``peer``, which keeps count of the ``cycles`` and the
+	wall-clock ``sim_time`` spent simulating, so the time spent in the host side decode can be told apart.
+	'''
+
+	cycles   = peer.cycles
+	sim_time = peer.sim_time
+
+	start  = time.perf_counter()
+	raw    = list(backhaul._ingest_samples())
+	ingest = time.perf_counter() - start
+
+	cycles   = peer.cycles - cycles
+	sim_time = peer.sim_time - sim_time
+	depth    = backhaul.layout.sample_depth
+
+	backhaul.samples = backhaul._parse_samples(raw)
+
+	with TemporaryDirectory() as tmp:
+		vcd_file  = Path(tmp) / 'capture.vcd'
+		write_vcd = best_of(lambda: backhaul.write_vcd(vcd_file))
+
+	return {
+		'cycles':      cycles,
+		'cycles/smpl': cycles // depth,
+		'bytes/cycle': depth * backhaul.layout.bytes_per_sample / cycles,
+		'sim_s':       sim_time,
+		'ingest_s':    ingest - sim_time,
+		'parse_s':     best_of(lambda: backhaul._parse_samples(raw)),
+		'write_vcd_s': write_vcd,
+	}
+
+def print_results(results: Iterable[Result]) -> None:
+	''' Dump a set of benchmark results as a table '''
+
+	results = list(results)
+	if not results:
+		return
+
+	columns = list(results[0].keys())
+	cells   = [
+		[ f'{value:.6f}' if isinstance(value, float) else str(value) for value in result.values() ]
+		for result in results
+	]
+	widths  = [ max(len(column), *(len(row[idx]) for row in cells)) for idx, column in enumerate(columns) ]
+
+	print('  '.join(column.rjust(width) for column, width in zip(columns, widths)))
+	for row in cells:
+		print('  '.join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+def save_results(path: Path, results: Iterable[Result], **params: Any) -> None:
+	''' Write a set of named benchmark results out as JSON, along with what they were run with '''
+
+	path.parent.mkdir(parents = True, exist_ok = True)
+	path.write_text(json.dumps({
+		'python':  platform.python_version(),
+		'machine': platform.machine(),
+		'params':  params,
+		'results': list(results),
+	}, indent = '\t'))
+
+def load_results(path: Path) -> tuple[dict[str, Any], list[Result]]:
+	''' Read back a set of results written with :py:func:`save_results`, and what they were run with '''
+
+	data = json.loads(path.read_text())
+	return data['params'], data['results']
+
+def compare_results(results: list[Result], baseline: Iterable[Result], threshold: float) -> list[str]:
+	'''
+	Add the ``baseline_s`` time and the ``ratio`` against it to each of the ``results``, returning the names of
+	those which are more than ``threshold`` times slower than the baseline.
+	'''
+
+	previous    = { result['name']: result['seconds'] for result in baseline }
+	regressions = list[str]()
+
+	for result in results:
+		if (seconds := previous.get(result['name'])) is None:
+			result['baseline_s'] = None
+			result['ratio']      = None
+			continue
+
+		result['baseline_s'] = seconds
+		result['ratio']      = result['seconds'] / seconds
+		if result['ratio'] > threshold:
+			regressions.append(result['name'])
+
+	return regressions
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+Microbenchmarks for the host side of the ILA, the bit-vectors, sample parsing and the VCD export, at realistic
+capture sizes. None of these need the gateware, or any hardware.
+
+The results can be written out as JSON with ``--json``, and compared against an earlier run with
+``--baseline``, in which case anything that got more than ``--threshold`` times slower is a failure.
+
+Run with ``nox -s benchmark`` or ``python -m tests.benchmarks.host`` from the root of the repository.
+'''
+
+import random
+import sys
+from argparse           import ArgumentParser
+from collections.abc    import Callable, Iterable
+from pathlib            import Path
+from tempfile           import TemporaryDirectory
+
+from torii_ila._bits    import bits
+from torii_ila.backhaul import ILABackhaulInterface
+from torii_ila.layout   import ILALayout, ILASignal
+
+from .                  import Result, best_of, compare_results, load_results, print_results, save_results
+
+DEPTH     = 4096
+THRESHOLD = 1.25
+
+STATES = { 0: 'IDLE', 1: 'SETUP', 2: 'DATA', 3: 'STATUS', 4: 'STALL' }
+
+def make_layout(depth: int) -> ILALayout:
+	''' A 128-bit wide sample of the sort of mix of signals a real design would probe '''
+
+	widths  = (1, 1, 3, 8, 16, 32, 7, 1, 12, 24, 3, 20)
+	signals = list[ILASignal]()
+	offset  = 0
+
+	for idx, width in enumerate(widths):
+		signals.append(ILASignal(f'sig_{idx}', width, offset, enum = STATES if width == 3 else None))
+		offset += width
+
+	return ILALayout(signals, sample_depth = depth, sample_rate = 50e6, prologue_samples = 1)
+
+class MemoryBackhaul(ILABackhaulInterface):
+	''' Hands out the same canned capture every time '''
+
+	def __init__(self: 'MemoryBackhaul', layout: ILALayout, data: bytes) -> None:
+		super().__init__(layout)
+		self._data = data
+
+	def _ingest_samples(self: 'MemoryBackhaul') -> Iterable[bits]:
+		return list(self._split_samples(self._data))
+
+def cases(depth: int, vcd_file: Path) -> dict[str, Callable[[], object]]:
+	layout   = make_layout(depth)
+	rng      = random.Random(0x1a)
+	data     = rng.randbytes(depth * layout.bytes_per_sample)
+	backhaul = MemoryBackhaul(layout, data)
+
+	step   = layout.bytes_per_sample
+	chunks = [ data[idx:idx + step] for idx in range(0, len(data), step) ]
+	raw    = backhaul._ingest_samples()
+	pairs  = list(zip(raw, raw[1:]))
+
+	backhaul.samples = backhaul._parse_samples(raw)
+
+	# Nothing in a random haystack lines up with the needle, so the whole of it is searched
+	haystack = bits.from_bytes(data[:512])
+	needle   = bits.from_str('1' * 24)
+
+	return {
+		'bits.from_bytes':  lambda: [ bits.from_bytes(chunk, layout.sample_width) for chunk in chunks ],
+		'slice_aligned':    lambda: [ sample[8:40] for sample in raw ],
+		'slice_unaligned':  lambda: [ sample[3:37] for sample in raw ],
+		'bitop':            lambda: [ (lhs & rhs) ^ rhs for lhs, rhs in pairs ],
+		'find':             lambda: haystack.find(needle),
+		'_parse_samples':   lambda: backhaul._parse_samples(raw),
+		'enumerate':        lambda: list(backhaul.enumerate()),
+		'write_vcd':        lambda: backhaul.write_vcd(vcd_file),
+	}
+
+def run(depth: int = DEPTH, repeat: int = 5) -> list[Result]:
+	with TemporaryDirectory() as tmp:
+		benches = cases(depth, Path(tmp) / 'capture.vcd')
+		return [ { 'name': name, 'seconds': best_of(bench, repeat) } for name, bench in benches.items() ]
+
+def main() -> None:
+	parser = ArgumentParser(description = 'Host side ILA microbenchmarks')
+	parser.add_argument('--depth', type = int, default = DEPTH, help = 'Number of samples in the capture')
+	parser.add_argument('--repeat', type = int, default = 5, help = 'Runs of each benchmark to take the best of')
+	parser.add_argument('--json', type = Path, help = 'Write the results out to this file')
+	parser.add_argument('--baseline', type = Path, help = 'Results of an earlier run to compare against')
+	parser.add_argument(
+		'--threshold', type = float, default = THRESHOLD,
+		help = f'Fail if anything is this many times slower than the baseline (default: {THRESHOLD})'
+	)
+
+	args = parser.parse_args()
+
+	if args.baseline is not None:
+		params, baseline = load_results(args.baseline)
+		if params != { 'depth': args.depth }:
+			parser.error(f'The baseline was run with {params}, not a depth of {args.depth}')
+
+	results = run(args.depth, args.repeat)
+
+	if args.json is not None:
+		save_results(args.json, results, depth = args.depth)
+
+	regressions = list[str]()
+	if args.baseline is not None:
+		regressions = compare_results(results, baseline, args.threshold)
+
+	print_results(results)
+
+	if regressions:
+		for name in regressions:
+			print(f'{name} is more than {args.threshold}x slower than the baseline', file = sys.stderr)
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+Resource and timing estimates for a matrix of ILA configurations, across the bare ILA, the ``StreamILA``,
+and the UART and USB transports. Yosys is used if it's installed, otherwise the analytical model is.
+
+Run with ``python -m tests.benchmarks.resources`` from the root of the repository.
+'''
+
+from argparse            import ArgumentParser
+from collections.abc     import Callable
+
+from torii.hdl.ast       import Signal
+from torii.hdl.ir        import Elaboratable
+
+from torii_ila.ila       import IntegratedLogicAnalyzer, StreamILA
+from torii_ila.resources import FAMILIES, resource_report
+from torii_ila.uart      import UARTIntegratedLogicAnalyzer
+from torii_ila.usb       import USBIntegratedLogicAnalyzer
+
+WIDTHS    = (8, 32, 128)
+DEPTHS    = (256, 4096)
+PROLOGUES = (1, 4)
+
+KINDS: dict[str, Callable[..., Elaboratable]] = {
+	'ila':    IntegratedLogicAnalyzer,
+	'stream': StreamILA,
+	'uart':   lambda **kwargs: UARTIntegratedLogicAnalyzer(divisor = 8, tx = Signal(), rx = Signal(), **kwargs),
+	'usb':    USBIntegratedLogicAnalyzer,
+}
+
+def configs(
+	kinds: tuple[str, ...], widths: tuple[int, ...], depths: tuple[int, ...], prologues: tuple[int, ...]
+) -> dict[str, Elaboratable]:
+	return {
+		f'{kind} w{width} d{depth} p{prologue}': KINDS[kind](
+			signals = [ Signal(width) ], sample_depth = depth, prologue_samples = prologue
+		)
+		for kind in kinds for width in widths for depth in depths for prologue in prologues
+	}
+
+def main() -> None:
+	parser = ArgumentParser(description = 'ILA resource and timing estimates')
+	parser.add_argument('--family', choices = FAMILIES, default = 'ice40', help = 'The FPGA family to estimate for')
+	parser.add_argument('--kinds', choices = KINDS, nargs = '+', default = tuple(KINDS), help = 'ILAs to estimate')
+	parser.add_argument('--widths', type = int, nargs = '+', default = WIDTHS, help = 'Sample widths in bits')
+	parser.add_argument('--depths', type = int, nargs = '+', default = DEPTHS, help = 'Sample depths')
+	parser.add_argument('--prologues', type = int, nargs = '+', default = PROLOGUES, help = 'Prologue samples')
+	parser.add_argument('--model', action = 'store_true', help = 'Use the analytical model even if Yosys is found')
+
+	args = parser.parse_args()
+
+	ilas = configs(tuple(args.kinds), tuple(args.widths), tuple(args.depths), tuple(args.prologues))
+	print(resource_report(ilas, args.family, yosys = False if args.model else None))
+
+if __name__ == '__main__':
+	main()
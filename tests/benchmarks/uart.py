@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+End-to-end throughput of the UART ILA, with the gateware running in simulation on the other end of a
+:py:class:`SimSerial <tests._helpers.uart.SimSerial>`, so no hardware is needed.
+
+Run with ``python -m tests.benchmarks.uart`` from the root of the repository.
+'''
+
+from argparse           import ArgumentParser
+from unittest.mock      import patch
+
+from torii_ila.uart     import UARTIntegratedLogicAnalyzerBackhaul
+from torii_ila.uart     import _backhaul
+
+from .._helpers.uart    import SimSerial, counting_dut
+from .                  import Result, bench_backhaul, print_results
+
+WIDTHS  = (8, 32, 64)
+DEPTHS  = (64, 256)
+DIVISOR = 8
+
+def bench_capture(width: int, depth: int) -> Result:
+	''' Pull a single capture of ``depth`` samples of a ``width`` bit counter through the UART backhaul '''
+
+	dut    = counting_dut((width, ), depth, divisor = DIVISOR)
+	serial = SimSerial(dut, dut.ila)
+
+	with patch.object(_backhaul, '_open_serial', return_value = serial):
+		backhaul = UARTIntegratedLogicAnalyzerBackhaul(dut.ila, 'sim', 48e6 // DIVISOR)
+
+	return { 'width': width, 'depth': depth, **bench_backhaul(backhaul, serial) }
+
+def run(widths: tuple[int, ...] = WIDTHS, depths: tuple[int, ...] = DEPTHS) -> list[Result]:
+	return [ bench_capture(width, depth) for width in widths for depth in depths ]
+
+def main() -> None:
+	parser = ArgumentParser(description = 'UART ILA end-to-end throughput benchmark')
+	parser.add_argument('--widths', type = int, nargs = '+', default = WIDTHS, help = 'Sample widths in bits')
+	parser.add_argument('--depths', type = int, nargs = '+', default = DEPTHS, help = 'Sample depths')
+
+	args = parser.parse_args()
+
+	print_results(run(tuple(args.widths), tuple(args.depths)))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+End-to-end throughput of the USB ILA, with the gateware running in simulation behind a
+:py:class:`SimUSBDevice <tests._helpers.usb.SimUSBDevice>` standing in for the ``usb.core`` device, so no
+hardware is needed.
+
+The simulated cycles are those of the 60MHz UTMI clock spent draining the capture out of the bulk endpoint,
+everything else in ``ingest_s`` is the host side decode.
+
+Run with ``python -m tests.benchmarks.usb`` from the root of the repository.
+'''
+
+from argparse           import ArgumentParser
+from unittest.mock      import patch
+
+from torii_ila.usb      import USBIntegratedLogicAnalyzerBackhaul
+from torii_ila.usb      import _backhaul
+
+from .._helpers.usb     import SimUSBDevice, counting_dut
+from .                  import Result, bench_backhaul, print_results
+
+WIDTHS = (8, 32, 64)
+DEPTHS = (64, 256)
+
+def bench_capture(width: int, depth: int) -> Result:
+	''' Pull a single capture of ``depth`` samples of a ``width`` bit counter through the USB backhaul '''
+
+	dut    = counting_dut((width, ), depth)
+	device = SimUSBDevice(dut)
+
+	with patch.object(_backhaul, '_wait_for_device', return_value = device):
+		backhaul = USBIntegratedLogicAnalyzerBackhaul(dut.ila)
+
+	return { 'width': width, 'depth': depth, **bench_backhaul(backhaul, device) }
+
+def run(widths: tuple[int, ...] = WIDTHS, depths: tuple[int, ...] = DEPTHS) -> list[Result]:
+	return [ bench_capture(width, depth) for width in widths for depth in depths ]
+
+def main() -> None:
+	parser = ArgumentParser(description = 'USB ILA end-to-end throughput benchmark')
+	parser.add_argument('--widths', type = int, nargs = '+', default = WIDTHS, help = 'Sample widths in bits')
+	parser.add_argument('--depths', type = int, nargs = '+', default = DEPTHS, help = 'Sample depths')
+
+	args = parser.parse_args()
+
+	print_results(run(tuple(args.widths), tuple(args.depths)))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,220 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import asyncio
+import os
+import threading
+import tty
+from binascii           import crc_hqx
+from pathlib            import Path
+from tempfile           import TemporaryDirectory
+from unittest           import IsolatedAsyncioTestCase
+from unittest.mock      import patch
+
+from torii_ila.uart     import UARTILACommand, UARTIntegratedLogicAnalyzerAsyncBackhaul
+from torii_ila.usb      import _async, USBILARequest, USBIntegratedLogicAnalyzerAsyncBackhaul
+
+from ._helpers.capture  import LAYOUT, SAMPLES, MemoryAsyncBackhaul, encode_rcobs
+
+class FakeUARTILA:
+	''' Answers UART ILA commands on the controller side of a pseudo-terminal '''
+
+	def __init__(self) -> None:
+		self.fd, peer = os.openpty()
+		tty.setraw(peer)
+		self.port = os.ttyname(peer)
+		os.close(peer)
+
+	def _on_command(self) -> None:
+		for cmd in os.read(self.fd, 64):
+			match cmd:
+				case UARTILACommand.FLUSH:
+					# Dribble the frame out in two halves to make sure frames get stitched back together
+					frame = encode_rcobs(SAMPLES) + b'\x00'
+					os.write(self.fd, frame[:5])
+					asyncio.get_running_loop().call_later(0.01, os.write, self.fd, frame[5:])
+				case UARTILACommand.LAYOUT:
+					os.write(self.fd, encode_rcobs(LAYOUT.pack()) + b'\x00')
+
+	def __enter__(self) -> 'FakeUARTILA':
+		asyncio.get_running_loop().add_reader(self.fd, self._on_command)
+		return self
+
+	def __exit__(self, *_) -> None:
+		asyncio.get_running_loop().remove_reader(self.fd)
+		os.close(self.fd)
+
+class FakeBlockUARTILA(FakeUARTILA):
+	''' Answers block reads from a UART ILA built with ``block_samples = 1``, mangling the first go at some blocks '''
+
+	def __init__(self, damaged: set[int]) -> None:
+		super().__init__()
+		self.damaged  = damaged
+		self.requests = list[int]()
+
+	def _send_block(self, block: int) -> None:
+		self.requests.append(block)
+
+		frame = block.to_bytes(2, byteorder = 'little') + SAMPLES[block * 4:(block + 1) * 4]
+		frame += crc_hqx(frame, 0xFFFF).to_bytes(2, byteorder = 'little')
+		raw = bytearray(encode_rcobs(frame))
+
+		if block in self.damaged:
+			self.damaged.remove(block)
+			raw[3] ^= 0x10
+
+		os.write(self.fd, raw + b'\x00')
+
+	def _on_command(self) -> None:
+		data = os.read(self.fd, 64)
+
+		while data:
+			match data[0]:
+				case UARTILACommand.FLUSH:
+					for block in range(4):
+						self._send_block(block)
+					data = data[1:]
+				case UARTILACommand.RESEND:
+					self._send_block(int.from_bytes(data[1:3], byteorder = 'little'))
+					data = data[3:]
+				case _:
+					data = data[1:]
+
+class FakeUSBILA:
+	''' Times out the first few bulk reads, then hands the capture out a packet at a time '''
+
+	def __init__(self, timeouts: int, auto_send: bool = True) -> None:
+		self.timeouts = timeouts
+		self.reads    = list[tuple[int, int, int]]()
+		self._data    = bytearray(SAMPLES if auto_send else b'')
+		self._start   = 0
+
+	def ctrl_transfer(self, request_type: int, request: int, value: int, index: int, data: None) -> None:
+		match request:
+			case USBILARequest.READ_START:
+				self._start = value | (index << 16)
+			case USBILARequest.READ:
+				count = value | (index << 16)
+				self._data += SAMPLES[self._start * 4:(self._start + count) * 4]
+
+	def read(self, endpoint: int, size: int, timeout: int) -> bytes:
+		self.reads.append((endpoint, size, timeout))
+
+		if self.timeouts > 0:
+			self.timeouts -= 1
+			raise _async.usb.core.USBTimeoutError('Operation timed out')
+
+		data = bytes(self._data[:size])
+		del self._data[:size]
+		return data
+
+class UARTAsyncBackhaulTests(IsolatedAsyncioTestCase):
+	async def test_concurrent(self):
+		with FakeUARTILA() as dev0, FakeUARTILA() as dev1:
+			backhauls = (
+				UARTIntegratedLogicAnalyzerAsyncBackhaul(LAYOUT, dev0.port, 115200),
+				await UARTIntegratedLogicAnalyzerAsyncBackhaul.from_device(dev1.port, 115200),
+			)
+			self.assertEqual(backhauls[1].layout, LAYOUT)
+
+			await asyncio.gather(*(backhaul.refresh() for backhaul in backhauls))
+			await asyncio.gather(*(backhaul.update() for backhaul in backhauls))
+
+			for backhaul in backhauls:
+				samples = [ sample async for _, sample in backhaul ]
+				self.assertEqual(len(samples), 8)
+				self.assertEqual(
+					[ (sample['b'].to_int(), sample['c'].to_int(), sample['d'].to_int()) for sample in samples[:4] ],
+					[ (0, 0xef, 2), (1, 0xee, 4), (2, 0xed, 8), (3, 0xec, 16) ]
+				)
+				self.assertEqual(samples[:4], samples[4:])
+				backhaul._port.close()
+
+	async def test_blocks(self):
+		with FakeBlockUARTILA(damaged = { 1, 2 }) as dev:
+			backhaul = UARTIntegratedLogicAnalyzerAsyncBackhaul(LAYOUT, dev.port, 115200, block_samples = 1)
+
+			await backhaul.refresh()
+			window = await backhaul.read_range(2, 2)
+			backhaul._port.close()
+
+		# The damaged blocks are asked for again, and only the blocks covering the window are read for it
+		self.assertEqual(dev.requests, [ 0, 1, 2, 3, 1, 2, 2, 3 ])
+		self.assertEqual([ sample['b'].to_int() for sample in backhaul.samples ], [ 0, 1, 2, 3 ])
+		self.assertEqual([ sample['d'].to_int() for sample in window ], [ 8, 16 ])
+
+class USBAsyncBackhaulTests(IsolatedAsyncioTestCase):
+	async def _connect(self, device: FakeUSBILA, **kwargs) -> USBIntegratedLogicAnalyzerAsyncBackhaul:
+		with (
+			patch.object(_async, '_find_device', return_value = device),
+			patch.object(_async, '_bulk_max_packet_size', return_value = 8),
+		):
+			return await USBIntegratedLogicAnalyzerAsyncBackhaul(LAYOUT, **kwargs).connect()
+
+	async def test_refresh(self):
+		device   = FakeUSBILA(timeouts = 3)
+		backhaul = await self._connect(device, poll_timeout = 5)
+
+		await backhaul.refresh()
+
+		# Polled a packet at a time until the capture showed up, then the rest in one go
+		self.assertEqual(device.reads, [ (0x81, 8, 5) ] * 4 + [ (0x81, 8, 1000) ])
+		self.assertEqual(
+			[ (sample['b'].to_int(), sample['c'].to_int(), sample['d'].to_int()) async for _, sample in backhaul ],
+			[ (0, 0xef, 2), (1, 0xee, 4), (2, 0xed, 8), (3, 0xec, 16) ]
+		)
+
+	async def test_read_range(self):
+		device   = FakeUSBILA(timeouts = 0, auto_send = False)
+		backhaul = await self._connect(device, auto_send = False)
+
+		samples = await backhaul.read_range(1, 2)
+
+		# Only the window comes over the bulk endpoint
+		self.assertEqual(device.reads, [ (0x81, 8, 100) ])
+		self.assertEqual(
+			[ (sample['b'].to_int(), sample['c'].to_int()) for sample in samples ], [ (1, 0xee), (2, 0xed) ]
+		)
+		self.assertEqual(backhaul.samples, [])
+
+	async def test_read_range_auto_send(self):
+		device   = FakeUSBILA(timeouts = 0)
+		backhaul = await self._connect(device)
+
+		samples = await backhaul.read_range(2, 1)
+
+		# The ILA sends the whole capture regardless, so it all has to be drained
+		self.assertEqual(device.reads, [ (0x81, 8, 100), (0x81, 8, 1000) ])
+		self.assertEqual([ sample['d'].to_int() for sample in samples ], [ 8 ])
+
+	async def test_capture_timeout(self):
+		backhaul = await self._connect(FakeUSBILA(timeouts = 1000), poll_timeout = 1, capture_timeout = 0.05)
+
+		with self.assertRaises(RuntimeError):
+			await backhaul.refresh()
+
+	async def test_not_connected(self):
+		with self.assertRaises(RuntimeError):
+			await USBIntegratedLogicAnalyzerAsyncBackhaul(LAYOUT).refresh()
+
+class AsyncExportTests(IsolatedAsyncioTestCase):
+	async def test_off_loop(self):
+		backhaul = MemoryAsyncBackhaul(
+			LAYOUT, [ int.from_bytes(SAMPLES[idx:idx + 4], byteorder = 'little') for idx in range(0, 16, 4) ]
+		)
+		threads  = list[int]()
+
+		def _write_vcd(*_) -> None:
+			threads.append(threading.get_ident())
+
+		with TemporaryDirectory() as tmp:
+			with patch.object(backhaul, '_write_vcd', _write_vcd):
+				await backhaul.write_vcd(Path(tmp) / 'capture.vcd', processes = 2)
+
+			await backhaul.write_table(Path(tmp) / 'capture.arrow')
+			self.assertTrue((Path(tmp) / 'capture.arrow').exists())
+
+		# The encoding happens in the executor, not on the event loop
+		self.assertEqual(len(threads), 1)
+		self.assertNotEqual(threads[0], threading.get_ident())
+		self.assertEqual((await backhaul.columns())['d'].tolist(), [ 2, 4, 8, 16 ])
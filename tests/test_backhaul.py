@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from pathlib            import Path
+from tempfile           import TemporaryDirectory
+from unittest           import TestCase
+from unittest.mock      import patch
+
+import numpy
+import pyarrow
+import pyarrow.parquet
+
+from torii_ila          import backhaul
+from torii_ila.layout   import ILALayout, ILASignal
+from torii_ila.manifest import ILAManifest
+
+from ._helpers.capture  import MemoryBackhaul
+
+LAYOUT = ILALayout(
+	[
+		ILASignal('state', 3, 0, enum = { value: f'STATE {value}' for value in range(6) }),
+		ILASignal('count', 12, 3), ILASignal('flag', 1, 15),
+	],
+	sample_depth = 1000, sample_rate = 48e6, prologue_samples = 100
+)
+
+SAMPLES = [ (idx // 7 % 8) | ((idx * 5 % 4096) << 3) | ((idx >> 4 & 1) << 15) for idx in range(1000) ]
+
+def vcd_body(path: Path) -> str:
+	''' The VCD without the date it was written on '''
+
+	return ''.join(line for line in path.read_text().splitlines(keepends = True) if not line.startswith('$date'))
+
+class VCDExportTests(TestCase):
+	def setUp(self) -> None:
+		self._tmp = TemporaryDirectory()
+		self.path = Path(self._tmp.name)
+
+		self.backhaul = MemoryBackhaul(LAYOUT, SAMPLES)
+
+	def tearDown(self) -> None:
+		self._tmp.cleanup()
+
+	def test_decoded(self):
+		self.backhaul.write_vcd(self.path / 'capture.vcd')
+		vcd = (self.path / 'capture.vcd').read_text()
+
+		self.assertIn('$var string 1 # state $end', vcd)
+		self.assertIn('sSTATE_5 #', vcd)
+		# Values outside of the table are decoded as themselves
+		self.assertIn('s7 #', vcd)
+
+	def test_partitioned(self):
+		for inject_sample_clock in ( True, False ):
+			with self.subTest(inject_sample_clock = inject_sample_clock):
+				self.backhaul.write_vcd(self.path / 'serial.vcd', inject_sample_clock, post_step = 2)
+
+				# Partitions that don't line up with the sample clock or trigger to make sure they're stitched right
+				with patch.object(backhaul, '_VCD_PARTITION_SAMPLES', 99):
+					self.backhaul.write_vcd(
+						self.path / 'parallel.vcd', inject_sample_clock, post_step = 2, processes = 3
+					)
+
+				self.assertEqual(vcd_body(self.path / 'parallel.vcd'), vcd_body(self.path / 'serial.vcd'))
+
+	def test_processes(self):
+		with self.assertRaises(ValueError):
+			self.backhaul.write_vcd(self.path / 'capture.vcd', processes = 0)
+
+class TableExportTests(TestCase):
+	def setUp(self) -> None:
+		self._tmp = TemporaryDirectory()
+		self.path = Path(self._tmp.name)
+
+		self.backhaul = MemoryBackhaul(LAYOUT, SAMPLES)
+
+	def tearDown(self) -> None:
+		self._tmp.cleanup()
+
+	def test_columns(self):
+		columns = self.backhaul.columns()
+
+		self.assertEqual(list(columns), [ 'ila_timestamp', 'state', 'count', 'flag' ])
+		self.assertEqual(columns['state'].dtype, numpy.uint8)
+		self.assertEqual(columns['count'].dtype, numpy.uint16)
+		self.assertEqual(columns['state'].tolist(), [ value & 0x7 for value in SAMPLES ])
+		self.assertEqual(columns['count'].tolist(), [ value >> 3 & 0xFFF for value in SAMPLES ])
+		self.assertEqual(columns['flag'].tolist(), [ value >> 15 for value in SAMPLES ])
+		self.assertAlmostEqual(columns['ila_timestamp'][10], 10 / 48e6)
+
+	def test_decoded(self):
+		state = self.backhaul.columns(decode = True)['state']
+
+		self.assertEqual(state[35], 'STATE 5')
+		# Values outside of the table are decoded as themselves
+		self.assertEqual(state[49], '7')
+
+	def test_wide(self):
+		layout = ILALayout([ ILASignal('wide', 72, 0) ], sample_depth = 2, sample_rate = 1e6, prologue_samples = 0)
+		wide   = MemoryBackhaul(layout, [ 1 << 70 | 0x1234, 0xFF ])
+
+		self.assertEqual(wide.columns()['wide'][0].tobytes(), (1 << 70 | 0x1234).to_bytes(9, 'little'))
+
+		wide.write_table(self.path / 'wide.arrow')
+		table = pyarrow.ipc.open_file(self.path / 'wide.arrow').read_all()
+		self.assertEqual(table['wide'].type, pyarrow.binary(9))
+		self.assertEqual(table['wide'][1].as_py(), (0xFF).to_bytes(9, 'little'))
+
+	def test_to_numpy(self):
+		array = self.backhaul.to_numpy()
+
+		self.assertEqual(array.dtype.names, ( 'ila_timestamp', 'state', 'count', 'flag' ))
+		self.assertEqual(int(array[3]['count']), SAMPLES[3] >> 3 & 0xFFF)
+
+	def test_write_table(self):
+		for name, read in (
+			( 'capture.arrow', lambda path: pyarrow.ipc.open_file(path).read_all() ),
+			( 'capture.parquet', pyarrow.parquet.read_table ),
+		):
+			with self.subTest(name = name):
+				self.backhaul.write_table(self.path / name, decode = True)
+				table = read(self.path / name)
+
+				self.assertEqual(table.column_names, [ 'ila_timestamp', 'state', 'count', 'flag' ])
+				self.assertEqual(table['count'].to_pylist(), self.backhaul.columns()['count'].tolist())
+				self.assertEqual(table['state'].type, pyarrow.dictionary(pyarrow.int32(), pyarrow.string()))
+				self.assertEqual(table['state'][35].as_py(), 'STATE 5')
+				self.assertEqual(
+					ILAManifest.from_json(table.schema.metadata[b'torii_ila.manifest'].decode()).layout, LAYOUT
+				)
@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from contextlib         import redirect_stderr, redirect_stdout
+from io                 import StringIO
+from pathlib            import Path
+from tempfile           import TemporaryDirectory
+from unittest           import TestCase
+from unittest.mock      import patch
+
+import pyarrow.parquet
+from torii.back         import rtlil
+
+from torii_ila          import cli
+from torii_ila.manifest import ILAManifest, ILATransport
+from torii_ila.uart     import _backhaul as uart_backhaul
+from torii_ila.usb      import _backhaul as usb_backhaul
+
+from ._helpers          import usb as usb_helpers
+from ._helpers.uart     import SimSerial, counting_dut
+
+class CLIGenerateTests(TestCase):
+	def setUp(self) -> None:
+		self._dir = TemporaryDirectory()
+		self.path = Path(self._dir.name)
+
+	def tearDown(self) -> None:
+		self._dir.cleanup()
+
+	def generate(self, *args: str) -> int:
+		with redirect_stdout(StringIO()):
+			return cli.main([ 'generate', *args, '--cache-dir', str(self.path / 'cache') ])
+
+	def test_uart(self):
+		output = self.path / 'ila.il'
+		self.assertEqual(self.generate('uart', '-w', '12', '-r', '48', '-b', '115200', '-o', str(output)), 0)
+
+		core = output.read_text()
+		self.assertIn('module \\torii_ila', core)
+		self.assertIn('wire width 12 input 6 \\probe', core)
+		for port in ( 'trigger', 'sampling', 'complete', 'tx', 'rx' ):
+			self.assertIn(f' \\{port}\n', core)
+
+	def test_usb(self):
+		output = self.path / 'ila.il'
+		self.assertEqual(self.generate('usb', '-w', '8', '-r', '60', '-o', str(output), '-n', 'usb_ila'), 0)
+
+		core = output.read_text()
+		self.assertIn('module \\usb_ila', core)
+		for port in ( 'probe', 'usb_clk', 'rx_data', 'tx_data', 'line_state' ):
+			self.assertIn(f' \\{port}\n', core)
+
+	def test_cache(self):
+		args = ( 'uart', '-w', '12', '-r', '48', '-b', '115200' )
+		self.assertEqual(self.generate(*args, '-o', str(self.path / 'first.il')), 0)
+
+		# Now the same configuration should be served straight out of the cache
+		with patch.object(rtlil, 'convert', side_effect = AssertionError('core regenerated')):
+			self.assertEqual(self.generate(*args, '-o', str(self.path / 'second.il')), 0)
+			self.assertEqual(
+				(self.path / 'first.il').read_text(), (self.path / 'second.il').read_text()
+			)
+
+			with self.assertRaises(AssertionError):
+				self.generate(*args, '--compress', '-o', str(self.path / 'third.il'))
+
+	def test_manifest(self):
+		manifest = self.path / 'ila.json'
+		args     = (
+			'uart', '-w', '12', '-r', '48', '-b', '115200', '--compress', '-o', str(self.path / 'ila.il'),
+			'-m', str(manifest)
+		)
+		self.assertEqual(self.generate(*args), 0)
+
+		loaded = ILAManifest.load(manifest)
+		self.assertEqual([ (sig.name, sig.width) for sig in loaded.layout.signals ], [ ('probe', 12) ])
+		self.assertEqual(loaded.layout.sample_rate, 48e6)
+		self.assertEqual(loaded.transport, ILATransport.UART)
+		self.assertEqual(loaded.baudrate, 115200)
+		self.assertTrue(loaded.compress)
+
+		# The manifest is written out even if the core itself comes out of the cache
+		manifest.unlink()
+		self.assertEqual(self.generate(*args), 0)
+		self.assertEqual(ILAManifest.load(manifest), loaded)
+
+class CLICaptureTests(TestCase):
+	def setUp(self) -> None:
+		self._dir = TemporaryDirectory()
+		self.path = Path(self._dir.name)
+
+		self.dut    = counting_dut((4, 16), sample_depth = 8)
+		self.serial = SimSerial(self.dut, self.dut.ila)
+
+	def tearDown(self) -> None:
+		self._dir.cleanup()
+
+	def capture(self, *args: str) -> tuple[int, str]:
+		stderr = StringIO()
+		with patch.object(uart_backhaul, '_open_serial', return_value = self.serial), redirect_stderr(stderr):
+			res = cli.main([ 'capture', 'uart', 'sim', *args ])
+		return res, stderr.getvalue()
+
+	def test_vcd(self):
+		output = self.path / 'capture.vcd'
+		res, log = self.capture('-b', '6000000', '-o', str(output))
+		self.assertEqual(res, 0)
+		self.assertIn('Captured 8 samples', log)
+
+		vcd = output.read_text()
+		for name in ( 'count_0', 'count_1', 'ila_clk', 'ila_trigger' ):
+			self.assertIn(f' {name} $end', vcd)
+
+	def test_raw(self):
+		# The baudrate comes out of the manifest
+		manifest = self.path / 'ila.manifest'
+		ILAManifest.from_ila(self.dut.ila, baudrate = 6000000).save(manifest)
+
+		output = self.path / 'capture.bin'
+		res, _ = self.capture('-o', str(output), '-m', str(manifest), '-c', '3')
+		self.assertEqual(res, 0)
+
+		# Each sample is 20 bits, so 3 bytes, with the 16 bit counter in the top of it
+		raw    = output.read_bytes()
+		counts = [ int.from_bytes(raw[idx:idx + 3], byteorder = 'little') >> 4 for idx in range(0, len(raw), 3) ]
+		self.assertEqual(counts, list(range(counts[0], counts[0] + 8)))
+
+	def test_parquet(self):
+		output = self.path / 'capture.parquet'
+		res, _ = self.capture('-b', '6000000', '-o', str(output))
+		self.assertEqual(res, 0)
+
+		table  = pyarrow.parquet.read_table(output)
+		counts = table['count_1'].to_pylist()
+		self.assertEqual(table.column_names, [ 'ila_timestamp', 'count_0', 'count_1' ])
+		self.assertEqual(counts, list(range(counts[0], counts[0] + 8)))
+
+	def test_decode_failure(self):
+		with patch.object(uart_backhaul, '_decode_rcobs', side_effect = ValueError('Malformed rCOBS frame')):
+			res, log = self.capture('-b', '6000000', '-o', str(self.path / 'capture.vcd'))
+
+		# A bad frame off of the device fails the capture, it isn't a usage error
+		self.assertEqual(res, 1)
+		self.assertIn('Capture failed: Malformed rCOBS frame', log)
+
+	def test_missing_baudrate(self):
+		with self.assertRaises(SystemExit) as exit, redirect_stderr(StringIO()):
+			cli.main([ 'capture', 'uart', 'sim', '-o', str(self.path / 'capture.vcd') ])
+
+		self.assertEqual(exit.exception.code, 2)
+
+	def test_usb(self):
+		dut    = usb_helpers.counting_dut((4, 16), sample_depth = 8, auto_send = False)
+		device = usb_helpers.SimUSBDevice(dut)
+
+		output = self.path / 'capture.bin'
+		stderr = StringIO()
+		with patch.object(usb_backhaul, '_wait_for_device', return_value = device), redirect_stderr(stderr):
+			res = cli.main([ 'capture', 'usb', '--on-demand', '--retrigger', '-c', '3', '-o', str(output) ])
+
+		self.assertEqual(res, 0, stderr.getvalue())
+
+		raw    = output.read_bytes()
+		counts = [ int.from_bytes(raw[idx:idx + 3], byteorder = 'little') >> 4 for idx in range(0, len(raw), 3) ]
+		self.assertEqual(counts, list(range(counts[0], counts[0] + 8)))
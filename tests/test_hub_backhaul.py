@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from array              import array
+from unittest           import TestCase
+from unittest.mock      import patch
+
+from torii.hdl.ast      import Signal
+
+from torii_ila.uart     import UARTILACommand, UARTIntegratedLogicAnalyzerHub, UARTIntegratedLogicAnalyzerHubBackhaul
+from torii_ila.uart     import _backhaul as uart_backhaul
+from torii_ila.usb      import USBIntegratedLogicAnalyzerHub, USBIntegratedLogicAnalyzerHubBackhaul
+from torii_ila.usb      import _backhaul as usb_backhaul
+
+from ._helpers.capture  import encode_rcobs
+
+# The captures handed out by each of the fake hubs, one per channel
+CAPTURES = ( b'\x21\x03\x43\x05\x65\x07\x87\x09', b'\xaa\x55' )
+
+def make_hub(hub: UARTIntegratedLogicAnalyzerHub | USBIntegratedLogicAnalyzerHub):
+	hub.add_ila(signals = [ Signal(4, name = 'a'), Signal(8, name = 'b') ], sample_depth = 4)
+	hub.add_ila(signals = [ Signal(8, name = 'c') ], sample_depth = 2)
+	return hub
+
+class FakeHubSerial:
+	''' Answers ``FLUSH`` commands to each channel of a UART ILA hub with its canned capture '''
+
+	def __init__(self) -> None:
+		self.commands = list[tuple[int, int]]()
+		self._data    = bytearray()
+
+	@property
+	def in_waiting(self) -> int:
+		return len(self._data)
+
+	def read(self, size: int) -> bytes:
+		data = bytes(self._data[:size])
+		del self._data[:size]
+		return data
+
+	def write(self, data: bytes) -> None:
+		channel, command = data[0] >> 4, data[0] & 0xF
+		self.commands.append((channel, command))
+
+		if command == UARTILACommand.FLUSH:
+			self._data += encode_rcobs(bytes((channel, )) + CAPTURES[channel]) + b'\x00'
+
+class FakeHubDevice:
+	''' Hands each bulk endpoint of a USB ILA hub its own canned capture '''
+
+	def __init__(self, captures: dict[int, bytes]) -> None:
+		self.captures = captures
+		self.reads    = list[int]()
+
+	def read(self, endpoint: int, size: int, timeout: int | None = None) -> array:
+		self.reads.append(endpoint & 0x7f)
+		return array('B', self.captures[endpoint & 0x7f][:size])
+
+class UARTHubBackhaulTests(TestCase):
+	def setUp(self) -> None:
+		hub = make_hub(UARTIntegratedLogicAnalyzerHub(divisor = 16, tx = Signal(), rx = Signal(reset = 1)))
+
+		self.serial = FakeHubSerial()
+
+		with patch.object(uart_backhaul, '_open_serial', return_value = self.serial):
+			self.backhaul = UARTIntegratedLogicAnalyzerHubBackhaul(hub, 'fake', 115200)
+
+	def test_refresh(self):
+		self.backhaul.refresh()
+
+		self.assertEqual(self.serial.commands, [ (0, UARTILACommand.FLUSH), (1, UARTILACommand.FLUSH) ])
+		self.assertEqual(
+			[ (sample['a'].to_int(), sample['b'].to_int()) for sample in self.backhaul[0].samples ],
+			[ (0x1, 0x32), (0x3, 0x54), (0x5, 0x76), (0x7, 0x98) ]
+		)
+		self.assertEqual([ sample['c'].to_int() for sample in self.backhaul[1].samples ], [ 0xaa, 0x55 ])
+
+	def test_read_range(self):
+		# The hub has no RANGE command, so the window is cut out of the whole capture
+		self.assertEqual([ sample['b'].to_int() for sample in self.backhaul[0].read_range(1, 2) ], [ 0x54, 0x76 ])
+		self.assertEqual([ sample['c'].to_int() for sample in self.backhaul[1].read_range(1, 5) ], [ 0x55 ])
+		self.assertEqual(self.serial.commands, [ (0, UARTILACommand.FLUSH), (1, UARTILACommand.FLUSH) ])
+
+	def test_lazy_refresh(self):
+		channel = self.backhaul[0]
+		channel.lazy_refresh(page_samples = 1)
+
+		# Nothing is read until it's needed, and then the whole capture is read as one page
+		self.assertEqual(len(channel.samples), 4)
+		self.assertEqual(self.serial.commands, [])
+		self.assertEqual(channel.samples[2]['b'].to_int(), 0x76)
+		self.assertEqual([ sample['a'].to_int() for sample in channel.samples ], [ 0x1, 0x3, 0x5, 0x7 ])
+		self.assertEqual(self.serial.commands, [ (0, UARTILACommand.FLUSH) ])
+
+	def test_baudrate(self):
+		with self.assertRaises(RuntimeError):
+			self.backhaul[0].set_baudrate(1000000)
+		with self.assertRaises(RuntimeError):
+			self.backhaul[0].negotiate()
+
+class USBHubBackhaulTests(TestCase):
+	def setUp(self) -> None:
+		hub = make_hub(USBIntegratedLogicAnalyzerHub())
+
+		self.device = FakeHubDevice({ ep_num: capture for ep_num, capture in zip(hub.endpoints, CAPTURES) })
+
+		with patch.object(usb_backhaul.usb.core, 'find', return_value = self.device):
+			self.backhaul = USBIntegratedLogicAnalyzerHubBackhaul(hub)
+
+	def test_refresh(self):
+		self.backhaul.refresh()
+
+		self.assertEqual(sorted(self.device.reads), [ 1, 2 ])
+		self.assertEqual(
+			[ (sample['a'].to_int(), sample['b'].to_int()) for sample in self.backhaul[0].samples ],
+			[ (0x1, 0x32), (0x3, 0x54), (0x5, 0x76), (0x7, 0x98) ]
+		)
+		self.assertEqual([ sample['c'].to_int() for sample in self.backhaul[1].samples ], [ 0xaa, 0x55 ])
+
+	def test_read_range(self):
+		# The hub streams each capture out whole, so the window is cut out of it
+		self.assertEqual([ sample['b'].to_int() for sample in self.backhaul[0].read_range(1, 2) ], [ 0x54, 0x76 ])
+		self.assertEqual([ sample['c'].to_int() for sample in self.backhaul[1].read_range(1, 5) ], [ 0x55 ])
+		self.assertEqual(self.device.reads, [ 1, 2 ])
+
+	def test_lazy_refresh(self):
+		channel = self.backhaul[0]
+		channel.lazy_refresh(page_samples = 1)
+
+		self.assertEqual(len(channel.samples), 4)
+		self.assertEqual(self.device.reads, [])
+		self.assertEqual(channel.samples[2]['b'].to_int(), 0x76)
+		self.assertEqual([ sample['a'].to_int() for sample in channel.samples ], [ 0x1, 0x3, 0x5, 0x7 ])
+		self.assertEqual(self.device.reads, [ 1 ])
@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from enum             import Enum
+from unittest         import TestCase
+
+from torii.hdl.ast    import Signal
+from torii.hdl.dsl    import Module
+from torii.hdl.ir     import Fragment
+
+from torii_ila.ila    import IntegratedLogicAnalyzer, _LayoutROM
+from torii_ila.layout import ILALayout, ILASignal
+
+class Mode(Enum):
+	IDLE = 0
+	RUN  = 1
+	HALT = 3
+
+class ILALayoutTests(TestCase):
+	def setUp(self) -> None:
+		m = Module()
+		with m.FSM(name = 'ctrl') as fsm:
+			with m.State('IDLE'):
+				m.next = 'BUSY'
+			with m.State('BUSY'):
+				m.next = 'IDLE'
+
+		self.ila = IntegratedLogicAnalyzer(
+			signals = [
+				Signal(name = 'a'), Signal(3, name = 'b', reset = 5), Signal(Mode, name = 'mode'),
+				Signal(16, name = 'd'),
+			],
+			sample_depth     = 32,
+			sample_rate      = 80e6,
+			prologue_samples = 4,
+		)
+		self.ila.add_fsm(fsm)
+
+	def test_from_ila(self):
+		layout = self.ila.layout
+
+		self.assertEqual(layout.sample_width, 23)
+		self.assertEqual(layout.bytes_per_sample, 3)
+		self.assertEqual(layout.sample_depth, 32)
+		self.assertEqual(layout.prologue_samples, 4)
+
+		self.assertEqual(
+			[ (sig.name, sig.width, sig.offset) for sig in layout.signals ],
+			[ ('a', 1, 0), ('b', 3, 1), ('mode', 2, 4), ('d', 16, 6), ('ctrl_state', 1, 22) ]
+		)
+		self.assertEqual(layout.signals[1].reset, 5)
+		self.assertEqual(layout.signals[2].enum, { 0: 'IDLE/0', 1: 'RUN/1', 3: 'HALT/3' })
+		self.assertEqual(layout.signals[4].enum, { 0: 'IDLE/0', 1: 'BUSY/1' })
+		self.assertIsNone(layout.signals[3].enum)
+
+	def test_round_trip(self):
+		layout = self.ila.layout
+		data   = layout.pack()
+
+		self.assertEqual(ILALayout.packed_length(data[:ILALayout.HEADER_SIZE]), len(data))
+
+		unpacked = ILALayout.unpack(data)
+		self.assertEqual(unpacked, layout)
+		self.assertEqual(unpacked.layout_hash, layout.layout_hash)
+		self.assertEqual(unpacked.signals[2].decode(3), 'HALT/3')
+		self.assertEqual(unpacked.signals[2].decode(2), '2')
+
+	def test_vcd_strings(self):
+		layout  = self.ila.layout
+		strings = layout._vcd_strings
+
+		self.assertEqual(set(strings), { 'mode', 'ctrl_state' })
+		self.assertIs(layout._vcd_strings, strings)
+		self.assertEqual(strings['mode'][3], 'HALT/3')
+
+		calls = list[int]()
+
+		def decoder(value: int) -> str:
+			calls.append(value)
+			return 'op X'
+
+		layout  = ILALayout([ ILASignal('op', 8, 0, enum = { 0: 'NOP', 1: 'LOAD\tA' }, decoder = decoder) ], 1, 1.0, 0)
+		strings = layout._vcd_strings['op']
+
+		# The table is sanitized up front, anything else is decoded once and then kept
+		self.assertEqual(strings[1], 'LOAD____A')
+		self.assertEqual((strings[7], strings[7]), ('op_X', 'op_X'))
+		self.assertEqual(calls, [ 7 ])
+
+	def test_malformed(self):
+		data = self.ila.layout.pack()
+
+		with self.assertRaises(ValueError):
+			ILALayout.unpack(b'NOPE' + data[4:])
+		with self.assertRaises(ValueError):
+			ILALayout.unpack(data[:-1])
+		with self.assertRaises(ValueError):
+			ILALayout([ ILASignal('a' * 256, 1, 0) ], 1, 1.0, 0).pack()
+
+	def test_rom_too_big(self):
+		# The offset and length into the ROM are only 16 bits wide
+		Fragment.get(_LayoutROM(bytes(0xFFFF)), None)
+		with self.assertRaises(ValueError):
+			Fragment.get(_LayoutROM(bytes(0x10000)), None)
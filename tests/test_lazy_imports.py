@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import subprocess
+import sys
+from pathlib  import Path
+from unittest import TestCase
+
+# What the host side is expected to get by without, at least until it's asked to do something that needs them
+GATEWARE_MODULES = ( 'torii', 'torii_usb', 'usb_construct' )
+HEAVY_MODULES    = ( *GATEWARE_MODULES, 'vcd', 'asyncio', 'importlib.metadata', 'numpy', 'pyarrow' )
+
+def imported_modules(code: str) -> set[str]:
+	''' Run ``code`` in a fresh interpreter and collect the modules it left imported '''
+
+	result = subprocess.run(
+		[ sys.executable, '-c', f'{code}\nimport sys\nprint("\\n".join(sys.modules))' ],
+		capture_output = True, text = True, check = True, cwd = Path(__file__).parent.parent
+	)
+	return set(result.stdout.splitlines())
+
+class LazyImportTests(TestCase):
+	def assertNotImported(self, code: str, modules: tuple[str, ...]) -> None:
+		imported = imported_modules(code)
+		self.assertEqual([ module for module in modules if module in imported ], [], code)
+
+	def test_package(self):
+		self.assertNotImported('import torii_ila, torii_ila.cli, torii_ila.manifest', HEAVY_MODULES)
+
+	def test_uart_backhaul(self):
+		self.assertNotImported('from torii_ila.uart import UARTIntegratedLogicAnalyzerBackhaul', HEAVY_MODULES)
+
+	def test_usb_backhaul(self):
+		self.assertNotImported(
+			'from torii_ila.usb import USBIntegratedLogicAnalyzerBackhaul, USBIntegratedLogicAnalyzerCaptureManager',
+			HEAVY_MODULES
+		)
+
+	def test_async_backhaul(self):
+		self.assertNotImported(
+			'from torii_ila.usb import USBIntegratedLogicAnalyzerAsyncBackhaul\n'
+			'from torii_ila.uart import UARTIntegratedLogicAnalyzerAsyncBackhaul',
+			GATEWARE_MODULES
+		)
+
+	def test_gateware(self):
+		imported = imported_modules('from torii_ila.uart import UARTIntegratedLogicAnalyzer')
+		self.assertIn('torii', imported)
+		self.assertNotIn('asyncio', imported)
+
+	def test_version(self):
+		import torii_ila
+
+		self.assertIsInstance(torii_ila.__version__, str)
+		# Looked up once and then kept around
+		self.assertIn('__version__', vars(torii_ila))
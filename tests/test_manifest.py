@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from enum               import Enum
+from pathlib            import Path
+from tempfile           import TemporaryDirectory
+from unittest           import TestCase
+from unittest.mock      import patch
+
+from torii.hdl.ast      import Signal
+
+from torii_ila.ila      import IntegratedLogicAnalyzer
+from torii_ila.manifest import ILAManifest, ILATransport
+from torii_ila.uart     import UARTIntegratedLogicAnalyzer, UARTIntegratedLogicAnalyzerBackhaul
+from torii_ila.uart     import _backhaul as uart_backhaul
+from torii_ila.usb      import USBIntegratedLogicAnalyzer, USBIntegratedLogicAnalyzerBackhaul
+from torii_ila.usb      import _backhaul as usb_backhaul
+
+class Mode(Enum):
+	IDLE = 0
+	RUN  = 1
+	HALT = 3
+
+def _signals() -> list[Signal]:
+	return [ Signal(name = 'a'), Signal(Mode, name = 'mode'), Signal(12, name = 'b', reset = 9) ]
+
+class ILAManifestTests(TestCase):
+	def setUp(self) -> None:
+		self.uart = UARTIntegratedLogicAnalyzer(
+			divisor = 4, tx = Signal(), rx = Signal(), signals = _signals(), sample_depth = 64, compress = True,
+			block_samples = 16, clock_frequency = 48e6, baudrates = ( 3_000_000, 6_000_000 ),
+		)
+		self.usb = USBIntegratedLogicAnalyzer(
+			signals = _signals(), sample_depth = 64, serial_number = 'ILA-1', auto_send = False
+		)
+
+	def test_from_ila(self):
+		manifest = ILAManifest.from_ila(self.uart, baudrate = 12_000_000)
+
+		self.assertEqual(manifest.layout, self.uart.layout)
+		self.assertEqual(manifest.transport, ILATransport.UART)
+		self.assertEqual(manifest.baudrate, 12_000_000)
+		self.assertEqual(manifest.baudrates, ( 3_000_000, 6_000_000 ))
+		self.assertTrue(manifest.compress)
+		self.assertEqual(manifest.block_samples, 16)
+
+		manifest = ILAManifest.from_ila(self.usb)
+		self.assertEqual(manifest.transport, ILATransport.USB)
+		self.assertFalse(manifest.auto_send)
+		self.assertEqual(manifest.serial_number, 'ILA-1')
+
+		# ILAs without a transport just have their layout
+		ila = IntegratedLogicAnalyzer(signals = _signals())
+		self.assertEqual(ILAManifest.from_ila(ila), ILAManifest(ila.layout))
+
+	def test_round_trip(self):
+		for manifest in ( ILAManifest.from_ila(self.uart, baudrate = 12_000_000), self.usb.manifest ):
+			self.assertEqual(ILAManifest.unpack(manifest.pack()), manifest)
+			self.assertEqual(ILAManifest.from_json(manifest.to_json()), manifest)
+
+		# The decoders only make it through as their tables
+		signal = ILAManifest.from_json(self.usb.manifest.to_json()).layout.signals[1]
+		self.assertEqual(signal.enum, { 0: 'IDLE/0', 1: 'RUN/1', 3: 'HALT/3' })
+		self.assertEqual(signal.decode(3), 'HALT/3')
+
+		# A bare layout descriptor is a manifest with the default transport settings
+		self.assertEqual(ILAManifest.unpack(self.uart.layout.pack()), ILAManifest(self.uart.layout))
+
+	def test_save_load(self):
+		manifest = self.usb.manifest
+
+		with TemporaryDirectory() as directory:
+			for name in ( 'ila.json', 'ila.manifest' ):
+				path = Path(directory) / name
+				manifest.save(path)
+				self.assertEqual(ILAManifest.load(path), manifest)
+
+			self.assertTrue((Path(directory) / 'ila.json').read_text().startswith('{'))
+
+	def test_malformed(self):
+		data = ILAManifest.from_ila(self.uart, baudrate = 12_000_000).pack()
+
+		with self.assertRaises(ValueError):
+			ILAManifest.unpack(data[:-4])
+		with self.assertRaises(ValueError):
+			ILAManifest.unpack(data[:len(self.uart.layout.pack())] + b'XXXX' + data[len(self.uart.layout.pack()) + 4:])
+		with self.assertRaises(ValueError):
+			ILAManifest.from_json('{ "version": 1 }')
+		with self.assertRaises(ValueError):
+			ILAManifest.from_json(self.usb.manifest.to_json().replace('"usb"', '"can"'))
+
+	def test_backhaul(self):
+		manifest = ILAManifest.from_ila(self.uart, baudrate = 12_000_000)
+
+		with patch.object(uart_backhaul, '_open_serial'):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(manifest, 'sim', manifest.baudrate)
+
+		self.assertIsNone(backhaul.ila)
+		self.assertEqual(backhaul.layout, self.uart.layout)
+		self.assertTrue(backhaul._compressed)
+		self.assertEqual(backhaul._block_samples, 16)
+		self.assertEqual(backhaul._baudrates, ( 12_000_000, 3_000_000, 6_000_000 ))
+
+		with patch.object(usb_backhaul, '_wait_for_device') as wait_for_device:
+			backhaul = USBIntegratedLogicAnalyzerBackhaul(self.usb.manifest)
+
+		wait_for_device.assert_called_once_with(10, 'ILA-1')
+		self.assertFalse(backhaul._auto_send)
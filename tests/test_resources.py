@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import json
+from pathlib             import Path
+from unittest            import TestCase
+from unittest.mock       import patch
+
+from torii.hdl.ast       import Signal
+
+from torii_ila           import resources
+from torii_ila.ila       import IntegratedLogicAnalyzer, StreamILA
+from torii_ila.resources import estimate_resources, resource_report
+from torii_ila.uart      import UARTIntegratedLogicAnalyzer
+from torii_ila.usb       import USBIntegratedLogicAnalyzer
+
+def _ila(width: int, depth: int, prologue_samples: int = 1) -> IntegratedLogicAnalyzer:
+	return IntegratedLogicAnalyzer(
+		signals = [ Signal(width) ], sample_depth = depth, prologue_samples = prologue_samples
+	)
+
+class ResourceModelTests(TestCase):
+	def test_brams(self):
+		# 256 samples of 8 bits fits in a single iCE40 BRAM, 4096 of 64 bits takes 64 of them
+		self.assertEqual(estimate_resources(_ila(8, 256), yosys = False).brams, 1)
+		self.assertEqual(estimate_resources(_ila(64, 4096), yosys = False).brams, 64)
+		# But only 16 of the much bigger ECP5 ones
+		self.assertEqual(estimate_resources(_ila(64, 4096), 'ecp5', yosys = False).brams, 16)
+
+	def test_prologue(self):
+		one  = estimate_resources(_ila(32, 256, prologue_samples = 1), yosys = False)
+		four = estimate_resources(_ila(32, 256, prologue_samples = 4), yosys = False)
+
+		# Each extra prologue sample is another register stage as wide as the sample
+		self.assertEqual(four.ffs - one.ffs, 3 * 32)
+		self.assertEqual(four.luts, one.luts)
+
+	def test_transports(self):
+		ila    = estimate_resources(_ila(32, 1024), yosys = False)
+		stream = estimate_resources(StreamILA(signals = [ Signal(32) ], sample_depth = 1024), yosys = False)
+		uart   = estimate_resources(UARTIntegratedLogicAnalyzer(
+			signals = [ Signal(32) ], sample_depth = 1024, divisor = 8, tx = Signal(), rx = Signal()
+		), yosys = False)
+		usb    = estimate_resources(
+			USBIntegratedLogicAnalyzer(signals = [ Signal(32) ], sample_depth = 1024), yosys = False
+		)
+
+		for est in (ila, stream, uart, usb):
+			self.assertEqual(est.source, 'model')
+			self.assertGreater(est.fmax, 0)
+
+		self.assertLess(ila.luts, stream.luts)
+		self.assertLess(stream.luts, uart.luts)
+		self.assertLess(stream.ffs, usb.ffs)
+
+	def test_report(self):
+		report = resource_report({ 'small': _ila(8, 256), 'big': _ila(64, 4096) }, yosys = False).splitlines()
+
+		self.assertEqual(len(report), 3)
+		self.assertTrue(report[0].startswith('Config'))
+		self.assertTrue(report[1].startswith('small'))
+		self.assertTrue(report[2].startswith('big'))
+
+	def test_bad_family(self):
+		with self.assertRaises(ValueError):
+			estimate_resources(_ila(8, 256), 'gowin')
+
+	def test_no_yosys(self):
+		with patch.object(resources, 'which', return_value = None):
+			self.assertEqual(estimate_resources(_ila(8, 256)).source, 'model')
+
+			with self.assertRaises(RuntimeError):
+				estimate_resources(_ila(8, 256), yosys = True)
+
+class ResourceYosysTests(TestCase):
+	def test_yosys(self):
+		def run(args: list[str], cwd: Path, **kwargs):
+			self.assertIn('synth_ice40 -top top', args[-1])
+			self.assertIn('\\top', (cwd / 'ila.il').read_text())
+
+			(cwd / 'stat.json').write_text(json.dumps({ 'design': { 'num_cells_by_type': {
+				'SB_LUT4': 120, 'SB_CARRY': 10, 'SB_DFF': 30, 'SB_DFFE': 12, 'SB_RAM40_4K': 2,
+			} } }))
+			(cwd / 'ltp.txt').write_text('Longest topological path in top (length=6):\n')
+
+		with (
+			patch.object(resources, 'which', return_value = '/usr/bin/yosys'),
+			patch.object(resources.subprocess, 'run', side_effect = run),
+		):
+			est = estimate_resources(_ila(16, 512))
+
+		self.assertEqual(est.source, 'yosys')
+		self.assertEqual((est.luts, est.ffs, est.brams, est.logic_levels), (120, 42, 2, 6))
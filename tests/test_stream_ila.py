@@ -16,7 +16,7 @@ c = Signal(8)
 d = Signal(16)
 
 class StreamILADut(Elaboratable):
-	def __init__(self, o_domain: str) -> None:
+	def __init__(self, o_domain: str, stream_width: int | None = None) -> None:
 		self.o_domain = o_domain
 		self.ila = StreamILA(
 			signals = [
@@ -25,7 +25,8 @@ class StreamILADut(Elaboratable):
 			sample_depth    = 32,
 			sampling_domain = 'sync',
 			sample_rate     = 80e6,
-			output_domain   = o_domain
+			output_domain   = o_domain,
+			stream_width    = stream_width,
 		)
 
 	def elaborate(self, platform) -> Module:
@@ -106,3 +107,65 @@ class StreamILASameDomainTests(ToriiTestCase):
 		stream_drain(self)
 		sig_gen(self)
 		ila(self)
+
+class StreamILANarrowTests(ToriiTestCase):
+	dut: StreamILADut = StreamILADut
+	dut_args = {'o_domain': 'sync', 'stream_width': 8}
+	domains = (('sync', 80e6), )
+
+	@ToriiTestCase.simulation
+	def test_capture(self):
+		self.assertEqual(self.dut.ila.bits_per_sample, 32)
+		self.assertEqual(self.dut.ila.stream_width, 8)
+		self.assertEqual(self.dut.ila.words_per_sample, 4)
+		self.assertEqual(len(self.dut.ila.stream.data), 8)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def sig_gen(self: StreamILANarrowTests):
+			yield d.eq(1)
+			for i in range(128):
+				yield Settle()
+				yield
+				yield a.eq(~a)
+				yield b.eq(i & 0b0111)
+				yield c.eq(~(i & 0b11111111))
+				yield d.eq(d.rotate_left(1))
+			yield Settle()
+			yield
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ila(self: StreamILANarrowTests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.ila.trigger)
+			yield from self.wait_until_high(self.dut.ila.complete)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def stream_drain(self: StreamILANarrowTests):
+			words_per_sample = self.dut.ila.words_per_sample
+			total_words      = self.dut.ila.sample_depth * words_per_sample
+			memory           = self.dut.ila.ila._sample_memory
+
+			yield from self.wait_until_high(self.dut.ila.stream.valid, timeout = 128)
+			yield self.dut.ila.stream.ready.eq(1)
+
+			words = list[int]()
+			while len(words) < total_words:
+				yield Settle()
+				if (yield self.dut.ila.stream.valid):
+					self.assertEqual((yield self.dut.ila.stream.first), int(len(words) == 0))
+					self.assertEqual((yield self.dut.ila.stream.last), int(len(words) == total_words - 1))
+					words.append((yield self.dut.ila.stream.data))
+				yield
+
+			yield self.dut.ila.stream.ready.eq(0)
+			yield Settle()
+			self.assertEqual((yield self.dut.ila.stream.valid), 0)
+
+			# Each sample should come out least significant byte first
+			for idx in range(self.dut.ila.sample_depth):
+				sample = int.from_bytes(bytes(words[idx * words_per_sample:(idx + 1) * words_per_sample]), 'little')
+				self.assertEqual(sample, (yield memory[idx]))
+
+		stream_drain(self)
+		sig_gen(self)
+		ila(self)
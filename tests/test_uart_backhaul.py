@@ -0,0 +1,274 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import random
+from binascii                import crc_hqx
+from unittest                import TestCase
+from unittest.mock           import patch
+
+from torii.lib.coding.cobs   import decode_rcobs
+
+from torii_ila.uart          import UARTILACommand, UARTIntegratedLogicAnalyzerBackhaul
+from torii_ila.uart          import _backhaul
+from torii_ila.uart._backhaul import _decode_rcobs, _decompress_samples, _read_frame
+
+from ._helpers.capture       import LAYOUT, SAMPLES, encode_rcobs
+from ._helpers.uart          import SimSerial, counting_dut
+
+class FakeSerial:
+	''' Hands out the data a few bytes at a time, like a real serial port would '''
+
+	def __init__(self, data: bytes, chunk: int) -> None:
+		self._data  = bytearray(data)
+		self._chunk = chunk
+
+	@property
+	def in_waiting(self) -> int:
+		return min(len(self._data), self._chunk)
+
+	def read(self, size: int) -> bytes:
+		data = bytes(self._data[:size])
+		del self._data[:size]
+		return data
+
+class FakeBlockSerial(FakeSerial):
+	''' Answers block reads from a UART ILA built with ``block_samples = 1``, mangling the first go at some blocks '''
+
+	def __init__(self, damaged: set[int], dropped: set[int]) -> None:
+		super().__init__(b'', chunk = 7)
+		self.timeout  = None
+		self.damaged  = damaged
+		self.dropped  = dropped
+		self.requests = list[int]()
+
+	def _send_block(self, block: int) -> None:
+		self.requests.append(block)
+
+		frame = block.to_bytes(2, byteorder = 'little') + SAMPLES[block * 4:(block + 1) * 4]
+		frame += crc_hqx(frame, 0xFFFF).to_bytes(2, byteorder = 'little')
+		raw = bytearray(encode_rcobs(frame))
+
+		if block in self.dropped:
+			self.dropped.remove(block)
+			# Half the frame makes it, then the link goes quiet
+			self._data += raw[:len(raw) // 2]
+			return
+
+		if block in self.damaged:
+			self.damaged.remove(block)
+			raw[3] ^= 0x10
+
+		self._data += raw + b'\x00'
+
+	def write(self, data: bytes) -> None:
+		match data[0]:
+			case UARTILACommand.FLUSH:
+				for block in range(4):
+					self._send_block(block)
+			case UARTILACommand.RESEND:
+				self._send_block(int.from_bytes(data[1:3], byteorder = 'little'))
+
+class FakeRangeSerial(FakeSerial):
+	''' Answers window reads from a UART ILA built without ``block_samples`` '''
+
+	def __init__(self) -> None:
+		super().__init__(b'', chunk = 5)
+		self.windows = list[tuple[int, int]]()
+
+	def write(self, data: bytes) -> None:
+		if data[0] != UARTILACommand.RANGE:
+			return
+
+		start = int.from_bytes(data[1:5], byteorder = 'little')
+		count = int.from_bytes(data[5:9], byteorder = 'little')
+		self.windows.append((start, count))
+		self._data += encode_rcobs(SAMPLES[start * 4:(start + count) * 4]) + b'\x00'
+
+class FakeBaudSerial(FakeSerial):
+	''' A UART ILA built with a few baudrates on the other end of an adapter that tops out at ``max_baudrate`` '''
+
+	def __init__(self, baudrates: tuple[int, ...], max_baudrate: int) -> None:
+		super().__init__(b'', chunk = 16)
+		self.timeout      = None
+		self.baudrate     = baudrates[0]
+		self.baudrates    = baudrates
+		self.max_baudrate = max_baudrate
+		self._switching   = None
+
+	def flush(self) -> None:
+		pass
+
+	def reset_input_buffer(self) -> None:
+		self._data.clear()
+
+	def read(self, size: int) -> bytes:
+		# Anything sent past what the adapter can manage is lost
+		if self.baudrate > self.max_baudrate:
+			return b''
+		return super().read(size)
+
+	def write(self, data: bytes) -> None:
+		if data[0] != UARTILACommand.BAUD:
+			return
+
+		if self._switching is None:
+			self._switching = data[1]
+		else:
+			if self._switching == data[1] and self.baudrate == self.baudrates[data[1]]:
+				self._data += encode_rcobs(LAYOUT.pack()) + b'\x00'
+			self._switching = None
+
+class UARTBackhaulTests(TestCase):
+	def test_decode_rcobs(self):
+		rng = random.Random(0x7111a)
+
+		messages = [
+			b'', b'\x00', b'\x00\x00', b'\x01' * 253, b'\x01' * 254, b'\x01' * 255, b'\x01' * 600 + b'\x00',
+		]
+		for _ in range(64):
+			length = rng.randrange(1024)
+			# Bias towards zeros so we get plenty of short runs along with the long ones
+			messages.append(bytes(rng.choice((0, rng.randrange(256))) for _ in range(length)))
+
+		for message in messages:
+			encoded = encode_rcobs(message)
+			self.assertEqual(_decode_rcobs(encoded), decode_rcobs(encoded))
+			self.assertEqual(_decode_rcobs(encoded), message)
+
+		with self.assertRaises(ValueError):
+			_decode_rcobs(b'\x01\x05')
+
+	def test_read_frame(self):
+		frames = [ encode_rcobs(bytes(range(idx, idx + 100))) for idx in range(5) ]
+		serial = FakeSerial(b''.join(frame + b'\x00' for frame in frames), chunk = 33)
+
+		pending = bytearray()
+		for frame in frames:
+			self.assertEqual(_read_frame(serial, pending), frame)
+		self.assertEqual(pending, b'')
+
+	def test_decompress_samples(self):
+		self.assertEqual(
+			_decompress_samples(b'\x00\x01\x02\x03\x00\x04\x05\x01', 2), b'\x01\x02' * 4 + b'\x04\x05' * 2
+		)
+		self.assertEqual(_decompress_samples(b'', 2), b'')
+
+		with self.assertRaises(ValueError):
+			_decompress_samples(b'\x02\x00\x01\x02', 2)
+		with self.assertRaises(ValueError):
+			_decompress_samples(b'\x00\x01', 2)
+
+	def test_resend_blocks(self):
+		serial = FakeBlockSerial(damaged = { 1 }, dropped = { 3 })
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(LAYOUT, 'fake', 115200, block_samples = 1)
+			backhaul.refresh()
+
+		self.assertEqual(serial.timeout, 1.0)
+		# Only the blocks that didn't make it should have been asked for again
+		self.assertEqual(serial.requests, [ 0, 1, 2, 3, 1, 3 ])
+		self.assertEqual(
+			[ (sample['b'].to_int(), sample['c'].to_int(), sample['d'].to_int()) for sample in backhaul.samples ],
+			[ (0, 0xef, 2), (1, 0xee, 4), (2, 0xed, 8), (3, 0xec, 16) ]
+		)
+
+	def test_resend_gives_up(self):
+		serial = FakeBlockSerial(damaged = { 2 }, dropped = set())
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(LAYOUT, 'fake', 115200, block_samples = 1, retries = 0)
+			with self.assertRaises(RuntimeError):
+				backhaul.refresh()
+
+	def test_read_range(self):
+		serial = FakeRangeSerial()
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(LAYOUT, 'fake', 115200)
+
+			self.assertEqual(
+				[ (sample['b'].to_int(), sample['c'].to_int()) for sample in backhaul.read_range(1, 2) ],
+				[ (1, 0xee), (2, 0xed) ]
+			)
+			# Windows get clamped to the end of the sample buffer
+			self.assertEqual([ sample['d'].to_int() for sample in backhaul.read_range(3, 100) ], [ 16 ])
+
+			with self.assertRaises(ValueError):
+				backhaul.read_range(4, 1)
+			with self.assertRaises(ValueError):
+				backhaul.read_range(0, 0)
+
+		self.assertEqual(serial.windows, [ (1, 2), (3, 1) ])
+		self.assertEqual(backhaul.samples, [])
+
+	def test_lazy_refresh(self):
+		serial = FakeRangeSerial()
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(LAYOUT, 'fake', 115200)
+			backhaul.lazy_refresh(page_samples = 1, max_pages = 2)
+
+			# Nothing is read until it's needed
+			self.assertEqual(len(backhaul.samples), 4)
+			self.assertEqual(serial.windows, [])
+
+			self.assertEqual(backhaul.samples[-1]['d'].to_int(), 16)
+			self.assertEqual(backhaul.samples[3]['c'].to_int(), 0xec)
+			self.assertEqual([ sample['b'].to_int() for sample in backhaul.samples[0:2] ], [ 0, 1 ])
+			# The last sample fell out of the cache, so it has to be read again
+			self.assertEqual(backhaul.samples[3]['d'].to_int(), 16)
+			self.assertEqual(serial.windows, [ (3, 1), (0, 1), (1, 1), (3, 1) ])
+
+			with self.assertRaises(IndexError):
+				backhaul.samples[4]
+
+			serial.windows.clear()
+			self.assertEqual(
+				[ (ts, sample['b'].to_int()) for ts, sample in backhaul.enumerate() ],
+				[ (idx * LAYOUT.sample_period, idx) for idx in range(4) ]
+			)
+			# Walking the whole capture pushes everything out of the cache along the way
+			self.assertEqual(serial.windows, [ (0, 1), (1, 1), (2, 1), (3, 1) ])
+
+	def test_read_range_blocks(self):
+		serial = FakeBlockSerial(damaged = { 2 }, dropped = set())
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(LAYOUT, 'fake', 115200, block_samples = 1)
+			samples = backhaul.read_range(1, 2)
+
+		# Only the blocks covering the window are asked for
+		self.assertEqual(serial.requests, [ 1, 2, 2 ])
+		self.assertEqual([ sample['c'].to_int() for sample in samples ], [ 0xee, 0xed ])
+
+	def test_negotiate(self):
+		serial = FakeBaudSerial((115200, 1000000, 3000000, 12000000), max_baudrate = 3000000)
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(
+				LAYOUT, 'fake', 115200, baudrates = (1000000, 3000000, 12000000)
+			)
+			# 12Mbaud is too fast for the adapter, so we should fall back to 3Mbaud
+			self.assertEqual(backhaul.negotiate(), 3000000)
+
+		self.assertEqual(serial.baudrate, 3000000)
+		self.assertIsNone(serial.timeout)
+
+		with self.assertRaises(ValueError):
+			backhaul.set_baudrate(9600)
+
+	def test_simulated(self):
+		dut    = counting_dut((4, 16), sample_depth = 8)
+		serial = SimSerial(dut, dut.ila)
+
+		with patch.object(_backhaul, '_open_serial', return_value = serial):
+			backhaul = UARTIntegratedLogicAnalyzerBackhaul(dut.ila, 'sim', 6e6)
+
+		backhaul.refresh()
+		counts = [ sample['count_1'].to_int() for sample in backhaul.samples ]
+		# The counters keep going while the capture is running, so each sample is one on from the last
+		self.assertEqual(counts, list(range(counts[0], counts[0] + 8)))
+
+		window = backhaul.read_range(2, 3)
+		self.assertEqual([ sample['count_1'].to_int() for sample in window ], counts[2:5])
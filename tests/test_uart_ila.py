@@ -1,14 +1,17 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
-from torii.hdl.ast         import Signal
-from torii.hdl.dsl         import Module
-from torii.hdl.ir          import Elaboratable
-from torii.lib.coding.cobs import decode_rcobs
-from torii.sim             import Settle
-from torii.test            import ToriiTestCase
+from torii.hdl.ast            import Signal
+from torii.hdl.dsl            import Module
+from torii.hdl.ir             import Elaboratable
+from torii.lib.coding.cobs    import decode_rcobs
+from torii.sim                import Settle
+from torii.test               import ToriiTestCase
 
-from torii_ila.uart        import UARTILACommand, UARTIntegratedLogicAnalyzer
+from torii_ila.layout         import ILALayout
+from torii_ila.uart           import UARTILACommand, UARTIntegratedLogicAnalyzer
+from torii_ila.uart._backhaul import _check_block, _decompress_samples, _range_command
+from torii_ila.uart._impl     import _SampleRLE
 
 a = Signal()
 b = Signal(3)
@@ -19,7 +22,10 @@ uart_tx = Signal()
 uart_rx = Signal(reset = 1)
 
 class UARTILADut(Elaboratable):
-	def __init__(self) -> None:
+	def __init__(
+		self, compress: bool = False, block_samples: int | None = None, clock_frequency: float | None = None,
+		baudrates: tuple[int, ...] = (), embed_layout: bool = True
+	) -> None:
 		self.ila = UARTIntegratedLogicAnalyzer(
 			divisor = 16,
 			tx = uart_tx, rx = uart_rx,
@@ -29,6 +35,11 @@ class UARTILADut(Elaboratable):
 			sample_depth    = 4,
 			sampling_domain = 'sync',
 			sample_rate     = 80e6,
+			compress        = compress,
+			block_samples   = block_samples,
+			clock_frequency = clock_frequency,
+			baudrates       = baudrates,
+			embed_layout    = embed_layout,
 		)
 
 	def elaborate(self, platform) -> Module:
@@ -43,32 +54,32 @@ class UARTILATests(ToriiTestCase):
 	dut_args = {}
 	domains = (('sync', 48e6), )
 
-	def uart_read_byte(self):
+	def uart_read_byte(self, divisor: int = 16):
 		# Wait for Start bit
 		yield from self.wait_until_low(uart_tx)
 		yield
 		byte = 0
 		# Read in byte
 		for idx in range(8):
-			yield from self.step(16)
+			yield from self.step(divisor - 1)
 			byte |= (yield uart_tx) << idx
 		# Read stop bit
-		yield from self.step(16)
+		yield from self.step(divisor - 1)
 		self.assertEqual((yield uart_tx), 1)
 
 		return byte
 
-	def uart_write_byte(self, byte: int):
+	def uart_write_byte(self, byte: int, divisor: int = 16):
 		# Write the start bit
 		yield uart_rx.eq(0)
-		yield from self.step(16)
+		yield from self.step(divisor - 1)
 		# Data bits
 		for idx in range(8):
 			yield uart_rx.eq(byte >> idx)
-			yield from self.step(16)
+			yield from self.step(divisor - 1)
 		# Stop bits
 		yield uart_rx.eq(1)
-		yield from self.step(16)
+		yield from self.step(divisor - 1)
 
 	@ToriiTestCase.simulation
 	def test_capture(self):
@@ -123,3 +134,284 @@ class UARTILATests(ToriiTestCase):
 		sig_gen(self)
 		ila(self)
 		ingest_uart(self)
+
+	@ToriiTestCase.simulation
+	def test_range(self):
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def sig_gen(self: UARTILATests):
+			yield d.eq(1)
+			for i in range(128):
+				yield Settle()
+				yield
+				yield a.eq(~a)
+				yield b.eq(i & 0b0111)
+				yield c.eq(~(i & 0b11111111))
+				yield d.eq(d.rotate_left(1))
+			yield Settle()
+			yield
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ingest_uart(self: UARTILATests):
+			# The window past the end of the buffer is dropped, so the first frame is the second window
+			for expected in (b'\xe2\x4e\x00\x00\xd5\x8e\x00\x00', b'\xc6\x0e\x01\x00'):
+				data = bytearray()
+				while (byte := (yield from self.uart_read_byte())) != 0x00:
+					data.append(byte)
+				self.assertEqual(decode_rcobs(data), expected)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ila(self: UARTILATests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.ila.trigger, post_step = False)
+			yield from self.wait_until_high(self.dut.ila.complete)
+			yield from self.step(512)
+			# Nothing goes out until it's asked for
+			self.assertEqual((yield uart_tx), 1)
+			for byte in _range_command(4, 1) + _range_command(1, 2):
+				yield from self.uart_write_byte(byte)
+			yield from self.step(4096)
+			# Windows running off the end of the buffer are clamped to it
+			for byte in _range_command(3, 0xFFFFFFFF):
+				yield from self.uart_write_byte(byte)
+
+		sig_gen(self)
+		ila(self)
+		ingest_uart(self)
+
+	@ToriiTestCase.simulation
+	def test_layout(self):
+		layout = self.dut.ila.layout
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ingest_uart(self: UARTILATests):
+			# The layout request lands mid-capture, so it should wait until the samples are sent
+			samples = bytearray()
+			while (byte := (yield from self.uart_read_byte())) != 0x00:
+				samples.append(byte)
+			self.assertEqual(len(decode_rcobs(samples)), 16)
+
+			data = bytearray()
+			while (byte := (yield from self.uart_read_byte())) != 0x00:
+				data.append(byte)
+			self.assertEqual(decode_rcobs(data), layout.pack())
+			self.assertEqual(ILALayout.unpack(decode_rcobs(data)), layout)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ila(self: UARTILATests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.ila.trigger, post_step = False)
+			yield from self.wait_until_high(self.dut.ila.complete)
+			yield from self.step(512)
+			yield from self.uart_write_byte(UARTILACommand.FLUSH)
+			yield from self.uart_write_byte(UARTILACommand.LAYOUT)
+
+		ila(self)
+		ingest_uart(self)
+
+class NoLayoutUARTILATests(ToriiTestCase):
+	dut: UARTILADut = UARTILADut
+	dut_args = { 'embed_layout': False }
+	domains = (('sync', 48e6), )
+
+	uart_read_byte  = UARTILATests.uart_read_byte
+	uart_write_byte = UARTILATests.uart_write_byte
+
+	@ToriiTestCase.simulation
+	def test_layout(self):
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def uart(self: NoLayoutUARTILATests):
+			yield from self.step(16)
+			yield from self.uart_write_byte(UARTILACommand.LAYOUT)
+
+			# Without the layout ROM we just get a lone zero back
+			data = bytearray()
+			while (byte := (yield from self.uart_read_byte())) != 0x00:
+				data.append(byte)
+			self.assertEqual(decode_rcobs(data), b'\x00')
+
+		uart(self)
+
+class CompressedUARTILATests(ToriiTestCase):
+	dut: UARTILADut = UARTILADut
+	dut_args = { 'compress': True }
+	domains = (('sync', 48e6), )
+
+	uart_read_byte  = UARTILATests.uart_read_byte
+	uart_write_byte = UARTILATests.uart_write_byte
+
+	@ToriiTestCase.simulation
+	def test_capture(self):
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ingest_uart(self: CompressedUARTILATests):
+			data = bytearray()
+			while (byte := (yield from self.uart_read_byte())) != 0x00:
+				data.append(byte)
+
+			# Nothing moves during the capture, so it's one literal sample and a run of 3
+			self.assertEqual(decode_rcobs(data), b'\x00\x00\x00\x00\x00\x03')
+			self.assertEqual(_decompress_samples(decode_rcobs(data), 4), bytes(16))
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ila(self: CompressedUARTILATests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.ila.trigger, post_step = False)
+			yield from self.wait_until_high(self.dut.ila.complete)
+			yield from self.step(512)
+			yield from self.uart_write_byte(UARTILACommand.FLUSH)
+
+		ila(self)
+		ingest_uart(self)
+
+class BlockUARTILATests(ToriiTestCase):
+	dut: UARTILADut = UARTILADut
+	dut_args = { 'compress': True, 'block_samples': 3 }
+	domains = (('sync', 48e6), )
+
+	uart_read_byte  = UARTILATests.uart_read_byte
+	uart_write_byte = UARTILATests.uart_write_byte
+
+	def uart_read_block(self):
+		data = bytearray()
+		while (byte := (yield from self.uart_read_byte())) != 0x00:
+			data.append(byte)
+		return _check_block(bytes(data))
+
+	@ToriiTestCase.simulation
+	def test_resend(self):
+		self.assertEqual(self.dut.ila.blocks, 2)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def sig_gen(self: BlockUARTILATests):
+			yield d.eq(1)
+			for i in range(128):
+				yield Settle()
+				yield
+				yield a.eq(~a)
+				yield b.eq(i & 0b0111)
+				yield c.eq(~(i & 0b11111111))
+				yield d.eq(d.rotate_left(1))
+			yield Settle()
+			yield
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ingest_uart(self: BlockUARTILATests):
+			# Every sample differs from the one before it, so they all go out as literals
+			first  = (0, b'\x00\xf1\x2e\x00\x00\x00\xe2\x4e\x00\x00\x00\xd5\x8e\x00\x00')
+			second = (1, b'\x00\xc6\x0e\x01\x00')
+
+			# The first flush sends the capture as it comes out of the ILA, the second reads it back
+			for _ in range(2):
+				self.assertEqual((yield from self.uart_read_block()), first)
+				self.assertEqual((yield from self.uart_read_block()), second)
+
+			self.assertEqual((yield from self.uart_read_block()), second)
+			self.assertEqual(
+				_decompress_samples(first[1], 4) + _decompress_samples(second[1], 4),
+				b'\xf1\x2e\x00\x00\xe2\x4e\x00\x00\xd5\x8e\x00\x00\xc6\x0e\x01\x00'
+			)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ila(self: BlockUARTILATests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.ila.trigger, post_step = False)
+			yield from self.wait_until_high(self.dut.ila.complete)
+			yield from self.step(512)
+			yield from self.uart_write_byte(UARTILACommand.FLUSH)
+			# Each pass over the capture is a little over 30 bytes on the wire
+			yield from self.step(8192)
+			yield from self.uart_write_byte(UARTILACommand.FLUSH)
+			yield from self.step(8192)
+			# Asking for a block past the end should be ignored
+			for byte in (UARTILACommand.RESEND, 2, 0, UARTILACommand.RESEND, 1, 0):
+				yield from self.uart_write_byte(byte)
+
+		sig_gen(self)
+		ila(self)
+		ingest_uart(self)
+
+class BaudUARTILATests(ToriiTestCase):
+	dut: UARTILADut = UARTILADut
+	# This isn't the real clock, but it keeps the switch timeout down to something we can simulate
+	dut_args = { 'clock_frequency': 16e3, 'baudrates': (2e3, ) }
+	domains = (('sync', 48e6), )
+
+	uart_read_byte  = UARTILATests.uart_read_byte
+	uart_write_byte = UARTILATests.uart_write_byte
+
+	def uart_read_frame(self, divisor: int):
+		data = bytearray()
+		while (byte := (yield from self.uart_read_byte(divisor))) != 0x00:
+			data.append(byte)
+		return decode_rcobs(data)
+
+	@ToriiTestCase.simulation
+	def test_switch(self):
+		layout = self.dut.ila.layout
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def uart(self: BaudUARTILATests):
+			yield from self.step(16)
+
+			# Switch over to the faster baudrate and confirm it
+			yield from self.uart_write_byte(UARTILACommand.BAUD)
+			yield from self.uart_write_byte(1)
+			yield from self.step(32)
+			yield from self.uart_write_byte(UARTILACommand.BAUD, divisor = 8)
+			yield from self.uart_write_byte(1, divisor = 8)
+			self.assertEqual((yield from self.uart_read_frame(divisor = 8)), layout.pack())
+
+			# Ask to go back, but never confirm it, so we should stay put
+			yield from self.uart_write_byte(UARTILACommand.BAUD, divisor = 8)
+			yield from self.uart_write_byte(0, divisor = 8)
+			yield from self.step(1700)
+			yield from self.uart_write_byte(UARTILACommand.LAYOUT, divisor = 8)
+			self.assertEqual((yield from self.uart_read_frame(divisor = 8)), layout.pack())
+
+		uart(self)
+
+class SampleRLETests(ToriiTestCase):
+	dut: _SampleRLE = _SampleRLE
+	dut_args = { 'sample_bytes': 2 }
+	domains = (('sync', 48e6), )
+
+	@ToriiTestCase.simulation
+	def test_compress(self):
+		samples = [ 0x1234 ] * 3 + [ 0x0000 ] * 300 + [ 0x00ff, 0x1234, 0x1234 ]
+		payload = b''.join(sample.to_bytes(2, byteorder = 'little') for sample in samples)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def feed(self: SampleRLETests):
+			for frame in range(2):
+				for idx, byte in enumerate(payload):
+					yield self.dut.input.data.eq(byte)
+					yield self.dut.input.last.eq(idx == len(payload) - 1)
+					yield self.dut.input.valid.eq(1)
+					yield Settle()
+					while not (yield self.dut.input.ready):
+						yield
+						yield Settle()
+					yield
+				yield self.dut.input.valid.eq(0)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def drain(self: SampleRLETests):
+			yield self.dut.output.ready.eq(1)
+			for frame in range(2):
+				data = bytearray()
+				while True:
+					yield Settle()
+					if (yield self.dut.output.valid):
+						data.append((yield self.dut.output.data))
+						if (yield self.dut.output.last):
+							yield
+							break
+					yield
+
+				# Runs are capped at 255 repeats, after which the sample is sent again
+				self.assertEqual(
+					data, b'\x00\x34\x12\x02\x00\x00\x00\xff\x00\x00\x00\x2b\x00\xff\x00\x00\x34\x12\x01'
+				)
+				self.assertEqual(_decompress_samples(data, 2), payload)
+
+		feed(self)
+		drain(self)
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from torii.hdl.ast         import Signal
+from torii.hdl.cd          import ClockDomain
+from torii.hdl.dsl         import Module
+from torii.hdl.ir          import Elaboratable
+from torii.lib.coding.cobs import decode_rcobs
+from torii.sim             import Settle
+from torii.test            import ToriiTestCase
+
+from torii_ila.uart        import UARTILACommand, UARTIntegratedLogicAnalyzerHub
+
+a = Signal()
+b = Signal(3)
+c = Signal(8)
+d = Signal(16)
+
+uart_tx = Signal()
+uart_rx = Signal(reset = 1)
+
+class UARTILAHubDut(Elaboratable):
+	def __init__(self) -> None:
+		self.hub = UARTIntegratedLogicAnalyzerHub(divisor = 16, tx = uart_tx, rx = uart_rx)
+
+		self.core_ila = self.hub.add_ila(
+			signals = [ a, b, c, d ], sample_depth = 4, sampling_domain = 'sync', sample_rate = 48e6
+		)
+		self.phy_ila = self.hub.add_ila(
+			signals = [ c ], sample_depth = 8, sampling_domain = 'phy', sample_rate = 48e6
+		)
+
+	def elaborate(self, platform) -> Module:
+		m = Module()
+
+		m.domains.phy = ClockDomain()
+
+		m.submodules.hub = self.hub
+
+		return m
+
+class UARTILAHubTests(ToriiTestCase):
+	dut: UARTILAHubDut = UARTILAHubDut
+	dut_args = {}
+	domains = (('sync', 48e6), ('phy', 48e6))
+
+	def uart_read_byte(self):
+		# Wait for Start bit
+		yield from self.wait_until_low(uart_tx)
+		yield
+		byte = 0
+		# Read in byte
+		for idx in range(8):
+			yield from self.step(16)
+			byte |= (yield uart_tx) << idx
+		# Read stop bit
+		yield from self.step(16)
+		self.assertEqual((yield uart_tx), 1)
+
+		return byte
+
+	def uart_read_frame(self):
+		data = bytearray()
+		while True:
+			byte = (yield from self.uart_read_byte())
+			if byte == 0x00:
+				break
+			data.append(byte)
+		return decode_rcobs(data)
+
+	def uart_write_byte(self, byte: int):
+		# Write the start bit
+		yield uart_rx.eq(0)
+		yield from self.step(16)
+		# Data bits
+		for idx in range(8):
+			yield uart_rx.eq(byte >> idx)
+			yield from self.step(16)
+		# Stop bits
+		yield uart_rx.eq(1)
+		yield from self.step(16)
+
+	@ToriiTestCase.simulation
+	def test_capture(self):
+		self.assertEqual(UARTIntegratedLogicAnalyzerHub.command(0, UARTILACommand.FLUSH), 0x01)
+		self.assertEqual(UARTIntegratedLogicAnalyzerHub.command(1, UARTILACommand.FLUSH), 0x11)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def sig_gen(self: UARTILAHubTests):
+			yield d.eq(1)
+			for i in range(128):
+				yield Settle()
+				yield
+				yield a.eq(~a)
+				yield b.eq(i & 0b0111)
+				yield c.eq(~(i & 0b11111111))
+				yield d.eq(d.rotate_left(1))
+			yield Settle()
+			yield
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def ingest_uart(self: UARTILAHubTests):
+			# We asked for the phy ILA first, so it should come out first, tagged with its channel
+			self.assertEqual(
+				(yield from self.uart_read_frame()),
+				b'\x01\xef\xee\xed\xec\xeb\xea\xe9\xe8'
+			)
+			self.assertEqual(
+				(yield from self.uart_read_frame()),
+				b'\x00\xf1\x2e\x00\x00\xe2\x4e\x00\x00\xd5\x8e\x00\x00\xc6\x0e\x01\x00'
+			)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def core_trigger(self: UARTILAHubTests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.core_ila.trigger, post_step = False)
+			yield from self.wait_until_high(self.dut.core_ila.complete)
+			yield from self.step(512)
+			# Ask for the phy ILA first, then the core ILA
+			yield from self.uart_write_byte(UARTIntegratedLogicAnalyzerHub.command(1, UARTILACommand.FLUSH))
+			yield from self.uart_write_byte(UARTIntegratedLogicAnalyzerHub.command(0, UARTILACommand.FLUSH))
+
+		@ToriiTestCase.sync_domain(domain = 'phy')
+		def phy_trigger(self: UARTILAHubTests):
+			yield from self.step(16)
+			yield from self.pulse(self.dut.phy_ila.trigger, post_step = False)
+
+		sig_gen(self)
+		core_trigger(self)
+		phy_trigger(self)
+		ingest_uart(self)
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+import time
+from unittest      import TestCase
+from unittest.mock import patch
+
+from torii_ila.usb import (
+	_backhaul, USBILADevice, USBIntegratedLogicAnalyzer, USBIntegratedLogicAnalyzerCaptureManager,
+	USBIntegratedLogicAnalyzerHub, USBIntegratedLogicAnalyzerHubBackhaul,
+)
+
+class USBEnumerationTests(TestCase):
+	def test_returns_once_enumerated(self):
+		device = object()
+
+		with patch.object(_backhaul.usb.core, 'find', side_effect = [ None, None, device ]) as find:
+			start = time.monotonic()
+			self.assertIs(_backhaul._wait_for_device(timeout = 10, poll_interval = 0.01), device)
+			self.assertLess(time.monotonic() - start, 1)
+			self.assertEqual(find.call_count, 3)
+
+	def test_timeout(self):
+		with patch.object(_backhaul.usb.core, 'find', return_value = None):
+			with self.assertRaises(RuntimeError):
+				_backhaul._wait_for_device(timeout = 0.05, poll_interval = 0.01)
+
+	def test_serial_number_descriptor(self):
+		descriptors = USBIntegratedLogicAnalyzer(serial_number = 'board-7')._make_descriptors()
+		self.assertEqual(descriptors.get_descriptor_bytes(3, 3), b'\x10\x03' + 'board-7'.encode('utf-16-le'))
+
+		descriptors = USBIntegratedLogicAnalyzer()._make_descriptors()
+		self.assertEqual(descriptors.get_descriptor_bytes(3, 3), b'\x14\x03' + '000000000'.encode('utf-16-le'))
+
+		with self.assertRaises(ValueError):
+			USBIntegratedLogicAnalyzer(serial_number = 'board-7', discard_string_descriptors = True)
+		with self.assertRaises(ValueError):
+			USBIntegratedLogicAnalyzer(serial_number = '')
+
+	def test_discover_duplicates(self):
+		devices = [ USBILADevice('board-0', 1, 2), USBILADevice('board-0', 1, 3) ]
+
+		with patch.object(_backhaul, 'find_ilas', return_value = devices):
+			with self.assertRaises(RuntimeError):
+				USBIntegratedLogicAnalyzerCaptureManager.discover()
+
+	def test_capture_manager(self):
+		class FakeBackhaul:
+			def __init__(self, serial: str) -> None:
+				self.serial  = serial
+				self.samples = list()
+
+			def refresh(self) -> None:
+				self.samples = [ { 'serial': self.serial } ]
+
+		manager = USBIntegratedLogicAnalyzerCaptureManager(
+			{ f'board-{idx}': FakeBackhaul(f'board-{idx}') for idx in range(4) }, max_workers = 2
+		)
+
+		manager.refresh()
+
+		self.assertEqual(len(manager), 4)
+		self.assertEqual(manager.samples, { f'board-{idx}': [ { 'serial': f'board-{idx}' } ] for idx in range(4) })
+
+	def test_empty_hub(self):
+		with patch.object(_backhaul.usb.core, 'find', return_value = object()):
+			backhaul = USBIntegratedLogicAnalyzerHubBackhaul(USBIntegratedLogicAnalyzerHub())
+
+		# There is nothing to read, but that shouldn't be an error
+		self.assertEqual(len(backhaul), 0)
+		backhaul.refresh()
+		backhaul.update()
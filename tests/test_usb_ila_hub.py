@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from torii.hdl.ast       import Signal
+from torii.hdl.cd        import ClockDomain
+from torii.hdl.dsl       import Module
+from torii.hdl.ir        import Elaboratable
+from torii.sim           import Settle
+from torii.test          import ToriiTestCase
+
+from torii_ila.usb       import USBIntegratedLogicAnalyzerHub
+
+from ._helpers.usb       import UTMI_BUS, USBHostTestCase
+
+a = Signal()
+b = Signal(3)
+c = Signal(8)
+d = Signal(16)
+
+class USBILAHubDut(Elaboratable):
+	def __init__(self) -> None:
+		self.hub = USBIntegratedLogicAnalyzerHub(bus = ('usb', 0))
+
+		# One ILA on the core side, and one off in its own clock domain
+		self.core_ila = self.hub.add_ila(
+			signals = [ a, b, c, d ], sample_depth = 4, sampling_domain = 'sync', sample_rate = 60e6
+		)
+		self.phy_ila = self.hub.add_ila(
+			signals = [ c ], sample_depth = 8, sampling_domain = 'phy', sample_rate = 60e6
+		)
+
+	def elaborate(self, platform) -> Module:
+		m = Module()
+		m.domains.phy = ClockDomain()
+		m.submodules.hub = self.hub
+		return m
+
+class USBILAHubTests(USBHostTestCase):
+	dut: USBILAHubDut = USBILAHubDut
+	dut_args = {}
+	domains = (('usb', 60e6), ('sync', 60e6), ('phy', 60e6))
+
+	@ToriiTestCase.simulation
+	def test_capture(self):
+		ADDR = 0x1a
+
+		self.assertEqual(len(self.dut.hub.ilas), 2)
+		self.assertEqual(self.dut.hub.endpoints, [1, 2])
+		self.assertEqual(self.dut.core_ila.bytes_per_sample, 4)
+		self.assertEqual(self.dut.phy_ila.bytes_per_sample, 1)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def sig_gen(self: USBILAHubTests):
+			yield d.eq(1)
+			for i in range(128):
+				yield Settle()
+				yield
+				yield a.eq(~a)
+				yield b.eq(i & 0b0111)
+				yield c.eq(~(i & 0b11111111))
+				yield d.eq(d.rotate_left(1))
+			yield Settle()
+			yield
+
+		@ToriiTestCase.sync_domain(domain = 'usb')
+		def usb(self: USBILAHubTests):
+			# Tell the reset sequencer engine that the bus is active
+			yield UTMI_BUS.vbus_valid.eq(1)
+			# And in a valid non-SE0 state
+			yield UTMI_BUS.line_state.eq(0b01)
+			yield
+			yield from self.usb_sof()
+			yield from self.usb_set_addr(ADDR)
+			yield from self.usb_set_config(ADDR, 1)
+			# Read out the second ILA first, they are independent of each other
+			yield from self.usb_recv_ep_data(ADDR, 2, (
+				0xef, 0xee, 0xed, 0xec, 0xeb, 0xea, 0xe9, 0xe8,
+			))
+			yield from self.usb_recv_ep_data(ADDR, 1, (
+				0xf1, 0x2e, 0x00, 0x00,
+				0xe2, 0x4e, 0x00, 0x00,
+				0xd5, 0x8e, 0x00, 0x00,
+				0xc6, 0x0e, 0x01, 0x00,
+			))
+			yield from self.step(10)
+
+		@ToriiTestCase.sync_domain(domain = 'sync')
+		def core_trigger(self: USBILAHubTests):
+			while (yield c) != 0xf0:
+				yield
+			yield from self.pulse(self.dut.core_ila.trigger, post_step = False)
+
+		@ToriiTestCase.sync_domain(domain = 'phy')
+		def phy_trigger(self: USBILAHubTests):
+			while (yield c) != 0xf0:
+				yield
+			yield from self.pulse(self.dut.phy_ila.trigger, post_step = False)
+
+		sig_gen(self)
+		usb(self)
+		core_trigger(self)
+		phy_trigger(self)
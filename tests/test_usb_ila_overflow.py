@@ -2,63 +2,23 @@
 # SPDX-FileCopyrightText: 2025 Rachel Mant <git@dragonmux.network>
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>c
 
-from typing              import Iterable
 from enum                import Enum
 
 from torii.hdl.ast       import Signal
 from torii.hdl.dsl       import Module
 from torii.hdl.ir        import Elaboratable
 from torii.test          import ToriiTestCase
-from torii.hdl.rec       import Record, Direction
-
-from usb_construct.types import USBStandardRequests, USBPacketID
 
 from torii_ila.usb       import USBIntegratedLogicAnalyzer
 
+from ._helpers.usb       import USBHostTestCase
+
 class EnumValue(Enum):
 	Foo = 0
 	Bar = 1
 	Baz = 2
 	Qux = 3
 
-UTMI_BUS = Record([
-	# Send interface
-	('tx_data', 8, Direction.FANOUT),
-	('tx_valid', 1, Direction.FANOUT),
-	('tx_ready', 1, Direction.FANIN),
-	# Receive interface
-	('rx_data', 8, Direction.FANIN),
-	('rx_valid', 1, Direction.FANIN),
-	('rx_active', 1, Direction.FANIN),
-
-	# Control signals
-	('line_state', 2),
-	('vbus_valid', 1),
-	('session_valid', 1),
-	('session_end', 1),
-	('rx_error', 1),
-	('host_disconnect', 1),
-	('id_digital', 1),
-	('xcvr_select', 2),
-	('term_select', 1),
-	('op_mode', 2),
-	('suspend', 1),
-	('id_pullup', 1),
-	('dm_pulldown', 1),
-	('dp_pulldown', 1),
-	('chrg_vbus', 1),
-	('dischrg_vbus', 1),
-	('use_external_vbus_indicator', 1),
-])
-
-class Platform():
-	device = 'TEST'
-
-	def request(self, name: str, number: int = 0):
-		assert name == 'usb'
-		assert number == 0
-		return UTMI_BUS
-
 class USBILADut(Elaboratable):
 	def __init__(self) -> None:
 
@@ -129,15 +89,12 @@ class USBILADut(Elaboratable):
 
 		return m
 
-class USBILAOverflowTests(ToriiTestCase):
+class USBILAOverflowTests(USBHostTestCase):
 	dut: USBILADut = USBILADut
 	dut_args = {}
 	domains = (('usb', 60e6), ('sync', 60e6))
-	platform = Platform()
 
-	_last_frame: int = 0
-	_last_data_send: USBPacketID | None = None
-	_last_data_recv: USBPacketID | None = None
+	response_timeout = 150
 
 	@ToriiTestCase.simulation
 	def test_capture(self):
@@ -184,177 +141,3 @@ class USBILAOverflowTests(ToriiTestCase):
 
 		usb(self)
 		ila(self)
-
-	@staticmethod
-	def crc5(data: int, bit_len: int) -> int:
-		crc = 0x1f
-
-		for bit_idx in range(bit_len):
-			bit = (data >> bit_idx) & 1
-			crc <<= 1
-
-			if bit != (crc >> 5):
-				crc ^= 0x25
-			crc &= 0x1f
-
-		crc ^= 0x1f
-		return int(f'{crc:05b}'[::-1], base = 2)
-
-	@staticmethod
-	def crc16(data: int, bit_len: int, crc_in: int = 0) -> int:
-		crc = int(f'{crc_in ^ 0xffff:016b}'[::-1], base = 2)
-
-		for bit_idx in range(bit_len):
-			bit = (data >> bit_idx) & 1
-			crc <<= 1
-
-			if bit != (crc >> 16):
-				crc ^= 0x18005
-			crc &= 0xffff
-
-		crc ^= 0xffff
-		return int(f'{crc:016b}'[::-1], base = 2)
-
-	@staticmethod
-	def crc16_buff(data: Iterable[int]) -> int:
-		crc = 0
-		for byte in data:
-			crc = USBILAOverflowTests.crc16(byte, 8, crc)
-		return crc
-
-	def usb_send_control_token(self, pid: USBPacketID, token_data: int):
-		frame = token_data | (self.crc5(token_data, 11) << 11)
-		yield UTMI_BUS.rx_active.eq(1)
-		yield
-		yield UTMI_BUS.rx_valid.eq(1)
-		yield UTMI_BUS.rx_data.eq(pid.byte())
-		yield
-		yield UTMI_BUS.rx_data.eq(frame & 0xff)
-		yield
-		yield UTMI_BUS.rx_data.eq(frame >> 8)
-		yield
-		yield UTMI_BUS.rx_valid.eq(0)
-		yield UTMI_BUS.rx_active.eq(0)
-		yield
-
-	def usb_consume_response(self, data: Iterable[int]):
-		yield UTMI_BUS.tx_ready.eq(1)
-		yield
-		yield from self.wait_until_high(UTMI_BUS.tx_valid, timeout = 150)
-		for byte in data:
-			self.assertEqual((yield UTMI_BUS.tx_valid), 1)
-			self.assertEqual((yield UTMI_BUS.tx_data), byte)
-			yield
-		self.assertEqual((yield UTMI_BUS.tx_valid), 0)
-		yield UTMI_BUS.tx_ready.eq(0)
-
-	def usb_sof(self):
-		yield from self.usb_send_control_token(USBPacketID.SOF, self._last_frame)
-		self._last_frame += 1
-		self._last_frame &= 0x7ff
-
-	def usb_solicit(self, addr: int, ep: int, pid: USBPacketID):
-		yield from self.usb_send_control_token(pid, addr | (ep << 7))
-
-	def usb_in(self, addr: int, ep: int):
-		yield from self.usb_solicit(addr, ep, USBPacketID.IN)
-
-	def usb_out(self, addr: int, ep: int):
-		yield from self.usb_solicit(addr, ep, USBPacketID.OUT)
-
-	def usb_setup(self, addr: int):
-		self._last_data_send = None
-		yield from self.usb_solicit(addr, 0, USBPacketID.SETUP)
-
-	def usb_send_ack(self):
-		yield UTMI_BUS.rx_active.eq(1)
-		yield
-		yield UTMI_BUS.rx_valid.eq(1)
-		yield UTMI_BUS.rx_data.eq(USBPacketID.ACK.byte())
-		yield
-		yield UTMI_BUS.rx_valid.eq(0)
-		yield UTMI_BUS.rx_active.eq(0)
-		yield
-
-	def usb_recv_ack(self):
-		yield from self.usb_consume_response((USBPacketID.ACK.byte(),))
-
-	def usb_recv_stall(self):
-		yield from self.usb_consume_response((USBPacketID.STALL.byte(),))
-
-	def usb_send_data(self, data: Iterable[int]):
-		if self._last_data_send is None or self._last_data_send == USBPacketID.DATA1:
-			self._last_data_send = USBPacketID.DATA0
-		else:
-			self._last_data_send = USBPacketID.DATA1
-
-		yield UTMI_BUS.rx_active.eq(1)
-		yield
-		yield UTMI_BUS.rx_valid.eq(1)
-		yield UTMI_BUS.rx_data.eq(self._last_data_send.byte())
-		yield
-		crc = 0
-		for byte in data:
-			crc = self.crc16(byte, 8, crc)
-			yield UTMI_BUS.rx_data.eq(byte)
-			yield
-		yield UTMI_BUS.rx_data.eq(crc & 0xff)
-		yield
-		yield UTMI_BUS.rx_data.eq(crc >> 8)
-		yield
-		yield UTMI_BUS.rx_valid.eq(0)
-		yield UTMI_BUS.rx_active.eq(0)
-		yield
-
-	def usb_recv_zlp(self):
-		yield from self.usb_consume_response((USBPacketID.DATA1.byte(), 0x00, 0x00))
-
-	def usb_send_zlp(self):
-		yield from self.usb_send_data(())
-
-	def usb_send_setup_packet(self, addr: int, data: Iterable[int]):
-		yield from self.usb_setup(addr)
-		yield from self.usb_send_data(data)
-		yield from self.usb_recv_ack()
-
-	def usb_set_addr(self, addr: int):
-		yield from self.usb_send_setup_packet(0, (
-			0x00, USBStandardRequests.SET_ADDRESS,
-			*addr.to_bytes(2, byteorder = 'little'), 0x00, 0x00, 0x00, 0x00
-		))
-		yield from self.usb_in(0, 0)
-		yield from self.usb_recv_zlp()
-		yield from self.usb_send_ack()
-
-	def usb_set_config(self, addr: int, config: int):
-		yield from self.usb_send_setup_packet(addr, (
-			0x00, USBStandardRequests.SET_CONFIGURATION,
-			*config.to_bytes(2, byteorder = 'little'), 0x00, 0x00, 0x00, 0x00
-		))
-		yield from self.usb_in(addr, 0)
-		yield from self.usb_recv_zlp()
-		yield from self.usb_send_ack()
-
-	def usb_set_interface(self, addr: int, interface: int, alt: int):
-		yield from self.usb_send_setup_packet(addr, (
-			0x01, USBStandardRequests.SET_INTERFACE,
-			*alt.to_bytes(2, byteorder = 'little'),
-			*interface.to_bytes(2, byteorder = 'little'),
-			0x00, 0x00
-		))
-		yield from self.usb_in(addr, 0)
-		yield from self.usb_recv_zlp()
-		yield from self.usb_send_ack()
-
-	def usb_recv_ep_data(self, addr: int, ep: int, data: Iterable[int]):
-		if self._last_data_recv is None or self._last_data_recv == USBPacketID.DATA1:
-			self._last_data_recv = USBPacketID.DATA0
-		else:
-			self._last_data_recv = USBPacketID.DATA1
-
-		crc = self.crc16_buff(data)
-		yield from self.usb_in(addr, ep)
-		yield from self.usb_consume_response((
-			self._last_data_recv.byte(), *data, *crc.to_bytes(2, byteorder = 'little')
-		))
-		yield from self.usb_send_ack()
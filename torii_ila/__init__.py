@@ -1,12 +1,6 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
-try:
-	from importlib import metadata
-	__version__ = metadata.version(__package__)
-except ImportError: # :nocov:
-	__version__ = 'unknown'
-
 from .uart import ILA_HAS_UART
 from .usb  import ILA_HAS_USB
 
@@ -14,3 +8,17 @@ __all__ = (
 	'ILA_HAS_UART',
 	'ILA_HAS_USB',
 )
+
+def __getattr__(name: str) -> str:
+	# importlib.metadata is slow to import, so only look the version up if someone asks for it
+	if name != '__version__':
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+	try:
+		from importlib import metadata
+		version = metadata.version(__package__)
+	except ImportError: # :nocov:
+		version = 'unknown'
+
+	globals()['__version__'] = version
+	return version
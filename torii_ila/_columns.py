@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+Columnar export of captured samples, as NumPy arrays, and Apache Arrow IPC or Parquet files.
+
+NumPy and PyArrow are optional, and are only imported once samples are actually exported.
+
+'''
+
+from collections.abc import Sequence
+from importlib       import import_module
+from pathlib         import Path
+from typing          import TYPE_CHECKING, Any
+
+from .layout         import ILALayout, ILASignal
+from .manifest       import ILAManifest
+
+if TYPE_CHECKING:
+	import numpy
+	import pyarrow
+
+	from .backhaul   import Sample
+
+# The name of the column holding the timestamp of each sample, the same prefix as the VCD `ila_` signals
+TIMESTAMP_COLUMN = 'ila_timestamp'
+# Where the manifest of the capture is kept in the Arrow schema metadata
+MANIFEST_METADATA = b'torii_ila.manifest'
+
+def _import_optional(module: str) -> Any:
+	''' Import one of the export dependencies, pointing at the extra it comes with if it's missing '''
+
+	try:
+		return import_module(module)
+	except ImportError as error:
+		raise ImportError(
+			f'Exporting samples needs {module}, install it with `pip install torii-ila[export]`'
+		) from error
+
+def _column(np: Any, sig: ILASignal, samples: Sequence['Sample']) -> 'numpy.ndarray':
+	'''
+	Pull the values of a signal out of the samples as a column.
+
+	The values are copied out of the samples as one block of bytes and then reinterpreted, rather than
+	being converted one at a time. Signals up to 64 bits wide end up as the narrowest unsigned integer
+	type that fits them, wider signals are left as their raw little endian bytes.
+	'''
+
+	nbytes = (sig.width + 7) // 8
+	raw    = np.frombuffer(
+		b''.join(sample[sig.name].to_bytes() for sample in samples), dtype = np.uint8
+	).reshape(len(samples), nbytes)
+
+	if nbytes > 8:
+		return raw.view(f'V{nbytes}').reshape(len(samples))
+
+	itemsize = 1 << (nbytes - 1).bit_length()
+	padded   = np.zeros((len(samples), itemsize), dtype = np.uint8)
+	padded[:, :nbytes] = raw
+
+	return padded.view(f'<u{itemsize}').reshape(len(samples))
+
+def _decode_column(np: Any, sig: ILASignal, column: 'numpy.ndarray') -> tuple['numpy.ndarray', list[str]]:
+	'''
+	Decode a column of a signal with a decoder, each distinct value is only decoded once.
+
+	Returns
+	-------
+	tuple[numpy.ndarray, list[str]]
+		The index of the decoded value of each sample, and the decoded values.
+	'''
+
+	values, indices = np.unique(column, return_inverse = True)
+	return indices.reshape(len(column)), [ sig.decode(int(value)) for value in values ]
+
+def columns(layout: ILALayout, samples: Sequence['Sample'], decode: bool) -> dict[str, 'numpy.ndarray']:
+	''' See :py:meth:`torii_ila.backhaul.ILABackhaulInterface.columns`. '''
+
+	np     = _import_optional('numpy')
+	result = { TIMESTAMP_COLUMN: np.arange(len(samples), dtype = np.float64) * layout.sample_period }
+
+	for sig in layout.signals:
+		column = _column(np, sig, samples)
+
+		if decode and sig.has_decoder and column.dtype.kind == 'u':
+			indices, decoded = _decode_column(np, sig, column)
+			column = np.array(decoded, dtype = object)[indices]
+
+		result[sig.name] = column
+
+	return result
+
+def structured(layout: ILALayout, samples: Sequence['Sample'], decode: bool) -> 'numpy.ndarray':
+	''' See :py:meth:`torii_ila.backhaul.ILABackhaulInterface.to_numpy`. '''
+
+	np   = _import_optional('numpy')
+	cols = columns(layout, samples, decode)
+
+	array = np.empty(len(samples), dtype = [ (name, column.dtype) for name, column in cols.items() ])
+	for name, column in cols.items():
+		array[name] = column
+
+	return array
+
+def table(layout: ILALayout, samples: Sequence['Sample'], decode: bool) -> 'pyarrow.Table':
+	'''
+	Build an Arrow table of the samples.
+
+	Decoded signals are dictionary encoded, which pandas reads as categoricals, and the manifest of the
+	capture is kept in the schema metadata so the layout can be recovered from the file.
+	'''
+
+	np = _import_optional('numpy')
+	pa = _import_optional('pyarrow')
+
+	arrays = [ pa.array(np.arange(len(samples), dtype = np.float64) * layout.sample_period) ]
+
+	for sig in layout.signals:
+		column = _column(np, sig, samples)
+
+		if column.dtype.kind == 'V':
+			arrays.append(pa.FixedSizeBinaryArray.from_buffers(
+				pa.binary(column.dtype.itemsize), len(column), [ None, pa.py_buffer(column.tobytes()) ]
+			))
+		elif decode and sig.has_decoder:
+			indices, decoded = _decode_column(np, sig, column)
+			arrays.append(pa.DictionaryArray.from_arrays(indices.astype(np.int32), pa.array(decoded)))
+		else:
+			arrays.append(pa.array(column))
+
+	return pa.Table.from_arrays(
+		arrays, names = [ TIMESTAMP_COLUMN, *(sig.name for sig in layout.signals) ],
+		metadata = { MANIFEST_METADATA: ILAManifest(layout).to_json().encode('utf-8') }
+	)
+
+def write_table(path: Path, layout: ILALayout, samples: Sequence['Sample'], decode: bool, parquet: bool) -> None:
+	''' Write the samples out as a Parquet file if ``parquet``, otherwise as an Arrow IPC file. '''
+
+	samples_table = table(layout, samples, decode)
+
+	if parquet:
+		_import_optional('pyarrow.parquet').write_table(samples_table, path)
+	else:
+		with _import_optional('pyarrow').ipc.new_file(path, samples_table.schema) as writer:
+			writer.write_table(samples_table)
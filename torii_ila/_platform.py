@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+from typing        import Self
+
+from torii.hdl.ast import Signal
+from torii.hdl.rec import Record
+
+__all__ = (
+	'StandalonePlatform',
+)
+
+class StandalonePlatform:
+	'''
+	Just enough of a platform to elaborate an ILA on its own, outside of any real design.
+
+	The only resource any of the ILAs ask the platform for is the USB bus, so each resource requested is
+	handed out as a bare UTMI interface, which is kept hold of so it can be brought out as ports.
+
+	Attributes
+	----------
+	resources : dict[tuple[str, int], Record]
+		The resources requested so far, by name and number.
+	'''
+
+	device = 'standalone'
+
+	def __init__(self: Self) -> None:
+		self.resources = dict[tuple[str, int], Record]()
+
+	def request(self: Self, name: str, number: int = 0) -> Record:
+		# Only pulled in when a USB ILA asks for its bus, so this works without Torii USB otherwise
+		from torii_usb.interface.utmi import UTMIInterface
+
+		if (name, number) in self.resources:
+			raise ValueError(f'Resource {name}#{number} has already been requested')
+
+		bus = self.resources[name, number] = UTMIInterface()
+		return bus
+
+	@property
+	def ports(self: Self) -> list[Signal]:
+		''' All of the signals of the requested resources, in the order they were requested '''
+
+		return [ sig for bus in self.resources.values() for sig in bus.fields.values() ]
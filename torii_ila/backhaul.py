@@ -1,68 +1,379 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
+import math
 from abc             import ABCMeta, abstractmethod
-from collections.abc import Callable, Generator, Iterable
-from typing          import TYPE_CHECKING, Generic, Self, TypeAlias, TypeVar
+from collections     import OrderedDict, deque
+from collections.abc import AsyncGenerator, Callable, Generator, Iterable, Iterator, Sequence
+from functools       import partial
+from io              import StringIO
+from itertools       import islice
+from typing          import TYPE_CHECKING, Generic, NamedTuple, Self, TextIO, TypeAlias, TypeVar
 from pathlib         import Path
 
-from vcd             import VCDWriter
-from vcd.common      import VarType as VCDVarType
-from vcd.writer      import Variable as VCDVar
-
-from .ila            import IntegratedLogicAnalyzer
+from .layout         import ILALayout
+from .manifest       import ILAManifest
 from ._bits          import bits
+from .               import _columns
 
 if TYPE_CHECKING:
+	from concurrent.futures import Future
+
+	import numpy
+
+	from .ila  import IntegratedLogicAnalyzer, StreamILA
 	from .usb  import USBIntegratedLogicAnalyzer
 	from .uart import UARTIntegratedLogicAnalyzer
 
 __all__ = (
 	'ILABackhaulInterface',
+	'AsyncILABackhaulInterface',
+	'PagedSamples',
 )
 
-ILAInterface: TypeAlias = 'IntegratedLogicAnalyzer | USBIntegratedLogicAnalyzer | UARTIntegratedLogicAnalyzer'
+ILAInterface: TypeAlias = (
+	'IntegratedLogicAnalyzer | StreamILA | USBIntegratedLogicAnalyzer | UARTIntegratedLogicAnalyzer'
+)
 Sample: TypeAlias = dict[str, bits]
 Samples: TypeAlias = list[Sample]
 
 T = TypeVar('T', bound = ILAInterface)
+U = TypeVar('U')
 
-# TODO(aki): We should probably provide a way to have a live, firehose-like stream output for the backhaul interfaces
-#            it's a little more useful with the UART interface, as the USB interface is capable of doing batching mostly
-#            by itself already.
-class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
+class PagedSamples(Sequence[Sample]):
 	'''
-	This represents the API for all ILA backhaul interfaces to implement.
+	A read-only view of a capture that is read off of the device a page at a time, as it is accessed.
+
+	Pages are kept once they have been read, up to ``max_pages`` of them, after which the least recently
+	used page is dropped, and read again if it is needed later.
+
+	An instance of this class is typically created by calling :py:meth:`ILABackhaulInterface.lazy_refresh`.
+
+	Parameters
+	----------
+	read_range : Callable[[int, int], list[dict[str, bits]]]
+		Reads a window of the capture off of the device, see :py:meth:`ILABackhaulInterface.read_range`.
+
+	sample_depth : int
+		The number of samples in the capture.
+
+	page_samples : int
+		The number of samples in each page.
+		(default: 1024)
+
+	max_pages : int
+		The most pages to keep at once.
+		(default: 16)
+
+	Raises
+	------
+	ValueError
+		If ``page_samples`` or ``max_pages`` is not positive.
+
+	Attributes
+	----------
+	pages : int
+		The number of pages in the capture.
+	'''
+
+	def __init__(
+		self: Self, read_range: Callable[[int, int], Samples], sample_depth: int, page_samples: int = 1024,
+		max_pages: int = 16
+	) -> None:
+		if page_samples <= 0:
+			raise ValueError(f'Pages must be a positive number of samples, not {page_samples}')
+		if max_pages <= 0:
+			raise ValueError(f'At least one page must be kept, not {max_pages}')
+
+		self.page_samples = page_samples
+		self.max_pages    = max_pages
+		self.pages        = (sample_depth + page_samples - 1) // page_samples
+
+		self._read_range   = read_range
+		self._sample_depth = sample_depth
+		self._cache        = OrderedDict[int, Samples]()
+
+	def _page(self: Self, page: int) -> Samples:
+		''' Get the samples of the given page, reading it off of the device if we don't have it. '''
+
+		if (samples := self._cache.get(page)) is not None:
+			self._cache.move_to_end(page)
+			return samples
+
+		samples = self._read_range(page * self.page_samples, self.page_samples)
+
+		self._cache[page] = samples
+		if len(self._cache) > self.max_pages:
+			self._cache.popitem(last = False)
+
+		return samples
+
+	def __len__(self: Self) -> int:
+		return self._sample_depth
+
+	def __getitem__(self: Self, idx: int | slice) -> Sample | Samples:
+		if isinstance(idx, slice):
+			return [ self[sample] for sample in range(*idx.indices(self._sample_depth)) ]
+
+		if idx < 0:
+			idx += self._sample_depth
+		if idx < 0 or idx >= self._sample_depth:
+			raise IndexError(f'Sample {idx} is outside of the {self._sample_depth} sample capture')
+
+		page, offset = divmod(idx, self.page_samples)
+		return self._page(page)[offset]
+
+	def __iter__(self: Self) -> Iterator[Sample]:
+		for page in range(self.pages):
+			yield from self._page(page)
+
+# How many samples go into each partition of a VCD being encoded across multiple processes
+_VCD_PARTITION_SAMPLES = 65536
+
+# The values of the signals in a sample as they go into a VCD, in layout order, decoded signals are strings
+_VCDValues: TypeAlias = tuple[int | str, ...]
+
+class _VCDFormat(NamedTuple):
+	''' Everything needed to encode samples into a VCD, kept picklable so it can be sent to worker processes '''
+
+	# The name, width, and initial value of each signal
+	signals: tuple[tuple[str, int, int | str], ...]
+	sample_period: float
+	trigger_ts: float
+	inject_sample_clock: bool
 
+def _next_clock_edge(ts: float, half_period: float) -> int:
+	''' The index of the first sample clock edge at or after ``ts``. '''
+
+	edge = max(math.ceil(ts / half_period), 0)
+
+	# Make sure the division didn't round us an edge either way
+	while edge > 0 and (edge - 1) * half_period >= ts:
+		edge -= 1
+	while edge * half_period < ts:
+		edge += 1
+
+	return edge
+
+def _encode_vcd(
+	vcd_stream: TextIO, fmt: _VCDFormat, samples: Iterable[tuple[float, _VCDValues]],
+	previous: tuple[float, _VCDValues] | None = None, post_step: int = 0
+) -> int:
+	'''
+	Encode a run of (timestamp, values) samples into a VCD.
+
+	If ``previous`` is given, the run picks up from where that sample left off, as a partition of a larger
+	VCD. The header is still written out ahead of the run, but is meant to be dropped when stitching.
+
+	Returns
+	-------
+	int
+		Where the run starts in ``vcd_stream``, past the header if this is a partition.
+	'''
+
+	# Only pulled in when writing a VCD, so reading samples back doesn't pay for it
+	from vcd        import VCDWriter
+	from vcd.common import VarType as VCDVarType
+
+	half_period = fmt.sample_period / 2
+	start       = 0
+
+	if previous is None:
+		last_ts, inits = 0.0, tuple(init for _, _, init in fmt.signals)
+		trigger_init   = 0
+		clk_edge       = 0
+	else:
+		last_ts, inits = previous
+		trigger_init   = int(last_ts == fmt.trigger_ts)
+		clk_edge       = _next_clock_edge(last_ts, half_period)
+
+	with VCDWriter(vcd_stream, timescale = '1 ns', comment = 'Torii ILA Dump') as writer:
+		trigger = writer.register_var(
+			'ila', 'ila_trigger', VCDVarType.wire, size = 1, init = trigger_init
+		)
+
+		# If we are adding a matched clock from the ILA then set that up, the clock rises on even edges
+		if fmt.inject_sample_clock:
+			clk_signal = writer.register_var(
+				'ila', 'ila_clk', VCDVarType.wire, size = 1, init = clk_edge & 1
+			)
+
+		vcd_signals = [
+			writer.register_var('ila', name, VCDVarType.string, size = 1, init = init)
+			if isinstance(init, str) else
+			writer.register_var('ila', name, VCDVarType.wire, size = width, init = init)
+			for (name, width, _), init in zip(fmt.signals, inits)
+		]
+
+		if previous is not None:
+			writer.flush()
+			start = vcd_stream.tell()
+
+		# Wiggle out our captured samples
+		for ts, values in samples:
+			last_ts = ts
+
+			# If we are injecting our sample clock, make sure we run it up to the time
+			# of the last sample before we add a new sample
+			if fmt.inject_sample_clock:
+				while (clk_time := clk_edge * half_period) < ts:
+					writer.change(clk_signal, clk_time / 1e-9, (clk_edge & 1) ^ 1)
+					clk_edge += 1
+
+			if ts == fmt.trigger_ts:
+				writer.change(trigger, ts / 1e-9, 1)
+			elif ts > fmt.trigger_ts:
+				writer.change(trigger, ts / 1e-9, 0)
+
+			for var, value in zip(vcd_signals, values):
+				writer.change(var, ts / 1e-9, value)
+
+		# Append any needed post-steps, but only if we have a sample clock to tick
+		if fmt.inject_sample_clock:
+			for _ in range(post_step):
+				# Advance time
+				last_ts += fmt.sample_period
+				while (clk_time := clk_edge * half_period) < last_ts:
+					writer.change(clk_signal, clk_time / 1e-9, (clk_edge & 1) ^ 1)
+					clk_edge += 1
+
+	return start
+
+def _encode_vcd_partition(
+	fmt: _VCDFormat, samples: list[tuple[float, _VCDValues]], previous: tuple[float, _VCDValues] | None,
+	post_step: int
+) -> str:
+	''' Encode a partition of a VCD in a worker process, without the header unless it's the first partition. '''
+
+	vcd_stream = StringIO()
+	start      = _encode_vcd(vcd_stream, fmt, samples, previous, post_step)
+	return vcd_stream.getvalue()[start:]
+
+def _stitch_vcd(vcd_stream: TextIO, partition: str, last_stamp: str) -> str:
+	'''
+	Append an encoded partition to the VCD.
+
+	Returns
+	-------
+	str
+		The last timestamp line written to the VCD so far.
+	'''
+
+	# A partition that picks up within the same nanosecond the last one left off would repeat its timestamp
+	if last_stamp and partition.startswith(last_stamp):
+		partition = partition[len(last_stamp):]
+
+	vcd_stream.write(partition)
+
+	stamp = partition.rfind('\n#') + 1
+	if partition.startswith('#', stamp):
+		return partition[stamp:partition.index('\n', stamp) + 1]
+
+	return last_stamp
+
+def _encode_vcd_partitioned(
+	vcd_stream: TextIO, fmt: _VCDFormat, samples: Iterable[tuple[float, _VCDValues]], post_step: int, processes: int
+) -> None:
+	'''
+	Encode samples into a VCD by splitting them into partitions by time, encoding the partitions across a
+	pool of worker processes, and then stitching them back together in order.
+
+	Only a couple of partitions per process are ever in flight, so the samples can be streamed in.
+	'''
+
+	from concurrent.futures import ProcessPoolExecutor
+
+	samples    = iter(samples)
+	partitions = iter(lambda: list(islice(samples, _VCD_PARTITION_SAMPLES)), [])
+
+	if (partition := next(partitions, None)) is None:
+		_encode_vcd(vcd_stream, fmt, (), post_step = post_step)
+		return
+
+	# Not worth spinning up the workers for a single partition
+	if (following := next(partitions, None)) is None:
+		_encode_vcd(vcd_stream, fmt, partition, post_step = post_step)
+		return
+
+	last_stamp = ''
+	previous   = None
+	pending: deque[Future[str]] = deque()
+
+	with ProcessPoolExecutor(max_workers = processes) as pool:
+		while partition is not None:
+			pending.append(pool.submit(
+				_encode_vcd_partition, fmt, partition, previous, post_step if following is None else 0
+			))
+			previous  = partition[-1]
+			partition = following
+			following = next(partitions, None) if partition is not None else None
+
+			while len(pending) > processes * 2 or (partition is None and pending):
+				last_stamp = _stitch_vcd(vcd_stream, pending.popleft().result(), last_stamp)
+
+class _ILABackhaulBase(Generic[T]):
+	'''
+	The bits common to both the blocking and asyncio ILA backhaul interfaces.
 
 	Backhaul interfaces primarily deal with `Sample`s, which are `dict`s that map
 	signal names to :py:class:`torii_ila._bits.bits`
 
 	Parameters
 	----------
-	ila : IntegratedLogicAnalyzer
-		The ILA to interface to.
+	ila : IntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA to interface to, or just its layout or manifest.
 
 	Attributes
 	----------
-	ila : IntegratedLogicAnalyzer
-		The instance of the ILA used on the device. This is used to allow the backhaul
-		to automatically configure itself appropriately and also know what signals are being
-		captures and the like.
+	ila : IntegratedLogicAnalyzer | None
+		The instance of the ILA used on the device, if the backhaul was constructed from one.
+
+	layout : ILALayout
+		The sample layout of the ILA on the device. This is used to allow the backhaul to automatically
+		configure itself appropriately and also know what signals are being captured and the like.
 
 	samples : Iterable[dict[str, bits]] | None
 		The collected samples from the ILA.
 	'''
 
-	def __init__(self: Self, ila: T) -> None:
-		self.ila = ila
-		self.samples: Samples = list[Sample]()
+	# Whether the backhaul can ask the ILA for just part of the capture, rather than reading all of it
+	_ranged_readout = False
 
-	@abstractmethod
-	def _ingest_samples(self: Self) -> Iterable[bits]:
-		''' Acquire ILA samples from the backhaul interface. '''
+	def __init__(self: Self, ila: T | ILALayout | ILAManifest) -> None:
+		if isinstance(ila, ILALayout):
+			self.ila    = None
+			self.layout = ila
+		elif isinstance(ila, ILAManifest):
+			self.ila    = None
+			self.layout = ila.layout
+		else:
+			self.ila    = ila
+			self.layout = ILALayout.from_ila(ila)
 
-		raise NotImplementedError('ILA backhaul interfaces must implement this method')
+		self.samples: Samples | PagedSamples = list[Sample]()
+
+	def _split_samples(self: Self, samples: bytes) -> Generator[bits]:
+		'''
+		Split the raw sample data stream into a stream of bit-vectors.
+
+		Parameters
+		----------
+		samples : bytes
+			The ILA sample data to be split.
+
+		Returns
+		-------
+		Generator[torii.ila._bits.bits]
+			Stream of samples as appropriately sized bit-vectors.
+		'''
+
+		sample_width = self.layout.bytes_per_sample
+		sample_len   = self.layout.sample_width
+
+		for idx in range(0, len(samples), sample_width):
+			sample_raw = samples[idx:idx + sample_width]
+
+			yield bits.from_bytes(sample_raw, sample_len)
 
 	def _parse_sample(self, raw: bits) -> Sample:
 		'''
@@ -80,18 +391,11 @@ class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
 
 		'''
 
-		pos = 0
 		sample: Sample = dict()
 
-		# BUG(aki): This *might* not be 100% stable if the signal orders shift around under us.
-		for sig in self.ila._signals:
-			#
-			width = len(sig)
-			bits  = raw[pos : (pos + width)] # noqa: E203
-			# Advance to the next signal
-			pos += width
-
-			sample[sig.name] = bits
+		# The layout pins down where each signal lives in the sample, so we don't depend on signal ordering
+		for sig in self.layout.signals:
+			sample[sig.name] = raw[sig.offset : (sig.offset + sig.width)] # noqa: E203
 
 		return sample
 
@@ -112,11 +416,161 @@ class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
 
 		return [ self._parse_sample(sample) for sample in raw ]
 
+	def _clamp_range(self: Self, start: int, count: int) -> int:
+		'''
+		Check the window of the sample buffer starting at ``start`` is actually in it.
+
+		Returns
+		-------
+		int
+			The number of samples in the window, clamped to the end of the sample buffer.
+
+		Raises
+		------
+		ValueError
+			If ``start`` is outside of the sample buffer, or ``count`` is not positive.
+		'''
+
+		depth = self.layout.sample_depth
+
+		if start < 0 or start >= depth:
+			raise ValueError(f'Sample {start} is outside of the {depth} sample buffer')
+		if count <= 0:
+			raise ValueError(f'The number of samples to read must be positive, not {count}')
+
+		return min(count, depth - start)
+
+	def _timestamped(self: Self) -> Generator[tuple[float, Sample]]:
+		''' Pair each of the collected samples up with its timestamp. '''
+
+		ts: float = 0
+
+		for sample in self.samples:
+			yield ts, sample
+			ts += self.layout.sample_period
+
+	def _write_vcd(
+		self: Self, vcd_file: Path, samples: Iterable[tuple[float, Sample]], inject_sample_clock: bool, post_step: int,
+		processes: int = 1
+	) -> None:
+		''' Dump the given (timestamp, sample) stream into a VCD file on disk, across ``processes`` processes. '''
+
+		if processes < 1:
+			raise ValueError(f'The VCD needs at least one process to encode it, not {processes}')
+
+		vcd_strings = self.layout._vcd_strings
+		signals     = [ (sig.name, vcd_strings.get(sig.name)) for sig in self.layout.signals ]
+		fmt         = _VCDFormat(
+			signals             = tuple(
+				(sig.name, sig.width, sig.reset if strings is None else strings[sig.reset])
+				for sig, (_, strings) in zip(self.layout.signals, signals)
+			),
+			sample_period       = self.layout.sample_period,
+			trigger_ts          = self.layout.prologue_samples * self.layout.sample_period,
+			inject_sample_clock = inject_sample_clock,
+		)
+
+		def _values(sample: Sample) -> _VCDValues:
+			# Decoded values are looked up rather than decoded each time
+			return tuple(
+				sample[name].to_int() if strings is None else strings[sample[name].to_int()]
+				for name, strings in signals
+			)
+
+		values = ((ts, _values(sample)) for ts, sample in samples)
+
+		with vcd_file.open('w') as vcd_stream:
+			if processes == 1:
+				_encode_vcd(vcd_stream, fmt, values, post_step = post_step)
+			else:
+				_encode_vcd_partitioned(vcd_stream, fmt, values, post_step, processes)
+
+# TODO(aki): We should probably provide a way to have a live, firehose-like stream output for the backhaul interfaces
+#            it's a little more useful with the UART interface, as the USB interface is capable of doing batching mostly
+#            by itself already.
+class ILABackhaulInterface(_ILABackhaulBase[T], metaclass = ABCMeta):
+	'''
+	This represents the API for all ILA backhaul interfaces to implement.
+
+	See :py:class:`AsyncILABackhaulInterface` for the asyncio flavor of this API.
+
+	Backhaul interfaces primarily deal with `Sample`s, which are `dict`s that map
+	signal names to :py:class:`torii_ila._bits.bits`
+
+	Parameters
+	----------
+	ila : IntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA to interface to, or just its layout or manifest.
+
+	Attributes
+	----------
+	ila : IntegratedLogicAnalyzer | None
+		The instance of the ILA used on the device, if the backhaul was constructed from one.
+
+	layout : ILALayout
+		The sample layout of the ILA on the device. This is used to allow the backhaul to automatically
+		configure itself appropriately and also know what signals are being captured and the like.
+
+	samples : Iterable[dict[str, bits]] | None
+		The collected samples from the ILA.
+	'''
+
+	@abstractmethod
+	def _ingest_samples(self: Self) -> Iterable[bits]:
+		''' Acquire ILA samples from the backhaul interface. '''
+
+		raise NotImplementedError('ILA backhaul interfaces must implement this method')
+
+	def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		'''
+		Acquire a window of the ILA sample buffer from the backhaul interface.
+
+		Backhaul interfaces that can read back just part of the sample buffer override this, otherwise
+		the whole buffer is ingested and the window is cut out of it.
+		'''
+
+		return list(self._ingest_samples())[start:start + count]
+
 	def refresh(self: Self) -> None:
 		''' Update the internal sample buffer with samples ingested from the backhaul interface. '''
 
 		self.samples = self._parse_samples(self._ingest_samples())
 
+	def lazy_refresh(self: Self, page_samples: int = 1024, max_pages: int = 16) -> None:
+		'''
+		Like :py:meth:`refresh` but rather than reading the whole capture up front, each page of it is read
+		off of the device the first time it is accessed.
+
+		This lets huge captures be poked at interactively without waiting on all of it to come off of the
+		device first, see :py:class:`PagedSamples`.
+
+		Note
+		----
+		The pages are read from whatever capture is on the device at the time, so the ILA should not be
+		retriggered while the samples are in use. Backhauls that can't ask the ILA for just part of the
+		capture read all of it as a single page.
+
+		Parameters
+		----------
+		page_samples : int
+			The number of samples to read off of the device at a time.
+			(default: 1024)
+
+		max_pages : int
+			The most pages to keep at once, after which the least recently used is dropped.
+			(default: 16)
+
+		Raises
+		------
+		ValueError
+			If ``page_samples`` or ``max_pages`` is not positive.
+		'''
+
+		if not self._ranged_readout:
+			page_samples = self.layout.sample_depth
+
+		self.samples = PagedSamples(self.read_range, self.layout.sample_depth, page_samples, max_pages)
+
 	def update(self: Self) -> None:
 		'''
 		Like :py:meth:`refresh` but appends the ingested samples rather than replacing them.
@@ -133,6 +587,10 @@ class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
 		if len(self.samples) == 0:
 			self.refresh()
 		else:
+			# Anything still left on the device of a lazily read capture has to be read before it's replaced
+			if isinstance(self.samples, PagedSamples):
+				self.samples = list(self.samples)
+
 			self.samples.extend(self._parse_samples(self._ingest_samples()))
 
 	def enumerate(self: Self) -> Generator[tuple[float, Sample]]:
@@ -140,6 +598,8 @@ class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
 		Iterate over all of the samples received from our backhaul interface and format them
 		in a way that is easy to consume.
 
+		If :py:meth:`lazy_refresh` was used, the samples are read off of the device as they are reached.
+
 		Returns
 		-------
 		Generator[tuple[float, Sample]]
@@ -153,13 +613,40 @@ class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
 				print('Refresh didn\'t collect any samples, can\'t enumerate!')
 				return
 
-		ts: float = 0
+		yield from self._timestamped()
 
-		for sample in self.samples:
-			yield ts, sample
-			ts += self.ila.sample_period
+	def read_range(self: Self, start: int, count: int) -> Samples:
+		'''
+		Read a window of the sample buffer off of the device, leaving :py:attr:`samples` alone.
+
+		This is much quicker than a :py:meth:`refresh` when only part of a deep capture is of interest,
+		as long as the backhaul is able to ask the ILA for just that part.
+
+		Parameters
+		----------
+		start : int
+			The first sample of the window, the timestamp of each sample in the window is ``start``
+			sample periods further along than its index into it.
+
+		count : int
+			The number of samples in the window, this is clamped to the end of the sample buffer.
 
-	def write_vcd(self: Self, vcd_file: Path, inject_sample_clock: bool = True, post_step: int = 1) -> None:
+		Returns
+		-------
+		list[dict[str, bits]]
+			The samples in the window.
+
+		Raises
+		------
+		ValueError
+			If ``start`` is outside of the sample buffer, or ``count`` is not positive.
+		'''
+
+		return self._parse_samples(self._ingest_range(start, self._clamp_range(start, count)))
+
+	def write_vcd(
+		self: Self, vcd_file: Path, inject_sample_clock: bool = True, post_step: int = 1, *, processes: int = 1
+	) -> None:
 		'''
 		Dump all received ILA samples from the backhaul interface into a VCD file on disk.s
 
@@ -179,69 +666,257 @@ class ILABackhaulInterface(Generic[T], metaclass = ABCMeta):
 			This option is only meaningful if ``inject_sample_clock`` is true, as
 			we can't advance the VCD without it.
 			(default: 1)
+
+		processes : int
+			The number of processes to encode the VCD with. If more than one, the capture is split into
+			partitions by time which are encoded in parallel and then stitched back together in order, the
+			resulting VCD is the same either way.
+			(default: 1)
+
+		Raises
+		------
+		ValueError
+			If ``processes`` is less than 1.
 		'''
 
-		with vcd_file.open('w') as vcd_stream:
-			with VCDWriter(vcd_stream, timescale = '1 ns', comment = 'Torii ILA Dump') as writer:
-				# Signal mapping
-				vcd_signals: dict[str, VCDVar] = dict()
-				sig_decoder: dict[str, Callable[[int], str]] = dict()
-				trigger = writer.register_var(
-					'ila', 'ila_trigger', VCDVarType.wire, size = 1, init = 0
-				)
-
-				# If we are adding a matched clock from the ILA then set that up
-				if inject_sample_clock:
-					clk_value: int = 1
-					clk_time: int  = 0
-					clk_signal     = writer.register_var(
-						'ila', 'ila_clk', VCDVarType.wire, size = 1, init = clk_value ^ 1
-					)
-
-				for sig in self.ila._signals:
-					if sig.decoder is not None:
-						sig_decoder[sig.name] = sig.decoder
-						vcd_signals[sig.name] = writer.register_var(
-							'ila', sig.name, VCDVarType.string, size = 1,
-							init = sig_decoder[sig.name](sig.reset).expandtabs().replace(' ', '_')
-						)
-					else:
-						vcd_signals[sig.name] = writer.register_var(
-							'ila', sig.name, VCDVarType.wire, size = len(sig), init = sig.reset
-						)
-
-				last_ts: float = 0.0
-				# Wiggle out our captured samples
-				for ts, sample in self.enumerate():
-					last_ts = ts
-
-					# If we are injecting our sample clock, make sure we run it up to the time
-					# of the last sample before we add a new sample
-					if inject_sample_clock:
-						while clk_time < ts:
-							writer.change(clk_signal, clk_time / 1e-9, clk_value)
-							clk_value ^= 1 # Tick the clock
-							clk_time += (self.ila.sample_period / 2)
-
-					if ts == self.ila.prologue_samples * self.ila.sample_period:
-						writer.change(trigger, ts / 1e-9, 1)
-					elif ts > self.ila.prologue_samples * self.ila.sample_period:
-						writer.change(trigger, ts / 1e-9, 0)
-
-					# Iterate over the un-packed sample
-					for name, value in sample.items():
-						if (decoder := sig_decoder.get(name)) is not None:
-							decoded_val = decoder(value.to_int()).expandtabs().replace(' ', '_')
-							writer.change(vcd_signals[name], ts / 1e-9, decoded_val)
-						else:
-							writer.change(vcd_signals[name], ts / 1e-9, value.to_int())
-
-				# Append any needed post-steps, but only if we have a sample clock to tick
-				if inject_sample_clock:
-					for _ in range(post_step):
-						# Advance time
-						last_ts += self.ila.sample_period
-						while clk_time < last_ts:
-							writer.change(clk_signal, clk_time / 1e-9, clk_value)
-							clk_value ^= 1
-							clk_time += (self.ila.sample_period / 2)
+		self._write_vcd(vcd_file, self.enumerate(), inject_sample_clock, post_step, processes)
+
+	def columns(self: Self, *, decode: bool = False) -> dict[str, 'numpy.ndarray']:
+		'''
+		Get all received ILA samples as a NumPy array per signal, refreshing them first if we don't have any.
+
+		This needs NumPy, which comes with the ``export`` extra.
+
+		Parameters
+		----------
+		decode : bool
+			Replace the values of signals with decoders with their decoded form, as an ``object`` array
+			of ``str``.
+			(default: False)
+
+		Returns
+		-------
+		dict[str, numpy.ndarray]
+			The ``ila_timestamp`` of each sample in seconds, followed by a column for each signal in the
+			layout. Signals up to 64 bits wide are the narrowest unsigned integer type that fits them, wider
+			signals are their raw little endian bytes.
+
+		Raises
+		------
+		ImportError
+			If NumPy is not installed.
+		'''
+
+		if len(self.samples) == 0:
+			self.refresh()
+
+		return _columns.columns(self.layout, self.samples, decode)
+
+	def to_numpy(self: Self, *, decode: bool = False) -> 'numpy.ndarray':
+		'''
+		Get all received ILA samples as a NumPy structured array, refreshing them first if we don't have any.
+
+		The fields of the array are the columns from :py:meth:`columns`.
+
+		Parameters
+		----------
+		decode : bool
+			Replace the values of signals with decoders with their decoded form.
+			(default: False)
+
+		Returns
+		-------
+		numpy.ndarray
+			A record for each sample.
+
+		Raises
+		------
+		ImportError
+			If NumPy is not installed.
+		'''
+
+		if len(self.samples) == 0:
+			self.refresh()
+
+		return _columns.structured(self.layout, self.samples, decode)
+
+	def write_table(self: Self, table_file: Path, *, decode: bool = False) -> None:
+		'''
+		Dump all received ILA samples from the backhaul interface into an Apache Parquet file if it's a
+		``.parquet`` file, otherwise an Apache Arrow IPC file, refreshing them first if we don't have any.
+
+		The table has the same columns as :py:meth:`columns`, with signals wider than 64 bits stored as
+		fixed size binary and decoded signals dictionary encoded. The manifest of the capture is stored in
+		the ``torii_ila.manifest`` schema metadata, so the file can be made sense of without the design.
+
+		This needs NumPy and PyArrow, which come with the ``export`` extra.
+
+		Parameters
+		----------
+		table_file : Path
+			The file to write to.
+
+		decode : bool
+			Replace the values of signals with decoders with their decoded form.
+			(default: False)
+
+		Raises
+		------
+		ImportError
+			If NumPy or PyArrow are not installed.
+		'''
+
+		if len(self.samples) == 0:
+			self.refresh()
+
+		_columns.write_table(table_file, self.layout, self.samples, decode, table_file.suffix == '.parquet')
+
+class AsyncILABackhaulInterface(_ILABackhaulBase[T], metaclass = ABCMeta):
+	'''
+	The asyncio flavor of :py:class:`ILABackhaulInterface`.
+
+	All of the backhaul I/O is awaitable and never blocks the event loop, this allows for driving many
+	ILAs concurrently from a single thread. Exporting the samples, be it to a VCD, NumPy, or an Arrow or
+	Parquet file, is run in the default executor of the event loop for the same reason.
+
+	Parameters
+	----------
+	ila : IntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA to interface to, or just its layout or manifest.
+
+	Attributes
+	----------
+	ila : IntegratedLogicAnalyzer | None
+		The instance of the ILA used on the device, if the backhaul was constructed from one.
+
+	layout : ILALayout
+		The sample layout of the ILA on the device.
+
+	samples : Iterable[dict[str, bits]] | None
+		The collected samples from the ILA.
+	'''
+
+	@abstractmethod
+	async def _ingest_samples(self: Self) -> Iterable[bits]:
+		''' Acquire ILA samples from the backhaul interface. '''
+
+		raise NotImplementedError('ILA backhaul interfaces must implement this method')
+
+	async def _off_loop(self: Self, func: Callable[..., U], *args: object) -> U:
+		''' Run the CPU bound encoding and file I/O of exporting samples in an executor, off of the event loop '''
+
+		import asyncio
+
+		return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+	async def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		''' See :py:meth:`ILABackhaulInterface._ingest_range`. '''
+
+		return list(await self._ingest_samples())[start:start + count]
+
+	async def refresh(self: Self) -> None:
+		''' Update the internal sample buffer with samples ingested from the backhaul interface. '''
+
+		self.samples = self._parse_samples(await self._ingest_samples())
+
+	async def update(self: Self) -> None:
+		'''
+		Like :py:meth:`refresh` but appends the ingested samples rather than replacing them.
+
+		Note
+		----
+		Due to the latency and other factors, the signals in the concatenated samples buffers will likely
+		not be contiguous.
+		'''
+
+		if len(self.samples) == 0:
+			await self.refresh()
+		else:
+			self.samples.extend(self._parse_samples(await self._ingest_samples()))
+
+	async def enumerate(self: Self) -> AsyncGenerator[tuple[float, Sample]]:
+		'''
+		Asynchronously iterate over all of the samples received from our backhaul interface, refreshing
+		them first if we don't have any.
+
+		Returns
+		-------
+		AsyncGenerator[tuple[float, Sample]]
+			A stream of (timestamp, sample) tuples
+		'''
+
+		if len(self.samples) == 0:
+			await self.refresh()
+
+			if len(self.samples) == 0:
+				print('Refresh didn\'t collect any samples, can\'t enumerate!')
+				return
+
+		for ts, sample in self._timestamped():
+			yield ts, sample
+
+	def __aiter__(self: Self) -> AsyncGenerator[tuple[float, Sample]]:
+		return self.enumerate()
+
+	async def read_range(self: Self, start: int, count: int) -> Samples:
+		'''
+		Read a window of the sample buffer off of the device, leaving :py:attr:`samples` alone.
+
+		See :py:meth:`ILABackhaulInterface.read_range` for the parameters.
+		'''
+
+		return self._parse_samples(await self._ingest_range(start, self._clamp_range(start, count)))
+
+	async def write_vcd(
+		self: Self, vcd_file: Path, inject_sample_clock: bool = True, post_step: int = 1, *, processes: int = 1
+	) -> None:
+		'''
+		Dump all received ILA samples from the backhaul interface into a VCD file on disk, refreshing
+		them first if we don't have any.
+
+		See :py:meth:`ILABackhaulInterface.write_vcd` for the parameters.
+		'''
+
+		if len(self.samples) == 0:
+			await self.refresh()
+
+		await self._off_loop(self._write_vcd, vcd_file, self._timestamped(), inject_sample_clock, post_step, processes)
+
+	async def columns(self: Self, *, decode: bool = False) -> dict[str, 'numpy.ndarray']:
+		'''
+		Get all received ILA samples as a NumPy array per signal, refreshing them first if we don't have any.
+
+		See :py:meth:`ILABackhaulInterface.columns` for the parameters.
+		'''
+
+		if len(self.samples) == 0:
+			await self.refresh()
+
+		return await self._off_loop(_columns.columns, self.layout, self.samples, decode)
+
+	async def to_numpy(self: Self, *, decode: bool = False) -> 'numpy.ndarray':
+		'''
+		Get all received ILA samples as a NumPy structured array, refreshing them first if we don't have any.
+
+		See :py:meth:`ILABackhaulInterface.to_numpy` for the parameters.
+		'''
+
+		if len(self.samples) == 0:
+			await self.refresh()
+
+		return await self._off_loop(_columns.structured, self.layout, self.samples, decode)
+
+	async def write_table(self: Self, table_file: Path, *, decode: bool = False) -> None:
+		'''
+		Dump all received ILA samples from the backhaul interface into an Apache Parquet or Arrow IPC file,
+		refreshing them first if we don't have any.
+
+		See :py:meth:`ILABackhaulInterface.write_table` for the parameters.
+		'''
+
+		if len(self.samples) == 0:
+			await self.refresh()
+
+		await self._off_loop(
+			_columns.write_table, table_file, self.layout, self.samples, decode, table_file.suffix == '.parquet'
+		)
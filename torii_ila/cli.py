@@ -1,13 +1,35 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
-from argparse  import ArgumentParser, ArgumentDefaultsHelpFormatter
-from pathlib   import Path
+import hashlib
+import json
+import sys
+import time
+from argparse          import ArgumentParser, ArgumentDefaultsHelpFormatter, Namespace
+from collections.abc   import Generator
+from os                import getenv
+from pathlib           import Path
+from typing            import Self
 
-from torii.hdl import Elaboratable
+from .                 import _columns, uart, usb
+from ._bits            import bits
+from .backhaul         import ILABackhaulInterface, Sample
+from .layout           import ILALayout
+from .manifest         import ILAManifest
 
-from .uart     	import _setup_args as _setup_uart_args
-from .usb      import _setup_args as _setup_usb_args
+# Options that don't change what gets generated, and so are left out of the configuration hash
+_UNHASHED_OPTIONS = ( 'command', 'build', 'output', 'manifest', 'cache_dir', 'no_cache' )
+
+# The capture formats that are picked by the suffix of the output file, anything else is written raw
+_CAPTURE_SUFFIXES = {
+	'.vcd':     'vcd',
+	'.arrow':   'arrow',
+	'.feather': 'arrow',
+	'.parquet': 'parquet',
+}
+
+def _default_cache_dir() -> Path:
+	return Path(getenv('XDG_CACHE_HOME', Path.home() / '.cache')) / 'torii-ila'
 
 def _setup_common(parent_parser: ArgumentParser) -> None:
 	parser = parent_parser.add_argument_group(
@@ -28,7 +50,7 @@ def _setup_common(parent_parser: ArgumentParser) -> None:
 		metavar  = 'SAMPLE_WIDTH',
 		type     = int,
 		required = True,
-		help     = 'The width of each sample'
+		help     = 'The width of each sample, this is the width of the `probe` input port'
 	)
 
 	parser.add_argument(
@@ -42,36 +64,385 @@ def _setup_common(parent_parser: ArgumentParser) -> None:
 	parser.add_argument(
 		'--sample-rate', '-r',
 		metavar  = 'SAMPLE_RATE',
-		type     = int,
+		type     = float,
 		required = True,
 		help     = 'The speed of the ILA sampling domain in MHz'
 	)
 
 	parser.add_argument(
-		'--io-domain', '-i',
-		metavar = 'IO_DOMAIN',
+		'--prologue-samples', '-p',
+		metavar = 'PROLOGUE_SAMPLES',
+		type    = int,
+		default = 1,
+		help    = 'The number of samples to capture before the trigger'
+	)
+
+	parser.add_argument(
+		'--no-embed-layout',
+		action = 'store_true',
+		help   = 'Leave the layout descriptor ROM out of the gateware'
+	)
+
+	parser.add_argument(
+		'--name', '-n',
+		metavar = 'NAME',
 		type    = str,
-		default = 'sync',
-		help    = 'The name of the clock domain the ILA samples will be output on'
+		default = 'torii_ila',
+		help    = 'The name of the generated top level module'
 	)
 
-	parent_parser.add_argument(
-		'--io-speed', '-I',
-		metavar  = 'IO_SPEED',
-		type     = int,
+	parser.add_argument(
+		'--format', '-f',
+		choices = ( 'verilog', 'rtlil' ),
+		default = None,
+		help    = 'The output format, if not given RTLIL is used for `.il` files and Verilog for anything else'
+	)
+
+	parser.add_argument(
+		'--output', '-o',
+		metavar = 'OUTPUT',
+		type    = Path,
+		default = Path('ila.v'),
+		help    = 'The output file'
+	)
+
+	parser.add_argument(
+		'--manifest', '-m',
+		metavar = 'MANIFEST',
+		type    = Path,
+		default = None,
+		help    = 'Also write out the manifest of the ILA for use with `torii-ila capture`, as JSON for `.json` files'
+	)
+
+	parser.add_argument(
+		'--cache-dir',
+		metavar = 'CACHE_DIR',
+		type    = Path,
+		default = _default_cache_dir(),
+		help    = 'Where generated cores are kept, by the hash of their configuration'
+	)
+
+	parser.add_argument(
+		'--no-cache',
+		action = 'store_true',
+		help   = 'Always generate the core, even if it has been generated before'
+	)
+
+def _setup_generate(parent_parser: ArgumentParser) -> None:
+	transports = parent_parser.add_subparsers(
+		title    = 'Transports',
+		dest     = 'transport',
+		metavar  = 'TRANSPORT',
 		required = True,
-		help     = 'The speed of the ILA IO domain in MHz'
+	)
+
+	if uart.ILA_HAS_UART:
+		uart_parser = transports.add_parser(
+			'uart',
+			help            = 'Generate a UART ILA core',
+			description     = 'Generate a UART ILA core, with `tx` and `rx` ports for the serial link',
+			formatter_class = ArgumentDefaultsHelpFormatter
+		)
+		_setup_common(uart_parser)
+		uart._setup_args(uart_parser)
+		uart_parser.set_defaults(build = uart._build_ila)
+
+	if usb.ILA_HAS_USB:
+		usb_parser = transports.add_parser(
+			'usb',
+			help            = 'Generate a USB ILA core',
+			description     = (
+				'Generate a USB ILA core, with ports for a UTMI bus, which is clocked by the `usb_clk` port'
+			),
+			formatter_class = ArgumentDefaultsHelpFormatter
+		)
+		_setup_common(usb_parser)
+		usb._setup_args(usb_parser)
+		usb_parser.set_defaults(build = usb._build_ila)
+
+def _setup_capture_common(parent_parser: ArgumentParser) -> None:
+	parser = parent_parser.add_argument_group(
+		title = 'Common',
+		description = 'Common Capture Options'
+	)
+
+	parser.add_argument(
+		'--manifest', '-m',
+		metavar = 'MANIFEST',
+		type    = Path,
+		default = None,
+		help    = 'The manifest of the ILA, if not given its layout is read off of the device'
+	)
+
+	parser.add_argument(
+		'--format', '-f',
+		choices = ( 'vcd', 'arrow', 'parquet', 'raw' ),
+		default = None,
+		help    = (
+			'The output format, if not given VCD is used for `.vcd` files, an Arrow IPC file for `.arrow` and '
+			'`.feather` files, Parquet for `.parquet` files, and the raw samples, as they came off of the device, for '
+			'anything else'
+		)
+	)
+
+	parser.add_argument(
+		'--decode',
+		action = 'store_true',
+		help   = 'Store the decoded values of signals with decoders in Arrow and Parquet output, not the raw ones'
 	)
 
 	parser.add_argument(
 		'--output', '-o',
 		metavar = 'OUTPUT',
 		type    = Path,
-		default = (Path.cwd() / 'ila.v').relative_to(Path.cwd()),
+		default = Path('capture.vcd'),
 		help    = 'The output file'
 	)
 
-def main() -> int:
+	parser.add_argument(
+		'--chunk-samples', '-c',
+		metavar = 'CHUNK_SAMPLES',
+		type    = int,
+		default = 1024,
+		help    = 'The number of samples to read off of the device at a time, if it can be asked for part of a capture'
+	)
+
+	parser.add_argument(
+		'--no-sample-clock',
+		action = 'store_true',
+		help   = 'Leave the synthetic `ila_clk` sample clock out of the VCD'
+	)
+
+	parser.add_argument(
+		'--jobs', '-j',
+		metavar = 'JOBS',
+		type    = int,
+		default = 1,
+		help    = 'The number of processes to encode the VCD with, large captures are split up between them'
+	)
+
+	parser.add_argument(
+		'--quiet', '-q',
+		action = 'store_true',
+		help   = 'Don\'t report on the progress of the capture'
+	)
+
+def _setup_capture(parent_parser: ArgumentParser) -> None:
+	transports = parent_parser.add_subparsers(
+		title    = 'Transports',
+		dest     = 'transport',
+		metavar  = 'TRANSPORT',
+		required = True,
+	)
+
+	if uart.ILA_HAS_UART:
+		uart_parser = transports.add_parser(
+			'uart',
+			help            = 'Capture from a UART ILA',
+			description     = 'Capture from a UART ILA, the capture is read as soon as the ILA has completed it',
+			formatter_class = ArgumentDefaultsHelpFormatter
+		)
+		_setup_capture_common(uart_parser)
+		uart._setup_capture_args(uart_parser)
+		uart_parser.set_defaults(
+			check = uart._check_capture_args, connect = uart._get_backhaul, wait = uart._wait_for_capture
+		)
+
+	if usb.ILA_HAS_USB:
+		usb_parser = transports.add_parser(
+			'usb',
+			help            = 'Capture from a USB ILA',
+			description     = 'Capture from a USB ILA, the ILA is armed and the capture is read once it is complete',
+			formatter_class = ArgumentDefaultsHelpFormatter
+		)
+		_setup_capture_common(usb_parser)
+		usb._setup_capture_args(usb_parser)
+		usb_parser.set_defaults(connect = usb._get_backhaul, wait = usb._wait_for_capture)
+
+def _config_hash(args: Namespace, output_format: str) -> str:
+	''' Hash everything that goes into generating the core, so it only needs generating once '''
+
+	from torii import __version__ as torii_version
+
+	from .     import __version__
+
+	config = {
+		name: value for name, value in vars(args).items() if name not in _UNHASHED_OPTIONS
+	}
+	config.update(output_format = output_format, torii_ila = __version__, torii = torii_version)
+
+	return hashlib.sha256(json.dumps(config, sort_keys = True, default = str).encode()).hexdigest()
+
+def _generate(args: Namespace) -> int:
+	# Torii is only needed when generating, so capturing doesn't have to wait on it being imported
+	from torii.back        import rtlil, verilog
+	from torii.diagnostics import YosysError
+	from torii.hdl.ast     import Signal
+	from torii.hdl.ir      import Fragment
+
+	from ._platform        import StandalonePlatform
+
+	output_format = args.format or ('rtlil' if args.output.suffix == '.il' else 'verilog')
+	cached        = args.cache_dir / f'{_config_hash(args, output_format)}.{"il" if output_format == "rtlil" else "v"}'
+
+	probe      = Signal(args.sample_width, name = 'probe')
+	ila, ports = args.build(args, [ probe ])
+
+	if args.manifest is not None:
+		ILAManifest.from_ila(ila, baudrate = getattr(args, 'baudrate', None)).save(args.manifest)
+
+	if not args.no_cache and cached.is_file():
+		args.output.write_text(cached.read_text())
+		print(f'Using cached core for {args.output}')
+		return 0
+
+	platform = StandalonePlatform()
+	design   = Fragment.get(ila, platform)
+	ports    = [ probe, ila.trigger, ila.sampling, ila.complete, *ports, *platform.ports ]
+
+	try:
+		if output_format == 'rtlil':
+			core = rtlil.convert(design, name = args.name, ports = ports)
+		else:
+			core = verilog.convert(design, name = args.name, ports = ports)
+	except YosysError as error:
+		print(f'Unable to generate Verilog, is Yosys installed? {error}', file = sys.stderr)
+		return 1
+
+	args.output.write_text(core)
+	print(f'Generated {args.output}')
+
+	if not args.no_cache:
+		args.cache_dir.mkdir(parents = True, exist_ok = True)
+		# Write it out under another name first so a half written core never ends up in the cache
+		partial = cached.with_suffix('.partial')
+		partial.write_text(core)
+		partial.replace(cached)
+
+	return 0
+
+class _Progress:
+	''' Reports how far along reading a capture off of the device is, and how quickly it's going '''
+
+	def __init__(self: Self, layout: ILALayout, quiet: bool) -> None:
+		self._total        = layout.sample_depth
+		self._sample_bytes = layout.bytes_per_sample
+		self._quiet        = quiet
+		# Only redraw the progress line if someone is there to watch it
+		self._live         = not quiet and sys.stderr.isatty()
+		self._samples      = 0
+		self._start        = time.perf_counter()
+
+	def _rate(self: Self) -> str:
+		elapsed = max(time.perf_counter() - self._start, 1e-9)
+		return (
+			f'{self._samples / elapsed:,.0f} samples/s, '
+			f'{self._samples * self._sample_bytes / elapsed / 1024:,.1f} KiB/s'
+		)
+
+	def update(self: Self, samples: int) -> None:
+		self._samples += samples
+
+		if self._live:
+			print(
+				f'\r{self._samples}/{self._total} samples ({self._samples * 100 // self._total}%), {self._rate()}',
+				end = '', file = sys.stderr, flush = True
+			)
+
+	def finish(self: Self, output: Path) -> None:
+		if self._live:
+			print(file = sys.stderr)
+
+		if not self._quiet:
+			elapsed = time.perf_counter() - self._start
+			print(
+				f'Captured {self._samples} samples to {output} in {elapsed:.2f}s ({self._rate()})', file = sys.stderr
+			)
+
+def _read_chunks(backhaul: ILABackhaulInterface, chunk_samples: int) -> Generator[list[bits]]:
+	''' Read the capture off of the device ``chunk_samples`` at a time, if it can be asked for part of it '''
+
+	depth = backhaul.layout.sample_depth
+
+	if not backhaul._ranged_readout:
+		yield list(backhaul._ingest_samples())
+		return
+
+	# Reading less than a whole block means reading some blocks more than once
+	if (block_samples := getattr(backhaul, '_block_samples', None)) is not None:
+		chunk_samples = max(block_samples, chunk_samples - chunk_samples % block_samples)
+
+	for start in range(0, depth, chunk_samples):
+		yield list(backhaul._ingest_range(start, min(chunk_samples, depth - start)))
+
+def _timestamped(
+	backhaul: ILABackhaulInterface, chunks: Generator[list[bits]], progress: _Progress
+) -> Generator[tuple[float, Sample]]:
+	''' Parse and timestamp each of the samples as the chunks come in '''
+
+	ts: float = 0
+
+	for chunk in chunks:
+		for sample in backhaul._parse_samples(chunk):
+			yield ts, sample
+			ts += backhaul.layout.sample_period
+
+		progress.update(len(chunk))
+
+def _capture(args: Namespace) -> int:
+	if args.chunk_samples <= 0:
+		raise ValueError(f'Chunks must be a positive number of samples, not {args.chunk_samples}')
+	if args.jobs < 1:
+		raise ValueError(f'The VCD needs at least one process to encode it, not {args.jobs}')
+
+	output_format = args.format or _CAPTURE_SUFFIXES.get(args.output.suffix, 'raw')
+	manifest      = None if args.manifest is None else ILAManifest.load(args.manifest)
+
+	# Rather find out the export dependencies are missing before the capture than after it
+	if output_format in ( 'arrow', 'parquet' ):
+		try:
+			_columns._import_optional('pyarrow')
+		except ImportError as error:
+			raise ValueError(str(error)) from error
+
+	if manifest is not None and manifest.transport not in ( None, args.transport ):
+		raise ValueError(f'The manifest is for a {manifest.transport.upper()} ILA, not a {args.transport.upper()} one')
+
+	if (check := getattr(args, 'check', None)) is not None:
+		check(args, manifest)
+
+	try:
+		backhaul = args.connect(args, manifest)
+
+		if not args.quiet:
+			print('Waiting for the ILA to complete a capture', file = sys.stderr)
+		args.wait(args, backhaul)
+
+		progress = _Progress(backhaul.layout, args.quiet)
+		chunks   = _read_chunks(backhaul, args.chunk_samples)
+
+		if output_format == 'vcd':
+			backhaul._write_vcd(
+				args.output, _timestamped(backhaul, chunks, progress), not args.no_sample_clock, post_step = 1,
+				processes = args.jobs
+			)
+		elif output_format in ( 'arrow', 'parquet' ):
+			samples = [ sample for _, sample in _timestamped(backhaul, chunks, progress) ]
+			_columns.write_table(args.output, backhaul.layout, samples, args.decode, output_format == 'parquet')
+		else:
+			with args.output.open('wb') as raw:
+				for chunk in chunks:
+					raw.write(b''.join(sample.to_bytes() for sample in chunk))
+					progress.update(len(chunk))
+	# Anything malformed coming off of the device is a failed capture, not a usage error
+	except (RuntimeError, ValueError) as error:
+		print(f'Capture failed: {error}', file = sys.stderr)
+		return 1
+
+	progress.finish(args.output)
+	return 0
+
+def main(argv: list[str] | None = None) -> int:
 
 	parser = ArgumentParser(
 		prog = 'torii-ila',
@@ -79,10 +450,39 @@ def main() -> int:
 		formatter_class = ArgumentDefaultsHelpFormatter
 	)
 
-	_setup_common(parser)
-	_setup_uart_args(parser)
-	_setup_usb_args(parser)
+	commands = parser.add_subparsers(
+		title    = 'Commands',
+		dest     = 'command',
+		metavar  = 'COMMAND',
+		required = True,
+	)
 
-	args = parser.parse_args()
+	generate = commands.add_parser(
+		'generate',
+		help        = 'Generate a standalone ILA core',
+		description = (
+			'Generate a standalone ILA core for use in non-Torii designs, the signals to capture are '
+			'brought in on the `probe` port and a capture is started by the `trigger` port'
+		),
+	)
+	_setup_generate(generate)
+	generate.set_defaults(command = _generate)
 
-	return 0
+	capture = commands.add_parser(
+		'capture',
+		help        = 'Capture samples from an ILA',
+		description = (
+			'Connect to an ILA, wait for it to complete a capture, and write the samples out to a VCD, an Arrow '
+			'or Parquet table, or as the raw samples'
+		),
+	)
+	_setup_capture(capture)
+	capture.set_defaults(command = _capture)
+
+	args = parser.parse_args(argv)
+
+	# Bad arguments and manifests are usage errors, the commands report their own failures otherwise
+	try:
+		return args.command(args)
+	except ValueError as error:
+		parser.error(str(error))
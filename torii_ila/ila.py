@@ -4,15 +4,17 @@
 from collections.abc         import Iterable
 from typing                  import Self
 
-from torii.hdl.ast           import Cat, Signal, SignalSet
+from torii.hdl.ast           import Cat, Mux, Signal, SignalSet
 from torii.hdl.dsl           import FSM, Module
 from torii.hdl.ir            import Elaboratable
 from torii.hdl.mem           import Memory
 from torii.hdl.xfrm          import DomainRenamer
-from torii.lib.cdc           import FFSynchronizer
+from torii.lib.cdc           import FFSynchronizer, PulseSynchronizer
 from torii.lib.fifo          import AsyncFIFOBuffered
 from torii.lib.stream.simple import StreamInterface
 
+from .layout                 import ILALayout
+
 __all__ = (
 	'IntegratedLogicAnalyzer',
 	'StreamILA',
@@ -71,6 +73,9 @@ class IntegratedLogicAnalyzer(Elaboratable):
 	bytes_per_sample : int
 		The number of whole bytes per sample.
 
+	layout : ILALayout
+		The sample layout of the ILA.
+
 	trigger : Signal, in
 		ILA Sample start trigger strobe.
 
@@ -89,6 +94,10 @@ class IntegratedLogicAnalyzer(Elaboratable):
 
 	_is_elaborating: bool = False
 
+	@property
+	def layout(self: Self) -> ILALayout:
+		return ILALayout.from_ila(self)
+
 	def _recompute(self: Self) -> None:
 		'''
 		Re-compute the ILA sample internals
@@ -340,6 +349,17 @@ class StreamILA(Elaboratable):
 		The number of samples to capture **before** the trigger.
 		(default: 1)
 
+	stream_width : int | None
+		The width in bits of the output stream. If ``None`` the stream is ``bits_per_sample`` wide and
+		carries one sample per transfer, otherwise each sample is split into ``words_per_sample`` transfers
+		of ``stream_width`` bits, least significant word first. Must be a multiple of 8.
+		(default: None)
+
+	auto_send : bool
+		Send the sample buffer out of ``stream`` as soon as a capture completes. If ``False`` the
+		capture stays in the sample buffer until a window of it is asked for with ``read``.
+		(default: True)
+
 	Attributes
 	----------
 	domain : str
@@ -366,17 +386,43 @@ class StreamILA(Elaboratable):
 	bytes_per_sample : int
 		The number of whole bytes per sample.
 
+	layout : ILALayout
+		The sample layout of the ILA.
+
+	stream_width : int
+		The width of the output stream in bits.
+
+	words_per_sample : int
+		The number of ``stream_width`` wide transfers it takes to send a single sample.
+
 	trigger : Signal, in
 		ILA Sample start trigger strobe.
 
+	retrigger : Signal, in
+		Like ``trigger`` but on the output domain, this lets whatever is consuming the ``stream`` re-arm the
+		ILA alongside the design driving ``trigger``.
+
 	sampling : Signal, out
 		Indicates when the ILA is actively sampling.
 
 	complete : Signal, out
 		Indicates when sampling is completed and the buffer is full.
 
+	read : Signal, in
+		Strobe on the output domain to send ``read_count`` samples starting at ``read_start`` out of the
+		sample buffer again. This is ignored unless the ILA is idle with a complete capture.
+
+	read_start : Signal(range(sample_depth)), in
+		The first sample to send when ``read`` is strobed. This and ``read_count`` must be held until the
+		samples start coming out of ``stream``.
+
+	read_count : Signal(range(sample_depth + 1)), in
+		The number of samples to send when ``read`` is strobed, this must be non-zero and is clamped to the
+		end of the sample buffer.
+
 	stream : StreamInterface
-		The output stream of ILA samples.
+		The output stream of ILA samples. ``first`` is asserted on the first transfer of the sample
+		buffer, or the window of it being read, and ``last`` on the final transfer.
 	'''
 
 	@property
@@ -391,13 +437,33 @@ class StreamILA(Elaboratable):
 	def bytes_per_sample(self) -> int:
 		return self.ila.bytes_per_sample
 
+	@property
+	def stream_width(self) -> int:
+		if self._stream_width is None:
+			return self.bits_per_sample
+		return self._stream_width
+
+	@property
+	def words_per_sample(self) -> int:
+		return (self.bits_per_sample + self.stream_width - 1) // self.stream_width
+
+	@property
+	def layout(self: Self) -> ILALayout:
+		return ILALayout.from_ila(self)
+
 	def __init__(
 		self: Self, *,
 		signals: Iterable[Signal] = list(), sample_depth: int = 32, sampling_domain: str = 'sync',
-		sample_rate: float = 50e6, prologue_samples: int = 1, output_domain: str | None = None
+		sample_rate: float = 50e6, prologue_samples: int = 1, output_domain: str | None = None,
+		stream_width: int | None = None, auto_send: bool = True
 	) -> None:
 
-		self.domain = sampling_domain
+		if stream_width is not None and (stream_width <= 0 or stream_width % 8 != 0):
+			raise ValueError(f'Stream width must be a positive multiple of 8, not {stream_width}')
+
+		self.domain        = sampling_domain
+		self.auto_send     = auto_send
+		self._stream_width = stream_width
 
 		if (o_domain := output_domain) is not None:
 			self._o_domain = o_domain
@@ -418,11 +484,16 @@ class StreamILA(Elaboratable):
 		self.sample_period    = self.ila.sample_period
 		self.prologue_samples = self.ila.prologue_samples
 
-		self.trigger  = Signal()
-		self.sampling = self.ila.sampling
-		self.complete = self.ila.complete
+		self.trigger   = Signal()
+		self.retrigger = Signal()
+		self.sampling  = self.ila.sampling
+		self.complete  = self.ila.complete
 
-		self.stream = StreamInterface(data_width = self.bits_per_sample)
+		self.read       = Signal()
+		self.read_start = Signal(range(self.sample_depth))
+		self.read_count = Signal(range(self.sample_depth + 1))
+
+		self.stream = StreamInterface(data_width = self.stream_width)
 
 	def add_signal(self: Self, sig: Signal) -> None:
 		'''
@@ -450,7 +521,7 @@ class StreamILA(Elaboratable):
 		self.ila.add_signal(sig)
 
 		# We have the additional need here to update the stream
-		self.stream = StreamInterface(data_width = self.bits_per_sample)
+		self.stream = StreamInterface(data_width = self.stream_width)
 
 	def append_signals(self: Self, signals: Iterable[Signal]) -> None:
 		'''
@@ -475,7 +546,7 @@ class StreamILA(Elaboratable):
 		self.ila.append_signals(signals)
 
 		# We have the additional need here to update the stream
-		self.stream = StreamInterface(data_width = self.bits_per_sample)
+		self.stream = StreamInterface(data_width = self.stream_width)
 
 	def add_fsm(self: Self, fsm: FSM) -> None:
 		'''
@@ -517,7 +588,7 @@ class StreamILA(Elaboratable):
 		self.ila.add_fsm(fsm)
 
 		# We have the additional need here to update the stream
-		self.stream = StreamInterface(data_width = self.bits_per_sample)
+		self.stream = StreamInterface(data_width = self.stream_width)
 
 	def elaborate(self: Self, _) -> Module:
 		m = Module()
@@ -527,95 +598,344 @@ class StreamILA(Elaboratable):
 		if self._o_domain == self.domain:
 			i_domain_stream = self.stream
 		else:
-			i_domain_stream = StreamInterface(data_width = self.bits_per_sample)
+			i_domain_stream = StreamInterface(data_width = self.stream_width)
+
+		# If samples are wider than the output stream, they get serialized into words before
+		# they go anywhere near the CDC FIFO, so we need a sample-wide stream to feed that
+		if self.words_per_sample > 1:
+			sample_stream = StreamInterface(data_width = self.bits_per_sample)
+		else:
+			sample_stream = i_domain_stream
 
 		curr_sample = Signal(range(ila.sample_depth))
+		last_sample = Signal(range(ila.sample_depth))
+		data_valid  = Signal(reset = 1)
+		read_end    = Signal(range(2 * ila.sample_depth + 1))
 
 		m.d.comb += [
 			ila.sample_index.eq(curr_sample),
-			i_domain_stream.data.eq(ila.sample_capture),
+			sample_stream.data.eq(ila.sample_capture),
+			read_end.eq(self.read_start + self.read_count),
 		]
 
+		# The retrigger and read strobes come from the output domain, so they might need to be synchronized
+		retrigger = Signal()
+		read      = Signal()
+
 		with m.FSM(name = 'StreamILA'):
 			with m.State('IDLE'):
-				m.d.comb += [ self.ila.trigger.eq(self.trigger), ]
+				m.d.comb += [ self.ila.trigger.eq(self.trigger | retrigger), ]
 
-				with m.If(self.trigger):
+				with m.If(self.trigger | retrigger):
 					m.next = 'SAMPLING'
+				# Send a window of the buffer we already have again
+				with m.Elif(read & ila.complete):
+					m.d.sync += [
+						curr_sample.eq(self.read_start),
+						last_sample.eq(Mux(read_end > self.sample_depth, self.sample_depth, read_end) - 1),
+						sample_stream.first.eq(1),
+						# Give the sample memory a cycle to catch up with the new address
+						data_valid.eq(0),
+					]
+					m.next = 'SENDING'
 
 			with m.State('SAMPLING'):
 				# Wait for the ILA to get done sampling
 				with m.If(ila.complete):
-					# Reset the current sample number and instruct the stream that we are
-					# on the first bit of data
-					m.d.sync += [
-						curr_sample.eq(0),
-						i_domain_stream.first.eq(1),
-					]
-					# and go to yeet the data over the wall
-					m.next = 'SENDING'
+					if self.auto_send:
+						# Reset the current sample number and instruct the stream that we are
+						# on the first bit of data
+						m.d.sync += [
+							curr_sample.eq(0),
+							last_sample.eq(self.sample_depth - 1),
+							sample_stream.first.eq(1),
+						]
+						# and go to yeet the data over the wall
+						m.next = 'SENDING'
+					else:
+						# Otherwise hang on to it until someone asks for it
+						m.next = 'IDLE'
 
 			with m.State('SENDING'):
 				# We have a valid buffer of samples, time to send them off
 
-				data_valid = Signal(reset = 1)
-
 				# Ensure the stream is always providing valid data while we are sending
 				# and indicate if we are on the last sample.
 				m.d.comb += [
-					i_domain_stream.valid.eq(data_valid),
-					i_domain_stream.last.eq(curr_sample == (self.sample_depth - 1)),
+					sample_stream.valid.eq(data_valid),
+					sample_stream.last.eq(curr_sample == last_sample),
 				]
 
 				# Every time the downstream is ready, toss anew one at them
-				with m.If(i_domain_stream.ready):
+				with m.If(sample_stream.ready):
 					with m.If(data_valid):
 						m.d.sync += [
 							curr_sample.inc(),
 							data_valid.eq(0),
-							i_domain_stream.first.eq(0),
+							sample_stream.first.eq(0),
 						]
 
-						with m.If(i_domain_stream.last):
+						with m.If(sample_stream.last):
 							m.next = 'IDLE'
 					with m.Else():
 						m.d.sync += [ data_valid.eq(1), ]
 
-		# Add the clock domain crossing machinery if we need to
-		if self._o_domain != self.domain:
-			i_domain_signals = Cat(
-				i_domain_stream.first,
-				i_domain_stream.data,
-				i_domain_stream.last,
-			)
+		if self.words_per_sample > 1:
+			words = self.words_per_sample
+			width = self.stream_width
 
-			o_domain_signals = Cat(
-				self.stream.first,
-				self.stream.data,
-				self.stream.last
-			)
+			# Shift register to slice the samples up into stream words
+			sample_shift  = Signal(words * width)
+			first_latched = Signal()
+			last_latched  = Signal()
+			words_left    = Signal(range(words))
 
-			m.submodules.cdc_fifo = fifo = AsyncFIFOBuffered(
-				width    = len(i_domain_signals),
-				depth    = 16,
-				w_domain = 'sync',
-				r_domain = self._o_domain,
-			)
+			m.d.comb += [ i_domain_stream.data.eq(sample_shift[0:width]), ]
+
+			with m.FSM(name = 'StreamILASerializer'):
+				with m.State('IDLE'):
+					m.d.comb += [ sample_stream.ready.eq(1), ]
+
+					# Latch the sample and the framing so we can start shifting it out
+					with m.If(sample_stream.valid):
+						m.d.sync += [
+							sample_shift.eq(sample_stream.data),
+							first_latched.eq(sample_stream.first),
+							last_latched.eq(sample_stream.last),
+							words_left.eq(words - 1),
+						]
+						m.next = 'SHIFT'
+
+				with m.State('SHIFT'):
+					# Only pass the framing through on the first and last word of the sample respectively
+					m.d.comb += [
+						i_domain_stream.valid.eq(1),
+						i_domain_stream.first.eq(first_latched & (words_left == (words - 1))),
+						i_domain_stream.last.eq(last_latched & (words_left == 0)),
+					]
 
+					# Poke the sample stream while we're shifting so the next sample is already waiting for
+					# us by the time we're done with this one, rather than stalling a cycle every sample.
+					with m.If(~sample_stream.valid):
+						m.d.comb += [ sample_stream.ready.eq(1), ]
+
+					with m.If(i_domain_stream.ready):
+						# Still have words left in this sample, shift over to the next one
+						with m.If(words_left > 0):
+							m.d.sync += [
+								words_left.eq(words_left - 1),
+								sample_shift.eq(sample_shift[width:]),
+							]
+						# Otherwise grab the next sample if there is one ready to go
+						with m.Else():
+							m.d.comb += [ sample_stream.ready.eq(1), ]
+
+							with m.If(sample_stream.valid):
+								m.d.sync += [
+									sample_shift.eq(sample_stream.data),
+									first_latched.eq(sample_stream.first),
+									last_latched.eq(sample_stream.last),
+									words_left.eq(words - 1),
+								]
+							with m.Else():
+								m.next = 'IDLE'
+
+		if self._o_domain == self.domain:
 			m.d.comb += [
-				# From the ILA sampling domain
-				fifo.w_data.eq(i_domain_signals),
-				fifo.w_en.eq(i_domain_stream.valid),
-				i_domain_stream.ready.eq(fifo.w_rdy),
-
-				# Onto the output domain
-				o_domain_signals.eq(fifo.r_data),
-				self.stream.valid.eq(fifo.r_rdy),
-				fifo.r_en.eq(self.stream.ready),
+				retrigger.eq(self.retrigger),
+				read.eq(self.read),
 			]
 
 		# Adjust our domain appropriately
 		if self.domain != 'sync':
-			return DomainRenamer(sync = self.domain)(m)
+			m = DomainRenamer(sync = self.domain)(m)
+
+		if self._o_domain == self.domain:
+			return m
+
+		# Add the clock domain crossing machinery, this is done outside of the sampling side of the
+		# ILA so the output domain doesn't get caught up in the domain renaming
+		top = Module()
+		top.submodules.sampler = m
+
+		i_domain_signals = Cat(
+			i_domain_stream.first,
+			i_domain_stream.data,
+			i_domain_stream.last,
+		)
+
+		o_domain_signals = Cat(
+			self.stream.first,
+			self.stream.data,
+			self.stream.last
+		)
+
+		top.submodules.cdc_fifo = fifo = AsyncFIFOBuffered(
+			width    = len(i_domain_signals),
+			depth    = 16,
+			w_domain = self.domain,
+			r_domain = self._o_domain,
+		)
+
+		top.submodules.retrigger_sync = retrigger_sync = PulseSynchronizer(
+			i_domain = self._o_domain,
+			o_domain = self.domain,
+		)
+
+		top.submodules.read_sync = read_sync = PulseSynchronizer(
+			i_domain = self._o_domain,
+			o_domain = self.domain,
+		)
+
+		top.d.comb += [
+			# From the ILA sampling domain
+			fifo.w_data.eq(i_domain_signals),
+			fifo.w_en.eq(i_domain_stream.valid),
+			i_domain_stream.ready.eq(fifo.w_rdy),
+
+			# Onto the output domain
+			o_domain_signals.eq(fifo.r_data),
+			self.stream.valid.eq(fifo.r_rdy),
+			fifo.r_en.eq(self.stream.ready),
+
+			# And the retrigger and read strobes back the other way
+			retrigger_sync.i.eq(self.retrigger),
+			retrigger.eq(retrigger_sync.o),
+			read_sync.i.eq(self.read),
+			read.eq(read_sync.o),
+		]
+
+		return top
+
+class _LayoutROM(Elaboratable):
+	'''
+	Streams a packed :py:class:`ILALayout <torii_ila.layout.ILALayout>` descriptor, or a window of it, out of ROM.
+
+	Parameters
+	----------
+	data : bytes
+		The packed layout descriptor, if empty every window of it is empty.
+
+	max_length : int | None
+		The most bytes to send out in one go, regardless of ``length``.
+		(default: None)
+
+	Raises
+	------
+	ValueError
+		If on elaboration the descriptor is too big to be addressed by ``offset`` and ``length``.
+
+	Attributes
+	----------
+	start : Signal, in
+		Strobe to start streaming out the window of the descriptor.
+
+	offset : Signal(16), in
+		The offset into the descriptor to start streaming from.
+
+	length : Signal(16), in
+		The number of bytes to stream out, this is clamped to the end of the descriptor.
+
+	stream : StreamInterface, out
+		The descriptor byte stream, if the window is empty a lone transfer with ``last`` and without
+		``first`` is emitted.
+	'''
+
+	def __init__(self: Self, data: bytes, *, max_length: int | None = None) -> None:
+		self._data       = data
+		self._max_length = max_length
+
+		self.start  = Signal()
+		self.offset = Signal(16)
+		self.length = Signal(16)
+		self.stream = StreamInterface(data_width = 8)
+
+	def elaborate(self: Self, _) -> Module:
+		m = Module()
+
+		if len(self._data) > (max_size := 2 ** len(self.length) - 1):
+			raise ValueError(
+				f'ILA layout descriptor is {len(self._data)} bytes, which is more than the {max_size} bytes the '
+				'layout ROM can address, try giving the signals shorter names or leave out the layout'
+			)
+
+		# Without a descriptor, there's nothing to do but tell whoever is asking
+		if len(self._data) == 0:
+			empty = Signal()
+
+			m.d.comb += [
+				self.stream.valid.eq(empty),
+				self.stream.last.eq(1),
+			]
+
+			with m.If(self.start):
+				m.d.sync += [ empty.eq(1), ]
+			with m.Elif(self.stream.ready):
+				m.d.sync += [ empty.eq(0), ]
+
+			return m
+
+		rom = Memory(width = 8, depth = len(self._data), init = self._data, name = 'ila_layout')
+		m.submodules.read_port = rp = rom.read_port(domain = 'sync', transparent = False)
+
+		position = Signal(range(len(self._data) + 1))
+		end      = Signal(range(len(self._data) + 1))
+		first    = Signal()
+
+		if self._max_length is not None:
+			length = Mux(self.length > self._max_length, self._max_length, self.length)
+		else:
+			length = self.length
+
+		window_end = Signal(17)
+		m.d.comb += [
+			window_end.eq(self.offset + length),
+			self.stream.data.eq(rp.data),
+		]
+
+		with m.FSM(name = 'layout_rom'):
+			with m.State('IDLE'):
+				m.d.comb += [ rp.addr.eq(self.offset), ]
+
+				with m.If(self.start):
+					m.d.sync += [
+						position.eq(self.offset),
+						end.eq(Mux(window_end > len(self._data), len(self._data), window_end)),
+						first.eq(1),
+					]
+
+					with m.If((self.offset >= len(self._data)) | (length == 0)):
+						m.next = 'EMPTY'
+					with m.Else():
+						m.next = 'STREAM'
+
+			with m.State('STREAM'):
+				m.d.comb += [
+					self.stream.valid.eq(1),
+					self.stream.first.eq(first),
+					self.stream.last.eq(position + 1 == end),
+				]
+
+				# Keep the read port one byte ahead of the stream if it's moving
+				with m.If(self.stream.ready):
+					m.d.comb += [ rp.addr.eq(position + 1), ]
+					m.d.sync += [
+						position.inc(),
+						first.eq(0),
+					]
+
+					with m.If(self.stream.last):
+						m.next = 'IDLE'
+				with m.Else():
+					m.d.comb += [ rp.addr.eq(position), ]
+
+			with m.State('EMPTY'):
+				m.d.comb += [
+					self.stream.valid.eq(1),
+					self.stream.last.eq(1),
+				]
+
+				with m.If(self.stream.ready):
+					m.next = 'IDLE'
 
 		return m
@@ -0,0 +1,404 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+ILA sample layout descriptors.
+
+The layout describes everything the host needs to know to make sense of the samples coming off of an ILA,
+that being the signal names, widths, and offsets in the sample, any value decoders, as well as the sample
+depth and rate. It can be built from an ILA at elaboration time, and packed into a compact binary descriptor
+that the ILAs embed into the gateware so a backhaul can be constructed from the device alone.
+
+'''
+
+import struct
+import zlib
+from collections.abc import Callable, Iterable
+from dataclasses     import dataclass, field
+from functools       import cached_property
+from typing          import Any, Self
+
+__all__ = (
+	'ILASignal',
+	'ILALayout',
+)
+
+# Signals with decoders that are not Enums are tabulated if they are at most this wide
+_MAX_TABULATED_WIDTH = 8
+
+@dataclass(frozen = True)
+class ILASignal:
+	'''
+	A single signal within an ILA sample.
+
+	Attributes
+	----------
+	name : str
+		The name of the signal.
+
+	width : int
+		The width of the signal in bits.
+
+	offset : int
+		The bit offset of the signal within the sample.
+
+	reset : int
+		The reset value of the signal, as an unsigned value.
+		(default: 0)
+
+	enum : dict[int, str] | None
+		Table of values to their decoded names, if the signal has a decoder.
+		(default: None)
+
+	decoder : Callable[[int], str] | None
+		The original decoder of the signal, this is only present if the layout was built from an ILA
+		and is not part of the descriptor.
+		(default: None)
+	'''
+
+	name: str
+	width: int
+	offset: int
+	reset: int = 0
+	enum: dict[int, str] | None = None
+	decoder: Callable[[int], str] | None = field(default = None, compare = False, repr = False)
+
+	@property
+	def has_decoder(self: Self) -> bool:
+		return self.decoder is not None or self.enum is not None
+
+	def decode(self: Self, value: int) -> str:
+		'''
+		Decode a value of this signal into its textual form.
+
+		Parameters
+		----------
+		value : int
+			The value to decode.
+
+		Returns
+		-------
+		str
+			The decoded value, or the value itself if it is not in the ``enum`` table.
+		'''
+
+		if self.decoder is not None:
+			return self.decoder(value)
+
+		if self.enum is not None:
+			return self.enum.get(value, str(value))
+
+		return str(value)
+
+def _tabulate_decoder(sig: Any) -> dict[int, str] | None:
+	''' Build the value table for the decoder on the given Torii signal, if we can. '''
+
+	if sig.decoder is None:
+		return None
+
+	mask = (1 << len(sig)) - 1
+
+	if (enum_class := getattr(sig, '_enum_class', None)) is not None:
+		return { member.value & mask: sig.decoder(member.value) for member in enum_class }
+
+	if len(sig) > _MAX_TABULATED_WIDTH:
+		return None
+
+	table = dict[int, str]()
+	for value in range(2 ** len(sig)):
+		try:
+			table[value] = sig.decoder(value)
+		except Exception:
+			# Not all decoders (FSM states for instance) know about every value the signal can hold
+			continue
+
+	return table
+
+def _vcd_string(text: str) -> str:
+	''' VCD string values can't contain whitespace. '''
+
+	return text.expandtabs().replace(' ', '_')
+
+class _VCDStrings(dict[int, str]):
+	'''
+	The decoded values of a signal, ready to be written into a VCD.
+
+	This is seeded from the ``enum`` table of the signal, anything else it decodes to is worked out the first
+	time it's seen and then kept, so each value is only decoded once no matter how many samples hold it.
+	'''
+
+	def __init__(self: Self, sig: ILASignal) -> None:
+		super().__init__((value, _vcd_string(text)) for value, text in (sig.enum or dict()).items())
+		self._decode = sig.decode
+
+	def __missing__(self: Self, value: int) -> str:
+		self[value] = text = _vcd_string(self._decode(value))
+		return text
+
+class ILALayout:
+	'''
+	The sample layout of an ILA.
+
+	Parameters
+	----------
+	signals : Iterable[ILASignal]
+		The signals in the sample, in sample order.
+
+	sample_depth : int
+		The depth of the ILA sample buffer in samples.
+
+	sample_rate : float
+		The outwards facing sample rate used for formatting output.
+
+	prologue_samples : int
+		The number of samples captured before the trigger.
+
+	Attributes
+	----------
+	signals : tuple[ILASignal, ...]
+		The signals in the sample, in sample order.
+
+	sample_width : int
+		The width of the sample vector in bits.
+
+	bytes_per_sample : int
+		The number of whole bytes per sample.
+
+	bits_per_sample : int
+		The nearest power of 2 number of bits per sample.
+
+	sample_period : float
+		The period of time between samples in nanoseconds, equivalent to ``1 / sample_rate``.
+
+	layout_hash : int
+		A CRC32 of the names and widths of the signals, in sample order.
+	'''
+
+	MAGIC   = b'TILA'
+	VERSION = 1
+
+	# magic, version, total length, sample depth, prologue samples, sample rate, signal count
+	_HEADER = struct.Struct('<4sBxIIIdH')
+	# width, offset
+	_SIGNAL = struct.Struct('<HI')
+
+	HEADER_SIZE = _HEADER.size
+	''' The size of the fixed layout descriptor header in bytes. '''
+
+	def __init__(
+		self: Self, signals: Iterable[ILASignal], sample_depth: int, sample_rate: float, prologue_samples: int
+	) -> None:
+		self.signals          = tuple(signals)
+		self.sample_depth     = sample_depth
+		self.sample_rate      = sample_rate
+		self.prologue_samples = prologue_samples
+
+	@classmethod
+	def from_ila(cls: type[Self], ila: Any) -> Self:
+		'''
+		Build the layout of an ILA.
+
+		Parameters
+		----------
+		ila : IntegratedLogicAnalyzer | StreamILA | USBIntegratedLogicAnalyzer | UARTIntegratedLogicAnalyzer
+			The ILA to get the layout of.
+
+		Returns
+		-------
+		ILALayout
+			The layout of the ILA.
+		'''
+
+		signals = list[ILASignal]()
+		offset  = 0
+
+		for sig in ila._signals:
+			signals.append(ILASignal(
+				name    = sig.name,
+				width   = len(sig),
+				offset  = offset,
+				reset   = sig.reset & ((1 << len(sig)) - 1),
+				enum    = _tabulate_decoder(sig),
+				decoder = sig.decoder,
+			))
+			offset += len(sig)
+
+		return cls(signals, ila.sample_depth, ila.sample_rate, ila.prologue_samples)
+
+	@property
+	def sample_width(self: Self) -> int:
+		return sum(sig.width for sig in self.signals)
+
+	@property
+	def bytes_per_sample(self: Self) -> int:
+		return (self.sample_width + 7) // 8
+
+	@property
+	def bits_per_sample(self: Self) -> int:
+		return self.bytes_per_sample * 8
+
+	@property
+	def sample_period(self: Self) -> float:
+		return 1 / self.sample_rate
+
+	@cached_property
+	def _vcd_strings(self: Self) -> dict[str, _VCDStrings]:
+		''' The decoded value tables of the signals with decoders, shared by everything exported with this layout. '''
+
+		return { sig.name: _VCDStrings(sig) for sig in self.signals if sig.has_decoder }
+
+	@property
+	def layout_hash(self: Self) -> int:
+		layout = ';'.join(f'{sig.name}:{sig.width}' for sig in self.signals)
+		return zlib.crc32(layout.encode('utf-8'))
+
+	def __eq__(self: Self, other: object) -> bool:
+		if not isinstance(other, ILALayout):
+			return NotImplemented
+
+		return (
+			self.signals == other.signals and self.sample_depth == other.sample_depth and
+			self.sample_rate == other.sample_rate and self.prologue_samples == other.prologue_samples
+		)
+
+	def __repr__(self: Self) -> str:
+		return (
+			f'ILALayout(signals = {self.signals!r}, sample_depth = {self.sample_depth}, '
+			f'sample_rate = {self.sample_rate}, prologue_samples = {self.prologue_samples})'
+		)
+
+	def pack(self: Self) -> bytes:
+		'''
+		Pack the layout into its binary descriptor form.
+
+		Returns
+		-------
+		bytes
+			The layout descriptor.
+
+		Raises
+		------
+		ValueError
+			If a signal name or decoded value is longer than 255 bytes, or a signal is wider than 65535 bits.
+		'''
+
+		def _string(value: str) -> bytes:
+			raw = value.encode('utf-8')
+			if len(raw) > 0xFF:
+				raise ValueError(f'String \'{value}\' is too long to fit in an ILA layout descriptor')
+			return bytes((len(raw), )) + raw
+
+		body = bytearray()
+
+		for sig in self.signals:
+			if sig.width > 0xFFFF:
+				raise ValueError(f'Signal \'{sig.name}\' is too wide to fit in an ILA layout descriptor')
+
+			value_len = (sig.width + 7) // 8
+
+			body += _string(sig.name)
+			body += self._SIGNAL.pack(sig.width, sig.offset)
+			body += sig.reset.to_bytes(value_len, byteorder = 'little')
+
+			enum = sig.enum or dict()
+			body += len(enum).to_bytes(2, byteorder = 'little')
+			for value, text in enum.items():
+				body += value.to_bytes(value_len, byteorder = 'little')
+				body += _string(text)
+
+		header = self._HEADER.pack(
+			self.MAGIC, self.VERSION, self._HEADER.size + len(body), self.sample_depth, self.prologue_samples,
+			self.sample_rate, len(self.signals)
+		)
+
+		return header + bytes(body)
+
+	@classmethod
+	def packed_length(cls: type[Self], data: bytes) -> int:
+		'''
+		Get the full length of a layout descriptor from the start of it.
+
+		Parameters
+		----------
+		data : bytes
+			At least the first :py:attr:`HEADER_SIZE` bytes of the layout descriptor.
+
+		Returns
+		-------
+		int
+			The total length of the layout descriptor in bytes.
+
+		Raises
+		------
+		ValueError
+			If the data is not the start of a layout descriptor.
+		'''
+
+		if len(data) < cls._HEADER.size:
+			raise ValueError('Truncated ILA layout descriptor')
+
+		magic, version, length, *_ = cls._HEADER.unpack_from(data)
+
+		if magic != cls.MAGIC:
+			raise ValueError(f'Bad ILA layout descriptor magic {magic!r}')
+		if version != cls.VERSION:
+			raise ValueError(f'Unsupported ILA layout descriptor version {version}')
+
+		return length
+
+	@classmethod
+	def unpack(cls: type[Self], data: bytes) -> Self:
+		'''
+		Unpack a layout from its binary descriptor form.
+
+		Parameters
+		----------
+		data : bytes
+			The layout descriptor.
+
+		Returns
+		-------
+		ILALayout
+			The unpacked layout.
+
+		Raises
+		------
+		ValueError
+			If the descriptor is malformed.
+		'''
+
+		length = cls.packed_length(data)
+		if len(data) < length:
+			raise ValueError('Truncated ILA layout descriptor')
+
+		_, _, _, sample_depth, prologue_samples, sample_rate, signal_count = cls._HEADER.unpack_from(data)
+		pos = cls._HEADER.size
+
+		def _take(count: int) -> bytes:
+			nonlocal pos
+			if pos + count > length:
+				raise ValueError('Truncated ILA layout descriptor')
+			chunk = data[pos:pos + count]
+			pos += count
+			return chunk
+
+		def _string() -> str:
+			return _take(_take(1)[0]).decode('utf-8')
+
+		signals = list[ILASignal]()
+		for _ in range(signal_count):
+			name          = _string()
+			width, offset = cls._SIGNAL.unpack(_take(cls._SIGNAL.size))
+			value_len     = (width + 7) // 8
+			reset         = int.from_bytes(_take(value_len), byteorder = 'little')
+
+			enum: dict[int, str] | None = None
+			if (enum_count := int.from_bytes(_take(2), byteorder = 'little')) > 0:
+				enum = dict()
+				for _ in range(enum_count):
+					value       = int.from_bytes(_take(value_len), byteorder = 'little')
+					enum[value] = _string()
+
+			signals.append(ILASignal(name, width, offset, reset, enum))
+
+		return cls(signals, sample_depth, sample_rate, prologue_samples)
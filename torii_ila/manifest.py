@@ -0,0 +1,364 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+ILA manifests.
+
+A manifest is the :py:class:`ILALayout <torii_ila.layout.ILALayout>` of an ILA along with the settings of
+its transport that aren't part of the layout, such as whether the UART ILA compresses its samples. It is
+everything a backhaul needs to talk to the ILA, so it can be written out when the gateware is built and
+the capture host only needs the manifest, rather than the whole design.
+
+Manifests are saved either as JSON, or in a compact binary form which is the packed layout descriptor
+followed by the transport settings. A bare packed layout descriptor is also a valid binary manifest.
+
+'''
+
+import json
+import struct
+from dataclasses     import dataclass, replace
+from enum            import StrEnum, unique
+from pathlib         import Path
+from typing          import Any, Self
+
+from .layout         import ILALayout, ILASignal
+
+__all__ = (
+	'ILATransport',
+	'ILAManifest',
+)
+
+@unique
+class ILATransport(StrEnum):
+	''' The transports an ILA can be read back over '''
+
+	UART = 'uart'
+	''' A :py:class:`UARTIntegratedLogicAnalyzer <torii_ila.uart.UARTIntegratedLogicAnalyzer>`. '''
+	USB  = 'usb'
+	''' A :py:class:`USBIntegratedLogicAnalyzer <torii_ila.usb.USBIntegratedLogicAnalyzer>`. '''
+
+# Transports in the order they are numbered in the binary manifest, with 0 being none at all
+_TRANSPORTS = ( None, ILATransport.UART, ILATransport.USB )
+
+_FLAG_COMPRESS      = 0x01
+_FLAG_AUTO_SEND     = 0x02
+_FLAG_BLOCK_SAMPLES = 0x04
+_FLAG_BAUDRATE      = 0x08
+
+@dataclass(frozen = True)
+class ILAManifest:
+	'''
+	The layout of an ILA along with the settings of its transport.
+
+	The transport settings are named after the ILA options they come from, so a manifest can be passed to
+	any of the backhauls in place of the ILA itself.
+
+	Attributes
+	----------
+	layout : ILALayout
+		The sample layout of the ILA.
+
+	transport : ILATransport | None
+		The transport the ILA is read back over, or ``None`` for an ILA without one.
+		(default: None)
+
+	baudrate : int | None
+		The baudrate the UART ILA comes up at, if it is known.
+		(default: None)
+
+	baudrates : tuple[int, ...]
+		The additional baudrates the UART ILA can be switched to.
+		(default: tuple())
+
+	compress : bool
+		Whether the UART ILA run-length encodes its samples.
+		(default: False)
+
+	block_samples : int | None
+		The number of samples in each block the UART ILA sends its sample memory in, if it does.
+		(default: None)
+
+	auto_send : bool
+		Whether the USB ILA sends each capture as soon as it completes.
+		(default: True)
+
+	serial_number : str | None
+		The serial number the USB ILA reports, if it was given one.
+		(default: None)
+	'''
+
+	MAGIC   = b'TILM'
+	VERSION = 1
+
+	# magic, version, transport, flags, block samples, baudrate, baudrate count
+	_TRAILER = struct.Struct('<4sBBBIIB')
+
+	layout: ILALayout
+	transport: ILATransport | None = None
+	baudrate: int | None = None
+	baudrates: tuple[int, ...] = tuple()
+	compress: bool = False
+	block_samples: int | None = None
+	auto_send: bool = True
+	serial_number: str | None = None
+
+	@classmethod
+	def from_ila(cls: type[Self], ila: Any, *, baudrate: int | None = None) -> Self:
+		'''
+		Build the manifest of an ILA.
+
+		Parameters
+		----------
+		ila : IntegratedLogicAnalyzer | StreamILA | USBIntegratedLogicAnalyzer | UARTIntegratedLogicAnalyzer
+			The ILA to get the manifest of.
+
+		baudrate : int | None
+			The baudrate the UART ILA ``divisor`` was worked out for, the ILA itself can't know it.
+			(default: None)
+
+		Returns
+		-------
+		ILAManifest
+			The manifest of the ILA, the UART and USB ILAs fill in their transport settings.
+		'''
+
+		if (manifest := getattr(ila, 'manifest', None)) is None:
+			manifest = cls(ILALayout.from_ila(ila))
+
+		if baudrate is not None:
+			manifest = replace(manifest, baudrate = baudrate)
+
+		return manifest
+
+	def to_json(self: Self) -> str:
+		'''
+		Serialize the manifest to JSON.
+
+		Signal decoders are stored as their tables of values to decoded names, decoders that could not be
+		tabulated are left out.
+
+		Returns
+		-------
+		str
+			The JSON manifest.
+		'''
+
+		layout = self.layout
+
+		return json.dumps({
+			'version':          self.VERSION,
+			'transport':        self.transport,
+			'sample_depth':     layout.sample_depth,
+			'sample_rate':      layout.sample_rate,
+			'prologue_samples': layout.prologue_samples,
+			'signals': [
+				{
+					'name':   sig.name,
+					'width':  sig.width,
+					'offset': sig.offset,
+					'reset':  sig.reset,
+					'enum':   None if sig.enum is None else [ [ value, text ] for value, text in sig.enum.items() ],
+				} for sig in layout.signals
+			],
+			'baudrate':         self.baudrate,
+			'baudrates':        list(self.baudrates),
+			'compress':         self.compress,
+			'block_samples':    self.block_samples,
+			'auto_send':        self.auto_send,
+			'serial_number':    self.serial_number,
+		}, indent = '\t')
+
+	@classmethod
+	def from_json(cls: type[Self], data: str) -> Self:
+		'''
+		Deserialize a manifest from JSON.
+
+		Parameters
+		----------
+		data : str
+			The JSON manifest.
+
+		Returns
+		-------
+		ILAManifest
+			The deserialized manifest.
+
+		Raises
+		------
+		ValueError
+			If the manifest is malformed or of an unsupported version.
+		'''
+
+		try:
+			manifest = json.loads(data)
+
+			if (version := manifest['version']) != cls.VERSION:
+				raise ValueError(f'Unsupported ILA manifest version {version}')
+
+			signals = [
+				ILASignal(
+					name   = sig['name'],
+					width  = sig['width'],
+					offset = sig['offset'],
+					reset  = sig['reset'],
+					enum   = None if sig['enum'] is None else { value: text for value, text in sig['enum'] },
+				) for sig in manifest['signals']
+			]
+
+			return cls(
+				layout        = ILALayout(
+					signals, manifest['sample_depth'], manifest['sample_rate'], manifest['prologue_samples']
+				),
+				transport     = None if manifest['transport'] is None else ILATransport(manifest['transport']),
+				baudrate      = manifest['baudrate'],
+				baudrates     = tuple(manifest['baudrates']),
+				compress      = manifest['compress'],
+				block_samples = manifest['block_samples'],
+				auto_send     = manifest['auto_send'],
+				serial_number = manifest['serial_number'],
+			)
+		except (KeyError, TypeError) as error:
+			raise ValueError(f'Malformed ILA manifest: {error!r}') from error
+
+	def pack(self: Self) -> bytes:
+		'''
+		Pack the manifest into its binary form.
+
+		Returns
+		-------
+		bytes
+			The binary manifest.
+
+		Raises
+		------
+		ValueError
+			If the layout can't be packed, there are more than 255 ``baudrates``, or the ``serial_number``
+			is longer than 255 bytes.
+		'''
+
+		if len(self.baudrates) > 0xFF:
+			raise ValueError(f'At most 255 additional baudrates fit in an ILA manifest, not {len(self.baudrates)}')
+
+		serial_number = (self.serial_number or '').encode('utf-8')
+		if len(serial_number) > 0xFF:
+			raise ValueError(f'Serial number \'{self.serial_number}\' is too long to fit in an ILA manifest')
+
+		flags = (
+			(_FLAG_COMPRESS if self.compress else 0) |
+			(_FLAG_AUTO_SEND if self.auto_send else 0) |
+			(_FLAG_BLOCK_SAMPLES if self.block_samples is not None else 0) |
+			(_FLAG_BAUDRATE if self.baudrate is not None else 0)
+		)
+
+		trailer = self._TRAILER.pack(
+			self.MAGIC, self.VERSION, _TRANSPORTS.index(self.transport), flags, self.block_samples or 0,
+			self.baudrate or 0, len(self.baudrates)
+		)
+
+		return b''.join((
+			self.layout.pack(), trailer, struct.pack(f'<{len(self.baudrates)}I', *self.baudrates),
+			bytes((len(serial_number), )), serial_number,
+		))
+
+	@classmethod
+	def unpack(cls: type[Self], data: bytes) -> Self:
+		'''
+		Unpack a manifest from its binary form.
+
+		Parameters
+		----------
+		data : bytes
+			The binary manifest, or just a packed layout descriptor.
+
+		Returns
+		-------
+		ILAManifest
+			The unpacked manifest, with the default transport settings if only given a layout descriptor.
+
+		Raises
+		------
+		ValueError
+			If the manifest is malformed.
+		'''
+
+		layout = ILALayout.unpack(data)
+		pos    = ILALayout.packed_length(data)
+
+		if pos == len(data):
+			return cls(layout)
+
+		if len(data) < pos + cls._TRAILER.size:
+			raise ValueError('Truncated ILA manifest')
+
+		magic, version, transport, flags, block_samples, baudrate, baudrate_count = cls._TRAILER.unpack_from(
+			data, pos
+		)
+
+		if magic != cls.MAGIC:
+			raise ValueError(f'Bad ILA manifest magic {magic!r}')
+		if version != cls.VERSION:
+			raise ValueError(f'Unsupported ILA manifest version {version}')
+		if transport >= len(_TRANSPORTS):
+			raise ValueError(f'Unknown ILA transport {transport}')
+
+		pos += cls._TRAILER.size
+		baudrates_end = pos + baudrate_count * 4
+
+		if len(data) <= baudrates_end or len(data) < baudrates_end + 1 + data[baudrates_end]:
+			raise ValueError('Truncated ILA manifest')
+
+		serial_number = data[baudrates_end + 1:baudrates_end + 1 + data[baudrates_end]].decode('utf-8')
+
+		return cls(
+			layout        = layout,
+			transport     = _TRANSPORTS[transport],
+			baudrate      = baudrate if flags & _FLAG_BAUDRATE else None,
+			baudrates     = struct.unpack_from(f'<{baudrate_count}I', data, pos),
+			compress      = bool(flags & _FLAG_COMPRESS),
+			block_samples = block_samples if flags & _FLAG_BLOCK_SAMPLES else None,
+			auto_send     = bool(flags & _FLAG_AUTO_SEND),
+			serial_number = serial_number or None,
+		)
+
+	def save(self: Self, path: Path) -> None:
+		'''
+		Write the manifest out to a file, as JSON if it's a ``.json`` file, otherwise in its binary form.
+
+		Parameters
+		----------
+		path : Path
+			The file to write the manifest to.
+		'''
+
+		if path.suffix == '.json':
+			path.write_text(self.to_json())
+		else:
+			path.write_bytes(self.pack())
+
+	@classmethod
+	def load(cls: type[Self], path: Path) -> Self:
+		'''
+		Read a manifest in either form, or a packed layout descriptor, from a file.
+
+		Parameters
+		----------
+		path : Path
+			The file to read the manifest from.
+
+		Returns
+		-------
+		ILAManifest
+			The manifest.
+
+		Raises
+		------
+		ValueError
+			If the manifest is malformed.
+		'''
+
+		data = path.read_bytes()
+
+		if data.startswith(ILALayout.MAGIC):
+			return cls.unpack(data)
+
+		return cls.from_json(data.decode('utf-8'))
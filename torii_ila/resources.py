@@ -0,0 +1,531 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+Resource and timing estimates for ILA configurations.
+
+Picking the sample depth, width, and number of prologue samples for an ILA so it still fits in the
+device is otherwise a matter of trial and error with full place and route runs. The estimates are
+produced by running Yosys synthesis when it is available, and by an analytical model of the elaborated
+design when it's not.
+'''
+
+import json
+import re
+import subprocess
+from collections.abc import Iterable, Mapping, Sequence
+from math            import ceil, log
+from pathlib         import Path
+from shutil          import which
+from tempfile        import TemporaryDirectory
+from typing          import Literal, NamedTuple, Self
+
+from torii.back      import rtlil
+from torii.hdl.ast   import (
+	ArrayProxy, Assign, Cat, Const, Operator, Part, Signal, SignalDict, Slice, Switch, Value
+)
+from torii.hdl.ir    import Elaboratable, Fragment
+from torii.hdl.mem   import MemoryInstance
+from torii.hdl.rec   import Record
+
+from ._platform      import StandalonePlatform
+
+__all__ = (
+	'FPGAFamily',
+	'ResourceEstimate',
+	'estimate_resources',
+	'resource_report',
+)
+
+class FPGAFamily(NamedTuple):
+	'''
+	What the estimates need to know about an FPGA family.
+
+	The delays are rough figures for a middling speed grade, including an allowance for routing, and are
+	only meant for telling whether a configuration is in the right ballpark.
+
+	Attributes
+	----------
+	name : str
+		The name of the family, this is also used to find the Yosys ``synth_<name>`` script.
+
+	lut_cells : dict[str, int]
+		The cells that make up the LUT count after synthesis, and how many LUTs each is worth.
+
+	ff_cells : tuple[str, ...]
+		The prefixes of the flip-flop cells after synthesis.
+
+	bram_cells : tuple[str, ...]
+		The block RAM cells after synthesis.
+
+	bram_configs : tuple[tuple[int, int], ...]
+		The (width, depth) configurations a single block RAM can be used in.
+
+	lut_delay : float
+		The delay through a LUT and its routing in nanoseconds.
+
+	carry_delay : float
+		The delay along the carry chain per bit in nanoseconds.
+
+	clock_overhead : float
+		The clock to out, setup, and clock skew overhead of every path in nanoseconds.
+	'''
+
+	name: str
+	lut_cells: dict[str, int]
+	ff_cells: tuple[str, ...]
+	bram_cells: tuple[str, ...]
+	bram_configs: tuple[tuple[int, int], ...]
+	lut_delay: float
+	carry_delay: float
+	clock_overhead: float
+
+FAMILIES = {
+	'ice40': FPGAFamily(
+		name           = 'ice40',
+		lut_cells      = { 'SB_LUT4': 1 },
+		ff_cells       = ( 'SB_DFF', ),
+		bram_cells     = ( 'SB_RAM40_4K', ),
+		bram_configs   = ( (16, 256), (8, 512), (4, 1024), (2, 2048) ),
+		lut_delay      = 1.4,
+		carry_delay    = 0.13,
+		clock_overhead = 1.8,
+	),
+	'ecp5': FPGAFamily(
+		name           = 'ecp5',
+		lut_cells      = { 'LUT4': 1, 'CCU2C': 2 },
+		ff_cells       = ( 'TRELLIS_FF', ),
+		bram_cells     = ( 'DP16KD', ),
+		bram_configs   = ( (36, 512), (18, 1024), (9, 2048), (4, 4096), (2, 8192), (1, 16384) ),
+		lut_delay      = 0.7,
+		carry_delay    = 0.06,
+		clock_overhead = 1.0,
+	),
+}
+
+class ResourceEstimate(NamedTuple):
+	'''
+	The estimated resource usage and maximum clock frequency of an ILA.
+
+	Attributes
+	----------
+	luts : int
+		The number of LUTs.
+
+	ffs : int
+		The number of flip-flops.
+
+	brams : int
+		The number of block RAMs.
+
+	logic_levels : int
+		The number of LUTs along the longest path between flip-flops.
+
+	fmax : float
+		The estimated maximum clock frequency in MHz.
+
+	source : str
+		Where the estimate came from, either ``'yosys'`` or ``'model'``.
+	'''
+
+	luts: int
+	ffs: int
+	brams: int
+	logic_levels: int
+	fmax: float
+	source: Literal['yosys', 'model']
+
+# The interface signals brought out as ports if the ILA has them, so synthesis doesn't prune the whole thing
+_PORT_NAMES = (
+	'trigger', 'retrigger', 'sampling', 'complete', 'sample_index', 'sample_capture',
+	'read', 'read_start', 'read_count', 'tx', 'rx',
+)
+
+def _ports(ila: Elaboratable, platform: StandalonePlatform) -> list[Signal]:
+	ports = [ sig for name in _PORT_NAMES if isinstance(sig := getattr(ila, name, None), Signal) ]
+
+	if isinstance(stream := getattr(ila, 'stream', None), Record):
+		ports.extend(stream.fields.values())
+
+	return ports + platform.ports
+
+def _bram_count(family: FPGAFamily, width: int, depth: int) -> int:
+	''' The fewest block RAMs the given memory fits into '''
+
+	return min(ceil(width / cfg_width) * ceil(depth / cfg_depth) for cfg_width, cfg_depth in family.bram_configs)
+
+def _bitwise_operands(value: Value) -> Sequence[Value] | None:
+	'''
+	The operands of a bitwise operator, or ``None`` if it's not one. A multiplexer between two constants
+	is just a gate on the select and so counts as one too.
+	'''
+
+	if not isinstance(value, Operator):
+		return None
+
+	if value.operator in ('~', '&', '|', '^'):
+		return value.operands
+
+	if value.operator == 'm' and all(isinstance(arm, Const) for arm in value.operands[1:]):
+		return value.operands[:1]
+
+	return None
+
+class _Model:
+	'''
+	Analytical model of an elaborated design.
+
+	Flip-flops are counted off of the signals driven from a clock domain, and block RAMs off of the
+	dimensions of each memory. The LUTs and logic levels come from walking each statement, costing each
+	operator as it would map onto 4-input LUTs and carry chains, with every assignment made under a condition
+	costing a LUT per bit for the enable or multiplexer in front of it.
+	'''
+
+	def __init__(self: Self, family: FPGAFamily) -> None:
+		self.family = family
+		self.luts   = 0
+		self.ffs    = 0
+		self.brams  = 0
+		self.levels = 0
+		self.carry  = 0
+
+		# The depth, in logic levels and carry bits, of the logic driving each combinational signal
+		self._comb_depth = SignalDict()
+
+		# Elaboration copies expressions about rather than sharing them, so each distinct expression is
+		# numbered, making sure each is only costed once like it would be after synthesis
+		self._numbers   = dict[int, int]()
+		self._keys      = dict[tuple, int]()
+		self._costed    = set[int]()
+		self._depths    = dict[int, tuple[int, int]]()
+
+	def _number(self: Self, value: Value) -> int:
+		if (number := self._numbers.get(id(value))) is not None:
+			return number
+
+		if isinstance(value, Const):
+			key: tuple = ('const', value.value, len(value))
+		elif isinstance(value, Slice):
+			key = ('slice', self._number(value.value), value.start, value.stop)
+		elif isinstance(value, Part):
+			key = ('part', self._number(value.value), self._number(value.offset), value.width, value.stride)
+		elif isinstance(value, Cat):
+			key = ('cat', *(self._number(part) for part in value.parts))
+		elif isinstance(value, Operator):
+			key = ('op', value.operator, *(self._number(operand) for operand in value.operands))
+		elif isinstance(value, ArrayProxy):
+			key = ('array', self._number(value.index), *(self._number(elem) for elem in value.elems))
+		else:
+			key = ('value', id(value))
+
+		number = self._numbers[id(value)] = self._keys.setdefault(key, len(self._keys))
+		return number
+
+	def _bitwise_leaves(self: Self, value: Value) -> dict[int, Value]:
+		''' The distinct inputs to a tree of bitwise operators, which all fold into LUTs together '''
+
+		if (operands := _bitwise_operands(value)) is not None:
+			leaves = dict[int, Value]()
+			for operand in operands:
+				leaves.update(self._bitwise_leaves(operand))
+			return leaves
+
+		if isinstance(value, Const):
+			return {}
+
+		return { self._number(value): value }
+
+	def _depth(self: Self, value: Value) -> tuple[int, int]:
+		''' The logic levels and carry chain bits in front of the given value '''
+
+		number = self._number(value)
+		if (depth := self._depths.get(number)) is None:
+			depth = self._depths[number] = self._value_depth(value)
+		return depth
+
+	def _value_depth(self: Self, value: Value) -> tuple[int, int]:
+		if isinstance(value, Signal):
+			return self._comb_depth.get(value, (0, 0))
+
+		if isinstance(value, (Slice, Part)):
+			return self._depth(value.value)
+
+		if isinstance(value, Cat):
+			return max((self._depth(part) for part in value.parts), default = (0, 0))
+
+		if isinstance(value, ArrayProxy):
+			levels, carry = max((self._depth(elem) for elem in value.elems), default = (0, 0))
+			return (levels + ceil(log(max(len(value.elems), 2), 4)), carry)
+
+		if _bitwise_operands(value) is not None:
+			leaves = self._bitwise_leaves(value).values()
+			levels, carry = max((self._depth(leaf) for leaf in leaves), default = (0, 0))
+			return (levels + ceil(log(max(len(leaves), 2), 4)), carry)
+
+		if isinstance(value, Operator):
+			levels, carry = max((self._depth(operand) for operand in value.operands), default = (0, 0))
+			width = max(len(operand) for operand in value.operands)
+
+			if value.operator in ('+', '-', '<', '<=', '>', '>='):
+				return (levels + 1, carry + width)
+			if value.operator in ('==', '!=', 'b', 'r|', 'r&', 'r^'):
+				return (levels + max(1, ceil(log(max(width, 2), 4))), carry)
+			if value.operator in ('u', 's'):
+				return (levels, carry)
+			return (levels + 1, carry)
+
+		return (0, 0)
+
+	def _cost(self: Self, value: Value) -> int:
+		''' The number of LUTs the given value takes, if it hasn't already been costed '''
+
+		if isinstance(value, (Slice, Part)):
+			return self._cost(value.value)
+
+		if isinstance(value, Cat):
+			return sum(self._cost(part) for part in value.parts)
+
+		if not isinstance(value, (Operator, ArrayProxy)) or (number := self._number(value)) in self._costed:
+			return 0
+
+		self._costed.add(number)
+
+		if isinstance(value, ArrayProxy):
+			return sum(self._cost(elem) for elem in value.elems) + len(value) * (len(value.elems) - 1) // 2
+
+		# Trees of bitwise operators fold into LUTs, each taking up to another 3 of the inputs
+		if _bitwise_operands(value) is not None:
+			leaves = self._bitwise_leaves(value).values()
+			return sum(self._cost(leaf) for leaf in leaves) + len(value) * ceil(max(len(leaves) - 1, 0) / 3)
+
+		cost  = sum(self._cost(operand) for operand in value.operands)
+		width = max(len(operand) for operand in value.operands)
+
+		match value.operator:
+			case 'u' | 's':
+				return cost
+			case '+' | '-' | 'm':
+				return cost + len(value)
+			case '<' | '<=' | '>' | '>=':
+				return cost + width
+			case '==' | '!=':
+				# Two pairs of bits compared per LUT, then the results reduced
+				return cost + ceil(width / 2) + ceil(width / 8)
+			case 'b' | 'r|' | 'r&' | 'r^':
+				return cost + ceil((width - 1) / 3)
+			case '*':
+				return cost + len(value.operands[0]) * len(value.operands[1])
+			case '<<' | '>>':
+				return cost + len(value) * ceil(log(max(len(value.operands[1]), 1) + 1, 2))
+			case _:
+				return cost + len(value)
+
+	def _walk(self: Self, stmts: Iterable, comb: bool, conditions: int, test_depth: tuple[int, int]) -> None:
+		for stmt in stmts:
+			if isinstance(stmt, Assign):
+				self.luts += self._cost(stmt.rhs) + (len(stmt.lhs) if conditions else 0)
+
+				levels, carry = max(self._depth(stmt.rhs), test_depth)
+				levels += 1 if conditions else 0
+
+				if comb:
+					for sig in stmt.lhs._lhs_signals():
+						self._comb_depth[sig] = max(self._comb_depth.get(sig, (0, 0)), (levels, carry))
+				else:
+					self.levels = max(self.levels, levels)
+					self.carry  = max(self.carry, carry)
+
+			elif isinstance(stmt, Switch):
+				self.luts += self._cost(stmt.test) + len(stmt.cases) * ceil(len(stmt.test) / 3)
+
+				levels, carry = self._depth(stmt.test)
+				depth = max((levels + 1, carry), test_depth)
+
+				for case in stmt.cases.values():
+					self._walk(case, comb, conditions + 1, depth)
+
+	def _fragments(self: Self, fragment: Fragment) -> Iterable[Fragment]:
+		yield fragment
+		for subfragment, _ in fragment.subfragments:
+			yield from self._fragments(subfragment)
+
+	def run(self: Self, fragment: Fragment) -> ResourceEstimate:
+		fragments = list[Fragment]()
+
+		for frag in self._fragments(fragment):
+			if isinstance(frag, MemoryInstance):
+				self.brams += _bram_count(self.family, frag.memory.width, frag.memory.depth)
+				continue
+
+			fragments.append(frag)
+			for domain, signals in frag.drivers.items():
+				if domain is not None:
+					self.ffs += sum(len(sig) for sig in signals)
+
+		# Walk everything a few times over so the depth of combinational signals feeding other
+		# combinational signals catches up, regardless of the order they were declared in
+		for _ in range(4):
+			self.luts = 0
+			self._costed.clear()
+			self._depths.clear()
+
+			for frag in fragments:
+				comb = frag.drivers.get(None, ())
+				for stmt in frag.statements:
+					self._walk((stmt, ), all(sig in comb for sig in stmt._lhs_signals()), 0, (0, 0))
+
+		return ResourceEstimate(
+			luts         = self.luts,
+			ffs          = self.ffs,
+			brams        = self.brams,
+			logic_levels = self.levels,
+			fmax         = _fmax(self.family, self.levels, self.carry),
+			source       = 'model',
+		)
+
+def _fmax(family: FPGAFamily, levels: int, carry: int) -> float:
+	return 1e3 / (family.clock_overhead + levels * family.lut_delay + carry * family.carry_delay)
+
+def _yosys(
+	ila: Elaboratable, platform: StandalonePlatform, family: FPGAFamily, yosys: str
+) -> ResourceEstimate:
+	''' Synthesize the ILA with Yosys and tally up the cells in the netlist '''
+
+	# Elaborate against our own platform to find out what resources need to be brought out as ports
+	design = Fragment.get(ila, platform)
+
+	with TemporaryDirectory(prefix = 'torii-ila-') as tmp:
+		work = Path(tmp)
+		(work / 'ila.il').write_text(rtlil.convert(design, ports = _ports(ila, platform)))
+
+		subprocess.run(
+			[
+				yosys, '-q', '-p', '; '.join((
+					'read_rtlil ila.il',
+					f'synth_{family.name} -top top',
+					'tee -q -o stat.json stat -json',
+					'tee -q -o ltp.txt ltp -noff',
+				))
+			],
+			cwd = work, check = True, capture_output = True,
+		)
+
+		stat  = json.loads((work / 'stat.json').read_text())
+		# The whole design is flattened, so there is only the top module if there's no design summary
+		if (totals := stat.get('design')) is None:
+			totals = next(iter(stat['modules'].values()))
+		cells = totals['num_cells_by_type']
+		ltp   = re.search(r'length=(\d+)', (work / 'ltp.txt').read_text())
+
+	levels = int(ltp.group(1)) if ltp is not None else 0
+
+	return ResourceEstimate(
+		luts         = sum(count * cells.get(cell, 0) for cell, count in family.lut_cells.items()),
+		ffs          = sum(count for cell, count in cells.items() if cell.startswith(family.ff_cells)),
+		brams        = sum(cells.get(cell, 0) for cell in family.bram_cells),
+		logic_levels = levels,
+		# The carry chains are already part of the path length, and their cells are quick
+		fmax         = _fmax(family, levels, 0),
+		source       = 'yosys',
+	)
+
+def estimate_resources(
+	ila: Elaboratable, family: str = 'ice40', *, yosys: bool | None = None
+) -> ResourceEstimate:
+	'''
+	Estimate the resources an ILA will take up and how fast it could be clocked.
+
+	This works with the :py:class:`IntegratedLogicAnalyzer <torii_ila.ila.IntegratedLogicAnalyzer>`,
+	:py:class:`StreamILA <torii_ila.ila.StreamILA>`, and the UART and USB ILAs, along with their hubs. The
+	ILA is elaborated on its own, with the bus for the USB ILAs being a bare UTMI interface, so the USB PHY
+	is not included.
+
+	Note
+	----
+	The Fmax is worked out from the number of logic levels on the longest path, with rough delays for
+	the family, place and route will have the final say.
+
+	Parameters
+	----------
+	ila : Elaboratable
+		The ILA to estimate the resources of, this is elaborated and so can't be used in a design afterwards.
+
+	family : str
+		The FPGA family to estimate for, either ``'ice40'`` or ``'ecp5'``.
+		(default: 'ice40')
+
+	yosys : bool | None
+		Whether to synthesize the ILA with Yosys, if ``None`` Yosys is used when it's found on the ``PATH``,
+		otherwise the analytical model is used.
+		(default: None)
+
+	Returns
+	-------
+	ResourceEstimate
+		The resource and timing estimate.
+
+	Raises
+	------
+	ValueError
+		If the family is unknown.
+
+	RuntimeError
+		If ``yosys`` is set but Yosys could not be found.
+	'''
+
+	if (fpga_family := FAMILIES.get(family)) is None:
+		raise ValueError(f'Unknown FPGA family \'{family}\', expected one of {", ".join(FAMILIES)}')
+
+	yosys_path = which('yosys') if yosys is not False else None
+
+	if yosys and yosys_path is None:
+		raise RuntimeError('Yosys was asked for but could not be found on the PATH')
+
+	platform = StandalonePlatform()
+
+	if yosys_path is not None:
+		return _yosys(ila, platform, fpga_family, yosys_path)
+
+	return _Model(fpga_family).run(Fragment.get(ila, platform))
+
+def resource_report(
+	ilas: Mapping[str, Elaboratable], family: str = 'ice40', *, yosys: bool | None = None
+) -> str:
+	'''
+	Estimate the resources of a set of ILA configurations and lay them out in a table.
+
+	Parameters
+	----------
+	ilas : Mapping[str, Elaboratable]
+		The ILAs to estimate, by the name to give them in the report.
+
+	family : str
+		The FPGA family to estimate for, see :py:func:`estimate_resources`.
+		(default: 'ice40')
+
+	yosys : bool | None
+		Whether to synthesize the ILAs with Yosys, see :py:func:`estimate_resources`.
+		(default: None)
+
+	Returns
+	-------
+	str
+		The report.
+	'''
+
+	header = ('Config', 'LUTs', 'FFs', 'BRAMs', 'Levels', 'Fmax (MHz)', 'Source')
+	rows   = [ header ]
+
+	for name, ila in ilas.items():
+		est = estimate_resources(ila, family, yosys = yosys)
+		rows.append((
+			name, str(est.luts), str(est.ffs), str(est.brams), str(est.logic_levels), f'{est.fmax:.1f}', est.source
+		))
+
+	widths = [ max(len(row[idx]) for row in rows) for idx in range(len(header)) ]
+
+	# The config names are left aligned, and the numbers right aligned
+	return '\n'.join(
+		'  '.join((row[0].ljust(widths[0]), *(cell.rjust(width) for cell, width in zip(row[1:], widths[1:]))))
+		for row in rows
+	)
@@ -1,27 +1,57 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
-from argparse import ArgumentParser
+from argparse       import ArgumentParser, Namespace
+from importlib      import import_module
+from importlib.util import find_spec
+from typing         import TYPE_CHECKING, Any
 
-try:
-	from ._impl import UARTILACommand, UARTIntegratedLogicAnalyzerBackhaul, UARTIntegratedLogicAnalyzer # noqa: F401
+from ..manifest     import ILAManifest
 
-	ILA_HAS_UART = True
+if TYPE_CHECKING:
+	from torii.hdl.ast import Signal
 
+	from ._async       import UARTIntegratedLogicAnalyzerAsyncBackhaul # noqa: F401
+	from ._backhaul    import ( # noqa: F401
+		UARTILACommand, UARTIntegratedLogicAnalyzerBackhaul, UARTIntegratedLogicAnalyzerHubBackhaul,
+	)
+	from ._impl        import UARTIntegratedLogicAnalyzer, UARTIntegratedLogicAnalyzerHub # noqa: F401
+
+ILA_HAS_UART = find_spec('serial') is not None
+
+# Where each of the public names lives, they are only imported when first used so that the host side
+# doesn't pull in the gateware, and the gateware doesn't pull in asyncio.
+_LAZY = {
+	'UARTILACommand':                           '_backhaul',
+	'UARTIntegratedLogicAnalyzerBackhaul':      '_backhaul',
+	'UARTIntegratedLogicAnalyzerAsyncBackhaul': '_async',
+	'UARTIntegratedLogicAnalyzer':              '_impl',
+	'UARTIntegratedLogicAnalyzerHubBackhaul':   '_backhaul',
+	'UARTIntegratedLogicAnalyzerHub':           '_impl',
+}
+
+if ILA_HAS_UART:
 	__all__ = (
 		'UARTILACommand',
 		'UARTIntegratedLogicAnalyzerBackhaul',
+		'UARTIntegratedLogicAnalyzerAsyncBackhaul',
 		'UARTIntegratedLogicAnalyzer',
+		'UARTIntegratedLogicAnalyzerHubBackhaul',
+		'UARTIntegratedLogicAnalyzerHub',
 		'ILA_HAS_UART',
 	)
-
-except ImportError:
-	ILA_HAS_UART = False
-
+else:
 	__all__ = (
 		'ILA_HAS_UART',
 	)
 
+def __getattr__(name: str) -> Any:
+	if not ILA_HAS_UART or (module := _LAZY.get(name)) is None:
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+	globals()[name] = value = getattr(import_module(f'.{module}', __name__), name)
+	return value
+
 def _setup_args(parent_parser: ArgumentParser) -> None:
 	# If we don't have UART ILA support, bail
 
@@ -35,6 +65,134 @@ def _setup_args(parent_parser: ArgumentParser) -> None:
 
 	parser.add_argument(
 		'--baudrate', '-b',
-		type = int,
-		help = 'The baud rate of the serial link'
+		type     = int,
+		required = True,
+		help     = 'The baud rate of the serial link'
+	)
+
+	parser.add_argument(
+		'--baudrates', '-B',
+		type    = int,
+		nargs   = '+',
+		default = tuple(),
+		help    = 'Additional baud rates the host can switch the serial link to'
+	)
+
+	parser.add_argument(
+		'--compress',
+		action = 'store_true',
+		help   = 'Run-length encode repeated samples'
+	)
+
+	parser.add_argument(
+		'--block-samples',
+		type    = int,
+		default = None,
+		help    = 'Send the sample memory in CRC checked blocks of this many samples'
+	)
+
+def _build_ila(args: Namespace, signals: list['Signal']) -> tuple['UARTIntegratedLogicAnalyzer', list['Signal']]:
+	''' Build the UART ILA described by the CLI arguments, along with the ports for the serial link '''
+
+	from torii.hdl.ast import Signal
+
+	from ._impl        import UARTIntegratedLogicAnalyzer
+
+	tx = Signal(name = 'tx')
+	rx = Signal(name = 'rx', reset = 1)
+
+	# The UART runs on the sampling domain
+	clock_frequency = args.sample_rate * 1e6
+
+	ila = UARTIntegratedLogicAnalyzer(
+		divisor          = int(clock_frequency // args.baudrate),
+		tx               = tx,
+		rx               = rx,
+		signals          = signals,
+		sample_depth     = args.sample_depth,
+		sampling_domain  = args.sampling_domain,
+		sample_rate      = clock_frequency,
+		prologue_samples = args.prologue_samples,
+		compress         = args.compress,
+		block_samples    = args.block_samples,
+		clock_frequency  = clock_frequency,
+		baudrates        = args.baudrates,
+		embed_layout     = not args.no_embed_layout,
+	)
+
+	return ila, [ tx, rx ]
+
+def _setup_capture_args(parent_parser: ArgumentParser) -> None:
+	parser = parent_parser.add_argument_group(
+		title = 'UART',
+		description = 'UART Specific Capture Options'
 	)
+
+	parser.add_argument(
+		'port',
+		type = str,
+		help = 'The serial port the ILA is on'
+	)
+
+	parser.add_argument(
+		'--baudrate', '-b',
+		type    = int,
+		default = None,
+		help    = 'The baud rate the ILA was built for, this is needed unless it is in the manifest'
+	)
+
+	parser.add_argument(
+		'--baudrates', '-B',
+		type    = int,
+		nargs   = '+',
+		default = None,
+		help    = 'The additional baud rates the ILA was built with, if not in the manifest'
+	)
+
+	parser.add_argument(
+		'--negotiate',
+		action = 'store_true',
+		help   = 'Switch the serial link to the fastest of the baud rates before capturing'
+	)
+
+	parser.add_argument(
+		'--compressed',
+		action  = 'store_true',
+		default = None,
+		help    = 'The ILA was built with `compress` set, if not in the manifest'
+	)
+
+	parser.add_argument(
+		'--block-samples',
+		type    = int,
+		default = None,
+		help    = 'The `block_samples` the ILA was built with, if not in the manifest'
+	)
+
+def _check_capture_args(args: Namespace, manifest: ILAManifest | None) -> None:
+	''' Make sure the CLI arguments, along with the manifest, are enough to connect to the UART ILA '''
+
+	if args.baudrate is None and getattr(manifest, 'baudrate', None) is None:
+		raise ValueError('The baudrate of the ILA is needed, either from --baudrate or the manifest')
+
+def _get_backhaul(args: Namespace, manifest: ILAManifest | None) -> 'UARTIntegratedLogicAnalyzerBackhaul':
+	''' Connect to the UART ILA described by the CLI arguments, reading its layout off of it if not given '''
+
+	from ._backhaul import UARTIntegratedLogicAnalyzerBackhaul
+
+	# Anything not given on the command line is taken from the manifest, or its default if there isn't one
+	options  = dict(compressed = args.compressed, block_samples = args.block_samples, baudrates = args.baudrates)
+	baudrate = args.baudrate or manifest.baudrate
+
+	if manifest is None:
+		backhaul = UARTIntegratedLogicAnalyzerBackhaul.from_device(args.port, baudrate, **options)
+	else:
+		backhaul = UARTIntegratedLogicAnalyzerBackhaul(manifest, args.port, baudrate, **options)
+
+	if args.negotiate:
+		backhaul.negotiate()
+
+	return backhaul
+
+def _wait_for_capture(args: Namespace, backhaul: 'UARTIntegratedLogicAnalyzerBackhaul') -> None:
+	''' The UART ILA holds off on sending samples until the capture is done, so there's nothing to wait on '''
@@ -0,0 +1,252 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+The asyncio flavor of the UART ILA backhaul.
+
+'''
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from functools       import partial
+from pathlib         import Path
+from typing          import TYPE_CHECKING, Self
+
+from serial          import Serial, SerialException
+
+from .._bits         import bits
+from ..backhaul      import AsyncILABackhaulInterface
+from ..layout        import ILALayout
+from ..manifest      import ILAManifest
+from ._backhaul      import (
+	_BAUD_CONFIRM_TIMEOUT, T, UARTILACommand, _decode_rcobs, _Exchange, _open_serial, _UARTBackhaulBase,
+	_unpack_layout,
+)
+
+if TYPE_CHECKING:
+	from ._impl import UARTIntegratedLogicAnalyzer
+
+__all__ = (
+	'UARTIntegratedLogicAnalyzerAsyncBackhaul',
+)
+
+async def _async_read_frame(serial: Serial, buffer: bytearray) -> bytes:
+	'''
+	Like :py:func:`_read_frame` but for a non-blocking serial port, without blocking the event loop.
+
+	Anything that comes in past the end of the frame is left in ``buffer`` for the next call.
+	'''
+
+	loop = asyncio.get_running_loop()
+
+	while (eof := buffer.find(0x00)) < 0:
+		readable = loop.create_future()
+		loop.add_reader(serial.fileno(), lambda: readable.done() or readable.set_result(None))
+		try:
+			await readable
+		finally:
+			loop.remove_reader(serial.fileno())
+
+		buffer += serial.read(max(serial.in_waiting, 1))
+
+	frame = bytes(buffer[:eof])
+	del buffer[:eof + 1]
+	return frame
+
+async def _async_run_exchange(exchange: _Exchange[T], next_frame: Callable[[], Awaitable[bytes | None]]) -> T:
+	''' Like :py:func:`_run_exchange` but with ``next_frame`` awaited for each frame the exchange asks for '''
+
+	try:
+		next(exchange)
+		while True:
+			exchange.send(await next_frame())
+	except StopIteration as done:
+		return done.value
+
+class UARTIntegratedLogicAnalyzerAsyncBackhaul(
+	_UARTBackhaulBase, AsyncILABackhaulInterface['UARTIntegratedLogicAnalyzer']
+):
+	'''
+	The asyncio flavor of :py:class:`UARTIntegratedLogicAnalyzerBackhaul`.
+
+	The serial port is put into non-blocking mode and is only read from once the event loop says it is
+	readable, so no threads are needed no matter how many ports are being driven.
+
+	Note
+	----
+	This relies on :py:meth:`asyncio.loop.add_reader`, which is only available for serial ports on
+	POSIX platforms.
+
+	See :py:class:`torii_ila.backhaul.AsyncILABackhaulInterface` for public API.
+
+	Parameters
+	----------
+	ila : UARTIntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA being used, or its layout or manifest.
+
+	port : Path | str
+		The path to the serial port to use for the ILA.
+
+	baudrate : int
+		The BAUD the UART was configured for.
+
+	compressed : bool | None
+		Whether the ILA sends compressed samples, if not given this is taken from the ILA or manifest, and
+		is ``False`` when only a layout is given.
+		(default: None)
+
+	block_samples : int | None
+		The number of samples in each block if the ILA sends its samples in blocks, if not given this is
+		taken from the ILA or manifest, and is ``None`` when only a layout is given.
+		(default: None)
+
+	block_timeout : float
+		How long in seconds to wait on a block before giving up on it and asking for it again.
+		(default: 1.0)
+
+	retries : int
+		How many times to ask for damaged or missing blocks again before giving up.
+		(default: 3)
+
+	baudrates : Iterable[int] | None
+		The additional baudrates the ILA can be switched to, if not given this is taken from the ILA or
+		manifest, and is empty when only a layout is given.
+		(default: None)
+	'''
+
+	def __init__(
+		self: Self, ila: 'UARTIntegratedLogicAnalyzer | ILALayout | ILAManifest', port: Path | str, baudrate: int, *,
+		compressed: bool | None = None, block_samples: int | None = None, block_timeout: float = 1.0,
+		retries: int = 3, baudrates: Iterable[int] | None = None
+	) -> None:
+		super().__init__(
+			ila, port, baudrate, compressed = compressed, block_samples = block_samples, retries = retries,
+			baudrates = baudrates
+		)
+
+		self._port.timeout  = 0
+		# Frames only time out when waiting on a block, everything else is waited on for as long as it takes
+		self._frame_timeout = block_timeout if self._block_samples is not None else None
+
+	@classmethod
+	async def from_device(
+		cls, port: Path | str, baudrate: int, *, compressed: bool = False, block_samples: int | None = None,
+		baudrates: Iterable[int] = tuple()
+	) -> 'UARTIntegratedLogicAnalyzerAsyncBackhaul':
+		'''
+		Construct a backhaul using the ILA layout read back from the device.
+
+		Parameters
+		----------
+		port : Path | str
+			The path to the serial port to use for the ILA.
+
+		baudrate : int
+			The BAUD the UART was configured for.
+
+		compressed : bool
+			Whether the ILA was built with ``compress`` set, this is not part of the layout.
+			(default: False)
+
+		block_samples : int | None
+			The ``block_samples`` the ILA was built with, this is not part of the layout.
+			(default: None)
+
+		baudrates : Iterable[int]
+			The ``baudrates`` the ILA was built with, these are not part of the layout.
+			(default: tuple())
+
+		Returns
+		-------
+		UARTIntegratedLogicAnalyzerAsyncBackhaul
+			The newly constructed backhaul interface.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA was built without its layout descriptor.
+		'''
+
+		with _open_serial(port, baudrate) as serial:
+			serial.timeout = 0
+			serial.write(UARTILACommand.LAYOUT.to_bytes(length = 1))
+			raw = await _async_read_frame(serial, bytearray())
+
+		return cls(
+			_unpack_layout(_decode_rcobs(raw)), port, baudrate, compressed = compressed,
+			block_samples = block_samples, baudrates = baudrates
+		)
+
+	async def _next_frame(self: Self, timeout: float | None) -> bytes | None:
+		''' Read the next frame off of the UART, or ``None`` if it didn't turn up within ``timeout`` seconds '''
+
+		try:
+			return await asyncio.wait_for(_async_read_frame(self._port, self._pending), timeout)
+		except TimeoutError:
+			# Whatever made it in is the front of a frame we've given up on
+			self._pending.clear()
+			return None
+
+	async def _switch_baudrate(self: Self, baudrate: int) -> bool:
+		''' Send the baudrate switch and its confirmation, returns if the ILA answered intact at the new baudrate '''
+
+		try:
+			return await _async_run_exchange(
+				self._baud_exchange(baudrate), partial(self._next_frame, _BAUD_CONFIRM_TIMEOUT)
+			)
+		except (SerialException, ValueError):
+			return False
+
+	async def set_baudrate(self: Self, baudrate: int) -> None:
+		'''
+		Switch the UART over to another baudrate the ILA was built with.
+
+		See :py:meth:`UARTIntegratedLogicAnalyzerBackhaul.set_baudrate`.
+		'''
+
+		previous = self._check_baudrate(baudrate)
+
+		if not await self._switch_baudrate(baudrate):
+			# Give the ILA time to give up on the switch too
+			await asyncio.sleep(_BAUD_CONFIRM_TIMEOUT)
+			self._abandon_baudrate(baudrate, previous)
+
+	async def negotiate(self: Self) -> int:
+		'''
+		Switch the UART over to the fastest baudrate that both the ILA and the serial port can manage.
+
+		See :py:meth:`UARTIntegratedLogicAnalyzerBackhaul.negotiate`.
+		'''
+
+		for baudrate in self._faster_baudrates():
+			try:
+				await self.set_baudrate(baudrate)
+				return baudrate
+			except RuntimeError:
+				continue
+
+		return self._port.baudrate
+
+	async def _ingest_samples(self: Self) -> Iterable[bits]:
+		'''
+		Collect samples from the ILA backhaul interface.
+
+		Returns
+		-------
+		Iterable[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA sends its samples in blocks and some did not arrive intact.
+		'''
+
+		return await _async_run_exchange(self._ingest_exchange(), partial(self._next_frame, self._frame_timeout))
+
+	async def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		''' See :py:meth:`UARTIntegratedLogicAnalyzerBackhaul._ingest_range`. '''
+
+		return await _async_run_exchange(
+			self._range_exchange(start, count), partial(self._next_frame, self._frame_timeout)
+		)
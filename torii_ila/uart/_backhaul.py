@@ -0,0 +1,815 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+Host side of the UART ILA, the backhauls and the wire protocol they speak.
+
+Nothing here needs the gateware, so a capture can be read back with only :py:mod:`serial` installed.
+
+'''
+
+import time
+from binascii        import crc_hqx
+from collections     import deque
+from collections.abc import Callable, Generator, Iterable
+from enum            import IntEnum, unique
+from pathlib         import Path
+from typing          import TYPE_CHECKING, Self, TypeAlias, TypeVar
+
+from serial          import Serial, SerialException
+
+from .._bits         import bits
+from ..backhaul      import ILABackhaulInterface
+from ..layout        import ILALayout
+from ..manifest      import ILAManifest
+
+if TYPE_CHECKING:
+	from ..ila   import StreamILA
+	from ._impl  import UARTIntegratedLogicAnalyzer, UARTIntegratedLogicAnalyzerHub
+
+__all__ = (
+	'UARTILACommand',
+	'UARTIntegratedLogicAnalyzerBackhaul',
+	'UARTIntegratedLogicAnalyzerHubBackhaul',
+)
+
+@unique
+class UARTILACommand(IntEnum):
+	''' These are commands the UART ILA knows about '''
+
+	NONE   = 0x00
+	''' No command '''
+	FLUSH  = 0x01
+	''' Flush the ILA Sample memory down the UART. '''
+	STREAM = 0x02
+	''' Send the ILA sample memory down the UART until ``UARTILACommand.STOP`` is sent. '''
+	STOP   = 0x03
+	''' Stop the ILA from sending sample stream down the UART. '''
+	RETRIGGER = 0x04
+	''' Retrigger the ILA '''
+	LAYOUT    = 0x05
+	''' Send the packed :py:class:`ILALayout <torii_ila.layout.ILALayout>` descriptor down the UART. '''
+	RESEND    = 0x06
+	'''
+	Send a single block of the sample memory down the UART again, the block index follows the command as
+	two bytes, little endian. Only understood if the ILA was built with ``block_samples``.
+	'''
+	BAUD      = 0x07
+	'''
+	Switch the UART baudrate, the index of the baudrate follows the command as a single byte, with ``0``
+	being the baudrate the ILA was built for. Once switched, the command and index must be sent again at
+	the new baudrate to confirm it, after which the layout descriptor is sent. Otherwise the ILA goes back
+	to the previous baudrate. Only understood if the ILA was built with ``baudrates``.
+	'''
+	RANGE     = 0x08
+	'''
+	Send a window of the sample memory down the UART, the first sample and the number of samples follow
+	the command as four bytes each, little endian. Only understood if the ILA was built without
+	``block_samples``, use ``UARTILACommand.RESEND`` for those.
+	'''
+
+# How long in seconds the UART ILA waits for a baudrate switch to be confirmed before going back
+_BAUD_CONFIRM_TIMEOUT = 0.1
+# What the UART ILA answers with in place of the layout descriptor if it was built without it
+_NO_LAYOUT = b'\x00'
+
+T = TypeVar('T')
+
+def _open_serial(port: Path | str, baudrate: int) -> Serial:
+	''' Open the serial port for a UART backhaul and drop anything stale sitting in the receive buffer '''
+
+	if isinstance(port, Path):
+		if not port.exists():
+			raise RuntimeError(f'Path to serial port {port} does not exist, did you mean to pass a port name?')
+		serial = Serial(port = str(port), baudrate = baudrate)
+	else:
+		serial = Serial(port = port, baudrate = baudrate)
+
+	serial.reset_input_buffer()
+	return serial
+
+def _read_frame(serial: Serial, pending: bytearray) -> bytes:
+	'''
+	Read the next ``0x00`` terminated frame off of the serial port.
+
+	Unlike :py:meth:`serial.Serial.read_until` this pulls in everything that's waiting in one go rather
+	than a byte at a time. Anything that comes in past the end of the frame is left in ``pending`` for
+	the next call.
+
+	Raises
+	------
+	TimeoutError
+		If the serial port has a timeout set and nothing turned up within it.
+	'''
+
+	while (eof := pending.find(0x00)) < 0:
+		if not (data := serial.read(max(serial.in_waiting, 1))):
+			raise TimeoutError('Timed out waiting for a frame from the ILA')
+		pending += data
+
+	frame = bytes(pending[:eof])
+	del pending[:eof + 1]
+	return frame
+
+def _decode_rcobs(data: bytes | bytearray | memoryview) -> bytes:
+	'''
+	Decode an rCOBS encoded message.
+
+	This is :py:func:`torii.lib.coding.cobs.decode_rcobs`, but the runs are copied between memoryviews,
+	so the only copies made are into the result buffer and the final :py:class:`bytes`.
+
+	Raises
+	------
+	ValueError
+		If the message is improperly encoded.
+	'''
+
+	src     = memoryview(data)
+	res     = bytearray(len(src))
+	dst     = memoryview(res)
+	src_idx = len(src)
+	res_idx = len(res)
+
+	while src_idx != 0:
+		code = src[src_idx - 1]
+		if code == 0x00 or src_idx < code:
+			raise ValueError(f'Invalid rCOBS encoded byte at index {src_idx} of input buffer')
+
+		# Every run but a full one has an implicit zero after it, which is already there in `res`
+		if code != 0xFF:
+			res_idx -= 1
+
+		dst[res_idx + 1 - code:res_idx] = src[src_idx - code:src_idx - 1]
+
+		res_idx -= code - 1
+		src_idx -= code
+
+	# The last run reserved a zero at the very end that isn't part of the message
+	return bytes(dst[res_idx:len(res) - 1])
+
+def _check_block(raw: bytes) -> tuple[int, bytes] | None:
+	'''
+	Decode a block frame from an ILA built with ``block_samples`` and check its CRC.
+
+	Returns
+	-------
+	tuple[int, bytes] | None
+		The block index and the block payload, or ``None`` if the frame was damaged.
+	'''
+
+	try:
+		frame = _decode_rcobs(raw)
+	except ValueError:
+		return None
+
+	if len(frame) < 4 or crc_hqx(frame[:-2], 0xFFFF) != int.from_bytes(frame[-2:], byteorder = 'little'):
+		return None
+
+	return int.from_bytes(frame[:2], byteorder = 'little'), frame[2:-2]
+
+def _unpack_layout(payload: bytes) -> ILALayout:
+	''' Unpack the layout descriptor the ILA answered :py:attr:`UARTILACommand.LAYOUT` with '''
+
+	if payload == _NO_LAYOUT:
+		raise RuntimeError(
+			'The ILA was built without its layout descriptor, the backhaul needs to be built from the ILA or its layout'
+		)
+
+	return ILALayout.unpack(payload)
+
+def _baud_confirmed(payload: bytes, layout: ILALayout) -> bool:
+	''' Check the baudrate switch confirmation is the layout descriptor, or nothing if the ILA doesn't have one '''
+
+	if payload == _NO_LAYOUT:
+		return True
+
+	try:
+		return ILALayout.unpack(payload) == layout
+	except ValueError:
+		return False
+
+def _resend_command(block: int) -> bytes:
+	''' Build the command to have the ILA send the given block again '''
+
+	return UARTILACommand.RESEND.to_bytes(length = 1) + block.to_bytes(2, byteorder = 'little')
+
+def _range_command(start: int, count: int) -> bytes:
+	''' Build the command to have the ILA send the window of the sample memory starting at ``start`` '''
+
+	return (
+		UARTILACommand.RANGE.to_bytes(length = 1) +
+		start.to_bytes(4, byteorder = 'little') + count.to_bytes(4, byteorder = 'little')
+	)
+
+def _block_window(start: int, count: int, block_samples: int) -> tuple[range, int]:
+	''' Work out which blocks cover a window of the sample memory, and where the window starts in the first '''
+
+	first = start // block_samples
+	last  = (start + count - 1) // block_samples
+
+	return range(first, last + 1), start - first * block_samples
+
+def _baud_command(index: int) -> bytes:
+	''' Build the command to switch the ILA over to the baudrate with the given index '''
+
+	return UARTILACommand.BAUD.to_bytes(length = 1) + index.to_bytes(1)
+
+def _decompress_samples(data: bytes, sample_bytes: int) -> bytes:
+	'''
+	Expand the run-length encoded samples produced by :py:class:`_SampleRLE`.
+
+	Raises
+	------
+	ValueError
+		If the data is truncated, or starts with a repeat rather than a literal sample.
+	'''
+
+	res  = bytearray()
+	prev = b''
+	idx  = 0
+
+	while idx < len(data):
+		if (count := data[idx]) == 0x00:
+			prev = data[idx + 1:idx + 1 + sample_bytes]
+			if len(prev) != sample_bytes:
+				raise ValueError(f'Truncated literal sample at index {idx} of compressed samples')
+			res += prev
+			idx += 1 + sample_bytes
+		else:
+			if not prev:
+				raise ValueError(f'Sample repeat at index {idx} with no sample to repeat')
+			res += prev * count
+			idx += 1
+
+	return bytes(res)
+
+def _hub_command(channel: int, command: 'UARTILACommand') -> int:
+	''' Construct a channel addressed hub command byte, see :py:meth:`UARTIntegratedLogicAnalyzerHub.command`. '''
+
+	return ((channel & 0xF) << 4) | (command & 0xF)
+
+# A UART protocol exchange, it yields each time it wants the next frame read off of the serial port and is sent
+# back the raw frame, or ``None`` if one didn't turn up in time
+_Exchange: TypeAlias = Generator[None, bytes | None, T]
+
+def _run_exchange(exchange: _Exchange[T], next_frame: Callable[[], bytes | None]) -> T:
+	''' Run a UART protocol exchange to completion, with ``next_frame`` reading each frame it asks for '''
+
+	try:
+		next(exchange)
+		while True:
+			exchange.send(next_frame())
+	except StopIteration as done:
+		return done.value
+
+def _read_payload() -> _Exchange[bytes]:
+	''' Read the next frame off of the UART and rCOBS decode it '''
+
+	if (raw := (yield)) is None:
+		raise TimeoutError('Timed out waiting for a frame from the ILA')
+
+	return _decode_rcobs(raw)
+
+class _UARTBackhaulBase:
+	'''
+	The parts of the blocking and asyncio UART backhauls that don't depend on how the serial port is read.
+
+	The UART protocol is written as exchanges, see :py:data:`_Exchange`, which write their commands to the
+	serial port directly and leave reading frames back to the backhaul that runs them.
+	'''
+
+	layout: ILALayout
+
+	def __init__(
+		self: Self, ila: 'UARTIntegratedLogicAnalyzer | ILALayout | ILAManifest', port: Path | str, baudrate: int, *,
+		compressed: bool | None, block_samples: int | None, retries: int, baudrates: Iterable[int] | None
+	) -> None:
+		super().__init__(ila)
+
+		self._port          = _open_serial(port, baudrate)
+		self._pending       = bytearray()
+		self._compressed    = getattr(ila, 'compress', False) if compressed is None else compressed
+		self._block_samples = getattr(ila, 'block_samples', None) if block_samples is None else block_samples
+		self._retries       = retries
+		# The baudrate we start at is the one the ILA was built for, which is always index 0
+		self._baudrates     = (baudrate, *(getattr(ila, 'baudrates', ()) if baudrates is None else baudrates))
+
+	@property
+	def _blocks(self: Self) -> int:
+		return (self.layout.sample_depth + self._block_samples - 1) // self._block_samples
+
+	def _unpack_samples(self: Self, payload: bytes) -> list[bits]:
+		'''
+		Split the decoded payload of a frame from the ILA into samples.
+
+		The samples come off the UART LSB first, which is the byte order :py:class:`torii_ila._bits.bits`
+		wants, so each sample is sliced straight out of the payload once it's been decompressed.
+
+		Parameters
+		----------
+		payload : bytes
+			The rCOBS decoded frame payload.
+
+		Returns
+		-------
+		list[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+		'''
+
+		sample_width = self.layout.bytes_per_sample
+		sample_len   = self.layout.sample_width
+		from_bytes   = bits.from_bytes
+
+		if self._compressed:
+			payload = _decompress_samples(payload, sample_width)
+
+		return [
+			from_bytes(payload[idx:idx + sample_width], sample_len)
+			for idx in range(0, len(payload), sample_width)
+		]
+
+	def _baud_exchange(self: Self, baudrate: int) -> _Exchange[bool]:
+		''' Send the baudrate switch and its confirmation, returns if the ILA answered intact at the new baudrate '''
+
+		command = _baud_command(self._baudrates.index(baudrate))
+
+		self._port.write(command)
+		# Make sure the command is all the way out before switching our end over
+		self._port.flush()
+		self._pending.clear()
+
+		self._port.baudrate = baudrate
+		self._port.reset_input_buffer()
+		self._port.write(command)
+
+		if (raw := (yield)) is None:
+			return False
+
+		try:
+			return _baud_confirmed(_decode_rcobs(raw), self.layout)
+		except ValueError:
+			return False
+
+	def _check_baudrate(self: Self, baudrate: int) -> int:
+		''' Make sure the ILA can switch to ``baudrate``, returns the current baudrate to fall back to '''
+
+		if baudrate not in self._baudrates:
+			raise ValueError(f'The ILA can not switch to baudrate {baudrate}')
+
+		return self._port.baudrate
+
+	def _abandon_baudrate(self: Self, baudrate: int, previous: int) -> None:
+		''' Go back to the ``previous`` baudrate after the switch to ``baudrate`` didn't go through '''
+
+		self._port.baudrate = previous
+		self._port.reset_input_buffer()
+		self._pending.clear()
+		raise RuntimeError(f'Unable to switch the ILA over to baudrate {baudrate}')
+
+	def _faster_baudrates(self: Self) -> list[int]:
+		''' The baudrates faster than the current one, fastest first, for negotiating the baudrate '''
+
+		current = self._port.baudrate
+		return [ baudrate for baudrate in sorted(self._baudrates, reverse = True) if baudrate > current ]
+
+	def _read_block(self: Self, blocks: dict[int, bytes]) -> _Exchange[None]:
+		''' Read the next block frame off of the UART, and keep it if it arrived intact '''
+
+		if (raw := (yield)) is not None and (block := _check_block(raw)) is not None and block[0] < self._blocks:
+			blocks[block[0]] = block[1]
+
+	def _read_blocks(self: Self, wanted: range) -> _Exchange[bytes]:
+		'''
+		Read blocks of the sample memory, asking for any damaged or missing blocks again.
+
+		Parameters
+		----------
+		wanted : range
+			The blocks to read.
+
+		Returns
+		-------
+		bytes
+			The payloads of the blocks, in order.
+
+		Raises
+		------
+		RuntimeError
+			If some blocks still have not arrived intact after all the retries.
+		'''
+
+		blocks = dict[int, bytes]()
+
+		# The whole sample memory can be asked for in one go, anything less a block at a time
+		if len(wanted) == self._blocks:
+			self._port.write(UARTILACommand.FLUSH.to_bytes(length = 1))
+			for _ in wanted:
+				yield from self._read_block(blocks)
+		else:
+			for block in wanted:
+				self._port.write(_resend_command(block))
+				yield from self._read_block(blocks)
+
+		for _ in range(self._retries):
+			if all(block in blocks for block in wanted):
+				break
+
+			# The ILA can only resend one block at a time
+			for block in wanted:
+				if block not in blocks:
+					self._port.write(_resend_command(block))
+					yield from self._read_block(blocks)
+
+		if missing := sum(block not in blocks for block in wanted):
+			raise RuntimeError(f'{missing} sample blocks did not arrive intact from the ILA')
+
+		return b''.join(blocks[block] for block in wanted)
+
+	def _ingest_exchange(self: Self) -> _Exchange[list[bits]]:
+		''' Read the whole sample memory, in blocks if the ILA sends it in blocks '''
+
+		if self._block_samples is not None:
+			return self._unpack_samples((yield from self._read_blocks(range(self._blocks))))
+
+		self._port.write(UARTILACommand.FLUSH.to_bytes(length = 1))
+		return self._unpack_samples((yield from _read_payload()))
+
+	def _range_exchange(self: Self, start: int, count: int) -> _Exchange[list[bits]]:
+		'''
+		Read a window of the sample memory, if the ILA sends its samples in blocks the blocks covering the
+		window are asked for again and the window is cut out of them, otherwise the ILA sends just the window.
+		'''
+
+		if self._block_samples is not None:
+			wanted, offset = _block_window(start, count, self._block_samples)
+			return self._unpack_samples((yield from self._read_blocks(wanted)))[offset:offset + count]
+
+		self._port.write(_range_command(start, count))
+		return self._unpack_samples((yield from _read_payload()))
+
+class UARTIntegratedLogicAnalyzerBackhaul(_UARTBackhaulBase, ILABackhaulInterface['UARTIntegratedLogicAnalyzer']):
+	'''
+	UART-based ILA backhaul interface, used in combination with :py:class:`UARTIntegratedLogicAnalyzer`
+	to automatically set up a communications channel to get ILA samples off-device.
+
+	An instance of this class is typically created by calling :py:meth:`UARTIntegratedLogicAnalyzer.get_backhaul`
+	which lets the ILA configure the backhaul as needed.
+
+	Alternatively you can pass the :py:class:`UARTIntegratedLogicAnalyzer` instance from the gateware
+	to the constructor of this module, or if the gateware isn't at hand, use :py:meth:`from_device` to
+	read the ILA layout from the device itself.
+
+	The data coming off the ILA is `rCOBS <https://github.com/Dirbaio/rcobs>`_ encoded and the samples are
+	byte-wise swizzled, we automatically decode and de-swizzle the samples, as well as expand them if the
+	ILA was built with ``compress`` set.
+
+	See :py:class:`torii_ila.backhaul.ILABackhaulInterface` for public API.
+
+	Parameters
+	----------
+	ila : UARTIntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA being used, or its layout or manifest.
+
+	port : Path | str
+		The path to the serial port to use for the ILA.
+
+	baudrate : int
+		The BAUD the UART was configured for.
+
+	compressed : bool | None
+		Whether the ILA sends compressed samples, if not given this is taken from the ILA or manifest, and
+		is ``False`` when only a layout is given.
+		(default: None)
+
+	block_samples : int | None
+		The number of samples in each block if the ILA sends its samples in blocks, if not given this is
+		taken from the ILA or manifest, and is ``None`` when only a layout is given.
+		(default: None)
+
+	block_timeout : float
+		How long in seconds to wait on a block before giving up on it and asking for it again.
+		(default: 1.0)
+
+	retries : int
+		How many times to ask for damaged or missing blocks again before giving up.
+		(default: 3)
+
+	baudrates : Iterable[int] | None
+		The additional baudrates the ILA can be switched to, if not given this is taken from the ILA or
+		manifest, and is empty when only a layout is given.
+		(default: None)
+
+	'''
+
+	_ranged_readout = True
+
+	def __init__(
+		self: Self, ila: 'UARTIntegratedLogicAnalyzer | ILALayout | ILAManifest', port: Path | str, baudrate: int, *,
+		compressed: bool | None = None, block_samples: int | None = None, block_timeout: float = 1.0,
+		retries: int = 3, baudrates: Iterable[int] | None = None
+	) -> None:
+		super().__init__(
+			ila, port, baudrate, compressed = compressed, block_samples = block_samples, retries = retries,
+			baudrates = baudrates
+		)
+
+		if self._block_samples is not None:
+			self._port.timeout = block_timeout
+
+	@classmethod
+	def from_device(
+		cls, port: Path | str, baudrate: int, *, compressed: bool = False, block_samples: int | None = None,
+		baudrates: Iterable[int] = tuple()
+	) -> 'UARTIntegratedLogicAnalyzerBackhaul':
+		'''
+		Construct a backhaul using the ILA layout read back from the device.
+
+		Parameters
+		----------
+		port : Path | str
+			The path to the serial port to use for the ILA.
+
+		baudrate : int
+			The BAUD the UART was configured for.
+
+		compressed : bool
+			Whether the ILA was built with ``compress`` set, this is not part of the layout.
+			(default: False)
+
+		block_samples : int | None
+			The ``block_samples`` the ILA was built with, this is not part of the layout.
+			(default: None)
+
+		baudrates : Iterable[int]
+			The ``baudrates`` the ILA was built with, these are not part of the layout.
+			(default: tuple())
+
+		Returns
+		-------
+		UARTIntegratedLogicAnalyzerBackhaul
+			The newly constructed backhaul interface.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA was built without its layout descriptor.
+		'''
+
+		with _open_serial(port, baudrate) as serial:
+			serial.write(UARTILACommand.LAYOUT.to_bytes(length = 1))
+			raw = _read_frame(serial, bytearray())
+
+		return cls(
+			_unpack_layout(_decode_rcobs(raw)), port, baudrate, compressed = compressed,
+			block_samples = block_samples, baudrates = baudrates
+		)
+
+	def _next_frame(self: Self) -> bytes | None:
+		''' Read the next frame off of the UART, or ``None`` if the serial port timed out on it '''
+
+		try:
+			return _read_frame(self._port, self._pending)
+		except TimeoutError:
+			# Whatever made it in is the front of a frame we've given up on
+			self._pending.clear()
+			return None
+
+	def _switch_baudrate(self: Self, baudrate: int) -> bool:
+		''' Send the baudrate switch and its confirmation, returns if the ILA answered intact at the new baudrate '''
+
+		timeout = self._port.timeout
+
+		try:
+			self._port.timeout = _BAUD_CONFIRM_TIMEOUT
+			return _run_exchange(self._baud_exchange(baudrate), self._next_frame)
+		except (SerialException, ValueError):
+			return False
+		finally:
+			self._port.timeout = timeout
+
+	def set_baudrate(self: Self, baudrate: int) -> None:
+		'''
+		Switch the UART over to another baudrate the ILA was built with.
+
+		The switch is made at the current baudrate, and then confirmed at the new one. If that doesn't
+		get through both ends go back to the current baudrate.
+
+		Parameters
+		----------
+		baudrate : int
+			The baudrate to switch to, either the one the backhaul was created with or one of the ILA's
+			``baudrates``.
+
+		Raises
+		------
+		ValueError
+			If the ILA can not switch to the given baudrate.
+
+		RuntimeError
+			If the switch did not go through.
+		'''
+
+		previous = self._check_baudrate(baudrate)
+
+		if not self._switch_baudrate(baudrate):
+			# Give the ILA time to give up on the switch too
+			time.sleep(_BAUD_CONFIRM_TIMEOUT)
+			self._abandon_baudrate(baudrate, previous)
+
+	def negotiate(self: Self) -> int:
+		'''
+		Switch the UART over to the fastest baudrate that both the ILA and the serial port can manage.
+
+		Returns
+		-------
+		int
+			The baudrate the UART ended up at.
+		'''
+
+		for baudrate in self._faster_baudrates():
+			try:
+				self.set_baudrate(baudrate)
+				return baudrate
+			except RuntimeError:
+				continue
+
+		return self._port.baudrate
+
+	def _ingest_samples(self: Self) -> Iterable[bits]:
+		'''
+		Collect samples from the ILA backhaul interface.
+
+		In the case of the UART backhaul interface, we read until we hit an
+		EOF marker, then rCOBS decode and split the samples. If the ILA sends
+		its samples in blocks, each block is checked and requested again if
+		it was damaged.
+
+		Those are then transformed into bit-vectors with the padding truncated.
+
+		Returns
+		-------
+		Iterable[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA sends its samples in blocks and some did not arrive intact.
+		'''
+
+		return _run_exchange(self._ingest_exchange(), self._next_frame)
+
+	def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		'''
+		Collect a window of the sample memory from the ILA backhaul interface.
+
+		If the ILA sends its samples in blocks, the blocks covering the window are asked for again and
+		the window is cut out of them, otherwise the ILA is asked for just the window.
+
+		Returns
+		-------
+		Iterable[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA sends its samples in blocks and some did not arrive intact.
+		'''
+
+		return _run_exchange(self._range_exchange(start, count), self._next_frame)
+
+class _UARTHubChannelBackhaul(UARTIntegratedLogicAnalyzerBackhaul):
+	'''
+	Backhaul for a single ILA on a :py:class:`UARTIntegratedLogicAnalyzerHub`, it shares the serial port
+	with all of the other channels on the hub and only consumes the frames tagged with its channel ID.
+
+	The hub only implements the ``FLUSH`` command, so windows of the sample buffer are cut out of the whole
+	capture, and the baudrate can not be switched.
+	'''
+
+	_ranged_readout = False
+
+	def __init__(self: Self, ila: 'StreamILA', hub: 'UARTIntegratedLogicAnalyzerHubBackhaul', channel: int) -> None:
+		ILABackhaulInterface.__init__(self, ila)
+
+		self._hub           = hub
+		self._channel       = channel
+		self._compressed    = False
+		self._block_samples = None
+		self._baudrates     = ()
+
+	def _ingest_samples(self: Self) -> Iterable[bits]:
+		self._hub._command(self._channel, UARTILACommand.FLUSH)
+		return self._unpack_samples(self._hub._read_frame(self._channel))
+
+	def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		return ILABackhaulInterface._ingest_range(self, start, count)
+
+	def set_baudrate(self: Self, baudrate: int) -> None:
+		''' UART ILA hubs can not switch baudrate, this always raises a :py:class:`RuntimeError`. '''
+
+		raise RuntimeError('UART ILA hub channels can not switch baudrate')
+
+	def negotiate(self: Self) -> int:
+		''' UART ILA hubs can not switch baudrate, this always raises a :py:class:`RuntimeError`. '''
+
+		raise RuntimeError('UART ILA hub channels can not switch baudrate')
+
+class UARTIntegratedLogicAnalyzerHubBackhaul:
+	'''
+	Backhaul interface for a :py:class:`UARTIntegratedLogicAnalyzerHub`.
+
+	Each ILA on the hub gets its own channel, which is a full backhaul interface in its own right,
+	see :py:class:`torii_ila.backhaul.ILABackhaulInterface` for their API. The channels are indexed in
+	the order the ILAs were added to the hub.
+
+	Frames coming off the UART are demultiplexed by their channel ID, any frames for a channel other
+	than the one being read are held on to until that channel asks for them.
+
+	Parameters
+	----------
+	hub : UARTIntegratedLogicAnalyzerHub
+		The ILA hub being used.
+
+	port : Path | str
+		The path to the serial port to use for the hub.
+
+	baudrate : int
+		The BAUD the UART was configured for.
+
+	Attributes
+	----------
+	channels : list[ILABackhaulInterface]
+		The backhaul interface for each ILA on the hub.
+	'''
+
+	def __init__(self: Self, hub: 'UARTIntegratedLogicAnalyzerHub', port: Path | str, baudrate: int) -> None:
+		self.hub = hub
+
+		self._port    = _open_serial(port, baudrate)
+		self._rx      = bytearray()
+		self._pending = { channel: deque[bytes]() for channel in range(len(hub.ilas)) }
+
+		self.channels = [
+			_UARTHubChannelBackhaul(ila, self, channel) for channel, ila in enumerate(hub.ilas)
+		]
+
+	def __len__(self: Self) -> int:
+		return len(self.channels)
+
+	def __getitem__(self: Self, idx: int) -> ILABackhaulInterface:
+		return self.channels[idx]
+
+	def _command(self: Self, channel: int, command: UARTILACommand) -> None:
+		self._port.write(_hub_command(channel, command).to_bytes(length = 1))
+
+	def _read_frame(self: Self, channel: int) -> bytes:
+		'''
+		Get the next frame for the given channel, reading frames off the UART until one turns up.
+
+		Parameters
+		----------
+		channel : int
+			The channel to get the frame for.
+
+		Returns
+		-------
+		bytes
+			The decoded frame payload with the channel ID removed.
+		'''
+
+		pending = self._pending[channel]
+
+		while not pending:
+			if not (raw := _read_frame(self._port, self._rx)):
+				continue
+
+			# The channel ID is the first byte of the frame payload
+			frame = _decode_rcobs(raw)
+			if (frame_channel := frame[0]) in self._pending:
+				self._pending[frame_channel].append(frame[1:])
+
+		return pending.popleft()
+
+	def refresh(self: Self) -> None:
+		''' Request the sample buffers of all the hub channels at once, and then refresh each of them. '''
+
+		for channel in range(len(self.channels)):
+			self._command(channel, UARTILACommand.FLUSH)
+
+		for channel, backhaul in enumerate(self.channels):
+			backhaul.samples = backhaul._parse_samples(backhaul._unpack_samples(self._read_frame(channel)))
+
+	def update(self: Self) -> None:
+		''' Request the sample buffers of all the hub channels at once, and then update each of them. '''
+
+		for channel in range(len(self.channels)):
+			self._command(channel, UARTILACommand.FLUSH)
+
+		for channel, backhaul in enumerate(self.channels):
+			samples = backhaul._parse_samples(backhaul._unpack_samples(self._read_frame(channel)))
+			if len(backhaul.samples) == 0:
+				backhaul.samples = samples
+			else:
+				backhaul.samples.extend(samples)
@@ -2,148 +2,394 @@
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
 '''
-UART Based ILA and backhaul interface.
+UART Based ILA gateware.
 
 '''
 
-from collections.abc        import Generator, Iterable
-from enum                   import IntEnum, unique
-from itertools              import chain, islice
-from pathlib                import Path
-from typing                 import Self
-
-from serial                 import Serial
-
-from torii.hdl.ast          import Cat, Signal
-from torii.hdl.dsl          import FSM, Module
-from torii.hdl.ir           import Elaboratable
-from torii.hdl.xfrm         import DomainRenamer
-from torii.lib.coding.cobs  import RCOBSEncoder, decode_rcobs
-from torii.lib.stdio.serial import AsyncSerial
-
-from .._bits                import bits
-from ..backhaul             import ILABackhaulInterface
-from ..ila                  import StreamILA
+from collections.abc         import Iterable
+from pathlib                 import Path
+from typing                  import Self
+
+from torii.hdl.ast           import Array, Assign, Cat, Const, Mux, Signal, Value
+from torii.hdl.dsl           import FSM, Module
+from torii.hdl.ir            import Elaboratable
+from torii.hdl.xfrm          import DomainRenamer
+from torii.lib.coding.cobs   import RCOBSEncoder
+from torii.lib.stdio.serial  import AsyncSerial
+from torii.lib.stream.simple import StreamInterface
+from torii.util.units        import bits_for
+
+from ..ila                   import StreamILA, _LayoutROM
+from ..layout                import ILALayout
+from ..manifest              import ILAManifest, ILATransport
+from ._backhaul              import (
+	_BAUD_CONFIRM_TIMEOUT, UARTILACommand, UARTIntegratedLogicAnalyzerBackhaul,
+	UARTIntegratedLogicAnalyzerHubBackhaul, _hub_command,
+)
 
 __all__ = (
-	'UARTILACommand',
-	'UARTIntegratedLogicAnalyzerBackhaul',
 	'UARTIntegratedLogicAnalyzer',
+	'UARTIntegratedLogicAnalyzerHub',
 )
 
-@unique
-class UARTILACommand(IntEnum):
-	''' These are commands the UART ILA knows about '''
-
-	NONE   = 0x00
-	''' No command '''
-	FLUSH  = 0x01
-	''' Flush the ILA Sample memory down the UART. '''
-	STREAM = 0x02
-	''' Send the ILA sample memory down the UART until ``UARTILACommand.STOP`` is sent. '''
-	STOP   = 0x03
-	''' Stop the ILA from sending sample stream down the UART. '''
-	RETRIGGER = 0x04
-	''' Retrigger the ILA '''
-
-class UARTIntegratedLogicAnalyzerBackhaul(ILABackhaulInterface['UARTIntegratedLogicAnalyzer']):
+class _RCOBSFramer(Elaboratable):
 	'''
-	UART-based ILA backhaul interface, used in combination with :py:class:`UARTIntegratedLogicAnalyzer`
-	to automatically set up a communications channel to get ILA samples off-device.
+	Frames packets off of a byte-wide stream into `rCOBS <https://github.com/Dirbaio/rcobs>`_ encoded
+	UART frames.
+
+	Every transfer on ``stream`` up to and including the one with ``last`` set is rCOBS encoded and the
+	frame is terminated with a ``0x00`` :abbr:`EOF (End Of Frame)` marker.
 
-	An instance of this class is typically created by calling :py:meth:`UARTIntegratedLogicAnalyzer.get_backhaul`
-	which lets the ILA configure the backhaul as needed.
+	Parameters
+	----------
+	has_header : bool
+		Prefix each frame with the value on ``header``, this is encoded as part of the frame.
+		(default: False)
+
+	Attributes
+	----------
+	stream : StreamInterface, in
+		The byte stream to frame.
 
-	Alternatively you can pass the :py:class:`UARTIntegratedLogicAnalyzer` instance from the gateware
-	to the constructor of this module.
+	header : Signal(8), in
+		The frame header byte, only used if ``has_header`` is set.
 
-	The data coming off the ILA is `rCOBS <https://github.com/Dirbaio/rcobs>`_ encoded and the samples are
-	byte-wise swizzled, we automatically decode and de-swizzle the samples.
+	tx_data : Signal(8), out
+		The byte to send down the UART.
 
-	See :py:class:`torii_ila.backhaul.ILABackhaulInterface` for public API.
+	tx_ack : Signal, out
+		Strobe to send ``tx_data``.
+
+	tx_rdy : Signal, in
+		Indicates the UART is ready to accept the next byte.
+
+	idle : Signal, out
+		Indicates the framer is between frames.
+
+	done : Signal, out
+		Strobed when the EOF marker has been sent.
+	'''
+
+	def __init__(self: Self, *, has_header: bool = False) -> None:
+		self._has_header = has_header
+
+		self.stream  = StreamInterface(data_width = 8)
+		self.header  = Signal(8)
+		self.tx_data = Signal(8)
+		self.tx_ack  = Signal()
+		self.tx_rdy  = Signal()
+		self.idle    = Signal()
+		self.done    = Signal()
+
+	def elaborate(self: Self, _) -> Module:
+		m = Module()
+
+		m.submodules.rcobs = rcobs = RCOBSEncoder()
+
+		data_tx  = Signal(8)
+		finalize = Signal()
+
+		m.d.comb += [
+			# Glue the rCOBS encoder to the UARTs face
+			rcobs.raw.eq(data_tx),
+			self.tx_data.eq(rcobs.enc),
+			self.tx_ack.eq(rcobs.valid),
+			rcobs.ack.eq(self.tx_rdy),
+		]
+
+		with m.FSM(name = 'tx') as fsm:
+			m.d.comb += [ self.idle.eq(fsm.ongoing('IDLE')), ]
+
+			with m.State('IDLE'):
+				if self._has_header:
+					# Poke the stream so it can present data, but don't consume it yet
+					m.d.comb += [ self.stream.ready.eq(~self.stream.valid), ]
+				else:
+					m.d.comb += [ self.stream.ready.eq(1), ]
+
+				with m.If(self.stream.valid):
+					if self._has_header:
+						m.d.sync += [
+							data_tx.eq(self.header),
+							finalize.eq(0),
+						]
+					else:
+						m.d.sync += [
+							data_tx.eq(self.stream.data),
+							finalize.eq(self.stream.last),
+						]
+					# If we're coming out of idle we need to strobe the rCOBS encode to latch
+					m.d.comb += [ rcobs.strobe.eq(1), ]
+
+					m.next = 'TRANSMIT'
+
+			with m.State('TRANSMIT'):
+				# Wait for the rCOBS encoder to tell us to advance
+				with m.If(rcobs.ready):
+					# If that was the last byte of the stream, flush the state and end the frame
+					with m.If(finalize):
+						m.d.sync += [ finalize.eq(0), ]
+						m.d.comb += [ rcobs.finish.eq(1), ]
+						m.next = 'FRAME'
+					with m.Else():
+						m.d.comb += [ self.stream.ready.eq(1), ]
+
+						# If the stream already has the next byte ready to go, send it right away
+						with m.If(self.stream.valid):
+							m.d.sync += [
+								data_tx.eq(self.stream.data),
+								finalize.eq(self.stream.last),
+							]
+							m.d.comb += [ rcobs.strobe.eq(1), ]
+
+			with m.State('FRAME'):
+				# Let the rCOBS encoder settle and wait for the UART to become ready so we can
+				# emit our framing byte
+				with m.If(self.tx_rdy & rcobs.ready):
+					m.d.comb += [
+						self.tx_data.eq(0x00),
+						self.tx_ack.eq(1),
+						self.done.eq(1),
+					]
+					m.next = 'IDLE'
+
+		return m
+
+class _SampleRLE(Elaboratable):
+	'''
+	Run-length encodes a byte-wide stream of samples, collapsing runs of identical samples.
+
+	Each token in the output starts with a count byte, a count of ``0x00`` is followed by a literal sample,
+	and any other count means the previous sample repeats that many more times. The first sample of each
+	frame is always sent as a literal, so every frame can be expanded on its own.
 
 	Parameters
 	----------
-	ila : UARTIntegratedLogicAnalyzer
-		The ILA being used.
+	sample_bytes : int
+		The number of bytes in each sample on the input stream.
+
+	Attributes
+	----------
+	input : StreamInterface, in
+		The byte stream of samples to compress, ``last`` marks the final byte of the frame.
 
-	port : Path | str
-		The path to the serial port to use for the ILA.
+	output : StreamInterface, out
+		The compressed byte stream.
+	'''
+
+	def __init__(self: Self, sample_bytes: int) -> None:
+		self._sample_bytes = sample_bytes
+
+		self.input  = StreamInterface(data_width = 8)
+		self.output = StreamInterface(data_width = 8)
+
+	def elaborate(self: Self, _) -> Module:
+		m = Module()
+
+		last_byte = self._sample_bytes - 1
+
+		sample    = Signal(self._sample_bytes * 8)
+		previous  = Signal.like(sample)
+		byte      = Array(sample.word_select(idx, 8) for idx in range(self._sample_bytes))
+		index     = Signal(range(self._sample_bytes))
+		repeats   = Signal(8)
+		has_prev  = Signal()
+		finalize  = Signal()
 
-	baudrate : int
-		The BAUD the UART was configured for.
+		with m.FSM(name = 'rle'):
+			with m.State('GATHER'):
+				m.d.comb += [ self.input.ready.eq(1), ]
 
+				with m.If(self.input.valid):
+					m.d.sync += [ byte[index].eq(self.input.data), ]
+
+					with m.If(index == last_byte):
+						m.d.sync += [
+							index.eq(0),
+							finalize.eq(self.input.last),
+						]
+						m.next = 'COMPARE'
+					with m.Else():
+						m.d.sync += [ index.eq(index + 1), ]
+
+			with m.State('COMPARE'):
+				# Fold the sample into the current run if we can, otherwise flush the run and send it as-is
+				with m.If(has_prev & (sample == previous) & (repeats != 0xFF)):
+					m.d.sync += [ repeats.eq(repeats + 1), ]
+					with m.If(finalize):
+						m.next = 'FINAL_RUN'
+					with m.Else():
+						m.next = 'GATHER'
+				with m.Elif(repeats != 0):
+					m.next = 'RUN'
+				with m.Else():
+					m.next = 'LITERAL'
+
+			with m.State('RUN'):
+				m.d.comb += [
+					self.output.data.eq(repeats),
+					self.output.valid.eq(1),
+				]
+
+				with m.If(self.output.ready):
+					m.d.sync += [ repeats.eq(0), ]
+					m.next = 'LITERAL'
+
+			with m.State('LITERAL'):
+				m.d.comb += [
+					self.output.data.eq(0x00),
+					self.output.valid.eq(1),
+				]
+
+				with m.If(self.output.ready):
+					m.next = 'SAMPLE'
+
+			with m.State('SAMPLE'):
+				m.d.comb += [
+					self.output.data.eq(byte[index]),
+					self.output.last.eq(finalize & (index == last_byte)),
+					self.output.valid.eq(1),
+				]
+
+				with m.If(self.output.ready):
+					with m.If(index == last_byte):
+						m.d.sync += [
+							index.eq(0),
+							previous.eq(sample),
+							# Each frame stands on its own
+							has_prev.eq(~finalize),
+						]
+						m.next = 'GATHER'
+					with m.Else():
+						m.d.sync += [ index.eq(index + 1), ]
+
+			with m.State('FINAL_RUN'):
+				m.d.comb += [
+					self.output.data.eq(repeats),
+					self.output.last.eq(1),
+					self.output.valid.eq(1),
+				]
+
+				with m.If(self.output.ready):
+					m.d.sync += [
+						repeats.eq(0),
+						has_prev.eq(0),
+					]
+					m.next = 'GATHER'
+
+		return m
+
+# CRC-16/CCITT-FALSE polynomial, used for the block CRCs
+_CRC16_POLY = 0x1021
+
+def _crc16_byte(crc: Value, byte: Value) -> Value:
+	'''
+	Fold a byte into a CRC-16/CCITT-FALSE, the same CRC as :py:func:`binascii.crc_hqx` with an initial
+	value of ``0xFFFF``.
 	'''
 
-	def __init__(self: Self, ila: 'UARTIntegratedLogicAnalyzer', port: Path | str, baudrate: int) -> None:
-		super().__init__(ila)
+	for bit in reversed(range(8)):
+		crc = Cat(Const(0, 1), crc[0:15]) ^ Mux(crc[15] ^ byte[bit], _CRC16_POLY, 0)
+	return crc
 
-		if isinstance(port, Path):
-			if not port.exists():
-				raise RuntimeError(f'Path to serial port {port} does not exist, did you mean to pass a port name?')
-			else:
-				self._port = Serial(port = str(port), baudrate = baudrate)
-		else:
-			self._port = Serial(port = port, baudrate = baudrate)
+class _BlockCRC(Elaboratable):
+	'''
+	Wraps each frame of a byte stream with its block index and a CRC.
 
-		self._port.reset_input_buffer()
+	The frame comes out as the block index (2 bytes, little endian), the frame itself, and then the
+	CRC-16/CCITT-FALSE of the block index and the frame (2 bytes, little endian). The block index
+	counts up by one for every frame.
 
-	def _split_samples(self: Self, samples: bytes) -> Generator[bits]:
-		'''
-		Split the raw sample data stream into a stream of bit-vectors.
+	Attributes
+	----------
+	input : StreamInterface, in
+		The byte stream to wrap, ``last`` marks the end of each frame.
 
-		Parameters
-		----------
-		samples : bytes
-			The ILA sample data to be split.
+	output : StreamInterface, out
+		The wrapped byte stream, ``last`` marks the final CRC byte of each frame.
 
-		Returns
-		-------
-		Generator[torii.ila._bits.bits]
-			Stream of samples as appropriately sized bit-vectors.
-		'''
+	index : Signal(16), in
+		The block index to load when ``load`` is strobed.
 
-		sample_width = self.ila.bytes_per_sample
+	load : Signal, in
+		Strobe to set the block index of the next frame to ``index``.
+	'''
 
-		for idx in range(0, len(samples), sample_width):
-			sample_raw = samples[idx:idx + sample_width]
-			sample_len = len(Cat(self.ila._signals))
+	def __init__(self: Self) -> None:
+		self.input  = StreamInterface(data_width = 8)
+		self.output = StreamInterface(data_width = 8)
+		self.index  = Signal(16)
+		self.load   = Signal()
 
-			yield bits.from_bytes(sample_raw, sample_len)
+	def elaborate(self: Self, _) -> Module:
+		m = Module()
 
-	def _ingest_samples(self: Self) -> Iterable[bits]:
-		'''
-		Collect samples from the ILA backhaul interface.
+		block    = Signal(16)
+		crc      = Signal(16, reset = 0xFFFF)
+		next_crc = _crc16_byte(crc, self.output.data)
+
+		with m.FSM(name = 'block_crc'):
+			with m.State('INDEX_LOW'):
+				# Hold off on the index until there is a frame to go with it
+				m.d.comb += [
+					self.output.data.eq(block[0:8]),
+					self.output.valid.eq(self.input.valid),
+				]
+
+				with m.If(self.output.valid & self.output.ready):
+					m.d.sync += [ crc.eq(next_crc), ]
+					m.next = 'INDEX_HIGH'
+
+			with m.State('INDEX_HIGH'):
+				m.d.comb += [
+					self.output.data.eq(block[8:16]),
+					self.output.valid.eq(1),
+				]
+
+				with m.If(self.output.ready):
+					m.d.sync += [
+						crc.eq(next_crc),
+						block.eq(block + 1),
+					]
+					m.next = 'DATA'
 
-		In the case of the UART backhaul interface, we read until we hit an
-		EOF marker, then rCOBS decode and then de-swizzle the samples.
+			with m.State('DATA'):
+				m.d.comb += [
+					self.output.data.eq(self.input.data),
+					self.output.valid.eq(self.input.valid),
+					self.input.ready.eq(self.output.ready),
+				]
 
-		Those are then transformed into bit-vectors with the padding truncated.
+				with m.If(self.input.valid & self.input.ready):
+					m.d.sync += [ crc.eq(next_crc), ]
 
-		Returns
-		-------
-		Iterable[torii_ila._bits.bits]
-			Collection of sample bit-vectors.
-		'''
+					with m.If(self.input.last):
+						m.next = 'CRC_LOW'
+
+			with m.State('CRC_LOW'):
+				m.d.comb += [
+					self.output.data.eq(crc[0:8]),
+					self.output.valid.eq(1),
+				]
 
-		sample_width  = self.ila.bytes_per_sample
-		total_samples = self.ila.sample_depth * sample_width
+				with m.If(self.output.ready):
+					m.next = 'CRC_HIGH'
 
-		def _batch(data: bytes):
-			itr = iter(data)
-			while (chunk := tuple(islice(itr, sample_width))):
-				yield chunk
+			with m.State('CRC_HIGH'):
+				m.d.comb += [
+					self.output.data.eq(crc[8:16]),
+					self.output.last.eq(1),
+					self.output.valid.eq(1),
+				]
 
-		self._port.write(UARTILACommand.FLUSH.to_bytes(length = 1))
+				with m.If(self.output.ready):
+					m.d.sync += [ crc.eq(crc.reset), ]
+					m.next = 'INDEX_LOW'
 
-		# Consume up to the EOF marker
-		raw = self._port.read_until(b'\x00')
-		# Decode the rCOBS samples up to the \x00 byte
-		decoded_samples = decode_rcobs(raw[0:total_samples + 1])
-		# The samples from the UART come in byte-reversed, so we need to swap them then flatten to bytes
-		samples = bytes(chain.from_iterable((samp[::1] for samp in _batch(decoded_samples))))
-		# Split the decoded and fixed samples
-		return list(self._split_samples(samples))
+		with m.If(self.load):
+			m.d.sync += [ block.eq(self.index), ]
+
+		return m
 
 class UARTIntegratedLogicAnalyzer(Elaboratable):
 	'''
@@ -194,6 +440,34 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 		The number of samples to capture **before** the trigger.
 		(default: 1)
 
+	compress : bool
+		Run-length encode the samples before they are sent, runs of identical samples are collapsed into
+		a single byte. This trades a byte of overhead on every sample that changes for a much shorter
+		transfer when the signals are mostly idle.
+		(default: False)
+
+	block_samples : int | None
+		Send the sample memory in blocks of this many samples, each in its own frame tagged with the
+		block index and a CRC, so the backhaul can check them and ask for just the bad blocks again with
+		:py:attr:`UARTILACommand.RESEND`. If ``None`` the sample memory is sent as one unchecked frame.
+		(default: None)
+
+	clock_frequency : float | None
+		The frequency of the sampling domain in Hz, this is only needed for ``baudrates``.
+		(default: None)
+
+	baudrates : Iterable[int]
+		Additional baudrates the UART can be switched to at runtime with :py:attr:`UARTILACommand.BAUD`.
+		The UART always comes up at the baudrate set by ``divisor``.
+		(default: tuple())
+
+	embed_layout : bool
+		Keep the :py:class:`ILALayout <torii_ila.layout.ILALayout>` descriptor in ROM so it can be read back
+		with :py:attr:`UARTILACommand.LAYOUT`. Leaving it out saves the block RAM it takes up, but the
+		``LAYOUT`` command is answered with a frame holding a single zero byte, and the backhaul has to be
+		built from the ILA or its layout rather than ``from_device``.
+		(default: True)
+
 	Attributes
 	----------
 	domain : str
@@ -220,6 +494,17 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 	bytes_per_sample : int
 		The number of whole bytes per sample.
 
+	blocks : int
+		The number of blocks the sample memory is sent in, this is ``1`` if ``block_samples`` is ``None``.
+
+	manifest : ILAManifest
+		The :py:class:`ILAManifest <torii_ila.manifest.ILAManifest>` of the ILA, for building a backhaul
+		without the gateware. The ILA only knows its ``divisor``, so the manifest doesn't have the baudrate,
+		use :py:meth:`ILAManifest.from_ila <torii_ila.manifest.ILAManifest.from_ila>` to include it.
+
+	baudrates : tuple[int, ...]
+		The additional baudrates the UART can be switched to, in command index order starting at ``1``.
+
 	trigger : Signal, in
 		ILA Sample start trigger strobe.
 
@@ -231,6 +516,15 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 
 	idle : Signal, out
 		Indicates the UART transmitter is sitting idle and is ready to send data.
+
+	Raises
+	------
+	ValueError
+		If ``block_samples`` is not positive, or splits the sample memory into more than 65536 blocks.
+
+	ValueError
+		If ``baudrates`` is given without ``clock_frequency``, there are more than 255 of them, or
+		any of them are too fast for the clock.
 	'''
 
 	_backhaul: UARTIntegratedLogicAnalyzerBackhaul | None = None
@@ -271,27 +565,73 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 	def bytes_per_sample(self) -> int:
 		return self.ila.bytes_per_sample
 
+	@property
+	def layout(self) -> ILALayout:
+		return self.ila.layout
+
+	@property
+	def blocks(self) -> int:
+		if self.block_samples is None:
+			return 1
+		return (self.sample_depth + self.block_samples - 1) // self.block_samples
+
+	@property
+	def manifest(self) -> ILAManifest:
+		return ILAManifest(
+			self.layout, ILATransport.UART, baudrates = self.baudrates, compress = self.compress,
+			block_samples = self.block_samples
+		)
+
 	def __init__(
 		self: Self, *,
 		# UART Settings
 		divisor: int, tx: Signal, rx: Signal,
 		# ILA Settings
 		signals: Iterable[Signal] = list(), sample_depth: int = 32, sampling_domain: str = 'sync',
-		sample_rate: float = 50e6, prologue_samples: int = 1,
+		sample_rate: float = 50e6, prologue_samples: int = 1, compress: bool = False,
+		block_samples: int | None = None, clock_frequency: float | None = None, baudrates: Iterable[int] = tuple(),
+		embed_layout: bool = True,
 	) -> None:
+		self.baudrates = tuple(baudrates)
+
+		if self.baudrates:
+			if clock_frequency is None:
+				raise ValueError('The clock frequency is needed to work out the divisors for the baudrates')
+			if len(self.baudrates) > 0xFF:
+				raise ValueError(f'At most 255 additional baudrates can be used, not {len(self.baudrates)}')
+
+		self._baud_divisors = [ int(clock_frequency // baudrate) for baudrate in self.baudrates ]
+		for baudrate, baud_divisor in zip(self.baudrates, self._baud_divisors):
+			# This is the smallest divisor the UART can keep in sync with
+			if baud_divisor < 5:
+				raise ValueError(f'Baudrate {baudrate} is too fast for a {clock_frequency}Hz clock')
+
+		self._baud_timeout = int((clock_frequency or 0) * _BAUD_CONFIRM_TIMEOUT)
+
+		if block_samples is not None:
+			if block_samples <= 0:
+				raise ValueError(f'Block size must be a positive number of samples, not {block_samples}')
+			if (sample_depth + block_samples - 1) // block_samples > 0x10000:
+				raise ValueError(f'Blocks of {block_samples} samples would need more than 65536 blocks')
+
 		self._domain = sampling_domain
 
-		self.divisor = divisor
-		self.tx      = tx
-		self.rx      = rx
-		self.idle    = Signal()
+		self.divisor       = divisor
+		self.tx            = tx
+		self.rx            = rx
+		self.compress      = compress
+		self.block_samples = block_samples
+		self.embed_layout  = embed_layout
+		self.idle          = Signal()
 
 		self.ila = StreamILA(
 			signals          = signals,
 			sample_depth     = sample_depth,
 			sampling_domain  = 'sync', # We stuff this through a `DomainRenamer` later
 			sample_rate      = sample_rate,
-			prologue_samples = prologue_samples
+			prologue_samples = prologue_samples,
+			stream_width     = 8, # The UART only ever deals in bytes
+			auto_send        = False, # We ask for the samples when the host wants them
 		)
 
 		self._signals         = self.ila._signals
@@ -393,34 +733,161 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 	def elaborate(self: Self, _) -> Module:
 		m = Module()
 
-		m.submodules.ila   = ila   = self.ila
-		m.submodules.rcobs = rcobs = RCOBSEncoder()
-		m.submodules.uart  = uart  = AsyncSerial(divisor = self.divisor)
+		layout_data = self.layout.pack() if self.embed_layout else b''
+
+		divisors = [ self.divisor, *self._baud_divisors ]
+
+		m.submodules.ila    = ila    = self.ila
+		m.submodules.framer = framer = _RCOBSFramer()
+		m.submodules.uart   = uart   = AsyncSerial(divisor = self.divisor, divisor_bits = bits_for(max(divisors)))
+		m.submodules.layout = rom    = _LayoutROM(layout_data)
+
+		data_rx    = Signal.like(uart.rx.data, decoder = UARTILACommand)
+		send       = Signal()
+		stream     = Signal()
+		retrigger  = Signal()
+		layout_req = Signal()
+		layout     = Signal()
+		# Hold off on starting a new sample frame if we need to send the layout
+		ila_send   = Signal()
+		# Hold off on starting any new frames while the baudrate is being switched
+		baud_hold  = Signal()
+
+		samples = ila.stream
+
+		# The ILA only sends samples when asked, so hold the request until they start coming out, as
+		# it might have been made before the capture is done.
+		read_req   = Signal()
+		read_first = Signal()
+
+		m.d.comb += [ ila.read.eq(read_req), ]
+		m.d.sync += [ read_first.eq(samples.valid & samples.first), ]
+
+		with m.If(samples.valid & samples.first & ~read_first):
+			m.d.sync += [ read_req.eq(0), ]
+
+		def request_read(start: int | Value, count: int | Value) -> list[Assign]:
+			return [
+				send.eq(1),
+				read_req.eq(1),
+				ila.read_start.eq(start),
+				ila.read_count.eq(count),
+			]
+
+		if self.block_samples is not None:
+			block_bytes = self.block_samples * self.bytes_per_sample
+			block_pos   = Signal(range(block_bytes))
+			blocks      = StreamInterface(data_width = 8)
+
+			# Cut the sample stream up into blocks, reads always start on a block boundary so we
+			# only need to count within the block
+			m.d.comb += [
+				blocks.stream_eq(samples),
+				blocks.last.eq(samples.last | (block_pos == block_bytes - 1)),
+			]
+
+			with m.If(samples.valid & samples.ready):
+				with m.If(blocks.last):
+					m.d.sync += [ block_pos.eq(0), ]
+				with m.Else():
+					m.d.sync += [ block_pos.eq(block_pos + 1), ]
+
+			samples = blocks
+
+		if self.compress:
+			m.submodules.rle = rle = _SampleRLE(self.bytes_per_sample)
+			m.d.comb += [ rle.input.stream_eq(samples), ]
+			samples = rle.output
+
+		if self.block_samples is not None:
+			m.submodules.block_crc = block_crc = _BlockCRC()
+			m.d.comb += [ block_crc.input.stream_eq(samples), ]
+			m.d.sync += [ block_crc.load.eq(0), ]
+			samples = block_crc.output
+
+			block_req   = Signal(16)
+			frames_left = Signal(range(self.blocks + 1))
+
+			# Sending the whole capture means sending every block, starting from the first
+			def request_capture() -> list[Assign]:
+				return [
+					*request_read(0, self.sample_depth),
+					block_crc.index.eq(0),
+					block_crc.load.eq(1),
+					frames_left.eq(self.blocks),
+				]
+		else:
+			range_data = Signal(64)
+			range_byte = Signal(range(8))
+			range_end  = Signal(33)
 
-		data_tx   = Signal.like(ila.stream.data)
-		data_rx   = Signal.like(uart.rx.data, decoder = UARTILACommand)
-		to_send   = Signal(range(ila.bytes_per_sample + 1))
-		finalize  = Signal()
-		send      = Signal()
-		stream    = Signal()
-		retrigger = Signal()
+			def request_capture() -> list[Assign]:
+				return request_read(0, self.sample_depth)
+
+		# While streaming, every fresh capture is sent in full
+		complete_prev = Signal()
+		m.d.sync += [ complete_prev.eq(self.complete), ]
+
+		with m.If(self.complete & ~complete_prev & stream):
+			m.d.sync += request_capture()
 
 		m.d.comb += [
 			# Connect the UART
 			self.tx.eq(uart.tx.o),
 			uart.rx.i.eq(self.rx),
-			# Glue the rCOBS encoder to the UARTs face
-			rcobs.raw.eq(data_tx[0:8]),
-			uart.tx.data.eq(rcobs.enc),
-			uart.tx.ack.eq(rcobs.valid),
-			rcobs.ack.eq(uart.tx.rdy),
+			# Glue the framer to the UARTs face
+			uart.tx.data.eq(framer.tx_data),
+			uart.tx.ack.eq(framer.tx_ack),
+			framer.tx_rdy.eq(uart.tx.rdy),
+			self.idle.eq(framer.idle),
+			# Only let the samples through when we've been asked to send them
+			ila_send.eq(send & ~layout & ~((layout_req | baud_hold) & framer.idle)),
+			samples.ready.eq(framer.stream.ready & ila_send),
+			# The layout descriptor always covers the whole ROM
+			rom.offset.eq(0),
+			rom.length.eq(len(layout_data)),
+			rom.stream.ready.eq(framer.stream.ready & layout),
 			# Retrigger machinery
 			retrigger.eq(0),
 			self.ila.trigger.eq(retrigger | self.trigger),
 		]
 
+		with m.If(layout):
+			m.d.comb += [
+				framer.stream.data.eq(rom.stream.data),
+				framer.stream.last.eq(rom.stream.last),
+				framer.stream.valid.eq(rom.stream.valid),
+			]
+		with m.Else():
+			m.d.comb += [
+				framer.stream.data.eq(samples.data),
+				framer.stream.last.eq(samples.last),
+				framer.stream.valid.eq(samples.valid & ila_send),
+			]
+
+		# Commands that need more than the one byte hang around in the command state
+		wait_cmds = [ UARTILACommand.RETRIGGER ]
+		# And the states they take those bytes in need the UART receiver
+		rx_states = [ 'IDLE' ]
+
+		if self.block_samples is not None:
+			wait_cmds.append(UARTILACommand.RESEND)
+			rx_states.extend(( 'BLOCK_LOW', 'BLOCK_HIGH' ))
+		else:
+			wait_cmds.append(UARTILACommand.RANGE)
+			rx_states.append('RANGE_DATA')
+
+		if self.baudrates:
+			wait_cmds.append(UARTILACommand.BAUD)
+			rx_states.extend(( 'BAUD_INDEX', 'BAUD_CONFIRM', 'BAUD_CHECK' ))
+
+			baud_table   = Array(Const(divisor, len(uart.divisor)) for divisor in divisors)
+			baud_index   = Signal(8)
+			baud_revert  = Signal.like(uart.divisor)
+			baud_timeout = Signal(range(self._baud_timeout + 1))
+
 		with m.FSM(name = 'rx') as fsm:
-			m.d.comb += [ uart.rx.start.eq(fsm.ongoing('IDLE')), ]
+			m.d.comb += [ uart.rx.start.eq(Cat(fsm.ongoing(state) for state in rx_states).any()), ]
 
 			with m.State('IDLE'):
 				with m.If(uart.rx.done):
@@ -430,10 +897,11 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 			with m.State('CMD'):
 				with m.Switch(data_rx):
 					with m.Case(UARTILACommand.FLUSH):
-						m.d.sync += [ send.eq(1), ]
+						# Send the whole capture, or the next one if it's not done yet
+						m.d.sync += request_capture()
 					with m.Case(UARTILACommand.STREAM):
 						m.d.sync += [
-							send.eq(1),
+							*request_capture(),
 							stream.eq(1),
 						]
 					with m.Case(UARTILACommand.STOP):
@@ -441,86 +909,394 @@ class UARTIntegratedLogicAnalyzer(Elaboratable):
 					with m.Case(UARTILACommand.RETRIGGER):
 						m.next = 'RETRIGGER'
 						m.d.comb += [ retrigger.eq(1), ]
-
-				with m.If(data_rx != UARTILACommand.RETRIGGER):
+					with m.Case(UARTILACommand.LAYOUT):
+						m.d.sync += [ layout_req.eq(1), ]
+					if self.block_samples is not None:
+						with m.Case(UARTILACommand.RESEND):
+							m.next = 'BLOCK_LOW'
+					else:
+						with m.Case(UARTILACommand.RANGE):
+							m.d.sync += [ range_byte.eq(0), ]
+							m.next = 'RANGE_DATA'
+					if self.baudrates:
+						with m.Case(UARTILACommand.BAUD):
+							m.next = 'BAUD_INDEX'
+
+				with m.If(~data_rx.matches(*wait_cmds)):
 					m.next = 'IDLE'
 
 				m.d.sync += [ data_rx.eq(0), ]
 
 			with m.State('RETRIGGER'):
 				with m.If(self.complete):
-					m.d.sync += [ send.eq(1) ]
+					m.d.sync += request_capture()
 					m.next = 'IDLE'
 
-		with m.FSM(name = 'tx') as fsm:
-			m.d.comb += [ self.idle.eq(fsm.ongoing('IDLE')), ]
-
-			with m.State('IDLE'):
-				m.d.comb += [ ila.stream.ready.eq(send), ]
+			if self.block_samples is not None:
+				with m.State('BLOCK_LOW'):
+					with m.If(uart.rx.done):
+						m.d.sync += [ block_req[0:8].eq(uart.rx.data), ]
+						m.next = 'BLOCK_HIGH'
 
-				with m.If(ila.stream.valid & send):
-					m.d.sync += [
-						data_tx.eq(ila.stream.data),
-						to_send.eq(ila.bytes_per_sample - 1),
-					]
-					# If we're coming out of idle we need to strobe the rCOBS encode to latch
-					m.d.comb += [ rcobs.strobe.eq(1), ]
-
-					m.next = 'TRANSMIT'
-
-			with m.State('TRANSMIT'):
-				# Wait for the rCOBS encoder to tell us to advance
-				with m.If(rcobs.ready):
-					# If we still have bytes to send, shift over and send the next one
-					with m.If(to_send > 0):
-						# Tell the rCOBS encoder that data is valid
-						m.d.comb += [ rcobs.strobe.eq(1), ]
+				with m.State('BLOCK_HIGH'):
+					with m.If(uart.rx.done):
+						m.d.sync += [ block_req[8:16].eq(uart.rx.data), ]
+						m.next = 'RESEND'
 
+				with m.State('RESEND'):
+					# Quietly drop requests for blocks we don't have
+					with m.If(block_req < self.blocks):
 						m.d.sync += [
-							to_send.eq(to_send - 1),
-							data_tx.eq(data_tx[8:]),
+							*request_read(block_req * self.block_samples, self.block_samples),
+							block_crc.index.eq(block_req),
+							block_crc.load.eq(1),
+							frames_left.eq(1),
 						]
-					# Otherwise, wrap up
-					with m.Else():
-						m.d.comb += [ ila.stream.ready.eq(1), ]
+					m.next = 'IDLE'
+			else:
+				with m.State('RANGE_DATA'):
+					with m.If(uart.rx.done):
+						m.d.sync += [
+							range_data.eq(Cat(range_data[8:], uart.rx.data)),
+							range_byte.eq(range_byte + 1),
+						]
+						with m.If(range_byte == 7):
+							m.next = 'RANGE'
 
-						# In the case where the stream has data to be slurped out, do so for the next byte
-						with m.If(ila.stream.valid):
-							m.d.sync += [
-								data_tx.eq(ila.stream.data),
-								to_send.eq(ila.bytes_per_sample - 1),
-							]
-						with m.Elif(finalize):
-							# We just got done with the last transfer, flush the state and end the frame
-							m.d.sync += [ finalize.eq(0), ]
-							m.next = 'FLUSH'
-						with m.Else():
-							# If we are about to hit the last bit of the stream, we need to tell
-							# the rCOBS encoder to finalize at the end of the next transfer.
-							with m.If(ila.stream.last):
-								m.d.sync += [ finalize.eq(1), ]
-							m.next = 'IDLE'
-
-			with m.State('FLUSH'):
-				# Wait for the rCOBS encoder to become ready, then tell it to wrap up
-				with m.If(rcobs.ready):
-					m.d.comb += [ rcobs.finish.eq(1), ]
-					m.next = 'FRAME'
+				with m.State('RANGE'):
+					range_start = range_data[0:32]
+					range_count = range_data[32:64]
 
-			with m.State('FRAME'):
-				# Let the rCOBS encoder settle and wait for the UART to become ready so we can
-				# emit our framing byte
-				with m.If(uart.tx.rdy & rcobs.ready):
-					m.d.comb += [
-						uart.tx.data.eq(0x00),
-						uart.tx.ack.eq(1),
-					]
-					with m.If(~stream):
-						m.d.sync += [ send.eq(0), ]
+					m.d.comb += [ range_end.eq(range_start + range_count), ]
+
+					# Quietly drop requests for windows we don't have, and clamp the rest to the buffer
+					with m.If((range_start < self.sample_depth) & (range_count != 0)):
+						m.d.sync += request_read(
+							range_start,
+							Mux(range_end > self.sample_depth, self.sample_depth - range_start, range_count)
+						)
 					m.next = 'IDLE'
 
+			if self.baudrates:
+				with m.State('BAUD_INDEX'):
+					with m.If(uart.rx.done):
+						m.d.sync += [ baud_index.eq(uart.rx.data), ]
+						m.next = 'BAUD_SWITCH'
+
+				with m.State('BAUD_SWITCH'):
+					m.d.comb += [ baud_hold.eq(1), ]
+
+					# Quietly drop requests for baudrates we don't have
+					with m.If(baud_index >= len(divisors)):
+						m.next = 'IDLE'
+					# Don't pull the rug out from under anything that's still going out
+					with m.Elif(framer.idle & ~layout & uart.tx.rdy):
+						m.d.sync += [
+							baud_revert.eq(uart.divisor),
+							uart.divisor.eq(baud_table[baud_index]),
+							baud_timeout.eq(self._baud_timeout),
+						]
+						m.next = 'BAUD_CONFIRM'
+
+				# The host has to repeat the command at the new baudrate, otherwise we go back to the old one
+				with m.State('BAUD_CONFIRM'):
+					m.d.comb += [ baud_hold.eq(1), ]
+					m.d.sync += [ baud_timeout.eq(baud_timeout - 1), ]
+
+					with m.If(uart.rx.done & (uart.rx.data == UARTILACommand.BAUD)):
+						m.next = 'BAUD_CHECK'
+					with m.Elif(uart.rx.done | (baud_timeout == 0)):
+						m.d.sync += [ uart.divisor.eq(baud_revert), ]
+						m.next = 'IDLE'
+
+				with m.State('BAUD_CHECK'):
+					m.d.comb += [ baud_hold.eq(1), ]
+					m.d.sync += [ baud_timeout.eq(baud_timeout - 1), ]
+
+					# Answer with the layout so the host can tell it's all coming through intact
+					with m.If(uart.rx.done & (uart.rx.data == baud_index)):
+						m.d.sync += [ layout_req.eq(1), ]
+						m.next = 'IDLE'
+					with m.Elif(uart.rx.done | (baud_timeout == 0)):
+						m.d.sync += [ uart.divisor.eq(baud_revert), ]
+						m.next = 'IDLE'
+
+		# Wait for the framer to be between frames before sending the layout
+		with m.If(layout_req & framer.idle & ~layout & ~baud_hold):
+			m.d.sync += [
+				layout_req.eq(0),
+				layout.eq(1),
+			]
+			m.d.comb += [ rom.start.eq(1), ]
+
+		with m.If(framer.done & layout):
+			m.d.sync += [ layout.eq(0), ]
+		# Once the sample buffer has been framed, stop sending unless we're streaming
+		if self.block_samples is not None:
+			with m.Elif(framer.done):
+				with m.If(frames_left != 0):
+					m.d.sync += [ frames_left.eq(frames_left - 1), ]
+				with m.If((frames_left <= 1) & ~stream):
+					m.d.sync += [ send.eq(0), ]
+		else:
+			with m.Elif(framer.done & ~stream):
+				m.d.sync += [ send.eq(0), ]
+
 		# Fix up the lock domain, if needed
 		if self._domain != 'sync':
 			m = DomainRenamer(sync = self._domain)(m)
 
 		return m
+
+class UARTIntegratedLogicAnalyzerHub(Elaboratable):
+	'''
+	Hosts multiple ILAs on a single UART link.
+
+	Each ILA added to the hub with :py:meth:`add_ila` is assigned a channel, starting at ``0``, and may
+	sample on its own clock domain. The ILAs are triggered independently by way of the ``trigger`` signal
+	on the :py:class:`StreamILA <torii_ila.ila.StreamILA>` returned from :py:meth:`add_ila`.
+
+	Commands sent to the hub are channel addressed, the upper nibble of the command byte is the channel
+	and the lower nibble is the :py:class:`UARTILACommand`, see :py:meth:`command`. This means the commands
+	for channel ``0`` are the same as for the :py:class:`UARTIntegratedLogicAnalyzer`.
+
+	The output of each channel is an `rCOBS <https://github.com/Dirbaio/rcobs>`_ encoded frame, as with
+	the :py:class:`UARTIntegratedLogicAnalyzer`, except the first byte of the decoded frame is the channel ID
+	the samples belong to. When more than one channel has samples to send, the lowest channel goes first.
+
+	Parameters
+	----------
+	divisor : int
+		The clock divisor needed on the hub domain to reach the desired baudrate.
+
+	tx : Signal
+		The UART Transmit signal to use.
+
+	rx : Signal
+		The UART Receive signal to use.
+
+	domain : str
+		The clock domain the UART and hub logic runs on.
+		(default: sync)
+
+	Attributes
+	----------
+	ilas : list[StreamILA]
+		The ILAs on this hub, in the order they were added.
+
+	idle : Signal, out
+		Indicates the UART transmitter is sitting idle and is ready to send data.
+	'''
+
+	MAX_ILAS = 16
+
+	_backhaul: UARTIntegratedLogicAnalyzerHubBackhaul | None = None
+
+	@staticmethod
+	def command(channel: int, command: UARTILACommand) -> int:
+		'''
+		Construct a channel addressed hub command byte.
+
+		Parameters
+		----------
+		channel : int
+			The channel the command is for.
+
+		command : UARTILACommand
+			The command to send.
+
+		Returns
+		-------
+		int
+			The command byte to send down the UART.
+		'''
+
+		return _hub_command(channel, command)
+
+	def get_backhaul(self: Self, port: Path | str, baudrate: int) -> UARTIntegratedLogicAnalyzerHubBackhaul:
+		'''
+		Automatically create a :py:class:`UARTIntegratedLogicAnalyzerHubBackhaul` from this hub.
+
+		Parameters
+		----------
+		port : Path | str
+			The path to the serial port to use for the hub.
+
+		baudrate : int
+			The baudrate the UART was configured for.
+
+		Returns
+		-------
+		UARTIntegratedLogicAnalyzerHubBackhaul
+			The newly constructed backhaul interface or the already constructed instance.
+		'''
+
+		if self._backhaul is None:
+			self._backhaul = UARTIntegratedLogicAnalyzerHubBackhaul(hub = self, port = port, baudrate = baudrate)
+
+		return self._backhaul
+
+	def __init__(self: Self, *, divisor: int, tx: Signal, rx: Signal, domain: str = 'sync') -> None:
+		self._domain = domain
+
+		self.divisor = divisor
+		self.tx      = tx
+		self.rx      = rx
+		self.idle    = Signal()
+
+		self.ilas = list[StreamILA]()
+
+	def add_ila(
+		self: Self, *,
+		signals: Iterable[Signal] = list(), sample_depth: int = 32, sampling_domain: str = 'sync',
+		sample_rate: float = 50e6, prologue_samples: int = 1,
+	) -> StreamILA:
+		'''
+		Add a new ILA to the hub.
+
+		Parameters
+		----------
+		signals : Iterable[torii.Signal]
+			The signals to capture with the ILA.
+			(default: list())
+
+		sample_depth : int
+			Number of samples we wish to capture.
+			(default: 32)
+
+		sampling_domain : str
+			The clock domain the ILA sampling will take place on.
+			(default: sync)
+
+		sample_rate : float
+			The outwards facing sample rate used for formatting output.
+			(default: ``50e6`` i.e ``50MHz``)
+
+		prologue_samples : int
+			The number of samples to capture **before** the trigger.
+			(default: 1)
+
+		Returns
+		-------
+		StreamILA
+			The new ILA, its ``trigger`` signal is used to start the capture.
+
+		Raises
+		------
+		RuntimeError
+			If the hub is already hosting the maximum number of ILAs.
+		'''
+
+		if len(self.ilas) >= self.MAX_ILAS:
+			raise RuntimeError(f'A UART ILA hub can host at most {self.MAX_ILAS} ILAs')
+
+		ila = StreamILA(
+			signals          = signals,
+			sample_depth     = sample_depth,
+			sampling_domain  = sampling_domain,
+			sample_rate      = sample_rate,
+			prologue_samples = prologue_samples,
+			output_domain    = self._domain,
+			stream_width     = 8, # The UART only ever deals in bytes
+		)
+
+		self.ilas.append(ila)
+		return ila
+
+	def elaborate(self: Self, _) -> Module:
+		m = Module()
+
+		# The ILAs already know their domains, so only the hub logic gets renamed
+		hub = Module()
+
+		hub.submodules.framer = framer = _RCOBSFramer(has_header = True)
+		hub.submodules.uart   = uart   = AsyncSerial(divisor = self.divisor)
+
+		for channel, ila in enumerate(self.ilas):
+			m.submodules[f'ila{channel}'] = ila
+
+		data_rx = Signal.like(uart.rx.data)
+		command = Signal(4, decoder = UARTILACommand)
+		target  = Signal(4)
+		channel = Signal(4)
+		send    = Array(Signal(name = f'send{idx}') for idx in range(len(self.ilas)))
+		stream  = Array(Signal(name = f'stream{idx}') for idx in range(len(self.ilas)))
+
+		hub.d.comb += [
+			# Connect the UART
+			self.tx.eq(uart.tx.o),
+			uart.rx.i.eq(self.rx),
+			# Glue the framer to the UARTs face
+			uart.tx.data.eq(framer.tx_data),
+			uart.tx.ack.eq(framer.tx_ack),
+			framer.tx_rdy.eq(uart.tx.rdy),
+			# Each frame is tagged with the channel it's for
+			framer.header.eq(channel),
+			# Split the command byte into the target channel and the command proper
+			command.eq(data_rx[0:4]),
+			target.eq(data_rx[4:8]),
+		]
+
+		with hub.FSM(name = 'rx') as fsm:
+			hub.d.comb += [ uart.rx.start.eq(fsm.ongoing('IDLE')), ]
+
+			with hub.State('IDLE'):
+				with hub.If(uart.rx.done):
+					hub.d.sync += [ data_rx.eq(uart.rx.data), ]
+					hub.next = 'CMD'
+
+			with hub.State('CMD'):
+				# Silently drop any commands for channels we don't have
+				with hub.If(target < len(self.ilas)):
+					with hub.Switch(command):
+						with hub.Case(UARTILACommand.FLUSH):
+							hub.d.sync += [ send[target].eq(1), ]
+						with hub.Case(UARTILACommand.STREAM):
+							hub.d.sync += [
+								send[target].eq(1),
+								stream[target].eq(1),
+							]
+						with hub.Case(UARTILACommand.STOP):
+							hub.d.sync += [ stream[target].eq(0), ]
+						with hub.Case(UARTILACommand.RETRIGGER):
+							# The new capture gets sent once it's complete
+							hub.d.sync += [ send[target].eq(1), ]
+							with hub.Switch(target):
+								for idx, ila in enumerate(self.ilas):
+									with hub.Case(idx):
+										hub.d.comb += [ ila.retrigger.eq(1), ]
+
+				hub.d.sync += [ data_rx.eq(0), ]
+				hub.next = 'IDLE'
+
+		with hub.FSM(name = 'mux') as fsm:
+			hub.d.comb += [ self.idle.eq(fsm.ongoing('IDLE') & framer.idle), ]
+
+			with hub.State('IDLE'):
+				# Walk the channels from highest to lowest so the lowest channel wins
+				for idx, ila in reversed(list(enumerate(self.ilas))):
+					# Poke the streams so they can present their data
+					hub.d.comb += [ ila.stream.ready.eq(~ila.stream.valid), ]
+
+					with hub.If(ila.stream.valid & send[idx]):
+						hub.d.sync += [ channel.eq(idx), ]
+						hub.next = 'FRAME'
+
+			with hub.State('FRAME'):
+				with hub.Switch(channel):
+					for idx, ila in enumerate(self.ilas):
+						with hub.Case(idx):
+							hub.d.comb += [ framer.stream.stream_eq(ila.stream), ]
+
+				with hub.If(framer.done):
+					with hub.If(~stream[channel]):
+						hub.d.sync += [ send[channel].eq(0), ]
+					hub.next = 'IDLE'
+
+		# Fix up the hub domain, if needed
+		if self._domain != 'sync':
+			hub = DomainRenamer(sync = self._domain)(hub)
+
+		m.submodules.hub = hub
+
+		return m
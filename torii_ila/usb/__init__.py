@@ -1,26 +1,67 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
-from argparse import ArgumentParser
+from argparse       import ArgumentParser, Namespace
+from importlib      import import_module
+from importlib.util import find_spec
+from typing         import TYPE_CHECKING, Any
 
-try:
-	from ._impl import USBIntegratedLogicAnalyzerBackhaul, USBIntegratedLogicAnalyzer # noqa: F401
+from ..manifest     import ILAManifest
 
-	ILA_HAS_USB = True
+if TYPE_CHECKING:
+	from torii.hdl.ast import Signal
 
+	from ._async       import USBIntegratedLogicAnalyzerAsyncBackhaul # noqa: F401
+	from ._backhaul    import ( # noqa: F401
+		USBILARequest, USBILAStatus, USBILAConfig, USBILADevice, find_ilas, USBIntegratedLogicAnalyzerBackhaul,
+		USBIntegratedLogicAnalyzerCaptureManager, USBIntegratedLogicAnalyzerHubBackhaul,
+	)
+	from ._impl        import USBIntegratedLogicAnalyzer, USBIntegratedLogicAnalyzerHub # noqa: F401
+
+ILA_HAS_USB = all(find_spec(module) is not None for module in ( 'usb', 'torii_usb', 'usb_construct' ))
+
+# Where each of the public names lives, they are only imported when first used so that the host side
+# doesn't pull in the gateware, and the gateware doesn't pull in asyncio.
+_LAZY = {
+	'USBILARequest':                            '_backhaul',
+	'USBILAStatus':                             '_backhaul',
+	'USBILAConfig':                             '_backhaul',
+	'USBILADevice':                             '_backhaul',
+	'find_ilas':                                '_backhaul',
+	'USBIntegratedLogicAnalyzerBackhaul':       '_backhaul',
+	'USBIntegratedLogicAnalyzerAsyncBackhaul':  '_async',
+	'USBIntegratedLogicAnalyzerCaptureManager': '_backhaul',
+	'USBIntegratedLogicAnalyzer':               '_impl',
+	'USBIntegratedLogicAnalyzerHubBackhaul':    '_backhaul',
+	'USBIntegratedLogicAnalyzerHub':            '_impl',
+}
+
+if ILA_HAS_USB:
 	__all__ = (
+		'USBILARequest',
+		'USBILAStatus',
+		'USBILAConfig',
+		'USBILADevice',
+		'find_ilas',
 		'USBIntegratedLogicAnalyzerBackhaul',
+		'USBIntegratedLogicAnalyzerAsyncBackhaul',
+		'USBIntegratedLogicAnalyzerCaptureManager',
 		'USBIntegratedLogicAnalyzer',
+		'USBIntegratedLogicAnalyzerHubBackhaul',
+		'USBIntegratedLogicAnalyzerHub',
 		'ILA_HAS_USB',
 	)
-
-except ImportError:
-	ILA_HAS_USB = False
-
+else:
 	__all__ = (
 		'ILA_HAS_USB',
 	)
 
+def __getattr__(name: str) -> Any:
+	if not ILA_HAS_USB or (module := _LAZY.get(name)) is None:
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+	globals()[name] = value = getattr(import_module(f'.{module}', __name__), name)
+	return value
 
 def _setup_args(parent_parser: ArgumentParser) -> None:
 	# If we don't have USB ILA support, bail
@@ -32,3 +73,134 @@ def _setup_args(parent_parser: ArgumentParser) -> None:
 		title = 'USB',
 		description = 'USB Specific ILA Options'
 	)
+
+	parser.add_argument(
+		'--max-pkt-size',
+		type    = int,
+		default = 512,
+		help    = 'The max packet size of the bulk endpoint the samples are sent over'
+	)
+
+	parser.add_argument(
+		'--stream-width',
+		type    = int,
+		default = None,
+		help    = 'The width of the stream the samples are serialized into, if not a whole sample'
+	)
+
+	parser.add_argument(
+		'--serial-number',
+		type    = str,
+		default = None,
+		help    = 'The serial number the device reports'
+	)
+
+	parser.add_argument(
+		'--delayed-connect',
+		action = 'store_true',
+		help   = 'Wait until the first capture is complete before connecting to the host'
+	)
+
+	parser.add_argument(
+		'--on-demand',
+		action = 'store_true',
+		help   = 'Hold each capture until the host asks for it rather than sending it as soon as it completes'
+	)
+
+def _build_ila(args: Namespace, signals: list['Signal']) -> tuple['USBIntegratedLogicAnalyzer', list['Signal']]:
+	''' Build the USB ILA described by the CLI arguments, its UTMI bus is requested from the platform '''
+
+	from ._impl import USBIntegratedLogicAnalyzer
+
+	ila = USBIntegratedLogicAnalyzer(
+		signals          = signals,
+		sample_depth     = args.sample_depth,
+		sampling_domain  = args.sampling_domain,
+		sample_rate      = args.sample_rate * 1e6,
+		prologue_samples = args.prologue_samples,
+		delayed_connect  = args.delayed_connect,
+		max_pkt_size     = args.max_pkt_size,
+		serial_number    = args.serial_number,
+		stream_width     = args.stream_width,
+		embed_layout     = not args.no_embed_layout,
+		auto_send        = not args.on_demand,
+	)
+
+	return ila, []
+
+def _setup_capture_args(parent_parser: ArgumentParser) -> None:
+	parser = parent_parser.add_argument_group(
+		title = 'USB',
+		description = 'USB Specific Capture Options'
+	)
+
+	parser.add_argument(
+		'--serial-number',
+		type    = str,
+		default = None,
+		help    = 'The serial number of the device to capture from, if not given the first one found is used'
+	)
+
+	parser.add_argument(
+		'--timeout',
+		type    = float,
+		default = 10,
+		help    = 'The most seconds to wait for the device to enumerate'
+	)
+
+	parser.add_argument(
+		'--trigger-timeout',
+		type    = float,
+		default = None,
+		help    = 'The most seconds to wait for the capture to complete, if not given wait for as long as it takes'
+	)
+
+	parser.add_argument(
+		'--retrigger',
+		action = 'store_true',
+		help   = 'Start a new capture right away rather than waiting on the trigger'
+	)
+
+	parser.add_argument(
+		'--no-arm',
+		action = 'store_true',
+		help   = 'Leave the ILA trigger input as it is rather than arming it'
+	)
+
+	parser.add_argument(
+		'--on-demand',
+		action  = 'store_true',
+		default = None,
+		help    = 'The ILA was built with `auto_send` unset, if not in the manifest'
+	)
+
+def _get_backhaul(args: Namespace, manifest: ILAManifest | None) -> 'USBIntegratedLogicAnalyzerBackhaul':
+	''' Connect to the USB ILA described by the CLI arguments, reading its layout off of it if not given '''
+
+	from ._backhaul import USBIntegratedLogicAnalyzerBackhaul
+
+	if manifest is None:
+		return USBIntegratedLogicAnalyzerBackhaul.from_device(
+			timeout = args.timeout, serial_number = args.serial_number, auto_send = not args.on_demand
+		)
+
+	# Anything not given on the command line is taken from the manifest
+	backhaul = USBIntegratedLogicAnalyzerBackhaul(
+		manifest, timeout = args.timeout, serial_number = args.serial_number,
+		auto_send = None if args.on_demand is None else not args.on_demand
+	)
+	# Make sure we aren't about to decode the samples with the wrong layout
+	backhaul.check_config()
+
+	return backhaul
+
+def _wait_for_capture(args: Namespace, backhaul: 'USBIntegratedLogicAnalyzerBackhaul') -> None:
+	''' Arm or retrigger the USB ILA as asked, and wait on the capture to complete '''
+
+	if not args.no_arm:
+		backhaul.arm()
+
+	if args.retrigger:
+		backhaul.retrigger()
+
+	backhaul.wait_for_capture(args.trigger_timeout)
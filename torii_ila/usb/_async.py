@@ -0,0 +1,286 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+The asyncio flavor of the USB ILA backhaul.
+
+'''
+
+import asyncio
+from collections.abc    import Callable, Iterable
+from concurrent.futures import Executor
+from functools          import partial
+from typing             import TYPE_CHECKING, Any, Self
+
+import usb.core
+
+from ..backhaul         import AsyncILABackhaulInterface
+from ..layout           import ILALayout
+from ..manifest         import ILAManifest
+from .._bits            import bits
+from ._backhaul         import (
+	_BULK_EP_NUM, _ENUMERATION_POLL_INTERVAL, USBILAConfig, USBILARequest, USBILAStatus, _bulk_max_packet_size,
+	_find_device, _read_layout, _request_window, _vendor_in, _vendor_out,
+)
+
+if TYPE_CHECKING:
+	from ._impl import USBIntegratedLogicAnalyzer
+
+__all__ = (
+	'USBIntegratedLogicAnalyzerAsyncBackhaul',
+)
+
+async def _async_wait_for_device(
+	loop: asyncio.AbstractEventLoop, executor: Executor | None, timeout: float, serial_number: str | None = None
+) -> 'usb.core.Device':
+	''' Like :py:func:`_wait_for_device` but waits between looks on the event loop. '''
+
+	deadline = loop.time() + timeout
+
+	while (device := await loop.run_in_executor(executor, _find_device, serial_number)) is None:
+		if loop.time() >= deadline:
+			raise RuntimeError(f'Timed out after {timeout}s waiting for the USB ILA device to enumerate')
+		await asyncio.sleep(_ENUMERATION_POLL_INTERVAL)
+
+	return device
+
+class USBIntegratedLogicAnalyzerAsyncBackhaul(AsyncILABackhaulInterface['USBIntegratedLogicAnalyzer']):
+	'''
+	The asyncio flavor of :py:class:`USBIntegratedLogicAnalyzerBackhaul`.
+
+	pyusb only has blocking transfers, so they are run on an executor, but they are always bounded by a
+	short timeout. While waiting on a capture, the bulk endpoint is polled a packet at a time so no executor
+	thread is ever parked on a single device, this lets a small shared pool service many devices at once.
+
+	The backhaul must be connected with :py:meth:`connect` before use, or constructed with :py:meth:`from_device`.
+
+	See :py:class:`torii_ila.backhaul.AsyncILABackhaulInterface` for public API.
+
+	Parameters
+	----------
+	ila : USBIntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA being used, or its layout or manifest.
+
+	executor : concurrent.futures.Executor | None
+		The executor to run the USB transfers on, if not specified the event loop default executor is used.
+		(default: None)
+
+	poll_timeout : int
+		The timeout in milliseconds for each poll of the bulk endpoint while waiting for a capture.
+		(default: 100)
+
+	read_timeout : int
+		The timeout in milliseconds for reading the rest of the sample buffer once it starts arriving.
+		(default: 1000)
+
+	capture_timeout : float | None
+		The most seconds to wait for a capture to start arriving, if ``None`` wait for as long as it takes.
+		(default: None)
+
+	serial_number : str | None
+		The serial number of the device to connect to, if not specified, the serial number the ILA was
+		built with is used, or the one in the manifest, and failing that, the first Torii ILA device found.
+		(default: None)
+
+	auto_send : bool | None
+		Whether the ILA sends each capture as soon as it completes, if not given this is taken from the ILA or
+		manifest, and is ``True`` when only a layout is given.
+		(default: None)
+	'''
+
+	def __init__(
+		self: Self, ila: 'USBIntegratedLogicAnalyzer | ILALayout | ILAManifest', *, executor: Executor | None = None,
+		poll_timeout: int = 100, read_timeout: int = 1000, capture_timeout: float | None = None,
+		serial_number: str | None = None, auto_send: bool | None = None
+	) -> None:
+		super().__init__(ila)
+
+		if serial_number is None:
+			serial_number = getattr(ila, 'serial_number', None)
+
+		self.serial_number    = serial_number
+		self._executor        = executor
+		self._poll_timeout    = poll_timeout
+		self._read_timeout    = read_timeout
+		self._capture_timeout = capture_timeout
+		self._auto_send       = getattr(ila, 'auto_send', True) if auto_send is None else auto_send
+		self._device          = None
+		self._endpoint        = _BULK_EP_NUM
+		self._max_packet_size = 0
+
+	@classmethod
+	async def from_device(
+		cls, timeout: float = 10, *, executor: Executor | None = None, serial_number: str | None = None,
+		auto_send: bool = True
+	) -> 'USBIntegratedLogicAnalyzerAsyncBackhaul':
+		'''
+		Construct and connect a backhaul using the ILA layout read back from the device.
+
+		Parameters
+		----------
+		timeout : float
+			The most seconds to wait for the USB device to enumerate.
+			(default: 10)
+
+		executor : concurrent.futures.Executor | None
+			The executor to run the USB transfers on.
+			(default: None)
+
+		serial_number : str | None
+			The serial number of the device to connect to.
+			(default: None)
+
+		auto_send : bool
+			Whether the ILA was built with ``auto_send`` set, this is not part of the layout.
+			(default: True)
+
+		Returns
+		-------
+		USBIntegratedLogicAnalyzerAsyncBackhaul
+			The newly constructed backhaul interface.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA was built without its layout descriptor.
+		'''
+
+		loop   = asyncio.get_running_loop()
+		device = await _async_wait_for_device(loop, executor, timeout, serial_number)
+		layout = await loop.run_in_executor(executor, _read_layout, device)
+
+		return await cls(
+			layout, executor = executor, serial_number = serial_number, auto_send = auto_send
+		).connect(timeout = 0)
+
+	async def connect(self: Self, timeout: float = 10) -> Self:
+		'''
+		Wait for the device to enumerate and attach to it.
+
+		Parameters
+		----------
+		timeout : float
+			The most seconds to wait for the USB device to enumerate.
+			(default: 10)
+
+		Returns
+		-------
+		USBIntegratedLogicAnalyzerAsyncBackhaul
+			This backhaul, for chaining.
+
+		Raises
+		------
+		RuntimeError
+			If the USB ILA device did not enumerate in time.
+		'''
+
+		device = await _async_wait_for_device(asyncio.get_running_loop(), self._executor, timeout, self.serial_number)
+
+		self._device          = device
+		self._max_packet_size = await self._run(_bulk_max_packet_size, device, self._endpoint)
+
+		return self
+
+	async def _run(self: Self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+		return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+	async def arm(self: Self) -> None:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul.arm`. '''
+
+		await self._run(_vendor_out, self._device, USBILARequest.ARM, 1)
+
+	async def disarm(self: Self) -> None:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul.disarm`. '''
+
+		await self._run(_vendor_out, self._device, USBILARequest.ARM, 0)
+
+	async def retrigger(self: Self) -> None:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul.retrigger`. '''
+
+		await self._run(_vendor_out, self._device, USBILARequest.RETRIGGER)
+
+	async def status(self: Self) -> USBILAStatus:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul.status`. '''
+
+		return USBILAStatus((await self._run(_vendor_in, self._device, USBILARequest.STATUS, 1))[0])
+
+	async def config(self: Self) -> USBILAConfig:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul.config`. '''
+
+		return USBILAConfig.unpack(
+			await self._run(_vendor_in, self._device, USBILARequest.CONFIG, USBILAConfig._FORMAT.size)
+		)
+
+	async def check_config(self: Self) -> None:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul.check_config`. '''
+
+		if (device := await self.config()) != (local := USBILAConfig.from_layout(self.layout)):
+			raise RuntimeError(f'ILA on the device does not match the local ILA, got {device} expected {local}')
+
+	async def _ingest_samples(self: Self) -> Iterable[bits]:
+		'''
+		Collect samples from the ILA backhaul interface.
+
+		We poll the bulk endpoint a single packet at a time until the capture starts coming in, a single
+		packet transfer either lands whole or not at all, so nothing is lost when a poll times out. Once
+		the first packet arrives the rest of the sample buffer is read in one go.
+
+		Returns
+		-------
+		Iterable[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+
+		Raises
+		------
+		RuntimeError
+			If the backhaul is not connected, or the capture didn't start arriving within ``capture_timeout``.
+		'''
+
+		if self._device is None:
+			raise RuntimeError('The USB ILA backhaul is not connected, did you forget to call connect()?')
+
+		if not self._auto_send:
+			await self._run(_request_window, self._device, 0, self.layout.sample_depth)
+
+		return await self._read_samples(self.layout.sample_depth)
+
+	async def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		''' See :py:meth:`USBIntegratedLogicAnalyzerBackhaul._ingest_range`. '''
+
+		if self._device is None:
+			raise RuntimeError('The USB ILA backhaul is not connected, did you forget to call connect()?')
+
+		if self._auto_send:
+			return await super()._ingest_range(start, count)
+
+		await self._run(_request_window, self._device, start, count)
+		return await self._read_samples(count)
+
+	async def _read_samples(self: Self, count: int) -> list[bits]:
+		''' Read the given number of samples out of the bulk endpoint, see :py:meth:`_ingest_samples`. '''
+
+		total_samples = count * self.layout.bytes_per_sample
+		endpoint      = 0x80 | self._endpoint
+
+		loop = asyncio.get_running_loop()
+		if self._capture_timeout is not None:
+			deadline = loop.time() + self._capture_timeout
+
+		while True:
+			try:
+				samples = bytes(await self._run(
+					self._device.read, endpoint, self._max_packet_size, timeout = self._poll_timeout
+				))
+				break
+			except usb.core.USBTimeoutError:
+				if self._capture_timeout is not None and loop.time() >= deadline:
+					raise RuntimeError(
+						f'Timed out after {self._capture_timeout}s waiting for a capture from the USB ILA'
+					)
+
+		if len(samples) < total_samples:
+			samples += bytes(await self._run(
+				self._device.read, endpoint, total_samples - len(samples), timeout = self._read_timeout
+			))
+
+		return list(self._split_samples(samples))
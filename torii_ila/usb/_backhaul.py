@@ -0,0 +1,720 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
+
+'''
+Host side of the USB ILA, the backhauls and the vendor requests they use.
+
+Nothing here needs the gateware, so a capture can be read back with only :py:mod:`usb` installed.
+
+'''
+
+import struct
+import time
+from collections.abc    import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from enum               import IntEnum, IntFlag, unique
+from pathlib            import Path
+from typing             import TYPE_CHECKING, NamedTuple, Self
+
+import usb
+import usb.util
+
+from ..backhaul         import ILABackhaulInterface, Samples
+from ..layout           import ILALayout
+from ..manifest         import ILAManifest
+from .._bits            import bits
+
+if TYPE_CHECKING:
+	from ..ila  import StreamILA
+	from ._impl import USBIntegratedLogicAnalyzer, USBIntegratedLogicAnalyzerHub
+
+__all__ = (
+	'USBILARequest',
+	'USBILAStatus',
+	'USBILAConfig',
+	'USBILADevice',
+	'find_ilas',
+	'USBIntegratedLogicAnalyzerBackhaul',
+	'USBIntegratedLogicAnalyzerCaptureManager',
+	'USBIntegratedLogicAnalyzerHubBackhaul',
+)
+
+# The fixed IDs and bulk endpoint of the USB ILA device, see :py:class:`USBIntegratedLogicAnalyzer`
+_USB_VID     = 0x1D50
+_USB_PID     = 0x6190
+_BULK_EP_NUM = 1
+
+@unique
+class USBILARequest(IntEnum):
+	''' These are the vendor control requests the USB ILA knows about '''
+
+	ARM       = 0x01
+	''' Arm (``wValue`` of ``1``) or disarm (``wValue`` of ``0``) the ILA ``trigger`` input. '''
+	RETRIGGER = 0x02
+	''' Start a new capture right away, regardless of the ILA ``trigger`` input. '''
+	STATUS    = 0x03
+	''' Read back the :py:class:`USBILAStatus` of the ILA as a single byte. '''
+	CONFIG    = 0x04
+	''' Read back the :py:class:`USBILAConfig` of the ILA. '''
+	LAYOUT    = 0x05
+	'''
+	Read back up to one packet of the :py:class:`ILALayout <torii_ila.layout.ILALayout>` descriptor of the ILA,
+	starting at the byte offset in ``wIndex``.
+	'''
+	READ_START = 0x06
+	'''
+	Set the first sample of the window sent by the next :py:attr:`USBILARequest.READ`, the low 16 bits are in
+	``wValue`` and the high 16 bits in ``wIndex``.
+	'''
+	READ       = 0x07
+	'''
+	Send a window of the sample buffer out of the bulk endpoint again, the number of samples to send has its
+	low 16 bits in ``wValue`` and the high 16 bits in ``wIndex``. Windows that start past the end of the sample
+	buffer are ignored, and the rest are clamped to it.
+	'''
+
+class USBILAStatus(IntFlag):
+	''' The status flags returned from a :py:attr:`USBILARequest.STATUS` request '''
+
+	ARMED    = 0x01
+	''' The ILA ``trigger`` input is armed. '''
+	SAMPLING = 0x02
+	''' The ILA is actively sampling. '''
+	COMPLETE = 0x04
+	''' The ILA has completed sampling. '''
+
+class USBILAConfig(NamedTuple):
+	'''
+	The ILA configuration returned from a :py:attr:`USBILARequest.CONFIG` request.
+
+	On the wire this is a little-endian ``u32`` sample depth, ``u16`` sample width, and ``u32`` layout hash.
+	'''
+
+	_FORMAT = struct.Struct('<IHI')
+
+	sample_depth: int
+	''' The depth of the ILA sample buffer in samples. '''
+	sample_width: int
+	''' The width of the sample vector in bits. '''
+	layout_hash: int
+	''' CRC32 of the names and widths of the captured signals, in sample order. '''
+
+	@classmethod
+	def from_layout(cls, layout: ILALayout) -> 'USBILAConfig':
+		return cls(layout.sample_depth, layout.sample_width, layout.layout_hash)
+
+	@classmethod
+	def unpack(cls, data: bytes) -> 'USBILAConfig':
+		return cls(*cls._FORMAT.unpack(data))
+
+	def pack(self: Self) -> bytes:
+		return self._FORMAT.pack(*self)
+
+# How often to look for the USB device while waiting for it to enumerate
+_ENUMERATION_POLL_INTERVAL = 0.05
+# How often to check the ILA status while waiting for a capture
+_STATUS_POLL_INTERVAL = 0.01
+
+def _serial_number(device: 'usb.core.Device') -> str | None:
+	''' Get the serial number of a USB device, if it has one and we're allowed to read it. '''
+
+	if not device.iSerialNumber:
+		return None
+
+	try:
+		return usb.util.get_string(device, device.iSerialNumber)
+	except (usb.core.USBError, ValueError, NotImplementedError):
+		return None
+
+def _find_device(serial_number: str | None = None) -> 'usb.core.Device | None':
+	''' Find the Torii ILA USB device, optionally the one with the given serial number. '''
+
+	if serial_number is None:
+		return usb.core.find(
+			idVendor = _USB_VID, idProduct = _USB_PID
+		)
+
+	return usb.core.find(
+		idVendor = _USB_VID, idProduct = _USB_PID,
+		custom_match = lambda device: _serial_number(device) == serial_number
+	)
+
+class USBILADevice(NamedTuple):
+	''' An attached Torii ILA USB device, as returned from :py:func:`find_ilas`. '''
+
+	serial_number: str | None
+	''' The serial number of the device, or ``None`` if it could not be read. '''
+	bus: int
+	''' The USB bus the device is on. '''
+	address: int
+	''' The address of the device on its bus. '''
+
+def find_ilas() -> list[USBILADevice]:
+	'''
+	Enumerate all of the Torii ILA USB devices currently attached to the host.
+
+	This covers both :py:class:`USBIntegratedLogicAnalyzer` and :py:class:`USBIntegratedLogicAnalyzerHub`
+	devices, as they share a VID:PID. To tell devices apart they should be built with a unique
+	``serial_number`` each.
+
+	Returns
+	-------
+	list[USBILADevice]
+		The attached devices.
+	'''
+
+	return [
+		USBILADevice(_serial_number(device), device.bus, device.address)
+		for device in usb.core.find(
+			find_all = True,
+			idVendor = _USB_VID, idProduct = _USB_PID
+		)
+	]
+
+def _wait_for_device(
+	timeout: float, serial_number: str | None = None, poll_interval: float = _ENUMERATION_POLL_INTERVAL
+) -> 'usb.core.Device':
+	'''
+	Poll for the Torii ILA USB device to enumerate.
+
+	Parameters
+	----------
+	timeout : float
+		The most seconds to wait for the device to show up.
+
+	serial_number : str | None
+		The serial number of the device to wait for, if not specified, any Torii ILA device will do.
+
+	poll_interval : float
+		The number of seconds between each look for the device.
+
+	Returns
+	-------
+	usb.core.Device
+		The device, as soon as it has enumerated.
+
+	Raises
+	------
+	RuntimeError
+		If the device did not enumerate in time.
+	'''
+
+	deadline = time.monotonic() + timeout
+
+	while (device := _find_device(serial_number)) is None:
+		if time.monotonic() >= deadline:
+			raise RuntimeError(f'Timed out after {timeout}s waiting for the USB ILA device to enumerate')
+		time.sleep(poll_interval)
+
+	return device
+
+def _vendor_out(device: 'usb.core.Device', request: USBILARequest, value: int = 0, index: int = 0) -> None:
+	request_type = usb.util.build_request_type(
+		usb.util.CTRL_OUT, usb.util.CTRL_TYPE_VENDOR, usb.util.CTRL_RECIPIENT_DEVICE
+	)
+	device.ctrl_transfer(request_type, request, value, index, None)
+
+def _request_window(device: 'usb.core.Device', start: int, count: int) -> None:
+	''' Ask the ILA to send ``count`` samples starting at ``start`` out of the bulk endpoint. '''
+
+	_vendor_out(device, USBILARequest.READ_START, start & 0xFFFF, start >> 16)
+	_vendor_out(device, USBILARequest.READ, count & 0xFFFF, count >> 16)
+
+def _vendor_in(device: 'usb.core.Device', request: USBILARequest, length: int, index: int = 0) -> bytes:
+	request_type = usb.util.build_request_type(
+		usb.util.CTRL_IN, usb.util.CTRL_TYPE_VENDOR, usb.util.CTRL_RECIPIENT_DEVICE
+	)
+	return bytes(device.ctrl_transfer(request_type, request, 0, index, length))
+
+def _read_layout(device: 'usb.core.Device', chunk_size: int = 64) -> ILALayout:
+	''' Read the ILA layout descriptor off the device one control packet at a time. '''
+
+	data = bytearray(_vendor_in(device, USBILARequest.LAYOUT, chunk_size))
+	if len(data) == 0:
+		raise RuntimeError(
+			'The USB ILA was built without its layout descriptor, the backhaul needs to be built from the ILA or '
+			'its layout'
+		)
+
+	length = ILALayout.packed_length(data)
+
+	while len(data) < length:
+		chunk = _vendor_in(device, USBILARequest.LAYOUT, min(chunk_size, length - len(data)), len(data))
+		if len(chunk) == 0:
+			raise RuntimeError('USB ILA layout descriptor ended early')
+		data += chunk
+
+	return ILALayout.unpack(bytes(data))
+
+def _bulk_max_packet_size(device: 'usb.core.Device', endpoint: int) -> int:
+	''' Get the max packet size of the ILA bulk endpoint from the active configuration. '''
+
+	interface = device.get_active_configuration()[(0, 0)]
+	return usb.util.find_descriptor(interface, bEndpointAddress = 0x80 | endpoint).wMaxPacketSize
+
+class USBIntegratedLogicAnalyzerBackhaul(ILABackhaulInterface['USBIntegratedLogicAnalyzer']):
+	'''
+	USB-based ILA backhaul interface, used in combination with :py:class:`USBIntegratedLogicAnalyzer`
+	to automatically set up a communications channel to get ILA samples off-device.
+
+	An instance of this class is typically created by calling :py:meth:`USBIntegratedLogicAnalyzer.get_backhaul`
+	which lets the ILA configure the backhaul as needed.
+
+	Alternatively you can pass the :py:class:`USBIntegratedLogicAnalyzer` instance from the gateware
+	to the constructor of this module.
+
+	This backhaul interface works by sending a request to the bulk endpoint
+	:py:attr:`BULK_EP_NUM <torii_ila.usb.USBIntegratedLogicAnalyzer.BULK_EP_NUM>` that is provided by the
+	ILA backend for the USB device with the VID/PID also specified by the ILA.
+
+	If the gateware isn't at hand, :py:meth:`from_device` reads the ILA layout from the device itself.
+
+	See :py:class:`torii_ila.backhaul.ILABackhaulInterface` for public API.
+
+	Parameters
+	----------
+	ila : USBIntegratedLogicAnalyzer | ILALayout | ILAManifest
+		The ILA being used, or its layout or manifest.
+
+	timeout : float
+		The most seconds to wait for the USB device to enumerate, we connect as soon as it shows up.
+		(default: 10)
+
+	serial_number : str | None
+		The serial number of the device to connect to, if not specified, the serial number the ILA was
+		built with is used, or the one in the manifest, and failing that, the first Torii ILA device found.
+		(default: None)
+
+	auto_send : bool | None
+		Whether the ILA sends each capture as soon as it completes, if not given this is taken from the ILA or
+		manifest, and is ``True`` when only a layout is given. Otherwise every capture is asked for with
+		:py:attr:`USBILARequest.READ`, and :py:meth:`read_range` only moves the samples it was asked for.
+		(default: None)
+
+	Raises
+	------
+	RuntimeError
+		If the USB device did not enumerate in time.
+
+	'''
+
+	def __init__(
+		self: Self, ila: 'USBIntegratedLogicAnalyzer | ILALayout | ILAManifest', timeout: float = 10,
+		serial_number: str | None = None, auto_send: bool | None = None
+	) -> None:
+		super().__init__(ila)
+
+		if serial_number is None:
+			serial_number = getattr(ila, 'serial_number', None)
+
+		self._device    = _wait_for_device(timeout, serial_number)
+		self._endpoint  = _BULK_EP_NUM
+		self._auto_send = getattr(ila, 'auto_send', True) if auto_send is None else auto_send
+
+	@property
+	def _ranged_readout(self: Self) -> bool:
+		# Otherwise the whole capture is already on its way out of the bulk endpoint
+		return not self._auto_send
+
+	@classmethod
+	def from_device(
+		cls, timeout: float = 10, serial_number: str | None = None, auto_send: bool = True
+	) -> 'USBIntegratedLogicAnalyzerBackhaul':
+		'''
+		Construct a backhaul using the ILA layout read back from the device.
+
+		Parameters
+		----------
+		timeout : float
+			The most seconds to wait for the USB device to enumerate.
+			(default: 10)
+
+		serial_number : str | None
+			The serial number of the device to connect to.
+			(default: None)
+
+		auto_send : bool
+			Whether the ILA was built with ``auto_send`` set, this is not part of the layout.
+			(default: True)
+
+		Returns
+		-------
+		USBIntegratedLogicAnalyzerBackhaul
+			The newly constructed backhaul interface.
+
+		Raises
+		------
+		RuntimeError
+			If the ILA was built without its layout descriptor.
+		'''
+
+		return cls(
+			_read_layout(_wait_for_device(timeout, serial_number)), timeout = 0, serial_number = serial_number,
+			auto_send = auto_send
+		)
+
+	def _control_out(self: Self, request: USBILARequest, value: int = 0) -> None:
+		_vendor_out(self._device, request, value)
+
+	def _control_in(self: Self, request: USBILARequest, length: int) -> bytes:
+		return _vendor_in(self._device, request, length)
+
+	def arm(self: Self) -> None:
+		''' Arm the ILA, letting the ``trigger`` input in the gateware start a capture. '''
+
+		self._control_out(USBILARequest.ARM, 1)
+
+	def disarm(self: Self) -> None:
+		''' Disarm the ILA, the ``trigger`` input in the gateware is ignored until :py:meth:`arm` is called. '''
+
+		self._control_out(USBILARequest.ARM, 0)
+
+	def retrigger(self: Self) -> None:
+		'''
+		Start a new capture right away, even if the ILA is disarmed.
+
+		The samples from the new capture can then be collected with :py:meth:`refresh` or :py:meth:`update`.
+		'''
+
+		self._control_out(USBILARequest.RETRIGGER)
+
+	def status(self: Self) -> USBILAStatus:
+		'''
+		Get the current status of the ILA.
+
+		Returns
+		-------
+		USBILAStatus
+			The ILA status flags.
+		'''
+
+		return USBILAStatus(self._control_in(USBILARequest.STATUS, 1)[0])
+
+	def wait_for_capture(self: Self, timeout: float | None = None) -> None:
+		'''
+		Wait for the ILA to complete a capture.
+
+		Parameters
+		----------
+		timeout : float | None
+			The most seconds to wait for the capture, if not given wait for as long as it takes.
+			(default: None)
+
+		Raises
+		------
+		RuntimeError
+			If the capture was not completed in time.
+		'''
+
+		deadline = None if timeout is None else time.monotonic() + timeout
+
+		while USBILAStatus.COMPLETE not in self.status():
+			if deadline is not None and time.monotonic() >= deadline:
+				raise RuntimeError(f'Timed out after {timeout}s waiting for the USB ILA to complete a capture')
+			time.sleep(_STATUS_POLL_INTERVAL)
+
+	def config(self: Self) -> USBILAConfig:
+		'''
+		Read the configuration of the ILA back from the device.
+
+		Returns
+		-------
+		USBILAConfig
+			The ILA configuration.
+		'''
+
+		return USBILAConfig.unpack(self._control_in(USBILARequest.CONFIG, USBILAConfig._FORMAT.size))
+
+	def check_config(self: Self) -> None:
+		'''
+		Ensure the ILA on the device matches the one this backhaul was constructed with.
+
+		Raises
+		------
+		RuntimeError
+			If the device reports a different sample depth, sample width, or signal layout.
+		'''
+
+		if (device := self.config()) != (local := USBILAConfig.from_layout(self.layout)):
+			raise RuntimeError(f'ILA on the device does not match the local ILA, got {device} expected {local}')
+
+	def _ingest_samples(self: Self) -> Iterable[bits]:
+		'''
+		Collect samples from the ILA backhaul interface.
+
+		In the case of the USB backhaul, we have a bulk endpoint which sends us the ILA
+		buffer when requested.
+
+		Those are then transformed into bit-vectors with the padding truncated.
+
+		Returns
+		-------
+		Iterable[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+		'''
+
+		if not self._auto_send:
+			_request_window(self._device, 0, self.layout.sample_depth)
+
+		return self._read_samples(self.layout.sample_depth)
+
+	def _ingest_range(self: Self, start: int, count: int) -> Iterable[bits]:
+		'''
+		Collect a window of the sample buffer from the ILA backhaul interface.
+
+		If the ILA sends each capture as soon as it completes the whole capture has to be drained out of
+		the bulk endpoint first, so the window is cut out of that, otherwise only the window is read.
+
+		Returns
+		-------
+		Iterable[torii_ila._bits.bits]
+			Collection of sample bit-vectors.
+		'''
+
+		if self._auto_send:
+			return super()._ingest_range(start, count)
+
+		_request_window(self._device, start, count)
+		return self._read_samples(count)
+
+	def _read_samples(self: Self, count: int) -> list[bits]:
+		''' Read the given number of samples out of the bulk endpoint. '''
+
+		samples = self._device.read(0x80 | self._endpoint, count * self.layout.bytes_per_sample, timeout = 0)
+		return list(self._split_samples(samples))
+
+class USBIntegratedLogicAnalyzerCaptureManager:
+	'''
+	Drives a collection of :py:class:`USBIntegratedLogicAnalyzer` devices attached to the same host, such as
+	a board farm, arming and reading them all in parallel.
+
+	The devices are keyed by their serial number, so they must each have been built with a unique
+	``serial_number``. Typically an instance of this class is created by calling :py:meth:`discover`.
+
+	Each device keeps its own sample store, which is the ``samples`` of its backhaul.
+
+	Parameters
+	----------
+	backhauls : Mapping[str, USBIntegratedLogicAnalyzerBackhaul]
+		The backhaul for each device, keyed by its serial number.
+
+	max_workers : int | None
+		The most devices to talk to at once, if not specified all of them are.
+		(default: None)
+
+	Attributes
+	----------
+	backhauls : dict[str, USBIntegratedLogicAnalyzerBackhaul]
+		The backhaul for each device, keyed by its serial number.
+	'''
+
+	def __init__(
+		self: Self, backhauls: Mapping[str, USBIntegratedLogicAnalyzerBackhaul], max_workers: int | None = None
+	) -> None:
+		self.backhauls    = dict(backhauls)
+		self._max_workers = max_workers
+
+	@classmethod
+	def discover(
+		cls, ila: 'USBIntegratedLogicAnalyzer | ILALayout | None' = None, max_workers: int | None = None
+	) -> 'USBIntegratedLogicAnalyzerCaptureManager':
+		'''
+		Construct a capture manager for all of the Torii ILA devices currently attached to the host.
+
+		Parameters
+		----------
+		ila : USBIntegratedLogicAnalyzer | ILALayout | None
+			The ILA all of the devices are running, if not specified the layout is read back from each
+			device, which allows for driving devices running different ILAs.
+			(default: None)
+
+		max_workers : int | None
+			The most devices to talk to at once, if not specified all of them are.
+			(default: None)
+
+		Returns
+		-------
+		USBIntegratedLogicAnalyzerCaptureManager
+			The newly constructed capture manager.
+
+		Raises
+		------
+		RuntimeError
+			If the serial number of a device could not be read, or multiple devices share a serial number.
+		'''
+
+		serial_numbers = list[str]()
+		for device in find_ilas():
+			if device.serial_number is None:
+				raise RuntimeError(
+					f'Unable to read the serial number of the Torii ILA on bus {device.bus} address {device.address}'
+				)
+			if device.serial_number in serial_numbers:
+				raise RuntimeError(
+					f'Multiple Torii ILAs have the serial number \'{device.serial_number}\', '
+					'give each build a unique serial_number'
+				)
+			serial_numbers.append(device.serial_number)
+
+		def _connect(serial_number: str) -> USBIntegratedLogicAnalyzerBackhaul:
+			if ila is None:
+				return USBIntegratedLogicAnalyzerBackhaul.from_device(timeout = 0, serial_number = serial_number)
+			return USBIntegratedLogicAnalyzerBackhaul(ila, timeout = 0, serial_number = serial_number)
+
+		return cls(dict(zip(serial_numbers, map(_connect, serial_numbers))), max_workers)
+
+	def __len__(self: Self) -> int:
+		return len(self.backhauls)
+
+	def __getitem__(self: Self, serial_number: str) -> USBIntegratedLogicAnalyzerBackhaul:
+		return self.backhauls[serial_number]
+
+	@property
+	def samples(self: Self) -> dict[str, Samples]:
+		''' The samples collected from each device, keyed by its serial number. '''
+
+		return { serial: backhaul.samples for serial, backhaul in self.backhauls.items() }
+
+	def _for_each_device(self: Self, action: str) -> None:
+		if len(self.backhauls) == 0:
+			return
+
+		with ThreadPoolExecutor(max_workers = self._max_workers or len(self.backhauls)) as pool:
+			# Drain the list so any exceptions from the devices get raised here
+			list(pool.map(lambda backhaul: getattr(backhaul, action)(), self.backhauls.values()))
+
+	def arm(self: Self) -> None:
+		''' Arm all of the devices. '''
+
+		self._for_each_device('arm')
+
+	def disarm(self: Self) -> None:
+		''' Disarm all of the devices. '''
+
+		self._for_each_device('disarm')
+
+	def retrigger(self: Self) -> None:
+		''' Start a new capture on all of the devices right away. '''
+
+		self._for_each_device('retrigger')
+
+	def check_config(self: Self) -> None:
+		''' Ensure the ILA on every device matches the one its backhaul was constructed with. '''
+
+		self._for_each_device('check_config')
+
+	def refresh(self: Self) -> None:
+		''' Refresh the sample stores of all of the devices in parallel. '''
+
+		self._for_each_device('refresh')
+
+	def update(self: Self) -> None:
+		''' Append a new capture to the sample stores of all of the devices in parallel. '''
+
+		self._for_each_device('update')
+
+	def write_vcds(self: Self, directory: Path, inject_sample_clock: bool = True, post_step: int = 1) -> None:
+		'''
+		Dump the samples from each device into ``<serial number>.vcd`` in the given directory.
+
+		Parameters
+		----------
+		directory : Path
+			The directory to write the VCD files into, it is created if needed.
+
+		inject_sample_clock : bool
+			Add a clock that is timed to the ILA sample clock.
+			(default: True)
+
+		post_step : int
+			The number of post-sample steps to append to the VCD.
+			(default: 1)
+		'''
+
+		directory.mkdir(parents = True, exist_ok = True)
+
+		for serial, backhaul in self.backhauls.items():
+			backhaul.write_vcd(directory / f'{serial}.vcd', inject_sample_clock, post_step)
+
+class _USBHubChannelBackhaul(USBIntegratedLogicAnalyzerBackhaul):
+	'''
+	Backhaul for a single ILA on a :py:class:`USBIntegratedLogicAnalyzerHub`, it shares the USB device
+	with all of the other channels on the hub and only reads from its own bulk endpoint.
+
+	The hub does not implement the :py:class:`USBILARequest` control requests, so the ILA control
+	methods are not available on hub channels.
+	'''
+
+	def __init__(self: Self, ila: 'StreamILA', device: 'usb.core.Device', endpoint: int) -> None:
+		ILABackhaulInterface.__init__(self, ila)
+
+		self._device    = device
+		self._endpoint  = endpoint
+		# The hub always streams each capture out as soon as it completes
+		self._auto_send = True
+
+class USBIntegratedLogicAnalyzerHubBackhaul:
+	'''
+	Backhaul interface for a :py:class:`USBIntegratedLogicAnalyzerHub`.
+
+	Each ILA on the hub gets its own channel, which is a full backhaul interface in its own right,
+	see :py:class:`torii_ila.backhaul.ILABackhaulInterface` for their API. The channels are indexed in
+	the order the ILAs were added to the hub.
+
+	The :py:meth:`refresh` and :py:meth:`update` methods on the hub backhaul read all of the channels
+	concurrently, so samples from ILAs that are triggered together can be correlated.
+
+	Parameters
+	----------
+	hub : USBIntegratedLogicAnalyzerHub
+		The ILA hub being used.
+
+	timeout : float
+		The most seconds to wait for the USB device to enumerate, we connect as soon as it shows up.
+		(default: 10)
+
+	serial_number : str | None
+		The serial number of the device to connect to, if not specified, the serial number the hub was
+		built with is used, and failing that, the first Torii ILA device found.
+		(default: None)
+
+	Attributes
+	----------
+	channels : list[ILABackhaulInterface]
+		The backhaul interface for each ILA on the hub.
+	'''
+
+	def __init__(
+		self: Self, hub: 'USBIntegratedLogicAnalyzerHub', timeout: float = 10, serial_number: str | None = None
+	) -> None:
+		self.hub = hub
+
+		self._device  = _wait_for_device(timeout, serial_number or hub.serial_number)
+		self.channels = [
+			_USBHubChannelBackhaul(ila, self._device, ep_num)
+			for ep_num, ila in zip(hub.endpoints, hub.ilas)
+		]
+
+	def __len__(self: Self) -> int:
+		return len(self.channels)
+
+	def __getitem__(self: Self, idx: int) -> ILABackhaulInterface:
+		return self.channels[idx]
+
+	def _for_each_channel(self: Self, action: str) -> None:
+		if len(self.channels) == 0:
+			return
+
+		with ThreadPoolExecutor(max_workers = len(self.channels)) as pool:
+			# Drain the list so any exceptions from the channels get raised here
+			list(pool.map(lambda chan: getattr(chan, action)(), self.channels))
+
+	def refresh(self: Self) -> None:
+		''' Refresh the sample buffers of all of the hub channels concurrently. '''
+
+		self._for_each_channel('refresh')
+
+	def update(self: Self) -> None:
+		''' Update the sample buffers of all of the hub channels concurrently. '''
+
+		self._for_each_channel('update')
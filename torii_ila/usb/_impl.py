@@ -2,122 +2,277 @@
 # SPDX-FileCopyrightText: 2025 Aki Van Ness <aki@lethalbit.net>
 
 '''
-USB Based ILA and backhaul interface.
+USB Based ILA gateware.
 
 '''
 
-import time
-from collections.abc                     import Generator, Iterable
+from collections.abc                     import Iterable
 from typing                              import Self
 
-from torii.hdl.ast                       import Cat, Signal
+from torii.hdl.ast                       import Cat, Const, Mux, Signal
 from torii.hdl.dsl                       import FSM, Module
 from torii.hdl.ir                        import Elaboratable
+from torii.hdl.xfrm                      import DomainRenamer
 from torii.build.plat                    import Platform
+from torii.lib.cdc                       import FFSynchronizer
 
 from usb_construct.emitters              import DeviceDescriptorCollection
+from usb_construct.types                 import USBRequestRecipient, USBRequestType
+from torii_usb.stream.generator          import StreamSerializer
+from torii_usb.usb.request               import SetupPacket
+from torii_usb.usb.request.control       import ControlRequestHandler
+from torii_usb.usb.stream                import USBInStreamInterface
 from torii_usb.usb.usb2.device           import USBDevice
-from torii_usb.usb.usb2.endpoints.stream import USBMultibyteStreamInEndpoint
-
-import usb
-
-from ..ila                               import StreamILA
-from ..backhaul                          import ILABackhaulInterface
-from .._bits                             import bits
+from torii_usb.usb.usb2.endpoints.stream import USBMultibyteStreamInEndpoint, USBStreamInEndpoint
+
+from ..ila                               import StreamILA, _LayoutROM
+from ..layout                            import ILALayout
+from ..manifest                          import ILAManifest, ILATransport
+from ._backhaul                          import (
+	_BULK_EP_NUM, _USB_PID, _USB_VID, USBILAConfig, USBILARequest, USBIntegratedLogicAnalyzerBackhaul,
+	USBIntegratedLogicAnalyzerHubBackhaul,
+)
 
 __all__ = (
-	'USBIntegratedLogicAnalyzerBackhaul',
 	'USBIntegratedLogicAnalyzer',
+	'USBIntegratedLogicAnalyzerHub',
 )
 
+def _request_bus(platform: Platform, bus: str | tuple[str, int] | None):
+	''' Request the USB bus resource described by ``bus`` from the platform. '''
 
-class USBIntegratedLogicAnalyzerBackhaul(ILABackhaulInterface['USBIntegratedLogicAnalyzer']):
-	'''
-	USB-based ILA backhaul interface, used in combination with :py:class:`USBIntegratedLogicAnalyzer`
-	to automatically set up a communications channel to get ILA samples off-device.
+	if bus is None:
+		return platform.request('usb')
+
+	if isinstance(bus, str):
+		return platform.request(bus)
+
+	if isinstance(bus, tuple) and len(bus) == 2:
+		return platform.request(bus[0], bus[1])
+
+	raise ValueError(f'Invalid USB bus resource {bus!r}, expected a name or a (name, number) tuple')
+
+# The serial number reported by ILAs that weren't given one
+_DEFAULT_SERIAL_NUMBER = '000000000'
+
+def _check_serial_number(serial_number: str | None, discard_str_desc: bool) -> None:
+	''' Make sure the requested serial number can actually be reported by the device. '''
+
+	if serial_number is None:
+		return
+
+	if discard_str_desc:
+		raise ValueError('A serial number can not be set when discarding the string descriptors')
+	if len(serial_number) == 0 or len(serial_number) > 126:
+		raise ValueError(f'The serial number must be between 1 and 126 characters long, not {len(serial_number)}')
+
+def _make_descriptors(
+	vid: int, pid: int, endpoints: Iterable[int], max_pkt_size: int, discard_str_desc: bool,
+	serial_number: str | None = None
+) -> DeviceDescriptorCollection:
+	''' Build the descriptors for a Torii ILA device with a bulk IN endpoint for each of ``endpoints``. '''
 
-	An instance of this class is typically created by calling :py:meth:`USBIntegratedLogicAnalyzer.get_backhaul`
-	which lets the ILA configure the backhaul as needed.
+	desc = DeviceDescriptorCollection()
 
-	Alternatively you can pass the :py:class:`USBIntegratedLogicAnalyzer` instance from the gateware
-	to the constructor of this module.
+	with desc.DeviceDescriptor() as dev:
+		dev.idVendor  = vid
+		dev.idProduct = pid
 
-	This backhaul interface works by sending a request to the bulk endpoint
-	:py:attr:`BULK_EP_NUM <torii_ila.usb.USBIntegratedLogicAnalyzer.BULK_EP_NUM>` that is provided by the
-	ILA backend for the USB device with the VID/PID also specified by the ILA.
+		if not discard_str_desc:
+			dev.iManufacturer = 'Shrine Maiden Heavy Industries'
+			dev.iProduct      = 'Torii ILA'
+			dev.iSerialNumber = serial_number or _DEFAULT_SERIAL_NUMBER
 
-	See :py:class:`torii_ila.backhaul.ILABackhaulInterface` for public API.
+		dev.bNumConfigurations = 1
+
+	with desc.ConfigurationDescriptor() as cfg:
+		with cfg.InterfaceDescriptor() as iface:
+			iface.bInterfaceNumber = 0
+
+			for ep_num in endpoints:
+				with iface.EndpointDescriptor() as ep:
+					ep.bEndpointAddress = 0x80 | ep_num
+					ep.wMaxPacketSize   = max_pkt_size
+
+	return desc
+
+class _USBILARequestHandler(ControlRequestHandler):
+	'''
+	Handles the :py:class:`USBILARequest` vendor requests on the control endpoint.
 
 	Parameters
 	----------
-	ila : USBIntegratedLogicAnalyzer
-		The ILA being used.
+	layout : ILALayout
+		The layout of the ILA to report.
 
-	delay : int
-		The number of second to delay the attempt to connect to the USB device, to allow for enumeration.
+	max_packet_size : int
+		The max packet size of the control endpoint.
+		(default: 64)
 
-	'''
+	embed_layout : bool
+		Keep the layout descriptor in ROM, otherwise :py:attr:`USBILARequest.LAYOUT` is always answered with
+		an empty packet.
+		(default: True)
 
-	def __init__(self: Self, ila: 'USBIntegratedLogicAnalyzer', delay: int = 3) -> None:
-		super().__init__(ila)
+	Attributes
+	----------
+	armed : Signal, out
+		Whether the ILA ``trigger`` input is armed, starts armed.
 
-		if delay > 0:
-			time.sleep(delay)
+	retrigger : Signal, out
+		Strobed when the host asks for a new capture.
 
-		self._device = usb.core.find(idVendor = self.ila.USB_VID, idProduct = self.ila.USB_PID)
+	status : Signal(8), in
+		The :py:class:`USBILAStatus` to report.
 
-	def _split_samples(self: Self, samples: bytes) -> Generator[bits]:
-		'''
-		Split the raw sample data stream into a stream of bit-vectors.
+	read : Signal, out
+		Strobed when the host asks for a window of the sample buffer.
 
-		Parameters
-		----------
-		samples : bytes
-			The ILA sample data to be split.
+	read_start : Signal(32), out
+		The first sample of the window the host last asked for.
 
-		Returns
-		-------
-		Generator[torii.ila._bits.bits]
-			Stream of samples as appropriately sized bit-vectors.
-		'''
+	read_count : Signal(32), out
+		The number of samples in the window the host last asked for.
+	'''
 
-		sample_width = self.ila.bytes_per_sample
+	def __init__(self: Self, layout: ILALayout, max_packet_size: int = 64, *, embed_layout: bool = True) -> None:
+		super().__init__()
 
-		for idx in range(0, len(samples), sample_width):
-			sample_raw = samples[idx:idx + sample_width]
-			sample_len = len(Cat(self.ila._signals))
+		self._config          = USBILAConfig.from_layout(layout).pack()
+		self._layout          = layout.pack() if embed_layout else b''
+		self._max_packet_size = max_packet_size
 
-			yield bits.from_bytes(sample_raw, sample_len)
+		self.armed     = Signal(reset = 1)
+		self.retrigger = Signal()
+		self.status    = Signal(8)
 
-	def _ingest_samples(self: Self) -> Iterable[bits]:
-		'''
-		Collect samples from the ILA backhaul interface.
+		self.read       = Signal()
+		self.read_start = Signal(32)
+		self.read_count = Signal(32)
+
+	def elaborate(self: Self, _) -> Module:
+		m = Module()
 
-		In the case of the USB backhaul, we have a bulk endpoint which sends us the ILA
-		buffer when requested.
+		interface = self.interface
+		setup     = interface.setup
 
-		Those are then transformed into bit-vectors with the padding truncated.
+		m.submodules.transmitter = transmitter = StreamSerializer(
+			data_length = len(self._config), domain = 'usb', stream_type = USBInStreamInterface,
+			max_length_width = len(self._config).bit_length()
+		)
 
-		Returns
-		-------
-		Iterable[torii_ila._bits.bits]
-			Collection of sample bit-vectors.
-		'''
+		m.submodules.layout = layout = DomainRenamer(sync = 'usb')(
+			_LayoutROM(self._layout, max_length = self._max_packet_size)
+		)
 
-		sample_width  = self.ila.bytes_per_sample
-		total_samples = self.ila.sample_depth * sample_width
+		m.d.comb += [
+			layout.offset.eq(setup.index),
+			layout.length.eq(setup.length),
+		]
+
+		arm_value       = Signal(7)
+		arm_strobe      = Signal()
+		retrigger_value = Signal(7)
+
+		with m.If(arm_strobe):
+			m.d.usb += [ self.armed.eq(arm_value[0]), ]
+
+		# This is only ever a strobe, and is registered so the window is in place by the time it goes out
+		m.d.usb += [ self.read.eq(0), ]
+
+		with m.FSM(domain = 'usb'):
+			with m.State('IDLE'):
+				# Always start our responses with DATA1 pids, per [USB 2.0: 8.5.3].
+				m.d.usb += [ interface.tx_data_pid.eq(1), ]
+
+				with m.If(setup.received & self.handler_condition(setup)):
+					with m.Switch(setup.request):
+						with m.Case(USBILARequest.ARM):
+							m.next = 'ARM'
+						with m.Case(USBILARequest.RETRIGGER):
+							m.next = 'RETRIGGER'
+						with m.Case(USBILARequest.STATUS):
+							m.next = 'STATUS'
+						with m.Case(USBILARequest.CONFIG):
+							m.next = 'CONFIG'
+						with m.Case(USBILARequest.LAYOUT):
+							m.next = 'LAYOUT'
+						with m.Case(USBILARequest.READ_START):
+							m.next = 'READ_START'
+						with m.Case(USBILARequest.READ):
+							m.next = 'READ'
+						with m.Default():
+							m.next = 'UNHANDLED'
+
+			with m.State('ARM'):
+				self.handle_register_write_request(m, arm_value, arm_strobe)
+
+			with m.State('RETRIGGER'):
+				self.handle_register_write_request(m, retrigger_value, self.retrigger)
+
+			with m.State('STATUS'):
+				self.handle_simple_data_request(m, transmitter, self.status)
+
+			with m.State('CONFIG'):
+				self.handle_simple_data_request(
+					m, transmitter, Const(int.from_bytes(self._config, byteorder = 'little'), len(self._config) * 8),
+					length = len(self._config)
+				)
+
+			with m.State('LAYOUT'):
+				m.d.comb += [ layout.stream.attach(interface.tx), ]
+
+				with m.If(interface.data_requested):
+					m.d.comb += [ layout.start.eq(1), ]
+
+				with m.If(interface.status_requested):
+					m.d.comb += [ interface.handshakes_out.ack.eq(1), ]
+					m.next = 'IDLE'
+
+			# The window is wider than a register write can carry, so it's spread over wValue and wIndex
+			with m.State('READ_START'):
+				with m.If(interface.status_requested):
+					m.d.comb += self.send_zlp()
+
+				with m.If(interface.handshakes_in.ack):
+					m.d.usb += [ self.read_start.eq(Cat(setup.value, setup.index)), ]
+					m.next = 'IDLE'
+
+			with m.State('READ'):
+				with m.If(interface.status_requested):
+					m.d.comb += self.send_zlp()
+
+				with m.If(interface.handshakes_in.ack):
+					m.d.usb += [
+						self.read_count.eq(Cat(setup.value, setup.index)),
+						self.read.eq(1),
+					]
+					m.next = 'IDLE'
+
+			with m.State('UNHANDLED'):
+				# Stall at the next opportunity, then go back to idle
+				with m.If(interface.data_requested | interface.status_requested):
+					m.d.comb += [ interface.handshakes_out.stall.eq(1), ]
+					m.next = 'IDLE'
 
-		# BUG(aki): We drain the full sample buffer all at once, which, while fine for smaller
-		#           capture depths might be a problem for wide/deep captures.
-		samples = self._device.read(0x80 | self.ila.BULK_EP_NUM, total_samples, timeout = 0)
-		return list(self._split_samples(samples))
+		return m
+
+	def handler_condition(self: Self, setup: SetupPacket):
+		return (
+			(setup.type == USBRequestType.VENDOR) &
+			(setup.recipient == USBRequestRecipient.DEVICE)
+		)
 
 class USBIntegratedLogicAnalyzer(Elaboratable):
 	'''
 	A simple ILA that produces samples over a USB bulk endpoint.
 
-	This shows up as a USB device with VID:PID of ``04A0:ACA7`` on the host with the Product string
-	of ``Torii ILA`` and the Serial Number string of ``000000000``.
+	This shows up as a USB device with VID:PID of ``1D50:6190`` on the host with the Product string
+	of ``Torii ILA`` and the Serial Number string of ``000000000`` unless a ``serial_number`` is given.
+
+	The ILA can be controlled from the host with the :py:class:`USBILARequest` vendor requests on the
+	control endpoint, which allows it to be armed, disarmed, and retriggered, as well as having its
+	status and configuration read back, without needing to reconnect to the device.
 
 	Parameters
 	----------
@@ -161,6 +316,38 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 		so, or devices that are under heavy BRAM pressure.
 		(default: False)
 
+	serial_number : str | None
+		The Serial Number string the device reports, this should be unique per-build when there are
+		multiple ILAs attached to the same host so they can be told apart.
+		(default: None)
+
+	stream_width : int | None
+		Serialize samples down to this many bits in the sampling domain, before they cross over into the
+		USB domain, see :py:class:`StreamILA <torii_ila.ila.StreamILA>`. Setting this to ``8`` shrinks
+		the CDC FIFO for wide captures, at the cost of the sampling side taking ``words_per_sample`` times
+		as long to drain the sample memory. If ``None`` whole samples cross over and are sliced up by
+		the endpoint.
+		(default: None)
+
+	embed_layout : bool
+		Keep the :py:class:`ILALayout <torii_ila.layout.ILALayout>` descriptor in ROM so it can be read back
+		with :py:attr:`USBILARequest.LAYOUT`. Leaving it out saves the block RAM it takes up, but the backhaul
+		has to be built from the ILA or its layout rather than ``from_device``. The layout hash is still
+		reported by :py:attr:`USBILARequest.CONFIG` either way.
+		(default: True)
+
+	auto_send : bool
+		Send each capture out of the bulk endpoint as soon as it completes. If ``False`` captures are only
+		sent when the host asks for a window of one with :py:attr:`USBILARequest.READ`, which lets it read
+		back just the part of the sample buffer it is interested in.
+		(default: True)
+
+	Raises
+	------
+	ValueError
+		If a ``serial_number`` is given along with ``discard_string_descriptors``, or it is not between
+		1 and 126 characters long.
+
 	Attributes
 	----------
 	ila : StreamILA
@@ -184,8 +371,18 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 	bytes_per_sample : int
 		The number of whole bytes per sample.
 
+	config : USBILAConfig
+		The ILA configuration reported to the host by the :py:attr:`USBILARequest.CONFIG` request.
+
+	manifest : ILAManifest
+		The :py:class:`ILAManifest <torii_ila.manifest.ILAManifest>` of the ILA, for building a backhaul
+		without the gateware.
+
+	serial_number : str | None
+		The Serial Number string the device reports, if one was given.
+
 	trigger : Signal, in
-		ILA Sample start trigger strobe.
+		ILA Sample start trigger strobe, ignored while the ILA is disarmed by the host.
 
 	sampling : Signal, out
 		Indicates when the ILA is actively sampling.
@@ -206,10 +403,10 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 		Value is set to ``0x6190``.
 	'''
 
-	BULK_EP_NUM = 1
+	BULK_EP_NUM = _BULK_EP_NUM
 
-	USB_VID = 0x1D50
-	USB_PID = 0x6190
+	USB_VID = _USB_VID
+	USB_PID = _USB_PID
 
 	_backhaul: USBIntegratedLogicAnalyzerBackhaul | None = None
 
@@ -240,6 +437,20 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 	def bytes_per_sample(self) -> int:
 		return self.ila.bytes_per_sample
 
+	@property
+	def layout(self) -> ILALayout:
+		return self.ila.layout
+
+	@property
+	def config(self) -> USBILAConfig:
+		return USBILAConfig.from_layout(self.layout)
+
+	@property
+	def manifest(self) -> ILAManifest:
+		return ILAManifest(
+			self.layout, ILATransport.USB, auto_send = self.auto_send, serial_number = self.serial_number
+		)
+
 	def __init__(
 		self: Self, *,
 		# ILA Settings
@@ -247,13 +458,18 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 		sample_rate: float = 50e6, prologue_samples: int = 1,
 		# USB Device Settings
 		bus: str | tuple[str, int] | None = None, delayed_connect: bool = False, max_pkt_size: int = 512,
-		discard_string_descriptors: bool = False
+		discard_string_descriptors: bool = False, serial_number: str | None = None,
+		stream_width: int | None = None, embed_layout: bool = True, auto_send: bool = True
 	) -> None:
+		_check_serial_number(serial_number, discard_string_descriptors)
 
 		self._bus              = bus
 		self._delayed_connect  = delayed_connect
 		self._max_pkt_size     = max_pkt_size
 		self._discard_str_desc = discard_string_descriptors
+		self.serial_number     = serial_number
+		self.embed_layout      = embed_layout
+		self.auto_send         = auto_send
 
 		self.ila = StreamILA(
 			signals          = signals,
@@ -262,6 +478,8 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 			sample_rate      = sample_rate,
 			prologue_samples = prologue_samples,
 			output_domain    = 'usb',
+			stream_width     = stream_width,
+			auto_send        = auto_send,
 		)
 
 		self._signals         = self.ila._signals
@@ -270,7 +488,7 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 		self.sample_period    = self.ila.sample_period
 		self.prologue_samples = self.ila.prologue_samples
 
-		self.trigger  = self.ila.trigger
+		self.trigger  = Signal()
 		self.sampling = self.ila.sampling
 		self.complete = self.ila.complete
 
@@ -361,54 +579,57 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 		self.ila.add_fsm(fsm)
 
 	def _make_descriptors(self: Self) -> DeviceDescriptorCollection:
-		desc = DeviceDescriptorCollection()
-
-		with desc.DeviceDescriptor() as dev:
-			dev.idVendor  = self.USB_VID
-			dev.idProduct = self.USB_PID
-
-			if not self._discard_str_desc:
-				dev.iManufacturer = 'Shrine Maiden Heavy Industries'
-				dev.iProduct      = 'Torii ILA'
-				dev.iSerialNumber = '000000000'
-
-			dev.bNumConfigurations = 1
-
-		with desc.ConfigurationDescriptor() as cfg:
-			with cfg.InterfaceDescriptor() as iface:
-				iface.bInterfaceNumber = 0
-
-				with iface.EndpointDescriptor() as ep:
-					ep.bEndpointAddress = 0x80 | self.BULK_EP_NUM
-					ep.wMaxPacketSize   = self._max_pkt_size
-
-		return desc
+		return _make_descriptors(
+			self.USB_VID, self.USB_PID, (self.BULK_EP_NUM, ), self._max_pkt_size, self._discard_str_desc,
+			self.serial_number
+		)
 
 	def elaborate(self: Self, platform: Platform) -> Module:
 		m = Module()
 
 		m.submodules.ila = ila = self.ila
 
-		if self._bus is not None:
-			if isinstance(self._bus, str):
-				usb_bus = platform.request(self._bus)
-			elif isinstance(self._bus, tuple) and len(self._bus) == 2:
-				usb_bus = platform.request(self._bus[0], self._bus[1])
-		else:
-			usb_bus = platform.request('usb')
-
-		m.submodules.usb = usb = USBDevice(bus = usb_bus)
+		m.submodules.usb = usb = USBDevice(bus = _request_bus(platform, self._bus))
 
 		descriptors = self._make_descriptors()
-		usb.add_standard_control_endpoint(descriptors)
+		control_ep  = usb.add_standard_control_endpoint(descriptors)
 
-		stream_ep = USBMultibyteStreamInEndpoint(
-			endpoint_number = self.BULK_EP_NUM,
-			max_packet_size = self._max_pkt_size,
-			byte_width      = self.bytes_per_sample
-		)
+		requests = _USBILARequestHandler(self.layout, embed_layout = self.embed_layout)
+		control_ep.add_request_handler(requests)
+
+		# The endpoint takes care of slicing up anything wider than a byte into the USB domain
+		if ila.stream_width == 8:
+			stream_ep = USBStreamInEndpoint(
+				endpoint_number = self.BULK_EP_NUM,
+				max_packet_size = self._max_pkt_size,
+			)
+		else:
+			stream_ep = USBMultibyteStreamInEndpoint(
+				endpoint_number = self.BULK_EP_NUM,
+				max_packet_size = self._max_pkt_size,
+				byte_width      = ila.stream_width // 8,
+			)
 		usb.add_endpoint(stream_ep)
 
+		armed    = Signal()
+		sampling = Signal()
+		complete = Signal()
+
+		m.submodules.armed_sync    = FFSynchronizer(requests.armed, armed, o_domain = ila.domain, reset = 1)
+		m.submodules.sampling_sync = FFSynchronizer(ila.sampling, sampling, o_domain = 'usb')
+		m.submodules.complete_sync = FFSynchronizer(ila.complete, complete, o_domain = 'usb')
+
+		m.d.comb += [
+			# Only let the trigger through when we're armed, the host can always retrigger
+			ila.trigger.eq(self.trigger & armed),
+			ila.retrigger.eq(requests.retrigger),
+			requests.status.eq(Cat(requests.armed, sampling, complete)),
+			# Drop windows past the end of the sample buffer, the ILA clamps the rest
+			ila.read.eq(requests.read & (requests.read_start < self.sample_depth) & (requests.read_count != 0)),
+			ila.read_start.eq(requests.read_start),
+			ila.read_count.eq(Mux(requests.read_count > self.sample_depth, self.sample_depth, requests.read_count)),
+		]
+
 		connect = Signal()
 
 		# If we are delaying connection until the ILA is stuffed, wait, otherwise connect right away.
@@ -425,3 +646,185 @@ class USBIntegratedLogicAnalyzer(Elaboratable):
 		]
 
 		return m
+
+class USBIntegratedLogicAnalyzerHub(Elaboratable):
+	'''
+	Hosts multiple ILAs on a single USB device.
+
+	Each ILA added to the hub with :py:meth:`add_ila` gets its own bulk IN endpoint, starting at endpoint
+	``1``, and may sample on its own clock domain. The ILAs are triggered independently by way of the
+	``trigger`` signal on the :py:class:`StreamILA <torii_ila.ila.StreamILA>` returned from :py:meth:`add_ila`.
+
+	The device shows up on the host with the same VID:PID and strings as the :py:class:`USBIntegratedLogicAnalyzer`.
+
+	Parameters
+	----------
+	bus : str | tuple[str, int] | None
+		The USB Bus resource to use.
+		(default: None)
+
+	delayed_connect : bool
+		Delay connection of the USB device until all of the ILAs have completed sampling.
+		(default: False)
+
+	max_pkt_size : int
+		Max packet size.
+		(default: 512)
+
+	discard_string_descriptors : bool
+		Discard the device Manufacturer, Product, and Serial Number string descriptors.
+		(default: False)
+
+	serial_number : str | None
+		The Serial Number string the device reports, see :py:class:`USBIntegratedLogicAnalyzer`.
+		(default: None)
+
+	Attributes
+	----------
+	ilas : list[StreamILA]
+		The ILAs on this hub, in the order they were added.
+
+	endpoints : list[int]
+		The bulk endpoint number for each of the ILAs in ``ilas``.
+
+	USB_VID : int
+		The fixed USB Vendor ID for the Torii-USB USB Device.
+
+	USB_PID : int
+		The fixed USB Product ID for the Torii-USB USB Device.
+	'''
+
+	USB_VID = USBIntegratedLogicAnalyzer.USB_VID
+	USB_PID = USBIntegratedLogicAnalyzer.USB_PID
+
+	MAX_ILAS = 15
+
+	_backhaul: USBIntegratedLogicAnalyzerHubBackhaul | None = None
+
+	def get_backhaul(self: Self) -> USBIntegratedLogicAnalyzerHubBackhaul:
+		'''
+		Automatically construct a :py:class:`USBIntegratedLogicAnalyzerHubBackhaul` from this hub.
+
+		Returns
+		-------
+		USBIntegratedLogicAnalyzerHubBackhaul
+			The newly constructed backhaul interface or the already constructed instance.
+		'''
+
+		if self._backhaul is None:
+			self._backhaul = USBIntegratedLogicAnalyzerHubBackhaul(self)
+		return self._backhaul
+
+	@property
+	def endpoints(self: Self) -> list[int]:
+		return list(range(1, len(self.ilas) + 1))
+
+	def __init__(
+		self: Self, *,
+		bus: str | tuple[str, int] | None = None, delayed_connect: bool = False, max_pkt_size: int = 512,
+		discard_string_descriptors: bool = False, serial_number: str | None = None
+	) -> None:
+		_check_serial_number(serial_number, discard_string_descriptors)
+
+		self._bus              = bus
+		self._delayed_connect  = delayed_connect
+		self._max_pkt_size     = max_pkt_size
+		self._discard_str_desc = discard_string_descriptors
+		self.serial_number     = serial_number
+
+		self.ilas = list[StreamILA]()
+
+	def add_ila(
+		self: Self, *,
+		signals: Iterable[Signal] = list(), sample_depth: int = 32, sampling_domain: str = 'sync',
+		sample_rate: float = 50e6, prologue_samples: int = 1,
+	) -> StreamILA:
+		'''
+		Add a new ILA to the hub.
+
+		Parameters
+		----------
+		signals : Iterable[torii.Signal]
+			The signals to capture with the ILA.
+			(default: list())
+
+		sample_depth : int
+			Number of samples we wish to capture.
+			(default: 32)
+
+		sampling_domain : str
+			The clock domain the ILA sampling will take place on.
+			(default: sync)
+
+		sample_rate : float
+			The outwards facing sample rate used for formatting output.
+			(default: ``50e6`` i.e ``50MHz``)
+
+		prologue_samples : int
+			The number of samples to capture **before** the trigger.
+			(default: 1)
+
+		Returns
+		-------
+		StreamILA
+			The new ILA, its ``trigger`` signal is used to start the capture.
+
+		Raises
+		------
+		RuntimeError
+			If the hub is already hosting the maximum number of ILAs.
+		'''
+
+		if len(self.ilas) >= self.MAX_ILAS:
+			raise RuntimeError(f'A USB ILA hub can host at most {self.MAX_ILAS} ILAs')
+
+		ila = StreamILA(
+			signals          = signals,
+			sample_depth     = sample_depth,
+			sampling_domain  = sampling_domain,
+			sample_rate      = sample_rate,
+			prologue_samples = prologue_samples,
+			output_domain    = 'usb',
+			stream_width     = 8,
+		)
+
+		self.ilas.append(ila)
+		return ila
+
+	def _make_descriptors(self: Self) -> DeviceDescriptorCollection:
+		return _make_descriptors(
+			self.USB_VID, self.USB_PID, self.endpoints, self._max_pkt_size, self._discard_str_desc,
+			self.serial_number
+		)
+
+	def elaborate(self: Self, platform: Platform) -> Module:
+		m = Module()
+
+		m.submodules.usb = usb = USBDevice(bus = _request_bus(platform, self._bus))
+
+		descriptors = self._make_descriptors()
+		usb.add_standard_control_endpoint(descriptors)
+
+		for ep_num, ila in zip(self.endpoints, self.ilas):
+			m.submodules[f'ila{ep_num}'] = ila
+
+			stream_ep = USBStreamInEndpoint(
+				endpoint_number = ep_num,
+				max_packet_size = self._max_pkt_size,
+			)
+			usb.add_endpoint(stream_ep)
+
+			m.d.comb += [ stream_ep.stream.stream_eq(ila.stream), ]
+
+		connect = Signal()
+
+		# If we are delaying connection wait until all of the ILAs are stuffed, otherwise connect right away.
+		if self._delayed_connect:
+			with m.If(Cat(ila.complete for ila in self.ilas).all()):
+				m.d.usb += [ connect.eq(1), ]
+		else:
+			m.d.comb += [ connect.eq(1), ]
+
+		m.d.comb += [ usb.connect.eq(connect), ]
+
+		return m